@@ -13,10 +13,12 @@ Features:
 - Batch entity creation in Stellio
 - Alert generation for significant events
 - State persistence and history tracking
+- Persistent per-camera observation ring buffers
 
 Architecture:
 - AccidentConfig: Load and validate YAML configuration
 - StateStore: Persist detection state and history
+- ObservationBuffer: Persistent per-camera ring buffers of recent metrics
 - DetectionMethod: Base class for anomaly detection algorithms
 - SpeedVarianceDetector: Statistical detection via speed variance
 - OccupancySpikeDetector: Rule-based detection via occupancy spike
@@ -32,20 +34,28 @@ Usage:
 import json
 import logging
 import os
+import sqlite3
 import sys
+import threading
 from abc import ABC, abstractmethod
-from collections import defaultdict, deque
+from collections import defaultdict
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from datetime import datetime, timedelta
+from dataclasses import dataclass
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from queue import Empty, Queue
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
-import requests
+import numpy as np
 import yaml
 
 # Add project root to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
+from shared.accident_history import AccidentHistoryStore
+from shared.async_stellio_writer import get_async_writer
+from shared.stellio_client import get_stellio_client
+
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 )
@@ -62,6 +72,37 @@ def parse_iso(ts: str) -> datetime:
     return datetime.strptime(ts, "%Y-%m-%dT%H:%M:%SZ")
 
 
+# Observation columns kept per camera: timestamp (epoch seconds) and metrics
+OBSERVATION_FIELDS = ("timestamp", "averageSpeed", "occupancy", "intensity")
+
+
+def observation_row(entity: Dict[str, Any]) -> List[float]:
+    """Timestamp and metric values of an observation entity (NaN when missing)"""
+    row = [np.nan] * len(OBSERVATION_FIELDS)
+    observed_at = None
+    for i, prop in enumerate(OBSERVATION_FIELDS[1:], start=1):
+        prop_obj = entity.get(prop)
+        value = prop_obj.get("value") if isinstance(prop_obj, dict) else prop_obj
+        try:
+            row[i] = float(value) if value is not None else np.nan
+        except (TypeError, ValueError):
+            pass
+        if isinstance(prop_obj, dict) and prop_obj.get("observedAt"):
+            observed_at = observed_at or prop_obj["observedAt"]
+
+    if isinstance(entity.get("observedAt"), str):
+        observed_at = entity["observedAt"]
+    if observed_at:
+        try:
+            observed = datetime.fromisoformat(observed_at.replace("Z", "+00:00"))
+            if observed.tzinfo is None:
+                observed = observed.replace(tzinfo=timezone.utc)
+            row[0] = observed.timestamp()
+        except ValueError:
+            pass
+    return row
+
+
 class AccidentConfig:
     """Load and validate accident detection configuration from YAML"""
 
@@ -126,11 +167,29 @@ class AccidentConfig:
 class StateStore:
     """Persistent state store for accident detection"""
 
-    def __init__(self, path: str, history_path: Optional[str] = None):
+    def __init__(
+        self,
+        path: str,
+        history_path: Optional[str] = None,
+        history_dir: Optional[str] = None,
+    ):
+        """
+        Initialize state store.
+
+        Args:
+            path: Camera state JSON file
+            history_path: Legacy JSON-array history file, imported into the
+                partitioned history once
+            history_dir: Directory of daily history partitions (default:
+                history_path without its suffix)
+        """
         self.path = Path(path)
         self.history_path = Path(history_path) if history_path else None
+        if history_dir is None and self.history_path is not None:
+            history_dir = str(self.history_path.with_suffix(""))
+        self.history = AccidentHistoryStore(history_dir) if history_dir else None
         self.data: Dict[str, Any] = {}
-        self.history: List[Dict[str, Any]] = []
+        self._pending_history: List[Dict[str, Any]] = []
         self._load()
         self._load_history()
 
@@ -149,18 +208,18 @@ class StateStore:
             self.data = {}
 
     def _load_history(self) -> None:
-        """Load detection history from JSON file"""
-        if self.history_path and self.history_path.exists():
-            try:
-                with open(self.history_path, "r", encoding="utf-8") as f:
-                    self.history = json.load(f)
-            except Exception as e:
-                logger.warning(
-                    f"Failed to load history file {self.history_path}: {e}, starting fresh"
+        """Import the legacy history file into an empty partitioned history"""
+        if (
+            self.history is not None
+            and self.history_path is not None
+            and self.history_path.is_file()
+            and not self.history.partitions()
+        ):
+            imported = self.history.import_json(str(self.history_path))
+            if imported:
+                logger.info(
+                    f"Imported {imported} records from {self.history_path} into {self.history.directory}"
                 )
-                self.history = []
-        else:
-            self.history = []
 
     def save(self) -> None:
         """Write state to JSON file"""
@@ -172,14 +231,13 @@ class StateStore:
             logger.error(f"Failed to save state to {self.path}: {e}")
 
     def save_history(self) -> None:
-        """Write detection history to JSON file"""
-        if self.history_path:
+        """Append detections recorded since the last save to the history"""
+        if self.history is not None and self._pending_history:
             try:
-                self.history_path.parent.mkdir(parents=True, exist_ok=True)
-                with open(self.history_path, "w", encoding="utf-8") as f:
-                    json.dump(self.history, f, indent=2, ensure_ascii=False)
+                self.history.append(self._pending_history)
+                self._pending_history = []
             except Exception as e:
-                logger.error(f"Failed to save history to {self.history_path}: {e}")
+                logger.error(f"Failed to save history to {self.history.directory}: {e}")
 
     def get_camera_state(self, camera_ref: str) -> Dict[str, Any]:
         """Get state for camera"""
@@ -187,7 +245,6 @@ class StateStore:
             "last_alert_ts": None,
             "alert_count_hour": 0,
             "hour_start": None,
-            "observations": [],
         }
         return self.data.get(camera_ref, default.copy())
 
@@ -196,17 +253,310 @@ class StateStore:
         self.data[camera_ref] = state
 
     def add_to_history(self, detection: Dict[str, Any]) -> None:
-        """Add detection to history"""
-        self.history.append(detection)
-        # Keep history manageable
-        if len(self.history) > 10000:
-            self.history = self.history[-10000:]
+        """Record a detection (written by save_history)"""
+        self._pending_history.append(detection)
 
     def cleanup_old_history(self, retention_days: int) -> None:
-        """Remove detections older than retention period"""
-        cutoff = datetime.utcnow() - timedelta(days=retention_days)
-        cutoff_str = cutoff.strftime("%Y-%m-%dT%H:%M:%SZ")
-        self.history = [h for h in self.history if h.get("timestamp", "") >= cutoff_str]
+        """Drop history partitions older than the retention period"""
+        if self.history is not None:
+            self.history.apply_retention(retention_days)
+
+
+class ObservationBuffer:
+    """
+    Persistent fixed-size ring buffers of recent observations per camera.
+
+    Each camera keeps a (len(FIELDS) x capacity) float array of timestamps
+    (epoch seconds) and metric values (NaN when missing), so a new run starts
+    with the full detection window. Buffers are stored in SQLite as one row
+    per camera; loading reads one row per camera and saving rewrites only
+    the cameras that changed.
+    """
+
+    FIELDS = OBSERVATION_FIELDS
+
+    def __init__(self, path: Optional[str] = None, capacity: int = 50):
+        """
+        Initialize buffer store.
+
+        Args:
+            path: SQLite file (None keeps buffers in memory only)
+            capacity: Observations kept per camera
+        """
+        self.path = Path(path) if path else None
+        self.capacity = capacity
+        self._rings: Dict[str, np.ndarray] = {}
+        self._heads: Dict[str, int] = {}
+        self._counts: Dict[str, int] = {}
+        self._dirty: set = set()
+        self._load()
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path))
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS buffers ("
+            "camera TEXT PRIMARY KEY, capacity INTEGER, head INTEGER, "
+            "count INTEGER, data BLOB)"
+        )
+        return conn
+
+    def _load(self) -> None:
+        """Load all camera buffers from SQLite"""
+        if not self.path or not self.path.exists():
+            return
+        try:
+            conn = self._connect()
+            try:
+                rows = conn.execute(
+                    "SELECT camera, capacity, head, count, data FROM buffers"
+                ).fetchall()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to load buffers {self.path}: {e}, starting fresh")
+            return
+
+        for camera, capacity, head, count, data in rows:
+            ring = np.frombuffer(data, dtype=np.float64).reshape(
+                len(self.FIELDS), capacity
+            )
+            # Unroll to chronological order, then re-fit to current capacity
+            order = np.arange(head - count, head) % capacity
+            values = ring[:, order][:, -self.capacity :]
+            self._rings[camera] = np.full((len(self.FIELDS), self.capacity), np.nan)
+            self._rings[camera][:, : values.shape[1]] = values
+            self._counts[camera] = values.shape[1]
+            self._heads[camera] = values.shape[1] % self.capacity
+
+    def save(self) -> None:
+        """Write changed camera buffers to SQLite"""
+        if not self.path or not self._dirty:
+            return
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO buffers VALUES (?, ?, ?, ?, ?)",
+                        [
+                            (
+                                camera,
+                                self.capacity,
+                                self._heads[camera],
+                                self._counts[camera],
+                                self._rings[camera].tobytes(),
+                            )
+                            for camera in self._dirty
+                        ],
+                    )
+            finally:
+                conn.close()
+            self._dirty.clear()
+        except sqlite3.Error as e:
+            logger.error(f"Failed to save buffers to {self.path}: {e}")
+
+    def append(self, camera_ref: str, entity: Dict[str, Any]) -> bool:
+        """
+        Append an observation's timestamp and metrics to a camera buffer.
+
+        Observations not newer than the camera's newest buffered timestamp
+        are skipped, so re-processing an input file (or one that overlaps the
+        previous run) does not buffer the same observations twice.
+
+        Returns:
+            True if the observation was buffered
+        """
+        row = observation_row(entity)
+        if camera_ref not in self._rings:
+            self._rings[camera_ref] = np.full((len(self.FIELDS), self.capacity), np.nan)
+            self._heads[camera_ref] = 0
+            self._counts[camera_ref] = 0
+        else:
+            buffered = self._rings[camera_ref][0, : self._counts[camera_ref]]
+            if not np.isnan(row[0]) and np.any(buffered >= row[0]):
+                return False
+
+        head = self._heads[camera_ref]
+        self._rings[camera_ref][:, head] = row
+        self._heads[camera_ref] = (head + 1) % self.capacity
+        self._counts[camera_ref] = min(self._counts[camera_ref] + 1, self.capacity)
+        self._dirty.add(camera_ref)
+        return True
+
+    def window(self, camera_ref: str) -> np.ndarray:
+        """
+        Buffered observations of a camera in chronological order.
+
+        Returns:
+            Array of shape (len(FIELDS), n), rows in FIELDS order
+        """
+        if camera_ref not in self._rings:
+            return np.empty((len(self.FIELDS), 0))
+        head, count = self._heads[camera_ref], self._counts[camera_ref]
+        order = np.arange(head - count, head) % self.capacity
+        return self._rings[camera_ref][:, order]
+
+    def observations(self, camera_ref: str) -> List[Dict[str, Any]]:
+        """Buffered observations of a camera as minimal NGSI-LD entities"""
+        observations = []
+        for column in self.window(camera_ref).T:
+            timestamp, values = column[0], column[1:]
+            observed_at = (
+                None
+                if np.isnan(timestamp)
+                else datetime.fromtimestamp(timestamp, timezone.utc).strftime(
+                    "%Y-%m-%dT%H:%M:%SZ"
+                )
+            )
+            obs: Dict[str, Any] = {}
+            for prop, value in zip(self.FIELDS[1:], values):
+                if not np.isnan(value):
+                    obs[prop] = {"type": "Property", "value": float(value)}
+                    if observed_at:
+                        obs[prop]["observedAt"] = observed_at
+            observations.append(obs)
+        return observations
+
+    def batch(self, cameras: List[str]) -> "ObservationBatch":
+        """Buffered observations of several cameras as one ObservationBatch"""
+        return ObservationBatch.from_windows(
+            {camera_ref: self.window(camera_ref) for camera_ref in cameras}
+        )
+
+    def __len__(self) -> int:
+        return len(self._rings)
+
+
+class AlertDispatcher:
+    """
+    Background writer for accident alerts.
+
+    Alerts are queued by the detection loop and appended to the alert file
+    by a worker thread, so alert I/O overlaps entity creation. Alerts
+    queued while a write is in progress are written together in one
+    rewrite of the file.
+    """
+
+    def __init__(self, alert_file: str):
+        """
+        Initialize dispatcher.
+
+        Args:
+            alert_file: JSON file holding the list of alerts
+        """
+        self.alert_file = Path(alert_file)
+        self.queue: Queue = Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, alert: Dict[str, Any]) -> None:
+        """Queue an alert for writing"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="accident-alerts", daemon=True
+                )
+                self._thread.start()
+        self.queue.put(alert)
+
+    def flush(self) -> None:
+        """Block until every queued alert has been written"""
+        self.queue.join()
+
+    def _run(self) -> None:
+        while True:
+            alerts = [self.queue.get()]
+            try:
+                while True:
+                    alerts.append(self.queue.get_nowait())
+            except Empty:
+                pass
+
+            try:
+                self._write(alerts)
+            finally:
+                for _ in alerts:
+                    self.queue.task_done()
+
+    def _write(self, alerts: List[Dict[str, Any]]) -> None:
+        try:
+            self.alert_file.parent.mkdir(parents=True, exist_ok=True)
+            if self.alert_file.exists():
+                with open(self.alert_file, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            else:
+                data = []
+            data.extend(alerts)
+            with open(self.alert_file, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            for alert in alerts:
+                logger.info(
+                    f"Alert generated for {alert['camera']}: {alert['entity_id']}"
+                )
+        except Exception as e:
+            logger.error(
+                f"Failed to write {len(alerts)} alert(s) to {self.alert_file}: {e}"
+            )
+
+
+@dataclass
+class ObservationBatch:
+    """
+    Recent observations of many cameras as (cameras x window) matrices.
+
+    Rows are right-aligned: camera i's newest observation is in the last
+    column and columns before its counts[i] observations are NaN.
+    """
+
+    cameras: List[str]
+    counts: np.ndarray
+    timestamp: np.ndarray
+    speed: np.ndarray
+    occupancy: np.ndarray
+    intensity: np.ndarray
+
+    @classmethod
+    def from_windows(cls, windows: Dict[str, np.ndarray]) -> "ObservationBatch":
+        """
+        Build a batch from per-camera windows.
+
+        Args:
+            windows: Camera → (len(OBSERVATION_FIELDS), n) chronological array
+        """
+        width = max([w.shape[1] for w in windows.values()] + [1])
+        data = np.full((len(OBSERVATION_FIELDS), len(windows), width), np.nan)
+        counts = np.zeros(len(windows), dtype=int)
+        for i, window in enumerate(windows.values()):
+            counts[i] = window.shape[1]
+            if counts[i]:
+                data[:, i, width - counts[i] :] = window
+        return cls(list(windows), counts, *data)
+
+    @classmethod
+    def from_observations(
+        cls, observations: Dict[str, List[Dict[str, Any]]]
+    ) -> "ObservationBatch":
+        """Build a batch from per-camera lists of NGSI-LD observations"""
+        return cls.from_windows(
+            {
+                camera_ref: np.array(
+                    [observation_row(obs) for obs in obs_list], dtype=float
+                )
+                .reshape(len(obs_list), len(OBSERVATION_FIELDS))
+                .T
+                for camera_ref, obs_list in observations.items()
+            }
+        )
+
+
+def _row_stats(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Per-row count, mean and population std of non-NaN values"""
+    counts = (~np.isnan(values)).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = np.nansum(values, axis=1) / counts
+        stds = np.sqrt(np.nansum((values - means[:, None]) ** 2, axis=1) / counts)
+    return counts, means, stds
 
 
 class DetectionMethod(ABC):
@@ -218,7 +568,6 @@ class DetectionMethod(ABC):
         self.enabled = config.get("enabled", True)
         self.weight = float(config.get("weight", 1.0))
 
-    @abstractmethod
     def detect(
         self, observations: List[Dict[str, Any]], camera_ref: str
     ) -> Tuple[bool, float, str]:
@@ -232,6 +581,20 @@ class DetectionMethod(ABC):
         Returns:
             (detected, confidence, reason)
         """
+        batch = ObservationBatch.from_observations({camera_ref: observations})
+        return self.detect_batch(batch)[0]
+
+    @abstractmethod
+    def detect_batch(self, batch: ObservationBatch) -> List[Tuple[bool, float, str]]:
+        """
+        Detect anomalies for every camera of a batch at once.
+
+        Args:
+            batch: Recent observations of all cameras
+
+        Returns:
+            (detected, confidence, reason) per camera, in batch order
+        """
         pass
 
 
@@ -243,59 +606,38 @@ class SpeedVarianceDetector(DetectionMethod):
         self.threshold = float(config.get("threshold", 3.0))
         self.window_size = int(config.get("window_size", 10))
 
-    def detect(
-        self, observations: List[Dict[str, Any]], camera_ref: str
-    ) -> Tuple[bool, float, str]:
+    def detect_batch(self, batch: ObservationBatch) -> List[Tuple[bool, float, str]]:
         """Detect abnormal speed variance indicating collision"""
-        if len(observations) < self.window_size:
-            return (
-                False,
-                0.0,
-                f"insufficient_data: {len(observations)}/{self.window_size}",
-            )
-
-        # Extract speeds from recent observations
-        speeds = []
-        for obs in observations[-self.window_size :]:
-            avg_speed = self._get_value(obs, "averageSpeed")
-            if avg_speed is not None:
-                speeds.append(avg_speed)
-
-        if len(speeds) < self.window_size // 2:
-            return (False, 0.0, "insufficient_speed_data")
-
-        # Calculate mean and standard deviation
-        mean_speed = sum(speeds) / len(speeds)
-        if mean_speed == 0:
-            return (False, 0.0, "zero_mean_speed")
-
-        variance = sum((s - mean_speed) ** 2 for s in speeds) / len(speeds)
-        std_dev = variance**0.5
-
-        if std_dev == 0:
-            return (False, 0.0, "zero_variance")
-
-        # Calculate coefficient of variation
-        cv = std_dev / mean_speed if mean_speed > 0 else 0
-
-        # Detect if variance exceeds threshold
-        if cv > self.threshold:
-            confidence = min(cv / (self.threshold * 2), 1.0)
-            reason = f"speed_variance: cv={cv:.2f}, threshold={self.threshold}"
-            return (True, confidence, reason)
-
-        return (False, 0.0, f"normal_variance: cv={cv:.2f}")
-
-    def _get_value(self, entity: Dict[str, Any], prop: str) -> Optional[float]:
-        """Extract property value from NGSI-LD entity"""
-        prop_obj = entity.get(prop)
-        if isinstance(prop_obj, dict):
-            val = prop_obj.get("value")
-            if val is not None:
-                return float(val)
-        elif prop_obj is not None:
-            return float(prop_obj)
-        return None
+        # Coefficient of variation of the last window_size speeds
+        valid, means, stds = _row_stats(batch.speed[:, -self.window_size :])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cvs = np.where(means > 0, stds / means, 0.0)
+
+        results = []
+        for count, n, mean, std, cv in zip(
+            batch.counts.tolist(),
+            valid.tolist(),
+            means.tolist(),
+            stds.tolist(),
+            cvs.tolist(),
+        ):
+            if count < self.window_size:
+                results.append(
+                    (False, 0.0, f"insufficient_data: {count}/{self.window_size}")
+                )
+            elif n < self.window_size // 2:
+                results.append((False, 0.0, "insufficient_speed_data"))
+            elif mean == 0:
+                results.append((False, 0.0, "zero_mean_speed"))
+            elif std == 0:
+                results.append((False, 0.0, "zero_variance"))
+            elif cv > self.threshold:
+                confidence = min(cv / (self.threshold * 2), 1.0)
+                reason = f"speed_variance: cv={cv:.2f}, threshold={self.threshold}"
+                results.append((True, confidence, reason))
+            else:
+                results.append((False, 0.0, f"normal_variance: cv={cv:.2f}"))
+        return results
 
 
 class OccupancySpikeDetector(DetectionMethod):
@@ -306,58 +648,40 @@ class OccupancySpikeDetector(DetectionMethod):
         self.spike_factor = float(config.get("spike_factor", 2.0))
         self.baseline_window = int(config.get("baseline_window", 20))
 
-    def detect(
-        self, observations: List[Dict[str, Any]], camera_ref: str
-    ) -> Tuple[bool, float, str]:
+    def detect_batch(self, batch: ObservationBatch) -> List[Tuple[bool, float, str]]:
         """Detect sudden increase in occupancy"""
-        if len(observations) < self.baseline_window + 1:
-            return (
-                False,
-                0.0,
-                f"insufficient_data: {len(observations)}/{self.baseline_window + 1}",
-            )
-
-        # Calculate baseline occupancy
-        baseline_obs = observations[-(self.baseline_window + 1) : -1]
-        occupancies = []
-        for obs in baseline_obs:
-            occ = self._get_value(obs, "occupancy")
-            if occ is not None:
-                occupancies.append(occ)
-
-        if len(occupancies) < self.baseline_window // 2:
-            return (False, 0.0, "insufficient_occupancy_data")
-
-        baseline_avg = sum(occupancies) / len(occupancies)
-        if baseline_avg == 0:
-            baseline_avg = 0.1  # Prevent division by zero
-
-        # Check current occupancy
-        current_obs = observations[-1]
-        current_occ = self._get_value(current_obs, "occupancy")
-        if current_occ is None:
-            return (False, 0.0, "missing_current_occupancy")
-
-        # Calculate spike ratio
-        spike_ratio = current_occ / baseline_avg
-
-        if spike_ratio >= self.spike_factor:
-            confidence = min((spike_ratio - 1.0) / self.spike_factor, 1.0)
-            reason = f"occupancy_spike: ratio={spike_ratio:.2f}, baseline={baseline_avg:.2f}, current={current_occ:.2f}"
-            return (True, confidence, reason)
-
-        return (False, 0.0, f"normal_occupancy: ratio={spike_ratio:.2f}")
-
-    def _get_value(self, entity: Dict[str, Any], prop: str) -> Optional[float]:
-        """Extract property value from NGSI-LD entity"""
-        prop_obj = entity.get(prop)
-        if isinstance(prop_obj, dict):
-            val = prop_obj.get("value")
-            if val is not None:
-                return float(val)
-        elif prop_obj is not None:
-            return float(prop_obj)
-        return None
+        # Baseline: mean of the baseline_window observations before the current one
+        baseline = batch.occupancy[:, -(self.baseline_window + 1) : -1]
+        valid, baselines, _ = _row_stats(baseline)
+        baselines = np.where(baselines == 0, 0.1, baselines)  # Prevent division by zero
+        currents = batch.occupancy[:, -1]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ratios = currents / baselines
+
+        required = self.baseline_window + 1
+        results = []
+        for count, n, baseline_avg, current_occ, spike_ratio in zip(
+            batch.counts.tolist(),
+            valid.tolist(),
+            baselines.tolist(),
+            currents.tolist(),
+            ratios.tolist(),
+        ):
+            if count < required:
+                results.append((False, 0.0, f"insufficient_data: {count}/{required}"))
+            elif n < self.baseline_window // 2:
+                results.append((False, 0.0, "insufficient_occupancy_data"))
+            elif np.isnan(current_occ):
+                results.append((False, 0.0, "missing_current_occupancy"))
+            elif spike_ratio >= self.spike_factor:
+                confidence = min((spike_ratio - 1.0) / self.spike_factor, 1.0)
+                reason = f"occupancy_spike: ratio={spike_ratio:.2f}, baseline={baseline_avg:.2f}, current={current_occ:.2f}"
+                results.append((True, confidence, reason))
+            else:
+                results.append(
+                    (False, 0.0, f"normal_occupancy: ratio={spike_ratio:.2f}")
+                )
+        return results
 
 
 class SuddenStopDetector(DetectionMethod):
@@ -369,67 +693,52 @@ class SuddenStopDetector(DetectionMethod):
         self.time_window = int(config.get("time_window", 30))
         self.min_initial_speed = float(config.get("min_initial_speed", 20))
 
-    def detect(
-        self, observations: List[Dict[str, Any]], camera_ref: str
-    ) -> Tuple[bool, float, str]:
+    def detect_batch(self, batch: ObservationBatch) -> List[Tuple[bool, float, str]]:
         """Detect sudden speed drop indicating collision"""
-        if len(observations) < 2:
-            return (False, 0.0, "insufficient_data")
-
-        # Find observations within time window
-        recent = []
-        try:
-            current_time = parse_iso(self._get_observed_at(observations[-1]))
-            for obs in reversed(observations):
-                obs_time = parse_iso(self._get_observed_at(obs))
-                if (current_time - obs_time).total_seconds() <= self.time_window:
-                    recent.insert(0, obs)
-                else:
-                    break
-        except Exception:
-            return (False, 0.0, "timestamp_parse_error")
-
-        if len(recent) < 2:
-            return (False, 0.0, "insufficient_recent_data")
-
-        # Get initial and current speeds
-        initial_speed = self._get_value(recent[0], "averageSpeed")
-        current_speed = self._get_value(recent[-1], "averageSpeed")
-
-        if initial_speed is None or current_speed is None:
-            return (False, 0.0, "missing_speed_data")
-
-        if initial_speed < self.min_initial_speed:
-            return (False, 0.0, f"initial_speed_too_low: {initial_speed}")
-
-        # Calculate speed drop ratio
-        speed_drop_ratio = (initial_speed - current_speed) / initial_speed
-
-        if speed_drop_ratio >= self.speed_drop_threshold:
-            confidence = min(speed_drop_ratio, 1.0)
-            reason = f"sudden_stop: drop={speed_drop_ratio:.2f}, initial={initial_speed:.1f}, current={current_speed:.1f}"
-            return (True, confidence, reason)
-
-        return (False, 0.0, f"normal_deceleration: drop={speed_drop_ratio:.2f}")
-
-    def _get_value(self, entity: Dict[str, Any], prop: str) -> Optional[float]:
-        """Extract property value from NGSI-LD entity"""
-        prop_obj = entity.get(prop)
-        if isinstance(prop_obj, dict):
-            val = prop_obj.get("value")
-            if val is not None:
-                return float(val)
-        elif prop_obj is not None:
-            return float(prop_obj)
-        return None
+        rows, width = batch.speed.shape
+        buffered = np.arange(width) >= (width - batch.counts)[:, None]
+
+        # Observations without a timestamp count as current
+        timestamps = np.where(
+            np.isnan(batch.timestamp),
+            datetime.now(timezone.utc).timestamp(),
+            batch.timestamp,
+        )
 
-    def _get_observed_at(self, entity: Dict[str, Any]) -> str:
-        """Extract observedAt timestamp from entity"""
-        for prop_name in ["observedAt", "averageSpeed", "occupancy", "intensity"]:
-            prop = entity.get(prop_name)
-            if isinstance(prop, dict) and "observedAt" in prop:
-                return prop["observedAt"]
-        return now_iso()
+        # Recent run: newest observations within time_window of the current one
+        within = buffered & (timestamps[:, -1:] - timestamps <= self.time_window)
+        recent = np.cumprod(within[:, ::-1], axis=1).sum(axis=1)
+
+        initials = batch.speed[np.arange(rows), np.clip(width - recent, 0, width - 1)]
+        currents = batch.speed[:, -1]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            drops = (initials - currents) / initials
+
+        results = []
+        for count, n, initial_speed, current_speed, speed_drop_ratio in zip(
+            batch.counts.tolist(),
+            recent.tolist(),
+            initials.tolist(),
+            currents.tolist(),
+            drops.tolist(),
+        ):
+            if count < 2:
+                results.append((False, 0.0, "insufficient_data"))
+            elif n < 2:
+                results.append((False, 0.0, "insufficient_recent_data"))
+            elif np.isnan(initial_speed) or np.isnan(current_speed):
+                results.append((False, 0.0, "missing_speed_data"))
+            elif initial_speed < self.min_initial_speed:
+                results.append((False, 0.0, f"initial_speed_too_low: {initial_speed}"))
+            elif speed_drop_ratio >= self.speed_drop_threshold:
+                confidence = min(speed_drop_ratio, 1.0)
+                reason = f"sudden_stop: drop={speed_drop_ratio:.2f}, initial={initial_speed:.1f}, current={current_speed:.1f}"
+                results.append((True, confidence, reason))
+            else:
+                results.append(
+                    (False, 0.0, f"normal_deceleration: drop={speed_drop_ratio:.2f}")
+                )
+        return results
 
 
 class PatternAnomalyDetector(DetectionMethod):
@@ -439,54 +748,40 @@ class PatternAnomalyDetector(DetectionMethod):
         super().__init__("pattern_anomaly", config)
         self.threshold = float(config.get("intensity_threshold", 2.5))
 
-    def detect(
-        self, observations: List[Dict[str, Any]], camera_ref: str
-    ) -> Tuple[bool, float, str]:
+    def detect_batch(self, batch: ObservationBatch) -> List[Tuple[bool, float, str]]:
         """Detect abnormal traffic intensity patterns"""
-        if len(observations) < 10:
-            return (False, 0.0, f"insufficient_data: {len(observations)}/10")
-
-        # Extract intensity values
-        intensities = []
-        for obs in observations[-20:]:
-            intensity = self._get_value(obs, "intensity")
-            if intensity is not None:
-                intensities.append(intensity)
-
-        if len(intensities) < 5:
-            return (False, 0.0, "insufficient_intensity_data")
-
-        # Calculate mean and std dev
-        mean_intensity = sum(intensities) / len(intensities)
-        variance = sum((i - mean_intensity) ** 2 for i in intensities) / len(
-            intensities
-        )
-        std_dev = variance**0.5
-
-        if std_dev == 0:
-            return (False, 0.0, "zero_variance")
-
-        # Check if current intensity is anomalous
-        current_intensity = intensities[-1]
-        z_score = abs(current_intensity - mean_intensity) / std_dev
-
-        if z_score > self.threshold:
-            confidence = min(z_score / (self.threshold * 2), 1.0)
-            reason = f"pattern_anomaly: z_score={z_score:.2f}, current={current_intensity:.2f}, mean={mean_intensity:.2f}"
-            return (True, confidence, reason)
-
-        return (False, 0.0, f"normal_pattern: z_score={z_score:.2f}")
-
-    def _get_value(self, entity: Dict[str, Any], prop: str) -> Optional[float]:
-        """Extract property value from NGSI-LD entity"""
-        prop_obj = entity.get(prop)
-        if isinstance(prop_obj, dict):
-            val = prop_obj.get("value")
-            if val is not None:
-                return float(val)
-        elif prop_obj is not None:
-            return float(prop_obj)
-        return None
+        window = batch.intensity[:, -20:]
+        valid, means, stds = _row_stats(window)
+
+        # Current intensity: newest non-missing value of each window
+        present = ~np.isnan(window)
+        last = window.shape[1] - 1 - np.argmax(present[:, ::-1], axis=1)
+        currents = window[np.arange(window.shape[0]), last]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            z_scores = np.abs(currents - means) / stds
+
+        results = []
+        for count, n, mean_intensity, std_dev, current_intensity, z_score in zip(
+            batch.counts.tolist(),
+            valid.tolist(),
+            means.tolist(),
+            stds.tolist(),
+            currents.tolist(),
+            z_scores.tolist(),
+        ):
+            if count < 10:
+                results.append((False, 0.0, f"insufficient_data: {count}/10"))
+            elif n < 5:
+                results.append((False, 0.0, "insufficient_intensity_data"))
+            elif std_dev == 0:
+                results.append((False, 0.0, "zero_variance"))
+            elif z_score > self.threshold:
+                confidence = min(z_score / (self.threshold * 2), 1.0)
+                reason = f"pattern_anomaly: z_score={z_score:.2f}, current={current_intensity:.2f}, mean={mean_intensity:.2f}"
+                results.append((True, confidence, reason))
+            else:
+                results.append((False, 0.0, f"normal_pattern: z_score={z_score:.2f}"))
+        return results
 
 
 class AccidentDetectionAgent:
@@ -500,7 +795,9 @@ class AccidentDetectionAgent:
         state_file = state_cfg.get("file", "data/accident_state.json")
         history_file = state_cfg.get("history_file", "data/accident_history.json")
         self.retention_days = int(state_cfg.get("retention_days", 7))
-        self.state_store = StateStore(state_file, history_file)
+        self.state_store = StateStore(
+            state_file, history_file, state_cfg.get("history_dir")
+        )
 
         # Initialize detection methods
         self.detectors: List[DetectionMethod] = []
@@ -523,6 +820,9 @@ class AccidentDetectionAgent:
         self.filtering = self.config.get_filtering()
         self.alert_cfg = self.config.get_alert()
         self.entity_cfg = self.config.get_entity_config()
+        self.alert_dispatcher = AlertDispatcher(
+            self.alert_cfg.get("alert_file", "data/accident_alerts.json")
+        )
 
         stellio = self.config.get_stellio()
         self.stellio_base = stellio.get("base_url") or os.environ.get(
@@ -532,11 +832,24 @@ class AccidentDetectionAgent:
         self.batch_create = bool(stellio.get("batch_create", True))
         self.max_workers = int(stellio.get("max_workers", 4))
 
-        self.session = requests.Session()
+        self.session = get_stellio_client(
+            self.stellio_base or "", pool_size=self.max_workers
+        )
+        # asyncio writer for the creation fan-out (replaces the thread pool)
+        self.writer = None
+        if stellio.get("async_writes", False) and self.stellio_base:
+            self.writer = get_async_writer(
+                self.stellio_base, int(stellio.get("max_concurrency", 64))
+            )
+            self.upsert_batch_size = int(stellio.get("batch_size", 100))
 
-        # Observation buffers per camera
-        self.observations_buffer: Dict[str, deque] = defaultdict(
-            lambda: deque(maxlen=50)
+        # Persistent observation ring buffers per camera
+        default_buffer_file = Path(state_file).with_name(
+            f"{Path(state_file).stem}_buffers.db"
+        )
+        buffer_file = state_cfg.get("buffer_file", str(default_buffer_file))
+        self.observations_buffer = ObservationBuffer(
+            buffer_file, int(state_cfg.get("buffer_size", 50))
         )
 
         if not self.create_endpoint:
@@ -580,21 +893,26 @@ class AccidentDetectionAgent:
         for entity in entities:
             camera_ref = self._get_camera_ref(entity)
             if camera_ref:
-                self.observations_buffer[camera_ref].append(entity)
+                self.observations_buffer.append(camera_ref, entity)
                 camera_observations[camera_ref].append(entity)
 
-        # Run detection for each camera
-        for camera_ref, obs_list in camera_observations.items():
+        # Run each detection method once over the buffered windows of all
+        # cameras (includes observations from previous runs)
+        cameras = list(camera_observations)
+        batch = self.observations_buffer.batch(cameras)
+        method_results = []
+        for detector in self.detectors:
             try:
-                # Get recent observations from buffer
-                recent_obs = list(self.observations_buffer[camera_ref])
+                method_results.append((detector, detector.detect_batch(batch)))
+            except Exception as e:
+                logger.error(f"Detection method {detector.name} failed: {e}")
 
-                # Run all detection methods
+        # Aggregate detections for each camera
+        for index, (camera_ref, obs_list) in enumerate(camera_observations.items()):
+            try:
                 detections = []
-                for detector in self.detectors:
-                    detected, confidence, reason = detector.detect(
-                        recent_obs, camera_ref
-                    )
+                for detector, outcomes in method_results:
+                    detected, confidence, reason = outcomes[index]
                     if detected:
                         detections.append(
                             {
@@ -651,7 +969,7 @@ class AccidentDetectionAgent:
                     confidence=avg_confidence,
                     severity=severity,
                     methods=methods_used,
-                    observation=recent_obs[-1],
+                    observation=obs_list[-1],
                 )
 
                 to_create.append((camera_ref, accident_entity))
@@ -689,79 +1007,40 @@ class AccidentDetectionAgent:
                     {"camera": camera_ref, "detected": False, "error": str(e)}
                 )
 
-        # Create entities in Stellio
-        creation_results: List[Dict[str, Any]] = []
-        if to_create:
-            if self.batch_create:
-                # Batch creation with ThreadPoolExecutor
-                with ThreadPoolExecutor(max_workers=self.max_workers) as exe:
-                    futures = {
-                        exe.submit(self._post_entity, entity): (cam, entity)
-                        for cam, entity in to_create
-                    }
-                    for fut in as_completed(futures):
-                        cam, entity = futures[fut]
-                        try:
-                            success, status_code, error = fut.result()
-                        except Exception as e:
-                            success = False
-                            status_code = None
-                            error = str(e)
-
-                        creation_results.append(
-                            {
-                                "camera": cam,
-                                "entity_id": entity["id"],
-                                "created": True,
-                                "success": success,
-                                "status_code": status_code,
-                                "error": error,
-                            }
-                        )
+        # Create entities in Stellio (async, batch or sequential); alerts
+        # are queued as creations complete and written in the background
+        results_by_entity = {
+            res["entity_id"]: res for res in results if res.get("entity_id")
+        }
+        for (cam, entity), (success, status_code, error) in self._create_entities(
+            to_create
+        ):
+            results_by_entity[entity["id"]].update(
+                {
+                    "camera": cam,
+                    "entity_id": entity["id"],
+                    "created": True,
+                    "success": success,
+                    "status_code": status_code,
+                    "error": error,
+                }
+            )
 
-                        if success:
-                            # Generate alert if configured
-                            severity = entity.get("severity", {}).get("value")
-                            if self._should_generate_alert(severity):
-                                self._alert(cam, entity)
-                        else:
-                            logger.error(
-                                f"Failed to create entity {entity['id']}: {error}"
-                            )
+            if success:
+                # Generate alert if configured
+                severity = entity.get("severity", {}).get("value")
+                if self._should_generate_alert(severity):
+                    self._alert(cam, entity)
             else:
-                # Sequential creation
-                for cam, entity in to_create:
-                    success, status_code, error = self._post_entity(entity)
-                    creation_results.append(
-                        {
-                            "camera": cam,
-                            "entity_id": entity["id"],
-                            "created": True,
-                            "success": success,
-                            "status_code": status_code,
-                            "error": error,
-                        }
-                    )
-
-                    if success:
-                        severity = entity.get("severity", {}).get("value")
-                        if self._should_generate_alert(severity):
-                            self._alert(cam, entity)
-                    else:
-                        logger.error(f"Failed to create entity {entity['id']}: {error}")
+                logger.error(f"Failed to create entity {entity['id']}: {error}")
 
-        # Merge results
-        for res in results:
-            # Find corresponding creation result
-            for cr in creation_results:
-                if cr["camera"] == res["camera"]:
-                    res.update(cr)
-                    break
+        self.alert_dispatcher.flush()
 
-        # Save state and cleanup old history
+        # Save state and buffers, append history and drop expired partitions
         self.state_store.save()
-        self.state_store.cleanup_old_history(self.retention_days)
+        self.observations_buffer.save()
         self.state_store.save_history()
+        self.state_store.cleanup_old_history(self.retention_days)
 
         # ============================================================
         # CRITICAL FIX: Write accidents.json output file
@@ -973,6 +1252,60 @@ class AccidentDetectionAgent:
                 return prop["observedAt"]
         return now_iso()
 
+    def _create_entities(
+        self, to_create: List[Tuple[str, Dict[str, Any]]]
+    ) -> Iterator[
+        Tuple[Tuple[str, Dict[str, Any]], Tuple[bool, Optional[int], Optional[str]]]
+    ]:
+        """
+        Create accident entities in Stellio.
+
+        Args:
+            to_create: (camera_ref, entity) pairs
+
+        Yields:
+            ((camera_ref, entity), (success, status_code, error)) as each
+            creation completes
+        """
+        if not to_create:
+            return
+        if self.writer is not None:
+            yield from self._post_entities_async(to_create)
+        elif self.batch_create:
+            # Batch creation with ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=self.max_workers) as exe:
+                futures = {
+                    exe.submit(self._post_entity, entity): (cam, entity)
+                    for cam, entity in to_create
+                }
+                for fut in as_completed(futures):
+                    try:
+                        yield futures[fut], fut.result()
+                    except Exception as e:
+                        yield futures[fut], (False, None, str(e))
+        else:
+            # Sequential creation
+            for cam, entity in to_create:
+                yield (cam, entity), self._post_entity(entity)
+
+    def _post_entities_async(
+        self, to_create: List[Tuple[str, Dict[str, Any]]]
+    ) -> List[
+        Tuple[Tuple[str, Dict[str, Any]], Tuple[bool, Optional[int], Optional[str]]]
+    ]:
+        """Upsert all accident entities in batches through the async Stellio writer."""
+        writes = self.writer.upsert_entities(
+            [entity for _, entity in to_create],
+            create_url=f"{self.stellio_base}{self.create_endpoint}",
+            headers={"Content-Type": "application/ld+json"},
+            timeout=10,
+            batch_size=self.upsert_batch_size,
+        )
+        return [
+            (item, (w.success, w.status_code, w.error))
+            for item, w in zip(to_create, writes)
+        ]
+
     def _post_entity(
         self, entity: Dict[str, Any]
     ) -> Tuple[bool, Optional[int], Optional[str]]:
@@ -1000,32 +1333,18 @@ class AccidentDetectionAgent:
         return severity in notify_on
 
     def _alert(self, camera_ref: str, entity: Dict[str, Any]) -> None:
-        """Generate alert for accident detection"""
-        alert_file = Path(self.alert_cfg.get("alert_file", "data/accident_alerts.json"))
-
-        alert = {
-            "timestamp": now_iso(),
-            "camera": camera_ref,
-            "entity_id": entity["id"],
-            "severity": entity.get("severity", {}).get("value"),
-            "confidence": entity.get("confidence", {}).get("value"),
-            "detection_method": entity.get("detectionMethod", {}).get("value"),
-            "message": f"Accident detected: {entity.get('severity', {}).get('value')} severity at {camera_ref}",
-        }
-
-        try:
-            alert_file.parent.mkdir(parents=True, exist_ok=True)
-            if alert_file.exists():
-                with open(alert_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-            else:
-                data = []
-            data.append(alert)
-            with open(alert_file, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            logger.info(f"Alert generated for {camera_ref}: {entity['id']}")
-        except Exception as e:
-            logger.error(f"Failed to write alert for {camera_ref}: {e}")
+        """Queue alert for accident detection"""
+        self.alert_dispatcher.submit(
+            {
+                "timestamp": now_iso(),
+                "camera": camera_ref,
+                "entity_id": entity["id"],
+                "severity": entity.get("severity", {}).get("value"),
+                "confidence": entity.get("confidence", {}).get("value"),
+                "detection_method": entity.get("detectionMethod", {}).get("value"),
+                "message": f"Accident detected: {entity.get('severity', {}).get('value')} severity at {camera_ref}",
+            }
+        )
 
 
 def main(config: Optional[Dict[str, Any]] = None):
@@ -20,15 +20,20 @@ from __future__ import annotations
 import json
 import logging
 import os
+import threading
+import time
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass, field, asdict
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
-import requests
 import yaml
 
+from shared.async_stellio_writer import get_async_writer
+from shared.stellio_client import get_stellio_client
+
 logger = logging.getLogger(__name__)
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -105,17 +110,196 @@ class CongestionConfig:
         state_cfg = self.config["congestion_detection"].get("state", {})
         return state_cfg.get("file", "data/congestion_state.json")
 
+    def get_state_config(self) -> Dict[str, Any]:
+        return self.config["congestion_detection"].get("state", {})
+
     def get_output_config(self) -> Dict[str, Any]:
         """Return output configuration"""
         return self.config["congestion_detection"].get("output", {})
 
+    def get_streaming(self) -> Dict[str, Any]:
+        """Return streaming mode configuration"""
+        return self.config["congestion_detection"].get("streaming", {})
+
+
+def _atomic_write_json(path: Path, data: Any, **dump_kwargs: Any) -> None:
+    """Write JSON to a temporary file and rename it over path"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, **dump_kwargs)
+    os.replace(tmp_path, path)
+
+
+class CongestionHistory:
+    """
+    Bounded per-camera history of congestion evaluations.
+
+    Each camera keeps a ring of its latest (epoch seconds, congested)
+    samples. When downsampling is enabled, samples falling out of the ring
+    are folded into per-hour summaries ([samples, congested samples]), of
+    which the latest summary_hours are kept. The whole history is stored as
+    one compact JSON file, so its size and load/save time are bounded by
+    the number of cameras rather than the age of the deployment.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        size: int = 1000,
+        downsample: bool = True,
+        summary_hours: int = 168,
+    ):
+        """
+        Initialize history.
+
+        Args:
+            path: History file (None keeps the history in memory only)
+            size: Samples kept per camera
+            downsample: Fold evicted samples into per-hour summaries
+            summary_hours: Hourly summaries kept per camera
+        """
+        self.path = Path(path) if path else None
+        self.size = max(int(size), 1)
+        self.downsample = downsample
+        self.summary_hours = int(summary_hours)
+        self.samples: Dict[str, deque] = {}
+        self.summaries: Dict[str, Dict[int, List[int]]] = {}
+        self._dirty = False
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path or not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception:
+            logger.warning(f"Failed to load history file {self.path}, starting fresh")
+            return
+        for camera_ref, entry in data.get("cameras", {}).items():
+            self.summaries[camera_ref] = {
+                int(hour): counts for hour, counts in entry.get("hours", {}).items()
+            }
+            self.samples[camera_ref] = deque(maxlen=self.size)
+            samples = [(int(ts), bool(c)) for ts, c in entry.get("samples", [])]
+            self._extend(camera_ref, samples)
+            # A smaller ring size evicted samples on load
+            self._dirty = self._dirty or len(samples) > self.size
+
+    def save(self) -> None:
+        """Write the history atomically if it changed"""
+        if not self.path or not self._dirty:
+            return
+        data = {
+            "size": self.size,
+            "cameras": {
+                camera_ref: {
+                    "samples": [[ts, int(c)] for ts, c in ring],
+                    "hours": {
+                        str(h): v for h, v in self.summaries.get(camera_ref, {}).items()
+                    },
+                }
+                for camera_ref, ring in self.samples.items()
+            },
+        }
+        try:
+            _atomic_write_json(self.path, data, separators=(",", ":"))
+            self._dirty = False
+        except Exception as e:
+            logger.error(f"Failed to save history to {self.path}: {e}")
+
+    def append(self, camera_ref: str, ts: str, congested: bool) -> None:
+        """Record one evaluation of a camera"""
+        if camera_ref not in self.samples:
+            self.samples[camera_ref] = deque(maxlen=self.size)
+        self._extend(camera_ref, [(int(parse_iso(ts).timestamp()), bool(congested))])
+        self._dirty = True
+
+    def _extend(self, camera_ref: str, samples: List[Tuple[int, bool]]) -> None:
+        ring = self.samples[camera_ref]
+        for sample in samples:
+            if len(ring) == ring.maxlen:
+                self._summarize(camera_ref, ring[0])
+            ring.append(sample)
+
+    def _summarize(self, camera_ref: str, sample: Tuple[int, bool]) -> None:
+        if not self.downsample or self.summary_hours <= 0:
+            return
+        hours = self.summaries.setdefault(camera_ref, {})
+        counts = hours.setdefault(sample[0] // 3600 * 3600, [0, 0])
+        counts[0] += 1
+        counts[1] += int(sample[1])
+        while len(hours) > self.summary_hours:
+            del hours[min(hours)]
+
+    def get(self, camera_ref: str) -> List[Dict[str, Any]]:
+        """Recent samples of a camera, oldest first"""
+        return [
+            {
+                "ts": datetime.fromtimestamp(ts, timezone.utc).strftime(ISO_FMT),
+                "congested": congested,
+            }
+            for ts, congested in self.samples.get(camera_ref, ())
+        ]
+
+    def hourly(self, camera_ref: str) -> List[Dict[str, Any]]:
+        """Per-hour summaries of a camera's older samples, oldest first"""
+        return [
+            {
+                "hour": datetime.fromtimestamp(hour, timezone.utc).strftime(ISO_FMT),
+                "samples": samples,
+                "congested": congested,
+            }
+            for hour, (samples, congested) in sorted(
+                self.summaries.get(camera_ref, {}).items()
+            )
+        ]
+
 
 class StateStore:
-    """Persistent state store for congestion statuses and history"""
+    """
+    Persistent state store for congestion statuses and history.
+
+    The state file is a small hot map of camera → congested, first_breach_ts
+    and last_update_ts; the evaluation history lives in a CongestionHistory
+    next to it, and the byte offsets reached in streaming feeds live in a
+    third file so a restarted --stream resumes where the checkpoint was
+    taken. All are written atomically.
+    """
 
-    def __init__(self, path: str):
+    def __init__(
+        self,
+        path: str,
+        history_path: Optional[str] = None,
+        history_size: int = 1000,
+        downsample: bool = True,
+        summary_hours: int = 168,
+        feed_offsets_path: Optional[str] = None,
+    ):
+        """
+        Initialize state store.
+
+        Args:
+            path: Hot state JSON file
+            history_path: History file (default: <state stem>_history.json)
+            history_size: Samples kept per camera
+            downsample: Fold evicted samples into per-hour summaries
+            summary_hours: Hourly summaries kept per camera
+            feed_offsets_path: Feed offsets file (default: <state stem>_feed.json)
+        """
         self.path = Path(path)
+        if history_path is None:
+            history_path = str(self.path.with_name(f"{self.path.stem}_history.json"))
+        if feed_offsets_path is None:
+            feed_offsets_path = str(self.path.with_name(f"{self.path.stem}_feed.json"))
+        self.history = CongestionHistory(
+            history_path, history_size, downsample, summary_hours
+        )
+        self.feed_offsets_path = Path(feed_offsets_path)
         self.data: Dict[str, Any] = {}
+        # Feed path → byte offset of the next unread line
+        self.feed_offsets: Dict[str, int] = {}
         self._load()
 
     def _load(self) -> None:
@@ -129,20 +313,43 @@ class StateStore:
         else:
             self.data = {}
 
+        # Move history lists of the former single-file layout into the ring
+        for camera_ref, state in self.data.items():
+            for entry in state.pop("history", None) or []:
+                self.history.append(camera_ref, entry["ts"], entry["congested"])
+
+        if self.feed_offsets_path.exists():
+            try:
+                with open(self.feed_offsets_path, "r", encoding="utf-8") as f:
+                    self.feed_offsets = {k: int(v) for k, v in json.load(f).items()}
+            except Exception:
+                logger.warning(
+                    f"Failed to load feed offsets {self.feed_offsets_path}, "
+                    "streaming feeds restart from the beginning"
+                )
+                self.feed_offsets = {}
+
     def save(self) -> None:
         try:
-            self.path.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.path, "w", encoding="utf-8") as f:
-                json.dump(self.data, f, indent=2, ensure_ascii=False)
+            _atomic_write_json(self.path, self.data, indent=2)
         except Exception as e:
             logger.error(f"Failed to save state to {self.path}: {e}")
+        self.history.save()
+        # Written after the state it belongs to: a crash in between replays
+        # events instead of skipping them
+        if self.feed_offsets:
+            try:
+                _atomic_write_json(self.feed_offsets_path, self.feed_offsets)
+            except Exception as e:
+                logger.error(
+                    f"Failed to save feed offsets to {self.feed_offsets_path}: {e}"
+                )
 
     def get(self, camera_ref: str) -> Dict[str, Any]:
         default = {
             "congested": False,
             "first_breach_ts": None,
             "last_update_ts": None,
-            "history": [],
         }
         return self.data.get(camera_ref, default.copy())
 
@@ -153,25 +360,13 @@ class StateStore:
         first_breach_ts: Optional[str],
         observed_at: Optional[str],
     ) -> None:
-        state = self.data.get(
-            camera_ref,
-            {
-                "congested": False,
-                "first_breach_ts": None,
-                "last_update_ts": None,
-                "history": [],
-            },
-        )
-        state["congested"] = congested
-        state["first_breach_ts"] = first_breach_ts
-        state["last_update_ts"] = observed_at or now_iso()
-        # Append history
-        state.setdefault("history", [])
-        state["history"].append({"ts": state["last_update_ts"], "congested": congested})
-        # Keep history length reasonable
-        if len(state["history"]) > 1000:
-            state["history"] = state["history"][-1000:]
+        state = {
+            "congested": congested,
+            "first_breach_ts": first_breach_ts,
+            "last_update_ts": observed_at or now_iso(),
+        }
         self.data[camera_ref] = state
+        self.history.append(camera_ref, state["last_update_ts"], congested)
 
 
 class CongestionDetector:
@@ -303,7 +498,15 @@ class CongestionDetectionAgent:
     def __init__(self, config_path: str = "config/congestion_config.yaml") -> None:
         self.config = CongestionConfig(config_path)
         state_file = self.config.get_state_file()
-        self.state_store = StateStore(state_file)
+        state_cfg = self.config.get_state_config()
+        self.state_store = StateStore(
+            state_file,
+            history_path=state_cfg.get("history_file"),
+            history_size=int(state_cfg.get("history_size", 1000)),
+            downsample=bool(state_cfg.get("downsample", True)),
+            summary_hours=int(state_cfg.get("summary_hours", 168)),
+            feed_offsets_path=state_cfg.get("feed_offsets_file"),
+        )
         self.detector = CongestionDetector(self.config, self.state_store)
         stellio = self.config.get_stellio()
         self.stellio_base = stellio.get("base_url") or os.environ.get(
@@ -313,7 +516,15 @@ class CongestionDetectionAgent:
         self.batch_updates = bool(stellio.get("batch_updates", True))
         self.max_workers = int(stellio.get("max_workers", 4))
         self.alert_cfg = self.config.get_alert()
-        self.session = requests.Session()
+        self.session = get_stellio_client(
+            self.stellio_base or "", pool_size=self.max_workers
+        )
+        # asyncio writer for the update fan-out (replaces the thread pool)
+        self.writer = None
+        if stellio.get("async_writes", False) and self.stellio_base:
+            self.writer = get_async_writer(
+                self.stellio_base, int(stellio.get("max_concurrency", 64))
+            )
 
         if not self.update_endpoint:
             raise ValueError("Stellio update_endpoint is required in config")
@@ -329,19 +540,35 @@ class CongestionDetectionAgent:
             }
         }
 
+    def _entity_url(self, entity_id: str) -> str:
+        """Build the full attribute update URL for an entity."""
+        if self.stellio_base:
+            return self.stellio_base.rstrip("/") + self.update_endpoint.format(
+                id=entity_id
+            )
+        return self.update_endpoint.format(id=entity_id)
+
+    def _patch_entities_async(
+        self, to_update: List[Tuple[str, Dict[str, Any], Dict[str, Any], bool]]
+    ) -> List[Tuple[Tuple, Tuple[bool, Optional[int], Optional[str]]]]:
+        """PATCH all updates concurrently through the async Stellio writer."""
+        writes = self.writer.patch_entities(
+            [(cam, self._entity_url(cam), payload) for cam, payload, _, _ in to_update],
+            headers={"Content-Type": "application/ld+json"},
+            timeout=10,
+        )
+        return [
+            (update, (w.success, w.status_code, w.error))
+            for update, w in zip(to_update, writes)
+        ]
+
     def _patch_entity(
         self, entity_id: str, payload: Dict[str, Any]
     ) -> Tuple[bool, Optional[int], Optional[str]]:
         """Send PATCH to Stellio for entity attributes update."""
         url = None
         try:
-            # Build full URL
-            if self.stellio_base:
-                url = self.stellio_base.rstrip("/") + self.update_endpoint.format(
-                    id=entity_id
-                )
-            else:
-                url = self.update_endpoint.format(id=entity_id)
+            url = self._entity_url(entity_id)
             headers = {"Content-Type": "application/ld+json"}
             logger.debug(f"PATCH {url} payload={payload}")
             resp = self.session.patch(url, json=payload, headers=headers, timeout=10)
@@ -410,6 +637,24 @@ class CongestionDetectionAgent:
         else:
             entities = []
 
+        results = self.process_entities(entities)
+        # Save state
+        self.state_store.save()
+        self._write_congestion_file(results)
+        return results
+
+    def process_entities(self, entities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Evaluate observations and PATCH cameras whose congestion state changed.
+
+        Updates the in-memory state store; callers decide when to save it.
+
+        Args:
+            entities: ItemFlowObserved entities
+
+        Returns:
+            List of result dicts with camera, updated, success, status_code, error
+        """
         results: List[Dict[str, Any]] = []
         to_update: List[Tuple[str, Dict[str, Any], Dict[str, Any], bool]] = (
             []
@@ -465,119 +710,81 @@ class CongestionDetectionAgent:
                     }
                 )
 
-        # Execute updates (batch or sequential)
+        # Execute updates (async, batch or sequential)
         update_results: List[Dict[str, Any]] = []
         if to_update:
-            if self.batch_updates:
+            if self.writer is not None:
+                outcomes = self._patch_entities_async(to_update)
+            elif self.batch_updates:
                 # Use ThreadPoolExecutor
+                outcomes = []
                 with ThreadPoolExecutor(max_workers=self.max_workers) as exe:
                     futures = {
-                        exe.submit(self._patch_entity, cam, payload): (
-                            cam,
-                            payload,
-                            ent,
-                            new_st,
-                        )
-                        for cam, payload, ent, new_st in to_update
+                        exe.submit(self._patch_entity, update[0], update[1]): update
+                        for update in to_update
                     }
                     for fut in as_completed(futures):
-                        cam, payload, ent, new_st = futures[fut]
                         try:
-                            success, status_code, error = fut.result()
+                            outcomes.append((futures[fut], fut.result()))
                         except Exception as e:
-                            success = False
-                            status_code = None
-                            error = str(e)
-                        update_results.append(
-                            {
-                                "camera": cam,
-                                "updated": True,
-                                "success": success,
-                                "status_code": status_code,
-                                "error": error,
-                            }
-                        )
-                        if success:
-                            # Update state store with new_st (True or False)
-                            prev = self.state_store.get(cam)
-                            if new_st:
-                                # Set congested True
-                                fb = prev.get("first_breach_ts") or now_iso()
-                                self.state_store.update(
-                                    cam,
-                                    True,
-                                    fb,
-                                    payload.get("congested", {}).get("observedAt"),
-                                )
-                            else:
-                                # Clear congestion
-                                self.state_store.update(
-                                    cam,
-                                    False,
-                                    None,
-                                    payload.get("congested", {}).get("observedAt"),
-                                )
-                            # Alert if notify_on_change and previous was False
-                            if self.alert_cfg.get(
-                                "enabled", False
-                            ) and self.alert_cfg.get("notify_on_change", False):
-                                if not prev.get("congested", False) and new_st:
-                                    self._alert(
-                                        cam,
-                                        ent,
-                                        payload.get("congested", {}).get("observedAt"),
-                                    )
-                        else:
-                            logger.error(f"Failed to update {cam}: {error}")
+                            outcomes.append((futures[fut], (False, None, str(e))))
             else:
                 # Sequential updates
-                for cam, payload, ent, new_st in to_update:
-                    success, status_code, error = self._patch_entity(cam, payload)
-                    update_results.append(
-                        {
-                            "camera": cam,
-                            "updated": True,
-                            "success": success,
-                            "status_code": status_code,
-                            "error": error,
-                        }
-                    )
-                    if success:
-                        prev = self.state_store.get(cam)
-                        if new_st:
-                            # Set congested True
-                            fb = prev.get("first_breach_ts") or now_iso()
-                            self.state_store.update(
-                                cam,
-                                True,
-                                fb,
-                                payload.get("congested", {}).get("observedAt"),
-                            )
-                        else:
-                            # Clear congestion
-                            self.state_store.update(
+                outcomes = [
+                    (update, self._patch_entity(update[0], update[1]))
+                    for update in to_update
+                ]
+
+            for (cam, payload, ent, new_st), (success, status_code, error) in outcomes:
+                update_results.append(
+                    {
+                        "camera": cam,
+                        "updated": True,
+                        "congested": new_st,
+                        "success": success,
+                        "status_code": status_code,
+                        "error": error,
+                    }
+                )
+                if success:
+                    # Update state store with new_st (True or False)
+                    prev = self.state_store.get(cam)
+                    if new_st:
+                        # Set congested True
+                        fb = prev.get("first_breach_ts") or now_iso()
+                        self.state_store.update(
+                            cam,
+                            True,
+                            fb,
+                            payload.get("congested", {}).get("observedAt"),
+                        )
+                    else:
+                        # Clear congestion
+                        self.state_store.update(
+                            cam,
+                            False,
+                            None,
+                            payload.get("congested", {}).get("observedAt"),
+                        )
+                    # Alert if notify_on_change and previous was False
+                    if self.alert_cfg.get("enabled", False) and self.alert_cfg.get(
+                        "notify_on_change", False
+                    ):
+                        if not prev.get("congested", False) and new_st:
+                            self._alert(
                                 cam,
-                                False,
-                                None,
+                                ent,
                                 payload.get("congested", {}).get("observedAt"),
                             )
-                        if self.alert_cfg.get("enabled", False) and self.alert_cfg.get(
-                            "notify_on_change", False
-                        ):
-                            if not prev.get("congested", False) and new_st:
-                                self._alert(
-                                    cam,
-                                    ent,
-                                    payload.get("congested", {}).get("observedAt"),
-                                )
-                    else:
-                        logger.error(f"Failed to update {cam}: {error}")
+                else:
+                    logger.error(f"Failed to update {cam}: {error}")
 
         # Combine results
         results.extend(update_results)
-        # Save state
-        self.state_store.save()
+        return results
 
+    def _write_congestion_file(self, results: List[Dict[str, Any]]) -> None:
+        """Write successful updates of a run to the congestion output file"""
         # ============================================================
         # CRITICAL FIX: Write congestion.json output file
         # ============================================================
@@ -612,7 +819,127 @@ class CongestionDetectionAgent:
             )
         except Exception as e:
             logger.error(f"Failed to write congestion file {congestion_file}: {e}")
-        return results
+
+    def run_stream(
+        self,
+        events: Iterable[Dict[str, Any]],
+        checkpoint_interval: float = 10.0,
+    ) -> Dict[str, int]:
+        """
+        Evaluate a continuous feed of observations one event at a time.
+
+        Each event is evaluated against the in-memory state as soon as it
+        arrives and a congestion flip is PATCHed immediately, so Stellio
+        follows the feed within one observation instead of one pipeline
+        cycle. State is checkpointed every checkpoint_interval seconds and
+        when the feed ends; a tail_ndjson() feed given state_store.feed_offsets
+        as offsets is checkpointed with it.
+
+        Args:
+            events: ItemFlowObserved entities (e.g. tail_ndjson() or a queue)
+            checkpoint_interval: Seconds between state saves
+
+        Returns:
+            Counts of processed events, PATCHes and failed PATCHes
+        """
+        stats = {"events": 0, "updates": 0, "failed": 0}
+        last_checkpoint = time.monotonic()
+        try:
+            for entity in events:
+                if entity is not None:
+                    for res in self.process_entities([entity]):
+                        if res.get("updated"):
+                            stats["updates"] += 1
+                            stats["failed"] += int(not res.get("success"))
+                    stats["events"] += 1
+
+                if time.monotonic() - last_checkpoint >= checkpoint_interval:
+                    self.state_store.save()
+                    last_checkpoint = time.monotonic()
+        finally:
+            self.state_store.save()
+        logger.info(
+            f"Stream ended: {stats['events']} events, {stats['updates']} updates "
+            f"({stats['failed']} failed)"
+        )
+        return stats
+
+
+def tail_ndjson(
+    path: str,
+    follow: bool = True,
+    poll_interval: float = 0.5,
+    stop: Optional[threading.Event] = None,
+    offsets: Optional[Dict[str, int]] = None,
+) -> Iterator[Optional[Dict[str, Any]]]:
+    """
+    Yield entities appended to an NDJSON file.
+
+    Waits for the file to appear and only yields complete lines. While
+    following, yields None after each idle poll so consumers can run
+    periodic work (checkpoints) on a quiet feed.
+
+    With offsets (e.g. StateStore.feed_offsets), reading starts at
+    offsets[path] and offsets[path] is advanced past each complete line
+    before it is yielded, so saving offsets together with the state a
+    consumer built from the yielded entities resumes the feed there. A file
+    shorter than the saved offset was truncated or replaced and is read
+    from the start.
+
+    Args:
+        path: NDJSON file, one entity per line
+        follow: Keep waiting for new lines at end of file
+        poll_interval: Seconds between polls at end of file
+        stop: Event that ends the feed when set
+        offsets: Feed path → byte offset map to resume from and update
+    """
+    file_path = Path(path)
+    while not file_path.exists():
+        if not follow or (stop is not None and stop.is_set()):
+            return
+        time.sleep(poll_interval)
+
+    offset = offsets.get(path, 0) if offsets is not None else 0
+    if offset > file_path.stat().st_size:
+        logger.warning(
+            f"{path} is shorter than its saved offset, reading from the start"
+        )
+        offset = 0
+
+    with open(file_path, "rb") as f:
+        f.seek(offset)
+        pending = b""
+        while stop is None or not stop.is_set():
+            line = f.readline()
+            if line:
+                pending += line
+                if not pending.endswith(b"\n"):
+                    continue  # Partial line still being written
+                offset += len(pending)
+                line, pending = pending.strip(), b""
+                if offsets is not None:
+                    offsets[path] = offset
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    logger.warning(
+                        f"Skipping malformed line in {path}: "
+                        f"{line[:80].decode('utf-8', 'replace')}"
+                    )
+                continue
+
+            if not follow:
+                if pending.strip():
+                    # Not recorded in offsets: the line may still be completed
+                    try:
+                        yield json.loads(pending)
+                    except ValueError:
+                        logger.warning(f"Skipping malformed line in {path}")
+                return
+            yield None
+            time.sleep(poll_interval)
 
 
 def main(config: Optional[Dict[str, Any]] = None):
@@ -640,9 +967,27 @@ def main(config: Optional[Dict[str, Any]] = None):
             default="config/congestion_config.yaml",
             help="Path to congestion config",
         )
+        parser.add_argument(
+            "--stream",
+            action="store_true",
+            help="Follow the streaming NDJSON feed instead of one batch file",
+        )
         args = parser.parse_args()
         input_file = args.input_file
         config_path = args.config
+        if args.stream:
+            agent = CongestionDetectionAgent(config_path)
+            streaming = agent.config.get_streaming()
+            feed = tail_ndjson(
+                streaming.get("input_file", "data/observations.ndjson"),
+                poll_interval=float(streaming.get("poll_interval", 0.5)),
+                offsets=agent.state_store.feed_offsets,
+            )
+            try:
+                agent.run_stream(feed, float(streaming.get("checkpoint_interval", 10)))
+            except KeyboardInterrupt:
+                pass
+            return
 
     agent = CongestionDetectionAgent(config_path)
     res = agent.process_observations_file(input_file)
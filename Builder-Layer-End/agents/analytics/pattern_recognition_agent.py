@@ -27,15 +27,20 @@ Date: 2025-11-01
 import os
 import json
 import logging
+import math
 import warnings
 import statistics
-from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Tuple
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Dict, Iterator, List, Any, Optional, Tuple
 from collections import defaultdict, deque
 from abc import ABC, abstractmethod
+from functools import partial
+from pathlib import Path
 import yaml
-import requests
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+from shared.async_stellio_writer import get_async_writer
+from shared.stellio_client import get_stellio_client
 
 # Neo4j driver
 try:
@@ -67,6 +72,8 @@ except ImportError:
     STATSMODELS_AVAILABLE = False
     logging.warning("statsmodels not available - install with: pip install statsmodels")
 
+logger = logging.getLogger(__name__)
+
 
 # ============================================================================
 # Configuration
@@ -156,6 +163,10 @@ class PatternConfig:
         """Get state persistence configuration."""
         return self.config["pattern_recognition"].get("state", {})
 
+    def get_performance_config(self) -> Dict[str, Any]:
+        """Get performance configuration."""
+        return self.config["pattern_recognition"].get("performance", {})
+
 
 # ============================================================================
 # Neo4j Connector
@@ -181,9 +192,12 @@ class Neo4jConnector:
         self.uri = config["uri"]
         self.auth = (config["auth"]["username"], config["auth"]["password"])
         self.database = config.get("database", "neo4j")
+        self.fetch_size = int(config.get("fetch_size", 1000))
 
         self.driver: Optional[Driver] = None
         self._connect()
+        if config.get("create_indexes", False):
+            self.ensure_indexes()
 
     def _connect(self):
         """Establish connection to Neo4j."""
@@ -206,6 +220,27 @@ class Neo4jConnector:
         if self.driver:
             self.driver.close()
 
+    def ensure_indexes(self):
+        """
+        Create the index behind the temporal range queries.
+
+        Camera.id is already backed by the uniqueness constraint created by
+        the Neo4j sync agent. Failures are logged and ignored, as the
+        queries still work (more slowly) without the index.
+        """
+        if not self.driver:
+            raise ConnectionError("Not connected to Neo4j")
+
+        query = (
+            "CREATE INDEX observation_observed_at_idx IF NOT EXISTS "
+            "FOR (o:Observation) ON (o.observedAt)"
+        )
+        try:
+            with self.driver.session(database=self.database) as session:
+                session.run(query).consume()
+        except Exception as e:
+            logger.warning(f"Could not create Observation.observedAt index: {e}")
+
     def query_temporal_data(
         self,
         camera_id: str,
@@ -229,7 +264,7 @@ class Neo4jConnector:
             raise ConnectionError("Not connected to Neo4j")
 
         # Build Cypher query dynamically based on metrics
-        metric_return = ", ".join([f"o.{m}" for m in metrics])
+        metric_return = ", ".join([f"o.{m} AS {m}" for m in metrics])
 
         query = f"""
         MATCH (c:Camera {{id: $camera_id}})
@@ -257,6 +292,65 @@ class Neo4jConnector:
 
             return records
 
+    def query_temporal_data_bulk(
+        self,
+        camera_ids: List[str],
+        start_time: datetime,
+        end_time: datetime,
+        metrics: List[str],
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Query temporal observation data for many cameras in one round-trip.
+
+        Records are streamed in batches of ``fetch_size`` and grouped per
+        camera in memory.
+
+        Args:
+            camera_ids: Camera entity IDs
+            start_time: Start of time window
+            end_time: End of time window
+            metrics: List of metric names to retrieve
+
+        Returns:
+            Observations per camera ID, in timestamp order (cameras without
+            observations map to an empty list)
+        """
+        if not self.driver:
+            raise ConnectionError("Not connected to Neo4j")
+
+        metric_return = ", ".join([f"o.{m} AS {m}" for m in metrics])
+
+        query = f"""
+        UNWIND $camera_ids AS camera_id
+        MATCH (c:Camera {{id: camera_id}})
+              -[:HAS_OBSERVATION]->(o:Observation)
+        WHERE o.observedAt >= $start_time
+          AND o.observedAt <= $end_time
+        RETURN camera_id, o.observedAt AS timestamp, {metric_return}
+        ORDER BY camera_id, o.observedAt
+        """
+
+        grouped: Dict[str, List[Dict[str, Any]]] = {
+            camera_id: [] for camera_id in camera_ids
+        }
+        with self.driver.session(
+            database=self.database, fetch_size=self.fetch_size
+        ) as session:
+            result = session.run(
+                query,
+                camera_ids=list(camera_ids),
+                start_time=start_time.isoformat(),
+                end_time=end_time.isoformat(),
+            )
+
+            for record in result:
+                data = {"timestamp": record["timestamp"]}
+                for metric in metrics:
+                    data[metric] = record.get(metric)
+                grouped.setdefault(record["camera_id"], []).append(data)
+
+        return grouped
+
     def check_observation_nodes_exist(self) -> bool:
         """
         Check if Observation nodes exist in Neo4j database.
@@ -399,6 +493,246 @@ class Neo4jConnector:
             return [record["camera_id"] for record in result]
 
 
+# ============================================================================
+# Rolling Aggregates
+# ============================================================================
+
+
+def _parse_timestamp(timestamp: Any) -> datetime:
+    """Parse an ISO 8601 observation timestamp (datetimes are returned as-is)."""
+    if isinstance(timestamp, str):
+        return datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    return timestamp
+
+
+def _utc(timestamp: datetime) -> datetime:
+    """Convert a datetime to UTC (naive datetimes are taken as UTC)."""
+    if timestamp.tzinfo is None:
+        return timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.astimezone(timezone.utc)
+
+
+def _atomic_write_json(path: Path, data: Any, **dump_kwargs: Any) -> None:
+    """Write JSON to a temporary file and rename it over path."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, **dump_kwargs)
+    os.replace(tmp_path, path)
+
+
+def _merge_moments(a: List[float], b: List[float]) -> List[float]:
+    """
+    Combine two [count, mean, m2, min, max] accumulators.
+
+    Uses the parallel form of Welford's algorithm, so merging per-hour
+    accumulators gives the same mean/variance as one pass over all values.
+    """
+    count = a[0] + b[0]
+    if a[0] == 0:
+        return list(b)
+    if b[0] == 0:
+        return list(a)
+    delta = b[1] - a[1]
+    mean = a[1] + delta * b[0] / count
+    m2 = a[2] + b[2] + delta * delta * a[0] * b[0] / count
+    return [count, mean, m2, min(a[3], b[3]), max(a[4], b[4])]
+
+
+def _moments_to_stats(moments: List[float]) -> Dict[str, float]:
+    """Statistics dict (as returned by TimeSeriesAnalyzer) of an accumulator."""
+    count, mean, m2, low, high = moments
+    return {
+        "mean": mean,
+        "std": math.sqrt(m2 / (count - 1)) if count > 1 else 0.0,
+        "count": int(count),
+        "min": low,
+        "max": high,
+    }
+
+
+class RollingAggregates:
+    """
+    Persisted per-camera running statistics for pattern analysis.
+
+    Each camera keeps one Welford accumulator ([count, mean, m2, min, max])
+    per metric per UTC calendar hour ("YYYY-MM-DDTHH"), the timestamp of
+    the newest observation added (high-water mark) and the start of the
+    window its buckets cover. A run only adds the observations newer than
+    the mark, drops the hour buckets that slid out of the analysis window,
+    and merges the remaining buckets into hour-of-day, weekday and daily
+    statistics. Work therefore grows with new observations and window
+    hours, not with the window's observations. A run over a window that
+    starts before the covered one (e.g. 7_days after 1_hour) rebuilds the
+    camera from its observations.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Initialize aggregates.
+
+        Args:
+            path: JSON file persisting the aggregates across runs
+                (None keeps them in memory only)
+        """
+        self.path = Path(path) if path else None
+        self.cameras: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.cameras = data.get("cameras", {})
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable aggregates file {self.path}: {e}")
+            self.cameras = {}
+
+    def save(self):
+        """Persist aggregates if they changed since the last save."""
+        if self.path is None or not self._dirty:
+            return
+        _atomic_write_json(self.path, {"cameras": self.cameras}, separators=(",", ":"))
+        self._dirty = False
+
+    def update(
+        self,
+        camera_id: str,
+        data: List[Dict[str, Any]],
+        metrics: List[str],
+        window_start: Optional[datetime] = None,
+    ) -> int:
+        """
+        Add a camera's observations newer than its high-water mark.
+
+        Args:
+            camera_id: Camera entity ID
+            data: Observations of the analysis window, in timestamp order
+            metrics: Metric names to aggregate
+            window_start: Start of the analysis window; if it is earlier
+                than the window the camera's buckets cover, they are
+                rebuilt from data
+
+        Returns:
+            Number of observations added
+        """
+        camera = self.cameras.get(camera_id)
+        if camera is None or (
+            window_start is not None
+            and (
+                camera.get("window_start") is None
+                or _utc(window_start) < _parse_timestamp(camera["window_start"])
+            )
+        ):
+            camera = self.cameras[camera_id] = {
+                "high_water_mark": None,
+                "window_start": (
+                    _utc(window_start).isoformat() if window_start else None
+                ),
+                "buckets": {},
+            }
+        mark = camera["high_water_mark"]
+        mark_ts = _utc(_parse_timestamp(mark)) if mark else None
+
+        # Observations arrive sorted, so only the tail past the mark is parsed
+        new = []
+        for obs in reversed(data):
+            timestamp = _utc(_parse_timestamp(obs["timestamp"]))
+            if mark_ts is not None and timestamp <= mark_ts:
+                break
+            new.append((timestamp, obs))
+        if not new:
+            return 0
+
+        for timestamp, obs in reversed(new):
+            hour_key = timestamp.strftime("%Y-%m-%dT%H")
+            for metric in metrics:
+                if obs.get(metric) is None:
+                    continue
+                value = float(obs[metric])
+                hours = camera["buckets"].setdefault(metric, {})
+                hours[hour_key] = _merge_moments(
+                    hours.get(hour_key, [0, 0.0, 0.0, value, value]),
+                    [1, value, 0.0, value, value],
+                )
+
+        camera["high_water_mark"] = new[0][0].isoformat()
+        self._dirty = True
+        return len(new)
+
+    def expire(self, camera_id: str, window_start: datetime) -> int:
+        """
+        Drop a camera's hour buckets older than the window start's hour.
+
+        Args:
+            camera_id: Camera entity ID
+            window_start: Start of the analysis window
+
+        Returns:
+            Number of buckets dropped
+        """
+        camera = self.cameras.get(camera_id)
+        if not camera:
+            return 0
+        window_start = _utc(window_start)
+        covered = camera.get("window_start")
+        if covered is None or window_start > _parse_timestamp(covered):
+            camera["window_start"] = window_start.isoformat()
+            self._dirty = True
+        cutoff = window_start.strftime("%Y-%m-%dT%H")
+        dropped = 0
+        for hours in camera["buckets"].values():
+            for hour_key in [k for k in hours if k < cutoff]:
+                del hours[hour_key]
+                dropped += 1
+        if dropped:
+            self._dirty = True
+        return dropped
+
+    def subset(self, camera_ids: List[str]) -> "RollingAggregates":
+        """In-memory copy of some cameras' aggregates (e.g. for a worker)."""
+        subset = RollingAggregates()
+        subset.cameras = {
+            camera_id: self.cameras[camera_id]
+            for camera_id in camera_ids
+            if camera_id in self.cameras
+        }
+        return subset
+
+    def summarize(
+        self, camera_id: str, metric: str, group: str
+    ) -> Dict[Any, Dict[str, float]]:
+        """
+        Merge a camera's hour buckets into grouped statistics.
+
+        Args:
+            camera_id: Camera entity ID
+            metric: Metric name
+            group: "hour" (0-23), "weekday" (0=Monday) or "date" (YYYY-MM-DD)
+
+        Returns:
+            Dictionary mapping group key to statistics
+        """
+        hours = self.cameras.get(camera_id, {}).get("buckets", {}).get(metric, {})
+        merged: Dict[Any, List[float]] = {}
+        for hour_key, moments in hours.items():
+            if group == "hour":
+                key = int(hour_key[11:13])
+            elif group == "weekday":
+                key = date.fromisoformat(hour_key[:10]).weekday()
+            elif group == "date":
+                key = hour_key[:10]
+            else:
+                raise ValueError(f"Unknown aggregate group: {group}")
+            merged[key] = (
+                _merge_moments(merged[key], moments) if key in merged else moments
+            )
+        return {key: _moments_to_stats(moments) for key, moments in merged.items()}
+
+
 # ============================================================================
 # Time-Series Analyzer
 # ============================================================================
@@ -407,25 +741,74 @@ class Neo4jConnector:
 class TimeSeriesAnalyzer:
     """Analyze time-series data for patterns and statistics."""
 
-    def __init__(self, data: List[Dict[str, Any]], metrics: List[str]):
+    def __init__(
+        self,
+        data: List[Dict[str, Any]],
+        metrics: List[str],
+        aggregates: Optional[RollingAggregates] = None,
+        camera_id: Optional[str] = None,
+    ):
         """
         Initialize analyzer with temporal data.
 
         Args:
             data: List of observations with timestamps
             metrics: List of metric names to analyze
+            aggregates: Rolling aggregates answering the hourly, daily and
+                weekday statistics of camera_id instead of a recompute
+            camera_id: Camera the data belongs to (used with aggregates)
         """
         self.data = data
         self.metrics = metrics
+        self.aggregates = aggregates
+        self.camera_id = camera_id
+
+        # Columnar copy with timestamps parsed once; statistics use the
+        # pure-Python loops below when pandas is unavailable or the
+        # timestamps cannot be converted in one pass (e.g. mixed offsets)
+        self.df = self._to_frame(data, metrics) if PANDAS_AVAILABLE and data else None
+
+    @staticmethod
+    def _to_frame(
+        data: List[Dict[str, Any]], metrics: List[str]
+    ) -> Optional["pd.DataFrame"]:
+        """Build a timestamp-indexed DataFrame of float metric columns."""
+        try:
+            index = pd.DatetimeIndex(pd.to_datetime([obs["timestamp"] for obs in data]))
+            columns = {
+                metric: np.array([obs.get(metric) for obs in data], dtype=float)
+                for metric in metrics
+                if any(metric in obs for obs in data)
+            }
+        except (KeyError, TypeError, ValueError):
+            return None
+        return pd.DataFrame(columns, index=index)
 
-        # Convert to pandas DataFrame if available
-        if PANDAS_AVAILABLE and data:
-            self.df = pd.DataFrame(data)
-            if "timestamp" in self.df.columns:
-                self.df["timestamp"] = pd.to_datetime(self.df["timestamp"])
-                self.df.set_index("timestamp", inplace=True)
-        else:
-            self.df = None
+    def _grouped_stats(self, metric: str, keys: Any) -> Dict[Any, Dict[str, float]]:
+        """Per-group mean/std/count/min/max of a metric column."""
+        if metric not in self.df.columns:
+            return {}
+        values = self.df[metric].to_numpy()
+        mask = ~np.isnan(values)
+        groups = pd.Series(values[mask]).groupby(np.asarray(keys)[mask])
+        counts = groups.count()
+        return {
+            key: {
+                "mean": mean,
+                "std": std if count > 1 else 0.0,
+                "count": count,
+                "min": low,
+                "max": high,
+            }
+            for key, mean, std, count, low, high in zip(
+                counts.index.tolist(),
+                groups.mean().tolist(),
+                groups.std().tolist(),
+                counts.tolist(),
+                groups.min().tolist(),
+                groups.max().tolist(),
+            )
+        }
 
     def get_hourly_aggregates(self, metric: str) -> Dict[int, Dict[str, float]]:
         """
@@ -437,6 +820,12 @@ class TimeSeriesAnalyzer:
         Returns:
             Dictionary mapping hour (0-23) to statistics
         """
+        if self.aggregates is not None:
+            return self.aggregates.summarize(self.camera_id, metric, "hour")
+
+        if self.df is not None:
+            return self._grouped_stats(metric, self.df.index.hour)
+
         hourly_stats = defaultdict(lambda: {"values": []})
 
         for obs in self.data:
@@ -475,6 +864,12 @@ class TimeSeriesAnalyzer:
         Returns:
             Dictionary mapping date (YYYY-MM-DD) to statistics
         """
+        if self.aggregates is not None:
+            return self.aggregates.summarize(self.camera_id, metric, "date")
+
+        if self.df is not None:
+            return self._grouped_stats(metric, self.df.index.strftime("%Y-%m-%d"))
+
         daily_stats = defaultdict(lambda: {"values": []})
 
         for obs in self.data:
@@ -490,10 +885,10 @@ class TimeSeriesAnalyzer:
 
         # Calculate statistics
         result = {}
-        for date, stats in daily_stats.items():
+        for day, stats in daily_stats.items():
             values = stats["values"]
             if values:
-                result[date] = {
+                result[day] = {
                     "mean": statistics.mean(values),
                     "std": statistics.stdev(values) if len(values) > 1 else 0.0,
                     "count": len(values),
@@ -513,6 +908,12 @@ class TimeSeriesAnalyzer:
         Returns:
             Dictionary mapping weekday to statistics
         """
+        if self.aggregates is not None:
+            return self.aggregates.summarize(self.camera_id, metric, "weekday")
+
+        if self.df is not None:
+            return self._grouped_stats(metric, self.df.index.weekday)
+
         weekday_stats = defaultdict(lambda: {"values": []})
 
         for obs in self.data:
@@ -551,6 +952,28 @@ class TimeSeriesAnalyzer:
         Returns:
             List of (timestamp, value, z_score) tuples
         """
+        if self.df is not None:
+            if metric not in self.df.columns:
+                return []
+            values = self.df[metric].to_numpy()
+            mask = ~np.isnan(values)
+            values = values[mask]
+            if len(values) < 2:
+                return []
+            std_val = values.std(ddof=1)
+            z_scores = (
+                (values - values.mean()) / std_val
+                if std_val != 0
+                else np.zeros(len(values))
+            )
+            return list(
+                zip(
+                    self.df.index[mask].to_pydatetime(),
+                    values.tolist(),
+                    z_scores.tolist(),
+                )
+            )
+
         values = []
         timestamps = []
 
@@ -736,17 +1159,27 @@ class PatternDetector:
 class ForecastEngine:
     """Generate forecasts using time-series models."""
 
-    def __init__(self, config: Dict[str, Any], analyzer: TimeSeriesAnalyzer):
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        analyzer: TimeSeriesAnalyzer,
+        start_params: Optional[Dict[str, List[float]]] = None,
+    ):
         """
         Initialize forecast engine.
 
         Args:
             config: Forecasting configuration
             analyzer: TimeSeriesAnalyzer instance
+            start_params: ARIMA parameters fitted in an earlier run, per
+                metric, used as the optimizer's starting point
         """
         self.config = config
         self.analyzer = analyzer
         self.method = config.get("method", "moving_average")
+        self.start_params = start_params or {}
+        # ARIMA parameters fitted by this engine, per metric
+        self.fitted_params: Dict[str, List[float]] = {}
 
     def forecast_next_hour(self, metric: str = "intensity") -> Dict[str, float]:
         """
@@ -846,7 +1279,12 @@ class ForecastEngine:
 
         try:
             model = ARIMA(values, order=(p, d, q))
-            fitted = model.fit()
+            start_params = self.start_params.get(metric)
+            if start_params is not None and len(start_params) == len(model.param_names):
+                fitted = model.fit(start_params=start_params)
+            else:
+                fitted = model.fit()
+            self.fitted_params[metric] = [float(v) for v in fitted.params]
             forecast_result = fitted.forecast(steps=1)
 
             forecast = (
@@ -869,6 +1307,95 @@ class ForecastEngine:
             return self._moving_average_forecast(metric)
 
 
+def analyze_series_patterns(
+    config: PatternConfig,
+    camera_id: str,
+    data: List[Dict[str, Any]],
+    time_window: str,
+    start_time: datetime,
+    end_time: datetime,
+    aggregates: Optional[RollingAggregates] = None,
+    arima_params: Optional[Dict[str, List[float]]] = None,
+) -> Tuple[Dict[str, Any], Dict[str, List[float]]]:
+    """
+    Detect patterns and forecast for one camera's observations.
+
+    Runs in the agent process or in a pattern worker process, so it only
+    depends on its arguments.
+
+    Args:
+        config: Pattern recognition configuration
+        camera_id: Camera entity ID
+        data: Observations with timestamps and metric values
+        time_window: Time window the observations cover
+        start_time: Start of time window
+        end_time: End of time window
+        aggregates: Rolling aggregates already updated with data
+        arima_params: Previously fitted ARIMA parameters per metric
+
+    Returns:
+        Tuple of (analysis results or no_data status, fitted ARIMA
+        parameters per metric)
+    """
+    if not data:
+        logger.warning(f"No data found for camera {camera_id} in window {time_window}")
+        return {
+            "status": "no_data",
+            "reason": "No observations found in time window",
+            "camera_id": camera_id,
+            "time_window": time_window,
+            "start_time": start_time.isoformat(),
+            "end_time": end_time.isoformat(),
+        }, {}
+
+    # Initialize analyzer
+    metrics = config.get_analysis_config()["metrics"]
+    analyzer = TimeSeriesAnalyzer(data, metrics, aggregates, camera_id)
+
+    # Detect patterns
+    patterns_config = config.get_patterns_config()
+    detector = PatternDetector(patterns_config, analyzer)
+
+    results = {
+        "status": "success",
+        "camera_id": camera_id,
+        "time_window": time_window,
+        "start_time": start_time.isoformat(),
+        "end_time": end_time.isoformat(),
+        "data_points": len(data),
+    }
+
+    # Rush hours
+    rush_hours = detector.detect_rush_hours("intensity")
+    results["rush_hours"] = rush_hours
+
+    # Anomalies
+    if patterns_config.get("anomaly_detection", {}).get("enabled", True):
+        anomaly_threshold = patterns_config["anomaly_detection"]["threshold"]
+        min_samples = patterns_config["anomaly_detection"]["min_samples"]
+        anomalies = detector.detect_anomalies(
+            "intensity", anomaly_threshold, min_samples
+        )
+        results["anomalies"] = anomalies
+
+    # Weekly patterns
+    if patterns_config.get("weekly_patterns", {}).get("enabled", True):
+        weekly = detector.detect_weekly_patterns("intensity")
+        results["weekly_patterns"] = weekly
+
+    # Forecasting
+    fitted_params: Dict[str, List[float]] = {}
+    forecasting_config = config.get_forecasting_config()
+    if forecasting_config.get("enabled", True):
+        forecast_engine = ForecastEngine(forecasting_config, analyzer, arima_params)
+        if forecasting_config.get("horizon", {}).get("next_hour", True):
+            forecast = forecast_engine.forecast_next_hour("intensity")
+            results["forecast"] = forecast
+        fitted_params = forecast_engine.fitted_params
+
+    return results, fitted_params
+
+
 # ============================================================================
 # Pattern Recognition Agent
 # ============================================================================
@@ -890,11 +1417,39 @@ class PatternRecognitionAgent:
         neo4j_config = self.config.get_neo4j_config()
         self.neo4j = Neo4jConnector(neo4j_config)
 
-        # HTTP session for Stellio
-        self.session = requests.Session()
-        self.session.headers.update(
-            {"Content-Type": "application/ld+json", "Accept": "application/ld+json"}
-        )
+        # Shared HTTP client for Stellio
+        stellio_config = self.config.get_stellio_config()
+        self.session = get_stellio_client(stellio_config.get("base_url", ""))
+
+        # asyncio writer for batched pattern entity upserts
+        self.writer = None
+        if stellio_config.get("async_writes", False) and stellio_config.get("base_url"):
+            self.writer = get_async_writer(
+                stellio_config["base_url"],
+                int(stellio_config.get("max_concurrency", 64)),
+            )
+        self.headers = {
+            "Content-Type": "application/ld+json",
+            "Accept": "application/ld+json",
+        }
+
+        # Running per-camera statistics, updated with new observations only
+        state_config = self.config.get_state_config()
+        self.aggregates: Optional[RollingAggregates] = None
+        if state_config.get("rolling_aggregates", False):
+            self.aggregates = RollingAggregates(state_config.get("aggregates_file"))
+
+        # Fitted ARIMA parameters per camera and metric (warm starts)
+        arima_params_file = state_config.get("arima_params_file")
+        self.arima_params_path = Path(arima_params_file) if arima_params_file else None
+        self.arima_params: Dict[str, Dict[str, List[float]]] = {}
+        self._arima_params_dirty = False
+        if self.arima_params_path is not None and self.arima_params_path.exists():
+            try:
+                with open(self.arima_params_path, "r", encoding="utf-8") as f:
+                    self.arima_params = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Discarding unreadable ARIMA parameters file: {e}")
 
         # Setup logging
         logging.basicConfig(
@@ -939,18 +1494,7 @@ class PatternRecognitionAgent:
         # Proceed with Pattern Analysis
         # ============================================================
 
-        # Calculate time range
-        end_time = datetime.now()
-        if time_window == "1_hour":
-            start_time = end_time - timedelta(hours=1)
-        elif time_window == "1_day":
-            start_time = end_time - timedelta(days=1)
-        elif time_window == "7_days":
-            start_time = end_time - timedelta(days=7)
-        elif time_window == "30_days":
-            start_time = end_time - timedelta(days=30)
-        else:
-            raise ValueError(f"Invalid time window: {time_window}")
+        start_time, end_time = self._time_range(time_window)
 
         # Query temporal data
         analysis_config = self.config.get_analysis_config()
@@ -969,63 +1513,82 @@ class PatternRecognitionAgent:
                 "time_window": time_window,
             }
 
-        if not data:
-            self.logger.warning(
-                f"No data found for camera {camera_id} in window {time_window}"
-            )
-            return {
-                "status": "no_data",
-                "reason": "No observations found in time window",
-                "camera_id": camera_id,
-                "time_window": time_window,
-                "start_time": start_time.isoformat(),
-                "end_time": end_time.isoformat(),
-            }
-
-        # Initialize analyzer
-        analyzer = TimeSeriesAnalyzer(data, metrics)
-
-        # Detect patterns
-        patterns_config = self.config.get_patterns_config()
-        detector = PatternDetector(patterns_config, analyzer)
+        return self.analyze_series(camera_id, data, time_window, start_time, end_time)
 
-        results = {
-            "status": "success",
-            "camera_id": camera_id,
-            "time_window": time_window,
-            "start_time": start_time.isoformat(),
-            "end_time": end_time.isoformat(),
-            "data_points": len(data),
-        }
-
-        # Rush hours
-        rush_hours = detector.detect_rush_hours("intensity")
-        results["rush_hours"] = rush_hours
+    @staticmethod
+    def _time_range(time_window: str) -> Tuple[datetime, datetime]:
+        """
+        Calculate the (start, end) range of a time window ending now (UTC).
 
-        # Anomalies
-        if patterns_config.get("anomaly_detection", {}).get("enabled", True):
-            anomaly_threshold = patterns_config["anomaly_detection"]["threshold"]
-            min_samples = patterns_config["anomaly_detection"]["min_samples"]
-            anomalies = detector.detect_anomalies(
-                "intensity", anomaly_threshold, min_samples
-            )
-            results["anomalies"] = anomalies
+        Raises:
+            ValueError: If the time window is unknown
+        """
+        end_time = datetime.now(timezone.utc)
+        if time_window == "1_hour":
+            start_time = end_time - timedelta(hours=1)
+        elif time_window == "1_day":
+            start_time = end_time - timedelta(days=1)
+        elif time_window == "7_days":
+            start_time = end_time - timedelta(days=7)
+        elif time_window == "30_days":
+            start_time = end_time - timedelta(days=30)
+        else:
+            raise ValueError(f"Invalid time window: {time_window}")
+        return start_time, end_time
 
-        # Weekly patterns
-        if patterns_config.get("weekly_patterns", {}).get("enabled", True):
-            weekly = detector.detect_weekly_patterns("intensity")
-            results["weekly_patterns"] = weekly
+    def analyze_series(
+        self,
+        camera_id: str,
+        data: List[Dict[str, Any]],
+        time_window: str,
+        start_time: datetime,
+        end_time: datetime,
+    ) -> Dict[str, Any]:
+        """
+        Analyze patterns in already-fetched observations of a camera.
 
-        # Forecasting
-        forecasting_config = self.config.get_forecasting_config()
-        if forecasting_config.get("enabled", True):
-            forecast_engine = ForecastEngine(forecasting_config, analyzer)
-            if forecasting_config.get("horizon", {}).get("next_hour", True):
-                forecast = forecast_engine.forecast_next_hour("intensity")
-                results["forecast"] = forecast
+        Args:
+            camera_id: Camera entity ID
+            data: Observations with timestamps and metric values
+            time_window: Time window the observations cover
+            start_time: Start of time window
+            end_time: End of time window
 
+        Returns:
+            Dictionary with pattern analysis results or no_data status
+        """
+        self._update_aggregates(camera_id, data, start_time)
+        results, fitted_params = analyze_series_patterns(
+            self.config,
+            camera_id,
+            data,
+            time_window,
+            start_time,
+            end_time,
+            self.aggregates,
+            self.arima_params.get(camera_id),
+        )
+        self._store_arima_params(camera_id, fitted_params)
         return results
 
+    def _update_aggregates(
+        self, camera_id: str, data: List[Dict[str, Any]], start_time: datetime
+    ):
+        """Add a camera's new observations to the rolling aggregates."""
+        if self.aggregates is None or not data:
+            return
+        metrics = self.config.get_analysis_config()["metrics"]
+        self.aggregates.update(camera_id, data, metrics, start_time)
+        self.aggregates.expire(camera_id, start_time)
+
+    def _store_arima_params(
+        self, camera_id: str, fitted_params: Dict[str, List[float]]
+    ):
+        """Remember fitted ARIMA parameters as the next run's warm start."""
+        if fitted_params:
+            self.arima_params.setdefault(camera_id, {}).update(fitted_params)
+            self._arima_params_dirty = True
+
     def create_pattern_entity(
         self, camera_id: str, pattern_type: str, analysis_results: Dict[str, Any]
     ) -> Dict[str, Any]:
@@ -1117,7 +1680,9 @@ class PatternRecognitionAgent:
         url = f"{stellio_config['base_url']}{stellio_config['create_endpoint']}"
 
         try:
-            response = self.session.post(url, json=entity, timeout=30)
+            response = self.session.post(
+                url, json=entity, headers=self.headers, timeout=30
+            )
             if response.status_code in [201, 204]:
                 self.logger.info(f"Created entity: {entity['id']}")
                 return True
@@ -1130,6 +1695,38 @@ class PatternRecognitionAgent:
             self.logger.error(f"Error posting entity: {e}")
             return False
 
+    def post_entities(self, entities: List[Dict[str, Any]]) -> int:
+        """
+        Publish pattern entities to Stellio.
+
+        Uses batched upserts through the async writer when enabled,
+        otherwise POSTs each entity.
+
+        Args:
+            entities: NGSI-LD entities
+
+        Returns:
+            Number of entities Stellio accepted
+        """
+        if self.writer is None:
+            return sum(1 for entity in entities if self.post_entity(entity))
+
+        stellio_config = self.config.get_stellio_config()
+        writes = self.writer.upsert_entities(
+            entities,
+            create_url=f"{stellio_config['base_url']}{stellio_config['create_endpoint']}",
+            headers=self.headers,
+            timeout=30,
+            batch_size=stellio_config.get("batch_size"),
+        )
+        for write in writes:
+            if not write.success:
+                self.logger.error(
+                    f"Failed to upsert entity {write.entity_id}: "
+                    f"{write.status_code} {write.error}"
+                )
+        return sum(1 for write in writes if write.success)
+
     def process_all_cameras(self, time_window: str = "7_days") -> Dict[str, Any]:
         """
         Process all cameras in Neo4j graph.
@@ -1214,10 +1811,15 @@ class PatternRecognitionAgent:
             "pattern_types", ["hourly", "daily", "weekly"]
         )
 
-        for camera_id in cameras:
+        chunk_size = int(self.config.get_neo4j_config().get("bulk_chunk_size", 0))
+
+        entities: List[Dict[str, Any]] = []
+        for camera_id, analyze in self._camera_analyses(
+            cameras, time_window, chunk_size
+        ):
             try:
                 # Analyze patterns
-                analysis = self.analyze_camera_patterns(camera_id, time_window)
+                analysis = analyze()
 
                 # Check if analysis was skipped or failed
                 if not analysis or analysis.get("status") in [
@@ -1233,16 +1835,25 @@ class PatternRecognitionAgent:
 
                 # Create entities for each pattern type
                 for pattern_type in pattern_types:
-                    entity = self.create_pattern_entity(
-                        camera_id, pattern_type, analysis
+                    entities.append(
+                        self.create_pattern_entity(camera_id, pattern_type, analysis)
                     )
-                    if self.post_entity(entity):
-                        results["entities_created"] += 1
 
             except Exception as e:
                 self.logger.error(f"Error processing camera {camera_id}: {e}")
                 results["failures"].append({"camera": camera_id, "error": str(e)})
 
+        if self.aggregates is not None:
+            self.aggregates.save()
+        if self.arima_params_path is not None and self._arima_params_dirty:
+            _atomic_write_json(
+                self.arima_params_path, self.arima_params, separators=(",", ":")
+            )
+            self._arima_params_dirty = False
+
+        # Publish all pattern entities once analysis is done
+        results["entities_created"] = self.post_entities(entities)
+
         # ============================================================
         # CRITICAL FIX: ALWAYS save output file
         # ============================================================
@@ -1253,6 +1864,149 @@ class PatternRecognitionAgent:
 
         return results
 
+    def _camera_analyses(
+        self, cameras: List[str], time_window: str, chunk_size: int
+    ) -> Iterator[Tuple[str, Callable[[], Dict[str, Any]]]]:
+        """
+        Pair each camera with the call analyzing it.
+
+        With a positive chunk_size, observations for chunk_size cameras are
+        fetched in one Neo4j query before their analyses are yielded;
+        otherwise each analysis queries its own camera. Pre-fetched series
+        are analyzed in a process pool when parallel processing is enabled;
+        if the pool fails (a worker dies, a task cannot be pickled), the
+        remaining cameras are analyzed in this process.
+
+        Args:
+            cameras: Camera entity IDs
+            time_window: Time window for analysis
+            chunk_size: Cameras per bulk query (0 = one query per camera)
+
+        Yields:
+            (camera ID, zero-argument analysis call) pairs
+        """
+        if chunk_size <= 0:
+            for camera_id in cameras:
+                yield camera_id, partial(
+                    self.analyze_camera_patterns, camera_id, time_window
+                )
+            return
+
+        start_time, end_time = self._time_range(time_window)
+        metrics = self.config.get_analysis_config()["metrics"]
+        executor = self._create_pool(len(cameras))
+        map_chunksize = int(
+            self.config.get_performance_config().get("chunk_size", 1) or 1
+        )
+
+        try:
+            for i in range(0, len(cameras), chunk_size):
+                chunk = cameras[i : i + chunk_size]
+                try:
+                    series = self.neo4j.query_temporal_data_bulk(
+                        chunk, start_time, end_time, metrics
+                    )
+                except Exception as e:
+                    self.logger.error(
+                        f"Failed to query Neo4j for {len(chunk)} cameras: {e}"
+                    )
+                    failure = {
+                        "status": "failed",
+                        "reason": f"Neo4j query error: {str(e)}",
+                        "time_window": time_window,
+                    }
+                    for camera_id in chunk:
+                        yield camera_id, partial(dict, failure, camera_id=camera_id)
+                    continue
+
+                if executor is None:
+                    for camera_id in chunk:
+                        yield camera_id, partial(
+                            self.analyze_series,
+                            camera_id,
+                            series.get(camera_id, []),
+                            time_window,
+                            start_time,
+                            end_time,
+                        )
+                    continue
+
+                # Rolling aggregates are updated here; each worker gets
+                # its camera's series, aggregates and ARIMA warm start
+                tasks = []
+                for camera_id in chunk:
+                    data = series.get(camera_id, [])
+                    self._update_aggregates(camera_id, data, start_time)
+                    tasks.append(
+                        (
+                            camera_id,
+                            data,
+                            time_window,
+                            start_time,
+                            end_time,
+                            (
+                                self.aggregates.subset([camera_id])
+                                if self.aggregates is not None
+                                else None
+                            ),
+                            self.arima_params.get(camera_id),
+                        )
+                    )
+
+                analyzed = 0
+                try:
+                    for camera_id, results, fitted_params, error in executor.map(
+                        _analyze_camera_task, tasks, chunksize=map_chunksize
+                    ):
+                        self._store_arima_params(camera_id, fitted_params)
+                        analyzed += 1
+                        yield camera_id, partial(_task_outcome, results, error)
+                except Exception as e:
+                    self.logger.warning(
+                        f"Process pool failed ({e!r}), analyzing the remaining "
+                        f"cameras in this process"
+                    )
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    executor = None
+                    for camera_id, data, *_ in tasks[analyzed:]:
+                        yield camera_id, partial(
+                            self.analyze_series,
+                            camera_id,
+                            data,
+                            time_window,
+                            start_time,
+                            end_time,
+                        )
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+    def _create_pool(self, camera_count: int) -> Optional[ProcessPoolExecutor]:
+        """
+        Create the pattern worker pool, if parallel processing applies.
+
+        Returns:
+            Process pool, or None to analyze in this process
+        """
+        performance_config = self.config.get_performance_config()
+        if not performance_config.get("parallel_processing", False):
+            return None
+        min_cameras = performance_config.get("parallel_min_cameras", 50)
+        if camera_count < min_cameras or (os.cpu_count() or 1) < 2:
+            return None
+
+        try:
+            return ProcessPoolExecutor(
+                max_workers=performance_config.get("max_workers", 4),
+                initializer=_init_pattern_worker,
+                initargs=(self.config,),
+            )
+        except (OSError, NotImplementedError) as e:
+            self.logger.warning(
+                f"Process pool unavailable ({e}), analyzing sequentially"
+            )
+            return None
+
     def _save_results(self, results: Dict[str, Any], filepath: str):
         """Save analysis results to JSON file."""
         try:
@@ -1271,6 +2025,40 @@ class PatternRecognitionAgent:
             self.session.close()
 
 
+_worker_config: Optional[PatternConfig] = None
+
+
+def _init_pattern_worker(config: PatternConfig):
+    """Keep the configuration in the worker process."""
+    global _worker_config
+    _worker_config = config
+
+
+def _analyze_camera_task(
+    task: Tuple[Any, ...],
+) -> Tuple[str, Optional[Dict[str, Any]], Dict[str, List[float]], Optional[str]]:
+    """
+    Analyze one camera's pre-fetched series inside a worker process.
+
+    Returns:
+        Tuple of (camera ID, analysis results, fitted ARIMA parameters,
+        error message or None)
+    """
+    camera_id = task[0]
+    try:
+        results, fitted_params = analyze_series_patterns(_worker_config, *task)
+        return camera_id, results, fitted_params, None
+    except Exception as e:
+        return camera_id, None, {}, str(e)
+
+
+def _task_outcome(results: Optional[Dict[str, Any]], error: Optional[str]):
+    """Return a worker's analysis, re-raising its error in the agent process."""
+    if error is not None:
+        raise RuntimeError(error)
+    return results
+
+
 # ============================================================================
 # Main Entry Point
 # ============================================================================
@@ -8,6 +8,12 @@ Key Features:
 - Batch publishing (configurable batch size, default 50)
 - Retry logic with exponential backoff (3 attempts: 1s, 2s, 4s)
 - Conflict resolution (409 → PATCH update)
+- Partial batch failures republish only the failed entities (bisecting the
+  batch when Stellio does not itemise errors)
+- Concurrent batch upserts with an adaptive in-flight window (429/503 aware)
+- sosa:madeObservation camera links written once per camera per run
+- Publish cache: unchanged entities are skipped, changed ones are sent as
+  attribute-level batch updates
 - Comprehensive error handling and reporting
 - Support for authentication tokens
 - Performance tracking and detailed reports
@@ -15,6 +21,8 @@ Key Features:
 Architecture:
 - ConfigLoader: Load and validate Stellio configuration from YAML
 - BatchPublisher: Handle HTTP requests to Stellio with retry logic
+- AdaptiveConcurrencyLimiter: Bound and adapt the number of in-flight batches
+- PublishCache: Persisted content hashes of the last published entities
 - PublishReportGenerator: Track and report publishing statistics
 - EntityPublisherAgent: Main orchestrator for the publishing workflow
 
@@ -23,10 +31,13 @@ Date: 2025-11-01
 Version: 1.0.0
 """
 
+import hashlib
 import json
 import logging
 import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
@@ -34,9 +45,9 @@ from dataclasses import dataclass, field
 
 import yaml
 import requests
-from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+from shared.stellio_client import get_stellio_client
 
 # Configure logging
 logging.basicConfig(
@@ -233,6 +244,238 @@ class ConfigLoader:
             raise ValueError("retry.backoff_factor must be greater than 0")
 
 
+class AdaptiveConcurrencyLimiter:
+    """
+    Window of in-flight batch upserts that adapts to Stellio's responses.
+
+    The window follows additive-increase / multiplicative-decrease: it grows
+    by one after each batch that completes within the latency target, shrinks
+    by one when a batch is slower than the target and is halved whenever
+    Stellio throttles (429/503).
+    """
+
+    def __init__(
+        self,
+        max_limit: int,
+        min_limit: int = 1,
+        latency_target: Optional[float] = None,
+    ):
+        """
+        Initialize limiter.
+
+        Args:
+            max_limit: Maximum number of in-flight batches
+            min_limit: Minimum number of in-flight batches
+            latency_target: Batch latency (seconds) above which the window
+                shrinks; None disables latency adaptation
+        """
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.latency_target = latency_target
+        self.limit = self.max_limit
+        self.in_flight = 0
+        self.throttled = 0
+        self._condition = threading.Condition()
+
+    def acquire(self) -> None:
+        """Block until a batch may be sent."""
+        with self._condition:
+            while self.in_flight >= self.limit:
+                self._condition.wait()
+            self.in_flight += 1
+
+    def release(self) -> None:
+        """Mark a batch as finished."""
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def on_success(self, latency: float) -> None:
+        """
+        Adapt the window after a completed batch.
+
+        Args:
+            latency: Batch duration in seconds
+        """
+        with self._condition:
+            if self.latency_target and latency > self.latency_target:
+                self.limit = max(self.min_limit, self.limit - 1)
+            else:
+                self.limit = min(self.max_limit, self.limit + 1)
+            self._condition.notify_all()
+
+    def on_throttle(self) -> None:
+        """Halve the window after a 429/503 response."""
+        with self._condition:
+            self.throttled += 1
+            self.limit = max(self.min_limit, self.limit // 2)
+            logger.warning(
+                f"Stellio throttled batch upsert, concurrency reduced to {self.limit}"
+            )
+
+
+class PublishCache:
+    """
+    Content hashes of the last successfully published version of each entity.
+
+    One hash is kept per attribute, so a re-published entity can be compared
+    attribute by attribute: unchanged entities are skipped and changed ones
+    only send the attributes that differ. The cache is a JSON file that
+    persists across runs. Entries older than ``max_age_seconds`` are ignored,
+    which forces a periodic full upsert of otherwise unchanged entities, and
+    are dropped when the cache is saved. At most ``max_entries`` entries (the
+    most recently published) are kept, so caching one-off entities such as
+    per-observation ItemFlowObserved IDs does not grow the file forever.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_age_seconds: Optional[float] = None,
+        max_entries: Optional[int] = None,
+    ):
+        """
+        Initialize cache and load the previous state.
+
+        Args:
+            path: Cache file path
+            max_age_seconds: Entry lifetime (None keeps entries forever)
+            max_entries: Entries kept on save (None keeps all)
+        """
+        self.path = Path(path)
+        self.max_age_seconds = max_age_seconds
+        self.max_entries = max_entries
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    @staticmethod
+    def attribute_hashes(entity: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Hash every attribute of an entity (including its type).
+
+        Args:
+            entity: NGSI-LD entity
+
+        Returns:
+            Hash by attribute name
+        """
+        return {
+            name: hashlib.sha1(
+                json.dumps(
+                    value, sort_keys=True, ensure_ascii=False, separators=(",", ":")
+                ).encode("utf-8")
+            ).hexdigest()
+            for name, value in entity.items()
+            if name not in ("id", "@context")
+        }
+
+    def diff(self, entity: Dict[str, Any]) -> Optional[List[str]]:
+        """
+        Compare an entity with its last published version.
+
+        Args:
+            entity: NGSI-LD entity
+
+        Returns:
+            Names of changed attributes (empty if unchanged), or None if the
+            entity must be fully upserted (not cached, expired, type changed
+            or attributes removed)
+        """
+        with self._lock:
+            entry = self.entries.get(entity.get("id"))
+        if entry is None:
+            return None
+        if (
+            self.max_age_seconds is not None
+            and time.time() - entry["published_at"] > self.max_age_seconds
+        ):
+            return None
+
+        current = self.attribute_hashes(entity)
+        cached = entry["attributes"]
+        if current.get("type") != cached.get("type") or set(cached) - set(current):
+            return None
+        return [name for name, digest in current.items() if cached.get(name) != digest]
+
+    def record(self, entity: Dict[str, Any]) -> None:
+        """
+        Remember an entity as published.
+
+        Args:
+            entity: Full NGSI-LD entity that Stellio now holds
+        """
+        with self._lock:
+            self.entries[entity.get("id", "unknown")] = {
+                "attributes": self.attribute_hashes(entity),
+                "published_at": time.time(),
+            }
+
+    def invalidate(self, entity_id: str) -> None:
+        """
+        Forget an entity, so its next publish is a full upsert.
+
+        Args:
+            entity_id: NGSI-LD entity ID
+        """
+        with self._lock:
+            self.entries.pop(entity_id, None)
+
+    def clear(self) -> None:
+        """Forget every entity, so all of them are fully upserted again."""
+        with self._lock:
+            self.entries = {}
+
+    def load(self) -> None:
+        """Load the cache file; a missing or corrupt file starts empty."""
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+            logger.info(f"Loaded publish cache with {len(self.entries)} entities")
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable publish cache {self.path}: {e}")
+            self.entries = {}
+
+    def prune(self) -> int:
+        """
+        Drop expired entries and the oldest ones beyond max_entries.
+
+        Returns:
+            Number of entries dropped
+        """
+        with self._lock:
+            before = len(self.entries)
+            if self.max_age_seconds is not None:
+                cutoff = time.time() - self.max_age_seconds
+                self.entries = {
+                    entity_id: entry
+                    for entity_id, entry in self.entries.items()
+                    if entry["published_at"] >= cutoff
+                }
+            if self.max_entries is not None and len(self.entries) > self.max_entries:
+                newest = sorted(
+                    self.entries.items(),
+                    key=lambda item: item[1]["published_at"],
+                    reverse=True,
+                )[: self.max_entries]
+                self.entries = dict(newest)
+            return before - len(self.entries)
+
+    def save(self) -> None:
+        """Prune the cache and write it atomically."""
+        dropped = self.prune()
+        if dropped:
+            logger.info(f"Dropped {dropped} expired or surplus publish cache entries")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with self._lock:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f)
+        os.replace(tmp_path, self.path)
+
+
 class BatchPublisher:
     """
     Handle batch publishing of NGSI-LD entities to Stellio Context Broker.
@@ -244,6 +487,15 @@ class BatchPublisher:
     - Error handling and tracking
     """
 
+    # Batch responses that mean "slow down" rather than "bad entities"
+    THROTTLE_STATUS_CODES = (429, 503)
+
+    # Unitemised batch errors caused by entity data (worth bisecting)
+    BAD_DATA_STATUS_CODES = (400, 422)
+
+    # Batch errors that every entity would hit again when sent on its own
+    AUTH_STATUS_CODES = (401, 403)
+
     def __init__(self, config: Dict[str, Any]):
         """
         Initialize BatchPublisher with Stellio configuration.
@@ -260,6 +512,13 @@ class BatchPublisher:
         self.headers_config = config["headers"]
         self.conflict_resolution = config["conflict_resolution"]
 
+        # Optional in-flight window, notified of throttled batch upserts
+        self.limiter: Optional[AdaptiveConcurrencyLimiter] = None
+
+        # Observation links per camera, flushed once per publish run
+        self.pending_observation_links: Dict[str, Dict[str, Optional[str]]] = {}
+        self._links_lock = threading.Lock()
+
         # Setup HTTP session with connection pooling
         self.session = self._create_session()
 
@@ -268,24 +527,18 @@ class BatchPublisher:
 
     def _create_session(self) -> requests.Session:
         """
-        Create HTTP session with connection pooling and retry configuration.
+        Get the shared Stellio client, sized for this publisher.
 
         Returns:
-            Configured requests.Session object
+            Shared StellioClient (a requests.Session)
         """
-        session = requests.Session()
+        # At least one pooled connection per in-flight batch
+        performance = self.config.get("performance", {})
+        pool_size = performance.get("connection_pool_size", 10)
+        if performance.get("parallel_batches", False):
+            pool_size = max(pool_size, performance.get("max_concurrent_batches", 5))
 
-        # Configure connection pool
-        pool_size = self.config.get("performance", {}).get("connection_pool_size", 10)
-        adapter = HTTPAdapter(
-            pool_connections=pool_size,
-            pool_maxsize=pool_size,
-            max_retries=0,  # We handle retries manually
-        )
-        session.mount("http://", adapter)
-        session.mount("https://", adapter)
-
-        return session
+        return get_stellio_client(self.base_url, pool_size=pool_size)
 
     def _create_headers(self) -> Dict[str, str]:
         """
@@ -315,6 +568,11 @@ class BatchPublisher:
         """
         Publish a batch of entities to Stellio using batch upsert endpoint.
 
+        If the upsert fails, only the entities Stellio reports as failed are
+        republished individually. When a 400/422 response is not itemised per
+        entity, the batch is bisected and each half is upserted again, so a
+        single bad entity costs O(log n) requests instead of n.
+
         Args:
             entities: List of NGSI-LD entities to publish
 
@@ -326,14 +584,232 @@ class BatchPublisher:
 
         logger.info(f"Publishing batch of {len(entities)} entities to Stellio")
 
+        return self._upsert_batch(entities)
+
+    def update_batch(
+        self, entities: List[Dict[str, Any]]
+    ) -> Tuple[List[PublishResult], List[Dict[str, Any]]]:
+        """
+        Update attributes of existing entities with one batch update.
+
+        Each entity carries only the attributes to overwrite. Entities that
+        Stellio does not know (404) or fails to update are not retried here;
+        they are returned so the caller can fully upsert them.
+
+        Args:
+            entities: Partial NGSI-LD entities (id, type, @context and the
+                changed attributes)
+
+        Returns:
+            Tuple of (results of updated entities, entities that need a full
+            upsert)
+        """
+        if not entities:
+            return [], []
+
+        url = (
+            f"{self.base_url}/{self.api_version}"
+            f"{self.endpoints.get('batch_update', '/entityOperations/update')}"
+        )
+        start_time = time.time()
+
+        try:
+            response = self._upsert_with_throttle_retry(url, entities)
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Batch update request failed: {e}, falling back to upsert")
+            return [], entities
+
+        duration = time.time() - start_time
+
+        if response.status_code in [200, 201, 204]:
+            success_ids = {entity.get("id", "unknown") for entity in entities}
+        else:
+            batch_result = self._parse_batch_result(response)
+            if batch_result is None:
+                logger.warning(
+                    f"Batch update failed with status {response.status_code}, "
+                    f"falling back to upsert for {len(entities)} entities"
+                )
+                return [], entities
+            success_ids, errors = batch_result
+            for entity_id, message in errors.items():
+                logger.info(f"Batch update error for {entity_id}: {message}")
+
+        results = [
+            PublishResult(
+                entity_id=entity.get("id", "unknown"),
+                status_code=response.status_code,
+                success=True,
+                duration=duration / len(entities),
+            )
+            for entity in entities
+            if entity.get("id", "unknown") in success_ids
+        ]
+        fallback = [e for e in entities if e.get("id", "unknown") not in success_ids]
+
+        logger.info(
+            f"Batch update: {len(results)} entities updated, "
+            f"{len(fallback)} need a full upsert"
+        )
+        return results, fallback
+
+    def entity_exists(self, entity_id: str) -> Optional[bool]:
+        """
+        Check whether Stellio holds an entity.
+
+        Args:
+            entity_id: NGSI-LD entity ID
+
+        Returns:
+            True if it exists, False on 404, None if the check failed
+        """
+        url = f"{self.base_url}/{self.api_version}{self.endpoints['entities']}/{entity_id}"
+        try:
+            response = self.session.get(url, headers=self.headers, timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Existence check for {entity_id} failed: {e}")
+            return None
+
+        if response.status_code == 200:
+            return True
+        if response.status_code == 404:
+            return False
+        logger.warning(
+            f"Existence check for {entity_id} returned HTTP {response.status_code}"
+        )
+        return None
+
+    def _upsert_batch(self, entities: List[Dict[str, Any]]) -> List[PublishResult]:
+        """
+        Upsert entities, resolving failures by itemised errors or bisection.
+
+        Unitemised 400/422 responses are bisected to isolate the bad
+        entities. 401/403, and 429/503 once throttle retries are used up,
+        fail the whole batch; other errors fall back to publishing each
+        entity once, without splitting.
+
+        Args:
+            entities: Non-empty list of NGSI-LD entities
+
+        Returns:
+            List of PublishResult objects, in the order of ``entities``
+        """
         # Build batch upsert URL
         url = f"{self.base_url}/{self.api_version}{self.endpoints['batch']}"
-
-        # Try batch upsert first
         start_time = time.time()
-        results = []
 
         try:
+            response = self._upsert_with_throttle_retry(url, entities)
+        except requests.exceptions.RequestException as e:
+            # Network error, try individual entities
+            logger.error(
+                f"Batch upsert request failed: {e}, trying individual entities"
+            )
+            return self._publish_entities_individually(entities)
+
+        duration = time.time() - start_time
+
+        if response.status_code in [200, 201, 204]:
+            # Batch upsert successful
+            logger.info(f"Batch upsert successful for {len(entities)} entities")
+            for entity in entities:
+                self.record_observation_link(entity)
+            return [
+                PublishResult(
+                    entity_id=entity.get("id", "unknown"),
+                    status_code=response.status_code,
+                    success=True,
+                    duration=duration / len(entities),
+                )
+                for entity in entities
+            ]
+
+        batch_result = self._parse_batch_result(response)
+
+        if batch_result is not None:
+            success_ids, errors = batch_result
+            return self._resolve_batch_errors(
+                entities, success_ids, errors, response.status_code, duration
+            )
+
+        if response.status_code in self.THROTTLE_STATUS_CODES:
+            # Throttle retries are used up; splitting would only add load
+            if self.limiter:
+                self.limiter.on_throttle()
+            logger.error(
+                f"Batch upsert still throttled (HTTP {response.status_code}) "
+                f"after retries, failing {len(entities)} entities"
+            )
+            return self._failed_results(
+                entities,
+                response.status_code,
+                f"Batch upsert throttled: HTTP {response.status_code}",
+                duration,
+            )
+
+        if response.status_code in self.AUTH_STATUS_CODES:
+            logger.error(
+                f"Batch upsert rejected with status {response.status_code}, "
+                f"failing {len(entities)} entities"
+            )
+            return self._failed_results(
+                entities,
+                response.status_code,
+                f"Batch upsert rejected: HTTP {response.status_code}",
+                duration,
+            )
+
+        if response.status_code not in self.BAD_DATA_STATUS_CODES or len(entities) == 1:
+            # Server errors, oversized payloads etc.: one individual fallback
+            logger.warning(
+                f"Batch upsert failed with status {response.status_code}, "
+                f"trying individual entities"
+            )
+            return self._publish_entities_individually(entities)
+
+        # Errors are not itemised: split the batch to isolate the bad entities
+        middle = len(entities) // 2
+        logger.warning(
+            f"Batch upsert failed with status {response.status_code}, "
+            f"bisecting {len(entities)} entities"
+        )
+        return self._upsert_batch(entities[:middle]) + self._upsert_batch(
+            entities[middle:]
+        )
+
+    @staticmethod
+    def _failed_results(
+        entities: List[Dict[str, Any]], status_code: int, error: str, duration: float
+    ) -> List[PublishResult]:
+        """Failed results for every entity of a batch."""
+        return [
+            PublishResult(
+                entity_id=entity.get("id", "unknown"),
+                status_code=status_code,
+                success=False,
+                error=error,
+                duration=duration / len(entities),
+            )
+            for entity in entities
+        ]
+
+    def _upsert_with_throttle_retry(
+        self, url: str, entities: List[Dict[str, Any]]
+    ) -> requests.Response:
+        """
+        POST a batch upsert, backing off while Stellio throttles it.
+
+        Args:
+            url: Batch upsert URL
+            entities: Entities to upsert
+
+        Returns:
+            Last upsert response
+        """
+        attempts = 0
+
+        while True:
+            attempts += 1
             response = self._make_request_with_retry(
                 method="POST",
                 url=url,
@@ -342,33 +818,141 @@ class BatchPublisher:
                 timeout=self.timeout,
             )
 
-            duration = time.time() - start_time
+            if (
+                response.status_code not in self.THROTTLE_STATUS_CODES
+                or attempts >= self.retry_config["max_attempts"]
+            ):
+                return response
 
-            if response.status_code in [200, 201, 204]:
-                # Batch upsert successful
-                logger.info(f"Batch upsert successful for {len(entities)} entities")
-                for entity in entities:
-                    results.append(
-                        PublishResult(
-                            entity_id=entity.get("id", "unknown"),
-                            status_code=response.status_code,
-                            success=True,
-                            duration=duration / len(entities),
-                        )
-                    )
-            else:
-                # Batch upsert failed, try individual entities
-                logger.warning(
-                    f"Batch upsert failed with status {response.status_code}, trying individual entities"
-                )
-                results = self._publish_entities_individually(entities)
+            if self.limiter:
+                self.limiter.on_throttle()
 
-        except requests.exceptions.RequestException as e:
-            # Network error, try individual entities
-            logger.error(
-                f"Batch upsert request failed: {e}, trying individual entities"
+            delay = self._retry_after_delay(response, attempts)
+            logger.warning(
+                f"Batch upsert throttled (HTTP {response.status_code}), "
+                f"retrying in {delay} seconds..."
             )
-            results = self._publish_entities_individually(entities)
+            time.sleep(delay)
+
+    def _retry_after_delay(self, response: requests.Response, attempt: int) -> float:
+        """
+        Delay before retrying a throttled request.
+
+        Args:
+            response: Throttled response
+            attempt: Current attempt number (1-indexed)
+
+        Returns:
+            Retry-After in seconds if given, else the backoff delay
+        """
+        retry_after = response.headers.get("Retry-After")
+        try:
+            return min(float(retry_after), self.retry_config["max_delay"])
+        except (TypeError, ValueError):
+            return self._calculate_backoff_delay(attempt)
+
+    def _parse_batch_result(
+        self, response: requests.Response
+    ) -> Optional[Tuple[set, Dict[str, str]]]:
+        """
+        Parse an NGSI-LD BatchOperationResult from an upsert response.
+
+        Stellio answers partially failed batch operations (207 Multi-Status,
+        or 400 when nothing succeeded) with ``{"success": [ids], "errors":
+        [{"entityId": id, "error": ProblemDetails}]}``.
+
+        Args:
+            response: Batch upsert response
+
+        Returns:
+            Tuple of (successful entity IDs, error message by entity ID), or
+            None if the response does not itemise results per entity
+        """
+        try:
+            body = response.json()
+        except ValueError:
+            return None
+
+        if not isinstance(body, dict):
+            return None
+
+        success = body.get("success")
+        errors = body.get("errors")
+        if not isinstance(success, list) and not isinstance(errors, list):
+            return None
+
+        success_ids = set()
+        for item in success or []:
+            if isinstance(item, dict):
+                item = item.get("entityId", item.get("id"))
+            if isinstance(item, str):
+                success_ids.add(item)
+
+        error_messages = {}
+        for item in errors or []:
+            if not isinstance(item, dict) or "entityId" not in item:
+                # An error we cannot attribute means the result is incomplete
+                return None
+            error = item.get("error")
+            if isinstance(error, dict):
+                message = error.get("detail") or error.get("title") or str(error)
+            else:
+                message = str(error)
+            error_messages[item["entityId"]] = message
+
+        return success_ids, error_messages
+
+    def _resolve_batch_errors(
+        self,
+        entities: List[Dict[str, Any]],
+        success_ids: set,
+        errors: Dict[str, str],
+        status_code: int,
+        duration: float,
+    ) -> List[PublishResult]:
+        """
+        Build results for a partially failed batch, republishing failed IDs.
+
+        Entities listed as successful are not sent again. Failed entities, and
+        any entity missing from the response, are published individually so
+        they get the usual retry and 409 → PATCH handling.
+
+        Args:
+            entities: Entities sent in the batch
+            success_ids: IDs Stellio reported as upserted
+            errors: Error message by failed entity ID
+            status_code: HTTP status of the batch response
+            duration: Batch request duration (seconds)
+
+        Returns:
+            List of PublishResult objects, in the order of ``entities``
+        """
+        failed = [e for e in entities if e.get("id", "unknown") not in success_ids]
+
+        logger.warning(
+            f"Batch upsert returned {status_code}: {len(entities) - len(failed)} "
+            f"upserted, republishing {len(failed)} failed entities"
+        )
+        for entity_id, message in errors.items():
+            logger.warning(f"Batch upsert error for {entity_id}: {message}")
+
+        retried = iter(self._publish_entities_individually(failed))
+
+        results = []
+        for entity in entities:
+            entity_id = entity.get("id", "unknown")
+            if entity_id in success_ids:
+                self.record_observation_link(entity)
+                results.append(
+                    PublishResult(
+                        entity_id=entity_id,
+                        status_code=status_code,
+                        success=True,
+                        duration=duration / len(entities),
+                    )
+                )
+            else:
+                results.append(next(retried))
 
         return results
 
@@ -428,36 +1012,8 @@ class BatchPublisher:
                     )
 
                     # CRITICAL: If this is an ItemFlowObserved (sosa:Observation),
-                    # update the parent Camera (sosa:Sensor) with sosa:madeObservation link
-                    entity_type = entity.get("type", "")
-                    if (
-                        entity_type == "ItemFlowObserved"
-                        or "ItemFlowObserved" in entity_type
-                    ):
-                        # Extract camera ID from refDevice relationship
-                        ref_device = entity.get("refDevice", {})
-                        if ref_device and ref_device.get("type") == "Relationship":
-                            camera_id = ref_device.get("object", "")
-                            if camera_id:
-                                # Extract observedAt timestamp from any property
-                                observed_at = None
-                                for key, value in entity.items():
-                                    if (
-                                        isinstance(value, dict)
-                                        and "observedAt" in value
-                                    ):
-                                        observed_at = value["observedAt"]
-                                        break
-
-                                # Update Camera with new observation
-                                logger.info(
-                                    f"🔗 Updating Camera {camera_id} with observation {entity_id}"
-                                )
-                                self.update_camera_with_observation(
-                                    camera_id=camera_id,
-                                    observation_id=entity_id,
-                                    observed_at=observed_at,
-                                )
+                    # queue the sosa:madeObservation link for the parent Camera
+                    self.record_observation_link(entity)
 
                     return PublishResult(
                         entity_id=entity_id,
@@ -472,7 +1028,10 @@ class BatchPublisher:
                     logger.warning(
                         f"Entity {entity_id} already exists (409), attempting PATCH update"
                     )
-                    return self._patch_entity(entity, attempts, start_time)
+                    result = self._patch_entity(entity, attempts, start_time)
+                    if result.success:
+                        self.record_observation_link(entity)
+                    return result
 
                 elif response.status_code in self.retry_config["retry_status_codes"]:
                     # Retryable error
@@ -653,6 +1212,64 @@ class BatchPublisher:
                 duration=duration,
             )
 
+    def record_observation_link(self, entity: Dict[str, Any]) -> None:
+        """
+        Queue the sosa:madeObservation link of a published observation.
+
+        Links are accumulated per camera and written by
+        flush_observation_links(), so each camera is updated once per run
+        instead of once per observation.
+
+        Args:
+            entity: Successfully published NGSI-LD entity
+        """
+        entity_type = entity.get("type", "")
+        if not (entity_type == "ItemFlowObserved" or "ItemFlowObserved" in entity_type):
+            return
+
+        # Extract camera ID from refDevice relationship
+        ref_device = entity.get("refDevice", {})
+        if not ref_device or ref_device.get("type") != "Relationship":
+            return
+        camera_id = ref_device.get("object", "")
+        if not camera_id:
+            return
+
+        # Extract observedAt timestamp from any property
+        observed_at = None
+        for value in entity.values():
+            if isinstance(value, dict) and "observedAt" in value:
+                observed_at = value["observedAt"]
+                break
+
+        with self._links_lock:
+            links = self.pending_observation_links.setdefault(camera_id, {})
+            links[entity.get("id", "unknown")] = observed_at
+
+    def flush_observation_links(self) -> Dict[str, bool]:
+        """
+        Write all queued observation links, one request per camera.
+
+        Returns:
+            Update success by camera ID
+        """
+        with self._links_lock:
+            pending = self.pending_observation_links
+            self.pending_observation_links = {}
+
+        if pending:
+            logger.info(
+                f"🔗 Linking {sum(len(links) for links in pending.values())} "
+                f"observations to {len(pending)} cameras"
+            )
+
+        return {
+            camera_id: self.update_camera_with_observations(
+                camera_id, list(links.items())
+            )
+            for camera_id, links in pending.items()
+        }
+
     def update_camera_with_observation(
         self, camera_id: str, observation_id: str, observed_at: Optional[str] = None
     ) -> bool:
@@ -670,6 +1287,29 @@ class BatchPublisher:
         Returns:
             True if update successful, False otherwise
         """
+        return self.update_camera_with_observations(
+            camera_id, [(observation_id, observed_at)]
+        )
+
+    def update_camera_with_observations(
+        self, camera_id: str, observations: List[Tuple[str, Optional[str]]]
+    ) -> bool:
+        """
+        Link several observations to a Camera in a single PATCH.
+
+        A single observation keeps the plain Relationship body; several are
+        sent as a multi-attribute: one Relationship instance per observation,
+        told apart by a datasetId equal to the observation ID.
+
+        Args:
+            camera_id: Camera entity ID (e.g. "urn:ngsi-ld:Camera:TTH406")
+            observations: (observation ID, observedAt or None) pairs
+
+        Returns:
+            True if update successful, False otherwise
+        """
+        observation_ids = [observation_id for observation_id, _ in observations]
+
         try:
             # Build PATCH URL for Camera entity
             patch_endpoint = self.conflict_resolution["patch_endpoint"].replace(
@@ -677,19 +1317,22 @@ class BatchPublisher:
             )
             url = f"{self.base_url}/{self.api_version}{patch_endpoint}"
 
-            # Build PATCH body to append observation to sosa:madeObservation
-            # Stellio will automatically append to existing array
+            # Build PATCH body to append observations to sosa:madeObservation
+            instances = []
+            for observation_id, observed_at in observations:
+                instance = {"type": "Relationship", "object": observation_id}
+                if len(observations) > 1:
+                    instance["datasetId"] = observation_id
+                # Add observedAt timestamp if provided
+                if observed_at:
+                    instance["observedAt"] = observed_at
+                instances.append(instance)
             patch_body = {
-                "sosa:madeObservation": {
-                    "type": "Relationship",
-                    "object": observation_id,
-                }
+                "sosa:madeObservation": (
+                    instances[0] if len(instances) == 1 else instances
+                )
             }
 
-            # Add observedAt timestamp if provided
-            if observed_at:
-                patch_body["sosa:madeObservation"]["observedAt"] = observed_at
-
             # Send PATCH request
             response = self.session.patch(
                 url, json=patch_body, headers=self.headers, timeout=self.timeout
@@ -697,20 +1340,21 @@ class BatchPublisher:
 
             if response.status_code in [200, 204]:
                 logger.info(
-                    f"✅ Camera {camera_id} updated: added observation {observation_id} "
-                    f"to sosa:madeObservation"
+                    f"✅ Camera {camera_id} updated: added {len(observation_ids)} "
+                    f"observation(s) to sosa:madeObservation"
                 )
                 return True
             else:
                 logger.warning(
-                    f"⚠️ Failed to update Camera {camera_id} with observation {observation_id}: "
-                    f"HTTP {response.status_code} - {response.text}"
+                    f"⚠️ Failed to update Camera {camera_id} with observations "
+                    f"{observation_ids}: HTTP {response.status_code} - {response.text}"
                 )
                 return False
 
         except Exception as e:
             logger.error(
-                f"❌ Exception updating Camera {camera_id} with observation {observation_id}: {e}"
+                f"❌ Exception updating Camera {camera_id} with observations "
+                f"{observation_ids}: {e}"
             )
             return False
 
@@ -746,7 +1390,12 @@ class BatchPublisher:
 
             try:
                 response = self.session.request(
-                    method=method, url=url, json=json, headers=headers, timeout=timeout
+                    method=method,
+                    url=url,
+                    json=json,
+                    headers=headers,
+                    timeout=timeout,
+                    retry=False,
                 )
                 return response
 
@@ -783,10 +1432,10 @@ class BatchPublisher:
         return min(delay, max_delay)
 
     def close(self) -> None:
-        """Close HTTP session and cleanup resources."""
+        """Release the HTTP session (the shared Stellio client stays open)."""
         if self.session:
             self.session.close()
-            logger.info("HTTP session closed")
+            logger.info("HTTP session released")
 
 
 class PublishReportGenerator:
@@ -981,6 +1630,7 @@ class EntityPublisherAgent:
         self.config = None
         self.publisher = None
         self.report_generator = None
+        self.cache = None
 
         # Load configuration
         self._load_configuration()
@@ -996,6 +1646,15 @@ class EntityPublisherAgent:
         self.publisher = BatchPublisher(self.config)
         self.report_generator = PublishReportGenerator(self.config)
 
+        cache_config = self.config.get("publish_cache", {})
+        if cache_config.get("enabled", False):
+            self.cache = PublishCache(
+                cache_config.get("path", "data/cache/publish_cache.json"),
+                max_age_seconds=cache_config.get("max_age_seconds"),
+                max_entries=cache_config.get("max_entries"),
+            )
+            self.existence_probes = cache_config.get("existence_probes", 0)
+
         logger.info("Entity Publisher Agent initialized successfully")
 
     def publish(
@@ -1027,31 +1686,61 @@ class EntityPublisherAgent:
         # Start tracking
         self.report_generator.start_tracking()
 
-        # Publish entities in batches
+        # Skip unchanged entities and send attribute updates for changed ones
         all_results = []
-        batch_size = self.config["batch_size"]
+        to_upsert = entities
+        skipped = updated = 0
+        if self.cache:
+            to_upsert, cached_results, skipped = self._publish_from_cache(entities)
+            updated = len(cached_results) - skipped
+            all_results.extend(cached_results)
+            self.report_generator.record_results(cached_results)
 
-        for i in range(0, len(entities), batch_size):
-            batch = entities[i : i + batch_size]
-            batch_num = (i // batch_size) + 1
-            total_batches = (len(entities) + batch_size - 1) // batch_size
+        # Publish entities in batches
+        batch_size = self.config["batch_size"]
+        batches = [
+            to_upsert[i : i + batch_size] for i in range(0, len(to_upsert), batch_size)
+        ]
 
-            logger.info(
-                f"Publishing batch {batch_num}/{total_batches} ({len(batch)} entities)"
-            )
+        if self.config.get("performance", {}).get("parallel_batches", False):
+            batch_results = self._publish_batches_concurrently(batches)
+        else:
+            batch_results = self._publish_batches_sequentially(batches)
 
-            # Publish batch
-            results = self.publisher.publish_batch(batch)
+        for results in batch_results:
             all_results.extend(results)
 
             # Record results
             self.report_generator.record_results(results)
 
+        if self.cache:
+            upserted_ids = {
+                r.entity_id for results in batch_results for r in results if r.success
+            }
+            for entity in to_upsert:
+                if entity.get("id") in upserted_ids:
+                    self.cache.record(entity)
+            self.cache.save()
+
+        # Link published observations to their cameras, one write per camera
+        camera_updates = self.publisher.flush_observation_links()
+
         # End tracking
         self.report_generator.end_tracking()
 
         # Generate report
         report = self.report_generator.generate_report()
+        if camera_updates:
+            report["camera_updates"] = {
+                "cameras": len(camera_updates),
+                "failed": sum(1 for ok in camera_updates.values() if not ok),
+            }
+        if self.cache:
+            report["publish_cache"] = {
+                "unchanged_skipped": skipped,
+                "attribute_updates": updated,
+                "upserted": len(to_upsert),
+            }
 
         # Save report
         if output_report:
@@ -1075,6 +1764,205 @@ class EntityPublisherAgent:
 
         return report
 
+    def _publish_from_cache(
+        self, entities: List[Dict[str, Any]]
+    ) -> Tuple[List[Dict[str, Any]], List[PublishResult], int]:
+        """
+        Resolve entities against the publish cache.
+
+        Unchanged entities are skipped (reported as 304). Changed entities are
+        sent as batch updates of their changed attributes; those Stellio no
+        longer has, or fails to update, are dropped from the cache and joined
+        to the entities that need a full upsert. Before anything is skipped, a
+        few unchanged entities are looked up in Stellio. If one is missing,
+        Stellio was reset or replaced: the whole cache is dropped and every
+        entity is fully upserted. If a lookup fails otherwise (auth, 5xx,
+        network), every entity is fully upserted for this run but the cache
+        is kept.
+
+        Args:
+            entities: Entities to publish
+
+        Returns:
+            Tuple of (entities to upsert, results of skipped and updated
+            entities, number skipped)
+        """
+        to_upsert = []
+        changes = []
+        results = []
+
+        diffs = [(entity, self.cache.diff(entity)) for entity in entities]
+        unchanged = [entity for entity, changed in diffs if changed == []]
+        holds = self._broker_holds(unchanged) if unchanged else True
+        if holds is False:
+            logger.warning(
+                "Stellio no longer holds cached entities, dropping the publish cache"
+            )
+            self.cache.clear()
+            diffs = [(entity, None) for entity in entities]
+        elif holds is None:
+            logger.warning(
+                "Could not confirm cached entities in Stellio, fully upserting "
+                "all entities for this run"
+            )
+            diffs = [(entity, None) for entity in entities]
+
+        for entity, changed in diffs:
+            if changed is None:
+                to_upsert.append(entity)
+            elif not changed:
+                results.append(
+                    PublishResult(
+                        entity_id=entity.get("id", "unknown"),
+                        status_code=304,
+                        success=True,
+                        attempts=0,
+                    )
+                )
+            else:
+                changes.append((entity, changed))
+
+        skipped = len(results)
+        full_entities = {entity["id"]: entity for entity, _ in changes}
+        partial_entities = []
+        for entity, changed in changes:
+            partial = {"id": entity["id"], "type": entity.get("type")}
+            if "@context" in entity:
+                partial["@context"] = entity["@context"]
+            partial.update({name: entity[name] for name in changed})
+            partial_entities.append(partial)
+        logger.info(
+            f"Publish cache: {skipped} unchanged, {len(partial_entities)} changed, "
+            f"{len(to_upsert)} new or expired"
+        )
+
+        batch_size = self.config["batch_size"]
+        for i in range(0, len(partial_entities), batch_size):
+            updated, fallback = self.publisher.update_batch(
+                partial_entities[i : i + batch_size]
+            )
+            results.extend(updated)
+            for result in updated:
+                self.cache.record(full_entities[result.entity_id])
+                self.publisher.record_observation_link(full_entities[result.entity_id])
+            for partial in fallback:
+                self.cache.invalidate(partial["id"])
+                to_upsert.append(full_entities[partial["id"]])
+
+        return to_upsert, results, skipped
+
+    def _broker_holds(self, entities: List[Dict[str, Any]]) -> Optional[bool]:
+        """
+        Probe Stellio for a few cached entities.
+
+        Up to publish_cache.existence_probes entities, spread evenly over the
+        list, are looked up one by one.
+
+        Args:
+            entities: Entities the cache considers published and unchanged
+
+        Returns:
+            True if every probed entity exists (or probing is disabled), False
+            if Stellio answered 404 for one, None if a probe failed otherwise
+        """
+        probes = min(self.existence_probes, len(entities))
+        holds: Optional[bool] = True
+        for i in range(probes):
+            entity_id = entities[i * len(entities) // probes].get("id", "unknown")
+            exists = self.publisher.entity_exists(entity_id)
+            if exists is False:
+                return False
+            if exists is None:
+                holds = None
+        return holds
+
+    def _publish_batches_sequentially(
+        self, batches: List[List[Dict[str, Any]]]
+    ) -> List[List[PublishResult]]:
+        """
+        Publish batches one after another.
+
+        Args:
+            batches: Entity batches
+
+        Returns:
+            Results of each batch, in batch order
+        """
+        batch_results = []
+
+        for batch_num, batch in enumerate(batches, start=1):
+            logger.info(
+                f"Publishing batch {batch_num}/{len(batches)} ({len(batch)} entities)"
+            )
+            batch_results.append(self.publisher.publish_batch(batch))
+
+        return batch_results
+
+    def _publish_batches_concurrently(
+        self, batches: List[List[Dict[str, Any]]]
+    ) -> List[List[PublishResult]]:
+        """
+        Publish batches with a bounded, adaptive number in flight.
+
+        Up to performance.max_concurrent_batches upserts run at once. The
+        window shrinks on 429/503 responses and on batches slower than
+        performance.latency_target_seconds, and grows back as batches succeed
+        without being throttled.
+
+        Args:
+            batches: Entity batches
+
+        Returns:
+            Results of each batch, in batch order
+        """
+        performance = self.config.get("performance", {})
+        max_concurrent = performance.get("max_concurrent_batches", 5)
+        limiter = AdaptiveConcurrencyLimiter(
+            max_limit=max_concurrent,
+            min_limit=performance.get("min_concurrent_batches", 1),
+            latency_target=(
+                performance.get("latency_target_seconds")
+                if performance.get("adaptive_concurrency", True)
+                else None
+            ),
+        )
+        self.publisher.limiter = limiter
+
+        def publish(batch_num: int, batch: List[Dict[str, Any]]):
+            try:
+                logger.info(
+                    f"Publishing batch {batch_num}/{len(batches)} "
+                    f"({len(batch)} entities, {limiter.in_flight} in flight)"
+                )
+                start_time = time.time()
+                throttled = limiter.throttled
+                results = self.publisher.publish_batch(batch)
+                # Throttled or failed batches must not grow the window back
+                if (
+                    results
+                    and all(result.success for result in results)
+                    and limiter.throttled == throttled
+                ):
+                    limiter.on_success(time.time() - start_time)
+                return results
+            finally:
+                limiter.release()
+
+        futures = []
+        try:
+            with ThreadPoolExecutor(max_workers=limiter.max_limit) as executor:
+                for batch_num, batch in enumerate(batches, start=1):
+                    limiter.acquire()
+                    futures.append(executor.submit(publish, batch_num, batch))
+        finally:
+            self.publisher.limiter = None
+
+        logger.info(
+            f"Concurrent publishing finished (final window {limiter.limit}, "
+            f"{limiter.throttled} throttled responses)"
+        )
+        return [future.result() for future in futures]
+
     def _load_entities(self, input_file: str) -> List[Dict[str, Any]]:
         """
         Load NGSI-LD entities from JSON file.
@@ -41,6 +41,8 @@ from urllib.parse import urljoin
 import requests
 import yaml
 
+from shared.stellio_client import get_stellio_client
+
 # Optional dependencies
 try:
     from kafka import KafkaConsumer
@@ -604,11 +606,9 @@ class EntityUpdater:
         )
         self.jitter = retry_config.get("jitter", True)
 
-        # Create HTTP session with connection pooling
-        self.session = requests.Session()
-
-        headers = self.stellio_config.get("headers", {})
-        self.session.headers.update(headers)
+        # Shared pooled HTTP client (retries are handled by patch_entity)
+        self.session = get_stellio_client(self.base_url)
+        self.headers = self.stellio_config.get("headers", {})
 
         logger.info(f"Entity updater initialized for Stellio: {self.base_url}")
 
@@ -721,7 +721,13 @@ class EntityUpdater:
 
         try:
             # Execute PATCH request
-            response = self.session.patch(url, json=payload, timeout=self.timeout)
+            response = self.session.patch(
+                url,
+                json=payload,
+                headers=self.headers,
+                timeout=self.timeout,
+                retry=False,
+            )
 
             latency_ms = (time.time() - start_time) * 1000
 
@@ -792,7 +798,7 @@ class EntityUpdater:
             )
 
     def close(self) -> None:
-        """Close HTTP session."""
+        """Release HTTP session (the shared Stellio client stays open)."""
         self.session.close()
         logger.info("Entity updater closed")
 
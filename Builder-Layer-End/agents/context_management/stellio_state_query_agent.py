@@ -9,6 +9,10 @@ This agent queries Stellio Context Broker to retrieve updated entities
 
 Used in Phase 8 (State Update Sync) to sync entity state updates to RDF/Fuseki.
 
+Results are paginated: the first page is requested with count=true, and once
+the total is known the remaining pages are fetched concurrently. Brokers that
+do not return a count are followed through their Link rel="next" headers.
+
 Author: LOD Pipeline Team
 Date: 2025-11-05
 """
@@ -18,11 +22,14 @@ import sys
 import json
 import logging
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Any
 from datetime import datetime
+from urllib.parse import urljoin
 import yaml
 
+from shared.stellio_client import get_stellio_client
 
 # Configure logging
 logging.basicConfig(
@@ -30,6 +37,11 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+NGSI_LD_HEADERS = {
+    "Accept": "application/ld+json",
+    "Link": '<https://uri.etsi.org/ngsi-ld/v1/ngsi-ld-core-context.jsonld>; rel="http://www.w3.org/ns/json-ld#context"; type="application/ld+json"',
+}
+
 
 class StellioStateQueryAgent:
     """
@@ -54,8 +66,15 @@ class StellioStateQueryAgent:
         )
         self.timeout = stellio_config.get("timeout", 30)
 
-        # Session for HTTP requests
-        self.session = requests.Session()
+        # Pagination settings
+        query_config = stellio_config.get("query", {})
+        self.page_size = query_config.get("page_size", 100)
+        self.max_concurrent_pages = max(1, query_config.get("max_concurrent_pages", 4))
+
+        # Shared HTTP client (one pooled connection per concurrent page)
+        self.session = get_stellio_client(
+            self.base_url, pool_size=self.max_concurrent_pages
+        )
 
         logger.info(f"Initialized Stellio State Query Agent")
         logger.info(f"Stellio URL: {self.base_url}")
@@ -85,15 +104,19 @@ class StellioStateQueryAgent:
         query_filter: Optional[str] = None,
         limit: int = 100,  # Stellio default max limit
         offset: int = 0,
+        attrs: Optional[List[str]] = None,
     ) -> List[Dict[str, Any]]:
         """
-        Query Stellio for entities with optional filters
+        Query Stellio for a single page of entities with optional filters
+
+        Use iter_entities() or query_all_entities() to retrieve every match.
 
         Args:
             entity_type: Entity type (e.g., "Camera", "ItemFlowObserved")
             query_filter: NGSI-LD query string (e.g., "congested==true")
             limit: Maximum number of entities to retrieve (max 100 per Stellio)
             offset: Pagination offset
+            attrs: Attributes to return (all attributes if None)
 
         Returns:
             List of NGSI-LD entities
@@ -106,41 +129,13 @@ class StellioStateQueryAgent:
             )
         """
         try:
-            # Build query URL
-            url = f"{self.base_url}{self.query_endpoint}"
-
-            # Build query parameters
-            params = {"limit": limit, "offset": offset}
-
-            if entity_type:
-                params["type"] = entity_type
-
-            if query_filter:
-                params["q"] = query_filter
-
-            # Add @context for NGSI-LD
-            headers = {
-                "Accept": "application/ld+json",
-                "Link": '<https://uri.etsi.org/ngsi-ld/v1/ngsi-ld-core-context.jsonld>; rel="http://www.w3.org/ns/json-ld#context"; type="application/ld+json"',
-            }
-
-            logger.info(f"Querying Stellio: {url}")
-            logger.info(f"Parameters: {params}")
+            params = self._build_params(entity_type, query_filter, attrs)
+            params.update({"limit": limit, "offset": offset})
 
-            # Execute query
-            response = self.session.get(
-                url, params=params, headers=headers, timeout=self.timeout
+            entities, _ = self._get_page(
+                f"{self.base_url}{self.query_endpoint}", params
             )
 
-            response.raise_for_status()
-
-            # Parse response
-            entities = response.json()
-
-            if isinstance(entities, dict):
-                # If response is a single entity, wrap in list
-                entities = [entities]
-
             logger.info(f"Retrieved {len(entities)} entities from Stellio")
 
             return entities
@@ -155,6 +150,176 @@ class StellioStateQueryAgent:
             logger.error(f"Failed to query Stellio: {e}")
             return []
 
+    def iter_entities(
+        self,
+        entity_type: Optional[str] = None,
+        query_filter: Optional[str] = None,
+        attrs: Optional[List[str]] = None,
+        page_size: Optional[int] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over every entity matching the query, page by page
+
+        The first page is requested with count=true. If the broker reports
+        the total, the remaining offsets are fetched concurrently (up to
+        max_concurrent_pages in flight) and yielded in order. Otherwise the
+        Link rel="next" header is followed, falling back to increasing
+        offsets until a short page is returned.
+
+        Args:
+            entity_type: Entity type (e.g., "Camera", "ItemFlowObserved")
+            query_filter: NGSI-LD query string (e.g., "congested==true")
+            attrs: Attributes to return (all attributes if None)
+            page_size: Entities per request (defaults to stellio.query.page_size)
+
+        Yields:
+            NGSI-LD entities
+
+        Raises:
+            requests.exceptions.RequestException: If a page request fails
+        """
+        page_size = page_size or self.page_size
+        url = f"{self.base_url}{self.query_endpoint}"
+        params = self._build_params(entity_type, query_filter, attrs)
+        params.update({"limit": page_size, "offset": 0, "count": "true"})
+
+        logger.info(f"Querying Stellio: {url}")
+        logger.info(f"Parameters: {params}")
+
+        entities, response = self._get_page(url, params)
+        yield from entities
+
+        total = response.headers.get("NGSILD-Results-Count")
+        if total is not None and total.isdigit():
+            total = int(total)
+            logger.info(f"Stellio reports {total} matching entities")
+            del params["count"]
+            yield from self._iter_pages_concurrently(url, params, page_size, total)
+            return
+
+        # No count: follow Link rel="next", or keep paging by offset
+        del params["count"]
+        offset = 0
+        while len(entities) == page_size:
+            next_link = response.links.get("next", {}).get("url")
+            if next_link:
+                entities, response = self._get_page(urljoin(url, next_link), None)
+            else:
+                offset += page_size
+                entities, response = self._get_page(url, {**params, "offset": offset})
+            yield from entities
+
+    def query_all_entities(
+        self,
+        entity_type: Optional[str] = None,
+        query_filter: Optional[str] = None,
+        attrs: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Query Stellio for every entity matching the filters
+
+        Args:
+            entity_type: Entity type (e.g., "Camera", "ItemFlowObserved")
+            query_filter: NGSI-LD query string (e.g., "congested==true")
+            attrs: Attributes to return (all attributes if None)
+
+        Returns:
+            List of NGSI-LD entities (empty on HTTP errors)
+        """
+        try:
+            entities = list(self.iter_entities(entity_type, query_filter, attrs))
+            logger.info(f"Retrieved {len(entities)} entities from Stellio")
+            return entities
+        except requests.exceptions.RequestException as e:
+            logger.error(f"HTTP error querying Stellio: {e}")
+            return []
+
+    def _iter_pages_concurrently(
+        self, url: str, params: Dict[str, Any], page_size: int, total: int
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Fetch the pages after the first one concurrently, yielding in order
+
+        At most max_concurrent_pages requests are in flight; the next page
+        is submitted as soon as the oldest one has been consumed.
+
+        Args:
+            url: Query URL
+            params: Query parameters without offset
+            page_size: Entities per request
+            total: Total number of matching entities
+
+        Yields:
+            NGSI-LD entities
+        """
+        offsets = iter(range(page_size, total, page_size))
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrent_pages) as executor:
+            in_flight = []
+            for offset in offsets:
+                in_flight.append(
+                    executor.submit(self._get_page, url, {**params, "offset": offset})
+                )
+                if len(in_flight) == self.max_concurrent_pages:
+                    break
+
+            while in_flight:
+                entities, _ = in_flight.pop(0).result()
+                offset = next(offsets, None)
+                if offset is not None:
+                    in_flight.append(
+                        executor.submit(
+                            self._get_page, url, {**params, "offset": offset}
+                        )
+                    )
+                yield from entities
+
+    def _build_params(
+        self,
+        entity_type: Optional[str],
+        query_filter: Optional[str],
+        attrs: Optional[List[str]],
+    ) -> Dict[str, Any]:
+        """Build NGSI-LD query parameters shared by every page"""
+        params = {}
+
+        if entity_type:
+            params["type"] = entity_type
+
+        if query_filter:
+            params["q"] = query_filter
+
+        if attrs:
+            params["attrs"] = ",".join(attrs)
+
+        return params
+
+    def _get_page(
+        self, url: str, params: Optional[Dict[str, Any]]
+    ) -> Tuple[List[Dict[str, Any]], requests.Response]:
+        """
+        Request a single page of entities
+
+        Args:
+            url: Query URL (a rel="next" link already carries its parameters)
+            params: Query parameters
+
+        Returns:
+            Tuple of (entities, response)
+        """
+        response = self.session.get(
+            url, params=params, headers=NGSI_LD_HEADERS, timeout=self.timeout
+        )
+        response.raise_for_status()
+
+        entities = response.json()
+
+        if isinstance(entities, dict):
+            # If response is a single entity, wrap in list
+            entities = [entities]
+
+        return entities, response
+
     def query_updated_cameras(self) -> List[Dict[str, Any]]:
         """
         Query Stellio for Camera entities with congested=true
@@ -162,33 +327,56 @@ class StellioStateQueryAgent:
         Returns:
             List of Camera entities with congestion state
         """
-        return self.query_entities(entity_type="Camera", query_filter="congested==true")
+        return self.query_all_entities(
+            entity_type="Camera", query_filter="congested==true"
+        )
 
-    def save_entities(self, entities: List[Dict[str, Any]], output_file: str) -> str:
+    def save_entities(
+        self, entities: Iterable[Dict[str, Any]], output_file: str
+    ) -> int:
         """
-        Save entities to JSON file
+        Stream entities to a JSON file
+
+        Entities are written as they are produced, so an iter_entities()
+        generator is saved without holding every page in memory. Output is
+        identical to json.dump(entities, f, indent=2) and is written to a
+        temporary file first, so a failed query leaves the previous file
+        in place.
 
         Args:
-            entities: List of NGSI-LD entities
+            entities: NGSI-LD entities (list or iterator)
             output_file: Output file path
 
         Returns:
-            Path to saved file
+            Number of entities saved
         """
+        output_path = Path(output_file)
+        temp_path = output_path.with_name(output_path.name + ".tmp")
+        count = 0
+
         try:
             # Ensure output directory exists
-            output_path = Path(output_file)
             output_path.parent.mkdir(parents=True, exist_ok=True)
 
             # Save entities
-            with open(output_path, "w", encoding="utf-8") as f:
-                json.dump(entities, f, indent=2, ensure_ascii=False)
+            with open(temp_path, "w", encoding="utf-8") as f:
+                f.write("[")
+                for entity in entities:
+                    item = json.dumps(entity, indent=2, ensure_ascii=False)
+                    f.write(("," if count else "") + "\n  ")
+                    f.write(item.replace("\n", "\n  "))
+                    count += 1
+                f.write("\n]" if count else "]")
+
+            os.replace(temp_path, output_path)
 
-            logger.info(f"Saved {len(entities)} entities to: {output_file}")
-            return output_file
+            logger.info(f"Saved {count} entities to: {output_file}")
+            return count
 
         except Exception as e:
             logger.error(f"Failed to save entities to {output_file}: {e}")
+            if temp_path.exists():
+                temp_path.unlink()
             raise
 
 
@@ -210,32 +398,30 @@ def main(config: Dict = None):
             entity_type = config.get("entity_type", "Camera")
             query_filter = config.get("query_filter")
             output_file = config.get("output_file", "data/updated_cameras.json")
-            limit = config.get("limit", 100)  # Stellio max limit
+            attrs = config.get("attrs")
+            page_size = config.get("page_size")
 
             agent = StellioStateQueryAgent(config_path)
 
-            # Query entities
-            entities = agent.query_entities(
-                entity_type=entity_type, query_filter=query_filter, limit=limit
+            # Stream every page straight to the output file (an empty
+            # result still creates the file for downstream agents)
+            entities_found = agent.save_entities(
+                agent.iter_entities(
+                    entity_type=entity_type,
+                    query_filter=query_filter,
+                    attrs=attrs,
+                    page_size=page_size,
+                ),
+                output_file,
             )
 
-            if not entities:
+            if not entities_found:
                 logger.warning("No entities found matching query")
-                # Still create empty output file for downstream agents
-                output_path = agent.save_entities([], output_file)
-                return {
-                    "status": "success",
-                    "entities_found": 0,
-                    "output_file": output_path,
-                }
-
-            # Save entities
-            output_path = agent.save_entities(entities, output_file)
 
             return {
                 "status": "success",
-                "entities_found": len(entities),
-                "output_file": output_path,
+                "entities_found": entities_found,
+                "output_file": output_file,
             }
 
         # Command line execution
@@ -256,7 +442,7 @@ def main(config: Dict = None):
             "--output", default="data/updated_cameras.json", help="Output file path"
         )
         parser.add_argument(
-            "--limit", type=int, default=1000, help="Maximum entities to retrieve"
+            "--attrs", help="Comma-separated attributes to retrieve (default: all)"
         )
         parser.add_argument(
             "--config",
@@ -269,22 +455,18 @@ def main(config: Dict = None):
         # Initialize agent
         agent = StellioStateQueryAgent(args.config)
 
-        # Query entities
-        entities = agent.query_entities(
-            entity_type=args.type, query_filter=args.filter, limit=args.limit
+        # Query and save entities
+        entities_found = agent.save_entities(
+            agent.iter_entities(
+                entity_type=args.type,
+                query_filter=args.filter,
+                attrs=args.attrs.split(",") if args.attrs else None,
+            ),
+            args.output,
         )
 
-        if not entities:
+        if not entities_found:
             logger.warning("No entities found matching query")
-            print("\n" + "=" * 80)
-            print("QUERY SUMMARY")
-            print("=" * 80)
-            print("Entities found: 0")
-            print("=" * 80)
-            return
-
-        # Save entities
-        output_path = agent.save_entities(entities, args.output)
 
         # Print summary
         print("\n" + "=" * 80)
@@ -292,8 +474,8 @@ def main(config: Dict = None):
         print("=" * 80)
         print(f"Entity type:     {args.type}")
         print(f"Query filter:    {args.filter or 'None'}")
-        print(f"Entities found:  {len(entities)}")
-        print(f"Output file:     {output_path}")
+        print(f"Entities found:  {entities_found}")
+        print(f"Output file:     {args.output}")
         print("=" * 80)
 
     except Exception as e:
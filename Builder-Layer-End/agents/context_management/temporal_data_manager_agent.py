@@ -26,14 +26,16 @@ import os
 import statistics
 import time
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 from urllib.parse import urljoin
 
-import requests
 import yaml
 
+from shared.stellio_client import get_stellio_client
+
 # Optional dependencies
 try:
     from neo4j import GraphDatabase
@@ -125,7 +127,8 @@ class TemporalDataStore:
 
     Features:
     - Batch POST operations
-    - Retry logic
+    - Bulk writer: concurrent per-entity requests or temporal batch endpoint
+    - Retry logic (only failed entities are resubmitted)
     - Connection pooling
     """
 
@@ -147,11 +150,17 @@ class TemporalDataStore:
         batch_config = self.stellio_config.get("batch", {})
         self.batch_enabled = batch_config.get("enabled", True)
         self.max_batch_size = batch_config.get("max_batch_size", 100)
+        self.max_instances_per_request = batch_config.get(
+            "max_instances_per_request", 1000
+        )
+        self.concurrency = max(1, batch_config.get("concurrency", 8))
+        self.retry_backoff = batch_config.get("retry_backoff", 1.0)
+        self.batch_endpoint = batch_config.get("temporal_batch_endpoint")
+        self.batch_endpoint_supported = bool(self.batch_endpoint)
 
-        # Create HTTP session
-        self.session = requests.Session()
-        headers = self.stellio_config.get("headers", {})
-        self.session.headers.update(headers)
+        # Shared HTTP client (one pooled connection per concurrent request)
+        self.session = get_stellio_client(self.base_url, pool_size=self.concurrency)
+        self.headers = self.stellio_config.get("headers", {})
 
         logger.info(f"Temporal data store initialized: {self.base_url}")
 
@@ -195,7 +204,9 @@ class TemporalDataStore:
         url = self.build_temporal_url(entity_id)
 
         try:
-            response = self.session.post(url, json=instances, timeout=self.timeout)
+            response = self.session.post(
+                url, json=instances, headers=self.headers, timeout=self.timeout
+            )
 
             if 200 <= response.status_code < 300:
                 logger.debug(
@@ -212,8 +223,186 @@ class TemporalDataStore:
             logger.error(f"Error storing temporal instances: {e}")
             return False
 
+    def post_temporal_bulk(
+        self, entity_instances: Dict[str, Dict[str, List[Dict[str, Any]]]]
+    ) -> Dict[str, bool]:
+        """
+        Store temporal instances of many entities.
+
+        Each entity's instances are split into requests of at most
+        ``max_instances_per_request`` instances. When a temporal batch
+        endpoint is configured, up to ``max_batch_size`` entities are sent
+        per request; otherwise the per-entity requests run concurrently on
+        the pooled session. Failed requests are retried up to
+        ``max_retries`` times with exponential backoff, resubmitting only
+        the entities that failed.
+
+        Args:
+            entity_instances: Entity ID → attribute name → temporal instances
+
+        Returns:
+            Dictionary of entity ID → True if all its instances were stored
+        """
+        pending = [
+            (entity_id, chunk)
+            for entity_id, instances in entity_instances.items()
+            for chunk in self._split_instances(instances)
+        ]
+
+        for attempt in range(self.max_retries + 1):
+            if not pending:
+                break
+            if attempt:
+                delay = self.retry_backoff * (2 ** (attempt - 1))
+                logger.warning(
+                    f"Retrying {len(pending)} failed temporal requests "
+                    f"in {delay:.1f}s (attempt {attempt + 1})"
+                )
+                time.sleep(delay)
+
+            pending = self._post_requests(pending)
+
+        failed_entities = {entity_id for entity_id, _ in pending}
+        if failed_entities:
+            logger.error(
+                f"Failed to store temporal instances for {len(failed_entities)} entities"
+            )
+
+        return {
+            entity_id: entity_id not in failed_entities
+            for entity_id in entity_instances
+        }
+
+    def _split_instances(
+        self, instances: Dict[str, List[Dict[str, Any]]]
+    ) -> List[Dict[str, List[Dict[str, Any]]]]:
+        """
+        Split an entity's instances into request-sized chunks.
+
+        Args:
+            instances: Attribute name → temporal instances
+
+        Returns:
+            List of attribute → instances dictionaries
+        """
+        chunks = []
+        current: Dict[str, List[Dict[str, Any]]] = {}
+        size = 0
+
+        for attr_name, attr_instances in instances.items():
+            for start in range(0, len(attr_instances), self.max_instances_per_request):
+                part = attr_instances[start : start + self.max_instances_per_request]
+                if size and size + len(part) > self.max_instances_per_request:
+                    chunks.append(current)
+                    current, size = {}, 0
+                current.setdefault(attr_name, []).extend(part)
+                size += len(part)
+
+        if current or not chunks:
+            chunks.append(current)
+
+        return chunks
+
+    def _post_requests(
+        self, requests_to_send: List[Tuple[str, Dict[str, List[Dict[str, Any]]]]]
+    ) -> List[Tuple[str, Dict[str, List[Dict[str, Any]]]]]:
+        """
+        Send one round of temporal requests.
+
+        Args:
+            requests_to_send: (entity ID, instances) pairs
+
+        Returns:
+            The pairs that failed
+        """
+        if self.batch_endpoint_supported:
+            failed = []
+            for start in range(0, len(requests_to_send), self.max_batch_size):
+                group = requests_to_send[start : start + self.max_batch_size]
+                result = self._post_batch(group)
+                if result is None:
+                    # Endpoint not supported: send the rest per entity
+                    return failed + self._post_concurrently(requests_to_send[start:])
+                failed.extend(result)
+            return failed
+
+        return self._post_concurrently(requests_to_send)
+
+    def _post_concurrently(
+        self, requests_to_send: List[Tuple[str, Dict[str, List[Dict[str, Any]]]]]
+    ) -> List[Tuple[str, Dict[str, List[Dict[str, Any]]]]]:
+        """
+        POST per-entity temporal requests concurrently.
+
+        Args:
+            requests_to_send: (entity ID, instances) pairs
+
+        Returns:
+            The pairs that failed
+        """
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            outcomes = list(
+                executor.map(
+                    lambda item: self.post_temporal_instances(*item), requests_to_send
+                )
+            )
+
+        return [item for item, ok in zip(requests_to_send, outcomes) if not ok]
+
+    def _post_batch(
+        self, group: List[Tuple[str, Dict[str, List[Dict[str, Any]]]]]
+    ) -> Optional[List[Tuple[str, Dict[str, List[Dict[str, Any]]]]]]:
+        """
+        POST several entities' instances to the temporal batch endpoint.
+
+        Args:
+            group: (entity ID, instances) pairs
+
+        Returns:
+            The pairs that failed, or None if the broker does not support
+            the endpoint
+        """
+        url = urljoin(self.base_url, self.batch_endpoint)
+        payload = [{"id": entity_id, **instances} for entity_id, instances in group]
+
+        try:
+            response = self.session.post(
+                url, json=payload, headers=self.headers, timeout=self.timeout
+            )
+        except Exception as e:
+            logger.error(f"Error storing temporal batch: {e}")
+            return list(group)
+
+        if response.status_code in (404, 405, 501):
+            logger.warning(
+                f"Temporal batch endpoint not supported ({response.status_code}), "
+                "using per-entity requests"
+            )
+            self.batch_endpoint_supported = False
+            return None
+
+        if 200 <= response.status_code < 300 and response.status_code != 207:
+            return []
+
+        # Partial failure: resubmit only the entities reported as failed
+        try:
+            errors = response.json().get("errors")
+        except (ValueError, AttributeError):
+            errors = None
+
+        if not isinstance(errors, list):
+            logger.error(
+                f"Failed to store temporal batch: {response.status_code} - {response.text}"
+            )
+            return list(group)
+
+        failed_ids = {
+            error.get("entityId") for error in errors if isinstance(error, dict)
+        }
+        return [item for item in group if item[0] in failed_ids]
+
     def close(self) -> None:
-        """Close HTTP session."""
+        """Release HTTP session (the shared Stellio client stays open)."""
         self.session.close()
 
 
@@ -665,7 +854,64 @@ class TemporalDataManagerAgent:
         if not observations:
             return True
 
-        # Group by attribute
+        # POST to Stellio
+        success = self.data_store.post_temporal_instances(
+            entity_id, self._build_instances(observations)
+        )
+
+        if success:
+            self.stats["observations_stored"] += len(observations)
+
+        return success
+
+    def store_temporal_observations_bulk(
+        self, observations_by_entity: Dict[str, List[Dict[str, Any]]]
+    ) -> Dict[str, bool]:
+        """
+        Store temporal observations for many entities at once.
+
+        Uses TemporalDataStore.post_temporal_bulk(), so entities are written
+        concurrently (or through the temporal batch endpoint) and only
+        failed entities are retried.
+
+        Args:
+            observations_by_entity: Entity ID → observations with timestamps
+
+        Returns:
+            Dictionary of entity ID → True if successful
+        """
+        entity_instances = {
+            entity_id: self._build_instances(observations)
+            for entity_id, observations in observations_by_entity.items()
+            if observations
+        }
+
+        results = self.data_store.post_temporal_bulk(entity_instances)
+
+        for entity_id, success in results.items():
+            if success:
+                self.stats["observations_stored"] += len(
+                    observations_by_entity[entity_id]
+                )
+
+        # Entities without observations have nothing to store
+        for entity_id in observations_by_entity:
+            results.setdefault(entity_id, True)
+
+        return results
+
+    def _build_instances(
+        self, observations: List[Dict[str, Any]]
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Group observations into temporal instances by attribute.
+
+        Args:
+            observations: List of observations with timestamps
+
+        Returns:
+            Dictionary of attribute name → list of temporal instances
+        """
         instances = defaultdict(list)
 
         for obs in observations:
@@ -679,13 +925,7 @@ class TemporalDataManagerAgent:
                     {"type": "Property", "value": value, "observedAt": observed_at}
                 )
 
-        # POST to Stellio
-        success = self.data_store.post_temporal_instances(entity_id, dict(instances))
-
-        if success:
-            self.stats["observations_stored"] += len(observations)
-
-        return success
+        return dict(instances)
 
     def run_cleanup(
         self, entity_id: str, observations: List[Dict[str, Any]]
@@ -8,7 +8,10 @@ and automatic data cleaning before entity publication.
 Architecture:
 - DataQualityConfig: Loads and manages validation configuration
 - SchemaValidator: Validates NGSI-LD schema compliance
+- ExpressionCompiler: Parses rule expressions once into safe code objects
+- URLReachabilityChecker: Batched, cached http_head() checks
 - BusinessRulesEngine: Evaluates custom business rules
+- VectorizedRuleEvaluator: Column-wise (NumPy) numeric rule evaluation
 - QualityScorer: Calculates weighted quality scores
 - DataCleaner: Normalizes and cleans entity data
 - DataQualityValidatorAgent: Main orchestrator
@@ -19,17 +22,29 @@ Date: 2025-11-02
 
 import os
 import re
+import ast
 import json
 import yaml
+import asyncio
 import logging
+import aiohttp
 import requests
 from datetime import datetime, timezone, timedelta
-from typing import Dict, List, Any, Tuple, Optional, Union
+from typing import Dict, List, Any, Tuple, Optional, Union, Iterator
 from pathlib import Path
-from urllib.parse import urlparse, urlunparse
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+from concurrent.futures import ProcessPoolExecutor
+import math
 import time
 
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -194,29 +209,29 @@ class SchemaValidator:
 
         # Check required fields
         required_fields = self.schema_config.get("required_fields", [])
-        for field in required_fields:
-            if field not in entity:
-                errors.append(f"Missing required field: {field}")
+        for field_name in required_fields:
+            if field_name not in entity:
+                errors.append(f"Missing required field: {field_name}")
 
         # Validate field types
         field_types = self.schema_config.get("field_types", {})
-        for field, expected_type in field_types.items():
-            if field in entity:
-                actual_type = type(entity[field]).__name__
+        for field_name, expected_type in field_types.items():
+            if field_name in entity:
+                actual_type = type(entity[field_name]).__name__
 
                 # Handle multiple allowed types
                 if isinstance(expected_type, list):
                     valid_types = [self._normalize_type_name(t) for t in expected_type]
                     if actual_type not in valid_types:
                         errors.append(
-                            f"Field '{field}' has invalid type '{actual_type}', "
+                            f"Field '{field_name}' has invalid type '{actual_type}', "
                             f"expected one of {valid_types}"
                         )
                 else:
                     expected_type_norm = self._normalize_type_name(expected_type)
                     if actual_type != expected_type_norm:
                         errors.append(
-                            f"Field '{field}' has invalid type '{actual_type}', "
+                            f"Field '{field_name}' has invalid type '{actual_type}', "
                             f"expected '{expected_type_norm}'"
                         )
 
@@ -275,12 +290,367 @@ class SchemaValidator:
         return errors
 
 
+@dataclass
+class CompiledExpression:
+    """
+    A business rule expression parsed once into a Python code object.
+
+    ``code`` is None when the expression could not be compiled; such an
+    expression always evaluates to False, exactly like an expression the
+    string-substitution engine fails to evaluate.
+    """
+
+    source: str
+    code: Optional[Any] = None
+    tree: Optional[ast.Expression] = None
+    patterns: List[Optional[re.Pattern]] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+@dataclass
+class CompiledRule:
+    """A business rule with its field path and expressions pre-parsed."""
+
+    name: str
+    field_path: str
+    field_parts: Optional[List[Tuple[str, Union[str, int]]]]
+    weight: float
+    severity: str
+    has_exists_check: bool
+    uses_http_head: bool
+    expressions: List[Tuple[CompiledExpression, str]]
+
+
+class ExpressionCompiler:
+    """
+    Compiles the business rule expression language into safe code objects.
+
+    The DSL (AND/OR/NOT/IN, MATCHES(), now(), len(), exists(), http_head())
+    is rewritten to a Python expression, parsed with ``ast`` and checked
+    against a whitelist of node types before being compiled. Field names
+    are bound as variables at evaluation time, so no text is re-parsed
+    per entity.
+    """
+
+    _MATCHES_PATTERN = re.compile(r'MATCHES\(([^,]+),\s*["\']([^"\']+)["\']\)')
+    _FUNCTION_PATTERN = re.compile(r"\b(len|exists|http_head)\(([^)]+)\)")
+    _STRING_LITERAL_PATTERN = re.compile(r"('[^']*'|\"[^\"]*\")")
+    _KEYWORD_PATTERN = re.compile(r"\b(AND|OR|NOT|IN)\b")
+
+    _ALLOWED_NODES = (
+        ast.Expression,
+        ast.BoolOp,
+        ast.And,
+        ast.Or,
+        ast.UnaryOp,
+        ast.Not,
+        ast.USub,
+        ast.UAdd,
+        ast.BinOp,
+        ast.Add,
+        ast.Sub,
+        ast.Mult,
+        ast.Div,
+        ast.Mod,
+        ast.Compare,
+        ast.Eq,
+        ast.NotEq,
+        ast.Lt,
+        ast.LtE,
+        ast.Gt,
+        ast.GtE,
+        ast.In,
+        ast.NotIn,
+        ast.Call,
+        ast.Name,
+        ast.Load,
+        ast.Constant,
+        ast.List,
+        ast.Tuple,
+        ast.Subscript,
+    )
+
+    FUNCTION_NAMES = frozenset(["_now", "_len", "_exists", "_http_head", "_matches"])
+
+    def __init__(self):
+        """Initialize compiler with an empty expression cache."""
+        self._cache: Dict[str, CompiledExpression] = {}
+
+    def compile(self, expression: str) -> CompiledExpression:
+        """
+        Compile an expression, reusing a cached result when available.
+
+        Args:
+            expression: Rule expression from data_quality_config.yaml
+
+        Returns:
+            Compiled expression
+        """
+        compiled = self._cache.get(expression)
+        if compiled is None:
+            compiled = self._compile(expression)
+            self._cache[expression] = compiled
+        return compiled
+
+    def _compile(self, expression: str) -> CompiledExpression:
+        """Rewrite, parse, validate and compile a single expression."""
+        compiled = CompiledExpression(source=expression)
+
+        def replace_matches(match):
+            try:
+                compiled.patterns.append(re.compile(match.group(2)))
+            except re.error:
+                compiled.patterns.append(None)
+            index = len(compiled.patterns) - 1
+            return f"_matches(_ctx, {match.group(1).strip()!r}, _patterns[{index}])"
+
+        source = self._MATCHES_PATTERN.sub(replace_matches, expression)
+        source = source.replace("now()", "_now()")
+        source = self._FUNCTION_PATTERN.sub(
+            lambda m: f"_{m.group(1)}(_ctx, {m.group(2).strip()!r})", source
+        )
+
+        # Map DSL keywords to Python operators outside of string literals
+        segments = self._STRING_LITERAL_PATTERN.split(source)
+        for i in range(0, len(segments), 2):
+            segments[i] = self._KEYWORD_PATTERN.sub(
+                lambda m: m.group(1).lower(), segments[i]
+            )
+        source = "".join(segments)
+
+        try:
+            tree = ast.parse(source.strip(), mode="eval")
+            self._check_tree(tree)
+            compiled.code = compile(tree, "<business_rule>", "eval")
+            compiled.tree = tree
+        except (SyntaxError, ValueError) as e:
+            compiled.error = str(e)
+            logger.error(f"Cannot compile expression '{expression}': {e}")
+
+        return compiled
+
+    def _check_tree(self, tree: ast.AST):
+        """Reject any syntax outside the expression language."""
+        for node in ast.walk(tree):
+            if not isinstance(node, self._ALLOWED_NODES):
+                raise ValueError(f"Unsupported syntax: {type(node).__name__}")
+            if isinstance(node, ast.Call) and not (
+                isinstance(node.func, ast.Name) and node.func.id in self.FUNCTION_NAMES
+            ):
+                raise ValueError("Only built-in rule functions may be called")
+            if isinstance(node, ast.Name) and node.id.startswith("__"):
+                raise ValueError(f"Invalid name: {node.id}")
+
+
+class URLReachabilityChecker:
+    """
+    Resolves http_head() status codes with a shared, normalised-URL cache.
+
+    URLs are keyed after normalisation (lowercase scheme/host, no trailing
+    slash or fragment, cache-busting query parameters removed), so the same
+    camera snapshot is checked once no matter how many entities reference it.
+    Reachable results are cached for ``cache_ttl`` seconds and failures for
+    ``http_negative_cache_ttl`` seconds. ``prefetch`` checks all uncached
+    URLs of a batch in one asyncio pass, limited per host.
+    """
+
+    def __init__(self, performance_config: Dict[str, Any]):
+        """
+        Initialize URL checker.
+
+        Args:
+            performance_config: Performance section of the configuration
+        """
+        self.timeout = performance_config.get("http_timeout", 5)
+        self.cache_ttl = performance_config.get("cache_ttl", 300)
+        self.negative_cache_ttl = performance_config.get("http_negative_cache_ttl", 60)
+        self.max_concurrent_per_host = performance_config.get(
+            "http_max_concurrent_per_host", 4
+        )
+        self.ignore_query_params = set(
+            performance_config.get("http_ignore_query_params", [])
+        )
+        self.cache: Dict[str, Tuple[float, int]] = {}
+
+    def normalize_url(self, url: str) -> str:
+        """Build the cache key for a URL."""
+        parsed = urlparse(url.strip())
+        query = urlencode(
+            sorted(
+                (key, value)
+                for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+                if key not in self.ignore_query_params
+            )
+        )
+        return urlunparse(
+            parsed._replace(
+                scheme=parsed.scheme.lower(),
+                netloc=parsed.netloc.lower(),
+                path=parsed.path.rstrip("/"),
+                query=query,
+                fragment="",
+            )
+        )
+
+    def get_cached(self, url: str) -> Optional[int]:
+        """
+        Get a cached status code.
+
+        Args:
+            url: URL to look up
+
+        Returns:
+            Cached HTTP status code or None if missing/expired
+        """
+        key = self.normalize_url(url)
+        entry = self.cache.get(key)
+        if entry is None:
+            return None
+
+        cache_time, status_code = entry
+        ttl = (
+            self.cache_ttl
+            if self._is_reachable(status_code)
+            else self.negative_cache_ttl
+        )
+        if time.time() - cache_time < ttl:
+            return status_code
+
+        self.cache.pop(key, None)
+        return None
+
+    def store(self, url: str, status_code: int):
+        """Cache a status code under the normalised URL."""
+        self.cache[self.normalize_url(url)] = (time.time(), status_code)
+
+    def check(self, url: str) -> int:
+        """
+        Blocking HTTP HEAD check for a single URL (cache miss outside a batch).
+
+        Args:
+            url: URL to check
+
+        Returns:
+            HTTP status code or 0 if check fails
+        """
+        try:
+            response = requests.head(url, timeout=self.timeout, allow_redirects=True)
+            status_code = response.status_code
+        except requests.RequestException:
+            status_code = 0
+
+        self.store(url, status_code)
+        return status_code
+
+    def prefetch(self, urls: List[str]) -> Dict[str, int]:
+        """
+        Check all uncached URLs concurrently and populate the cache.
+
+        Args:
+            urls: URLs referenced by http_head() rules in a batch
+
+        Returns:
+            Mapping of normalised URL to status code for URLs checked
+        """
+        pending = {}
+        for url in urls:
+            if not url or not isinstance(url, str):
+                continue
+            key = self.normalize_url(url)
+            if key not in pending and self.get_cached(url) is None:
+                pending[key] = url
+
+        if not pending:
+            return {}
+
+        try:
+            asyncio.get_running_loop()
+            logger.debug("Event loop already running, skipping URL prefetch")
+            return {}
+        except RuntimeError:
+            pass
+
+        results = asyncio.run(self._check_all(pending))
+        now = time.time()
+        for key, status_code in results.items():
+            self.cache[key] = (now, status_code)
+
+        logger.info(
+            f"Checked {len(results)} unique URLs "
+            f"({len(urls)} references, {len(urls) - len(results)} deduplicated/cached)"
+        )
+        return results
+
+    async def _check_all(self, urls: Dict[str, str]) -> Dict[str, int]:
+        """
+        Run HEAD checks for unique URLs with a per-host concurrency cap.
+
+        Args:
+            urls: Mapping of normalised URL to the original URL requested for it
+
+        Returns:
+            Mapping of normalised URL to status code
+        """
+        host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        for key in urls:
+            host = urlparse(key).netloc
+            if host not in host_semaphores:
+                host_semaphores[host] = asyncio.Semaphore(self.max_concurrent_per_host)
+
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+
+            async def check_one(key: str, url: str) -> Tuple[str, int]:
+                # The key drops parameters and slashes the server may need
+                async with host_semaphores[urlparse(key).netloc]:
+                    return key, await self._fetch_status(session, url)
+
+            results = await asyncio.gather(
+                *(check_one(key, url) for key, url in urls.items())
+            )
+
+        return dict(results)
+
+    async def _fetch_status(self, session: aiohttp.ClientSession, url: str) -> int:
+        """Issue one HEAD request, returning 0 on any failure."""
+        try:
+            async with session.head(url, allow_redirects=True) as response:
+                return response.status
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+            return 0
+
+    @staticmethod
+    def _is_reachable(status_code: int) -> bool:
+        """Whether a status code counts as a positive cache entry."""
+        return 0 < status_code < 400
+
+
 class BusinessRulesEngine:
     """
     Evaluates custom business rules on entity data.
     Supports expression evaluation with operators and functions.
+
+    Rules are compiled once per entity type (field paths parsed, expressions
+    turned into code objects by ExpressionCompiler). Setting
+    ``performance.compile_expressions: false`` falls back to the original
+    string-substitution evaluator.
     """
 
+    # Names an expression can use for the rule's field value, by value type
+    NUMERIC_ALIASES = ("speed", "temperature", "humidity", "intensity", "occupancy")
+    STRING_ALIASES = (
+        "id",
+        "url",
+        "observedAt",
+        "dateObserved",
+        "description",
+        "imageSnapshot",
+        "streamURL",
+        "status",
+        "patientId",
+    )
+    LIST_ALIASES = ("coordinates", "category")
+
     def __init__(self, config: DataQualityConfig):
         """
         Initialize business rules engine.
@@ -289,8 +659,21 @@ class BusinessRulesEngine:
             config: Data quality configuration
         """
         self.config = config
-        self.http_timeout = config.get_performance_config().get("http_timeout", 5)
-        self.http_cache = {}
+        performance_config = config.get_performance_config()
+        self.http_timeout = performance_config.get("http_timeout", 5)
+        self.compile_expressions = performance_config.get("compile_expressions", True)
+        self.url_checker = URLReachabilityChecker(performance_config)
+        self.http_cache = self.url_checker.cache
+        self.compiler = ExpressionCompiler()
+        self._compiled_rules: Dict[Optional[str], List[CompiledRule]] = {}
+        self._helpers = {
+            "__builtins__": {},
+            "_now": lambda: int(datetime.now(timezone.utc).timestamp()),
+            "_len": self._len_helper,
+            "_exists": self._exists_helper,
+            "_http_head": self._http_head_helper,
+            "_matches": self._matches_helper,
+        }
 
     def evaluate_rules(
         self, entity: Dict[str, Any], entity_type: Optional[str] = None
@@ -305,82 +688,130 @@ class BusinessRulesEngine:
         Returns:
             List of rule check results
         """
-        rules = self.config.get_business_rules(entity_type)
         results = []
 
-        for rule in rules:
+        for rule in self.get_compiled_rules(entity_type):
             result = self._evaluate_rule(entity, rule)
             results.append(result)
 
         return results
 
+    def get_compiled_rules(
+        self, entity_type: Optional[str] = None
+    ) -> List[CompiledRule]:
+        """
+        Get compiled business rules for an entity type (compiled on first use).
+
+        Args:
+            entity_type: Entity type for rule filtering
+
+        Returns:
+            List of compiled rules
+        """
+        rules = self._compiled_rules.get(entity_type)
+        if rules is None:
+            rules = [
+                self._compile_rule(rule)
+                for rule in self.config.get_business_rules(entity_type)
+            ]
+            self._compiled_rules[entity_type] = rules
+        return rules
+
+    def _compile_rule(self, rule: Dict[str, Any]) -> CompiledRule:
+        """Pre-parse a rule's field path and expressions."""
+        field_path = rule.get("field", "")
+        try:
+            field_parts = self._parse_field_path(field_path)
+        except ValueError:
+            logger.error(
+                f"Invalid field path '{field_path}' in rule '{rule.get('name')}'"
+            )
+            field_parts = None
+
+        expressions = [
+            (
+                self.compiler.compile(expr.get("expression", "")),
+                expr.get("error_message", "Validation failed"),
+            )
+            for expr in rule.get("rules", [])
+        ]
+
+        return CompiledRule(
+            name=rule.get("name", "unknown"),
+            field_path=field_path,
+            field_parts=field_parts,
+            weight=rule.get("weight", 1.0),
+            severity=rule.get("severity", "error"),
+            has_exists_check=any(
+                "exists(" in expression.source for expression, _ in expressions
+            ),
+            uses_http_head=any(
+                "http_head(" in expression.source for expression, _ in expressions
+            ),
+            expressions=expressions,
+        )
+
     def _evaluate_rule(
-        self, entity: Dict[str, Any], rule: Dict[str, Any]
+        self, entity: Dict[str, Any], rule: CompiledRule
     ) -> Dict[str, Any]:
         """
         Evaluate a single business rule.
 
         Args:
             entity: NGSI-LD entity
-            rule: Rule configuration
+            rule: Compiled rule
 
         Returns:
             Rule evaluation result
         """
-        rule_name = rule.get("name", "unknown")
-        field = rule.get("field", "")
-        weight = rule.get("weight", 1.0)
-        severity = rule.get("severity", "error")
-
         # Extract field value
-        field_value = self._extract_field_value(entity, field)
+        field_value = self._resolve_field_parts(entity, rule.field_parts)
 
-        # Check if field exists
-        if field_value is None:
-            # Field doesn't exist - check if rule requires it
-            has_exists_rule = any(
-                "exists(" in expr.get("expression", "")
-                for expr in rule.get("rules", [])
-            )
-
-            if has_exists_rule:
-                # Let the exists() check handle it
-                pass
-            else:
-                # Field is optional, skip this rule
-                return {
-                    "rule": rule_name,
-                    "passed": True,
-                    "weight": weight,
-                    "severity": severity,
-                    "skipped": True,
-                    "reason": f"Field '{field}' not present in entity",
-                }
+        # Field doesn't exist - skip unless an exists() check handles it
+        if field_value is None and not rule.has_exists_check:
+            return self._skipped_result(rule)
 
         # Evaluate all expressions in the rule
-        expressions = rule.get("rules", [])
+        context = self._create_evaluation_context(field_value, entity)
         all_passed = True
         errors = []
 
-        for expr_config in expressions:
-            expression = expr_config.get("expression", "")
-            error_message = expr_config.get("error_message", "Validation failed")
-
+        for expression, error_message in rule.expressions:
             try:
-                passed = self._evaluate_expression(expression, field_value, entity)
+                if self.compile_expressions:
+                    passed = self._evaluate_compiled(expression, context)
+                else:
+                    passed = self._interpret_expression(expression.source, context)
                 if not passed:
                     all_passed = False
                     errors.append(error_message)
             except Exception as e:
                 all_passed = False
                 errors.append(f"Expression evaluation error: {str(e)}")
-                logger.error(f"Error evaluating rule '{rule_name}': {e}")
+                logger.error(f"Error evaluating rule '{rule.name}': {e}")
 
+        return self._rule_result(rule, all_passed, errors)
+
+    def _skipped_result(self, rule: CompiledRule) -> Dict[str, Any]:
+        """Result for an optional rule whose field is absent."""
+        return {
+            "rule": rule.name,
+            "passed": True,
+            "weight": rule.weight,
+            "severity": rule.severity,
+            "skipped": True,
+            "reason": f"Field '{rule.field_path}' not present in entity",
+        }
+
+    def _rule_result(
+        self, rule: CompiledRule, all_passed: bool, errors: List[str]
+    ) -> Dict[str, Any]:
+        """Result for an evaluated rule."""
         return {
-            "rule": rule_name,
+            "rule": rule.name,
             "passed": all_passed,
-            "weight": weight,
-            "severity": severity,
+            "weight": rule.weight,
+            "severity": rule.severity,
             "errors": errors if not all_passed else [],
         }
 
@@ -396,52 +827,71 @@ class BusinessRulesEngine:
             Field value or None if not found
         """
         try:
-            # Handle array indexing
-            parts = []
-            current_part = ""
-
-            for char in field_path:
-                if char == "[":
-                    if current_part:
-                        parts.append(("key", current_part))
-                        current_part = ""
-                elif char == "]":
-                    if current_part:
-                        parts.append(("index", int(current_part)))
-                        current_part = ""
-                elif char == ".":
-                    if current_part:
-                        parts.append(("key", current_part))
-                        current_part = ""
-                else:
-                    current_part += char
+            parts = self._parse_field_path(field_path)
+        except ValueError:
+            return None
+        return self._resolve_field_parts(entity, parts)
 
-            if current_part:
-                parts.append(("key", current_part))
+    def _parse_field_path(self, field_path: str) -> List[Tuple[str, Union[str, int]]]:
+        """
+        Split a field path into ("key", name) and ("index", n) parts.
 
-            # Navigate through the entity
-            value = entity
-            for part_type, part_value in parts:
-                if part_type == "key":
-                    if isinstance(value, dict):
-                        value = value.get(part_value)
-                    else:
-                        return None
-                elif part_type == "index":
-                    if isinstance(value, list):
-                        if 0 <= part_value < len(value):
-                            value = value[part_value]
-                        else:
-                            return None
+        Raises:
+            ValueError: If an array index is not an integer
+        """
+        parts = []
+        current_part = ""
+
+        for char in field_path:
+            if char == "[":
+                if current_part:
+                    parts.append(("key", current_part))
+                    current_part = ""
+            elif char == "]":
+                if current_part:
+                    parts.append(("index", int(current_part)))
+                    current_part = ""
+            elif char == ".":
+                if current_part:
+                    parts.append(("key", current_part))
+                    current_part = ""
+            else:
+                current_part += char
+
+        if current_part:
+            parts.append(("key", current_part))
+
+        return parts
+
+    def _resolve_field_parts(
+        self,
+        entity: Dict[str, Any],
+        parts: Optional[List[Tuple[str, Union[str, int]]]],
+    ) -> Any:
+        """Navigate through the entity following pre-parsed path parts."""
+        if parts is None:
+            return None
+
+        value = entity
+        for part_type, part_value in parts:
+            if part_type == "key":
+                if isinstance(value, dict):
+                    value = value.get(part_value)
+                else:
+                    return None
+            elif part_type == "index":
+                if isinstance(value, list):
+                    if 0 <= part_value < len(value):
+                        value = value[part_value]
                     else:
                         return None
-
-                if value is None:
+                else:
                     return None
 
-            return value
-        except (KeyError, IndexError, ValueError, TypeError):
-            return None
+            if value is None:
+                return None
+
+        return value
 
     def _evaluate_expression(
         self, expression: str, field_value: Any, entity: Dict[str, Any]
@@ -463,6 +913,78 @@ class BusinessRulesEngine:
         # Create evaluation context
         context = self._create_evaluation_context(field_value, entity)
 
+        if self.compile_expressions:
+            return self._evaluate_compiled(self.compiler.compile(expression), context)
+
+        return self._interpret_expression(expression, context)
+
+    def _evaluate_compiled(
+        self, compiled: CompiledExpression, context: Dict[str, Any]
+    ) -> bool:
+        """
+        Evaluate a compiled expression against an evaluation context.
+
+        Field names are bound only for scalar and list values, matching the
+        substitution rules of the string evaluator.
+        """
+        if compiled.code is None:
+            return False
+
+        namespace = {
+            name: value
+            for name, value in context.items()
+            if name not in ("entity", "value")
+            and isinstance(value, (str, bool, int, float, list))
+        }
+        namespace.update(self._helpers)
+        namespace["_ctx"] = context
+        namespace["_patterns"] = compiled.patterns
+
+        try:
+            return bool(eval(compiled.code, namespace))
+        except Exception as e:
+            logger.error(f"Error evaluating expression '{compiled.source}': {e}")
+            return False
+
+    def _lookup_function_argument(self, context: Dict[str, Any], name: str) -> Any:
+        """Resolve a function argument the way the string evaluator does."""
+        return context.get(name, context.get("value"))
+
+    def _len_helper(self, context: Dict[str, Any], name: str) -> int:
+        """len() rule function."""
+        field_value = self._lookup_function_argument(context, name)
+        if field_value is None:
+            raise ValueError(f"len() argument '{name}' is not present")
+        return len(field_value) if hasattr(field_value, "__len__") else 0
+
+    def _exists_helper(self, context: Dict[str, Any], name: str) -> bool:
+        """exists() rule function."""
+        return self._lookup_function_argument(context, name) is not None
+
+    def _http_head_helper(self, context: Dict[str, Any], name: str) -> int:
+        """http_head() rule function."""
+        return self._http_head_check(self._lookup_function_argument(context, name))
+
+    def _matches_helper(
+        self, context: Dict[str, Any], argument: str, pattern: Optional[re.Pattern]
+    ) -> bool:
+        """MATCHES() rule operator with a pre-compiled pattern."""
+        if pattern is None:
+            return False
+
+        value = context.get(argument)
+        if isinstance(value, (str, bool, int, float)) and argument not in (
+            "entity",
+            "value",
+        ):
+            value_str = str(value)
+        else:
+            value_str = argument.strip('"')
+
+        return bool(pattern.match(value_str))
+
+    def _interpret_expression(self, expression: str, context: Dict[str, Any]) -> bool:
+        """Evaluate an expression by string substitution (uncompiled mode)."""
         # Replace function calls with their results
         expression = self._evaluate_functions(expression, context)
 
@@ -487,26 +1009,16 @@ class BusinessRulesEngine:
         # Add direct field value with common names
         if isinstance(field_value, (int, float)):
             # For numeric values, add common field names
-            for name in ["speed", "temperature", "humidity", "intensity", "occupancy"]:
+            for name in self.NUMERIC_ALIASES:
                 context[name] = field_value
         elif isinstance(field_value, str):
             # For string values
-            for name in [
-                "id",
-                "url",
-                "observedAt",
-                "dateObserved",
-                "description",
-                "imageSnapshot",
-                "streamURL",
-                "status",
-                "patientId",
-            ]:
+            for name in self.STRING_ALIASES:
                 context[name] = field_value
         elif isinstance(field_value, list):
             # For arrays
-            context["coordinates"] = field_value
-            context["category"] = field_value
+            for name in self.LIST_ALIASES:
+                context[name] = field_value
         elif isinstance(field_value, dict):
             # For objects
             context["refDevice"] = field_value
@@ -560,24 +1072,33 @@ class BusinessRulesEngine:
         if not url or not isinstance(url, str):
             return 0
 
-        # Check cache
-        if url in self.http_cache:
-            cache_time, status_code = self.http_cache[url]
-            if time.time() - cache_time < 300:  # 5 minute cache
-                return status_code
+        # Check cache (filled in bulk by prefetch_urls for batches)
+        status_code = self.url_checker.get_cached(url)
+        if status_code is not None:
+            return status_code
 
-        try:
-            response = requests.head(
-                url, timeout=self.http_timeout, allow_redirects=True
-            )
-            status_code = response.status_code
+        return self.url_checker.check(url)
 
-            # Cache result
-            self.http_cache[url] = (time.time(), status_code)
+    def prefetch_urls(self, entities: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Resolve every URL checked by http_head() rules for a batch at once.
 
-            return status_code
-        except requests.RequestException:
-            return 0
+        Args:
+            entities: Entities about to be validated
+
+        Returns:
+            Mapping of normalised URL to status code for URLs checked
+        """
+        urls = []
+        for entity in entities:
+            for rule in self.get_compiled_rules(entity.get("type", "unknown")):
+                if not rule.uses_http_head:
+                    continue
+                value = self._resolve_field_parts(entity, rule.field_parts)
+                if isinstance(value, str):
+                    urls.append(value)
+
+        return self.url_checker.prefetch(urls)
 
     def _replace_field_references(
         self, expression: str, context: Dict[str, Any]
@@ -652,6 +1173,320 @@ class BusinessRulesEngine:
             return False
 
 
+class VectorizedRuleEvaluator:
+    """
+    Evaluates numeric range and comparison rules for a whole batch at once.
+
+    A rule is vectorisable when its expressions only compare numeric aliases
+    of the field value (``speed >= 0.0``), constant indexes or ``len()`` of a
+    list field (``coordinates[0] <= 180.0``) or ``len()``/``MATCHES()`` of a
+    string field with numeric constants, joined by AND/OR/NOT. The field is
+    gathered into NumPy columns and each expression becomes one array
+    operation. Rows whose values do not fit a column (wrong type, short
+    lists, integers beyond float precision) and all other rules are
+    evaluated per entity by the rules engine, so results are identical.
+    """
+
+    _MAX_EXACT_INT = 2**53
+
+    _COMPARE_OPERATORS = {
+        ast.Eq: lambda left, right: left == right,
+        ast.NotEq: lambda left, right: left != right,
+        ast.Lt: lambda left, right: left < right,
+        ast.LtE: lambda left, right: left <= right,
+        ast.Gt: lambda left, right: left > right,
+        ast.GtE: lambda left, right: left >= right,
+    }
+
+    def __init__(self, rules_engine: BusinessRulesEngine):
+        """
+        Initialize vectorized evaluator.
+
+        Args:
+            rules_engine: Engine providing compiled rules and the per-entity path
+        """
+        self.rules_engine = rules_engine
+        self._plans: Dict[int, Optional[Tuple[Optional[str], set, list]]] = {}
+
+    def evaluate(
+        self, entities: List[Dict[str, Any]], entity_types: List[str]
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Evaluate business rules for a batch of entities.
+
+        Args:
+            entities: Entities to evaluate (already cleaned)
+            entity_types: Entity type used for rule filtering, per entity
+
+        Returns:
+            Rule results per entity, in the same order as evaluate_rules
+        """
+        results: List[List[Dict[str, Any]]] = [[] for _ in entities]
+
+        groups: Dict[str, List[int]] = {}
+        for index, entity_type in enumerate(entity_types):
+            groups.setdefault(entity_type, []).append(index)
+
+        for entity_type, indices in groups.items():
+            group = [entities[i] for i in indices]
+            for rule in self.rules_engine.get_compiled_rules(entity_type):
+                for index, result in zip(indices, self._evaluate_rule(rule, group)):
+                    results[index].append(result)
+
+        return results
+
+    def is_vectorizable(self, rule: CompiledRule) -> bool:
+        """Whether a rule is evaluated column-wise."""
+        return self._get_plan(rule) is not None
+
+    def _evaluate_rule(
+        self, rule: CompiledRule, entities: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Evaluate one rule for a group of entities of the same type."""
+        engine = self.rules_engine
+        plan = self._get_plan(rule)
+        if plan is None:
+            return [engine._evaluate_rule(entity, rule) for entity in entities]
+
+        kind, columns_used, expression_functions = plan
+        indexes = [key for key in columns_used if isinstance(key, int)]
+        results: List[Optional[Dict[str, Any]]] = [None] * len(entities)
+        eligible_rows = []
+        eligible_values = []
+
+        for row, entity in enumerate(entities):
+            value = engine._resolve_field_parts(entity, rule.field_parts)
+            if value is None:
+                results[row] = engine._skipped_result(rule)
+            elif self._fits_column(kind, indexes, value):
+                eligible_rows.append(row)
+                eligible_values.append(value)
+            else:
+                results[row] = engine._evaluate_rule(entity, rule)
+
+        if eligible_rows:
+            count = len(eligible_rows)
+            columns = self._build_columns(columns_used, eligible_values)
+            passed = np.vstack(
+                [function(columns, count) for function in expression_functions]
+            )
+            all_passed = passed.all(axis=0)
+
+            for position, row in enumerate(eligible_rows):
+                if all_passed[position]:
+                    results[row] = engine._rule_result(rule, True, [])
+                    continue
+                errors = [
+                    error_message
+                    for (_, error_message), ok in zip(
+                        rule.expressions, passed[:, position]
+                    )
+                    if not ok
+                ]
+                results[row] = engine._rule_result(rule, False, errors)
+
+        return results
+
+    def _fits_column(self, kind: Optional[str], indexes: List[int], value: Any) -> bool:
+        """Whether a field value can be represented exactly in the columns."""
+        if kind == "numeric":
+            return self._is_exact_number(value)
+        if kind == "list":
+            return isinstance(value, list) and all(
+                i < len(value) and self._is_exact_number(value[i]) for i in indexes
+            )
+        if kind == "string":
+            return isinstance(value, str)
+        return True
+
+    def _is_exact_number(self, value: Any) -> bool:
+        """Whether a value compares identically as a float64."""
+        if isinstance(value, float):
+            return True
+        return isinstance(value, int) and abs(value) <= self._MAX_EXACT_INT
+
+    def _build_columns(self, columns_used: set, values: List[Any]) -> Dict[Any, Any]:
+        """Gather field values into NumPy columns."""
+        columns = {}
+        for key in columns_used:
+            if key == "value":
+                columns[key] = np.array(values, dtype=np.float64)
+            elif key == "len":
+                columns[key] = np.array([len(v) for v in values], dtype=np.float64)
+            elif isinstance(key, int):
+                columns[key] = np.array([v[key] for v in values], dtype=np.float64)
+            else:
+                _, pattern = key
+                columns[key] = np.array(
+                    [
+                        pattern is not None and pattern.match(v) is not None
+                        for v in values
+                    ],
+                    dtype=bool,
+                )
+        return columns
+
+    def _get_plan(
+        self, rule: CompiledRule
+    ) -> Optional[Tuple[Optional[str], set, list]]:
+        """Translate a rule into column functions (cached, None if unsupported)."""
+        key = id(rule)
+        if key not in self._plans:
+            self._plans[key] = self._build_plan(rule)
+        return self._plans[key]
+
+    def _build_plan(
+        self, rule: CompiledRule
+    ) -> Optional[Tuple[Optional[str], set, list]]:
+        """Build the column plan for a rule."""
+        if rule.has_exists_check or not rule.expressions:
+            return None
+
+        usage = {"kinds": set(), "columns": set(), "patterns": []}
+        functions = []
+        try:
+            for expression, _ in rule.expressions:
+                if expression.tree is None:
+                    return None
+                usage["patterns"] = expression.patterns
+                functions.append(self._translate_condition(expression.tree.body, usage))
+        except ValueError:
+            return None
+
+        if len(usage["kinds"]) > 1:
+            return None
+
+        return next(iter(usage["kinds"]), None), usage["columns"], functions
+
+    def _translate_condition(self, node: ast.AST, usage: Dict[str, Any]):
+        """Translate a boolean expression node into a column function."""
+        if isinstance(node, ast.BoolOp):
+            parts = [self._translate_condition(value, usage) for value in node.values]
+            reducer = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+            return lambda columns, count: reducer.reduce(
+                [part(columns, count) for part in parts]
+            )
+
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            operand = self._translate_condition(node.operand, usage)
+            return lambda columns, count: np.logical_not(operand(columns, count))
+
+        if isinstance(node, ast.Call) and self._call_name(node) == "_matches":
+            key = ("match", self._matches_pattern(node, usage))
+            self._use(usage, "string", key)
+            return lambda columns, count: columns[key]
+
+        if isinstance(node, ast.Compare):
+            operands = [
+                self._translate_value(operand, usage)
+                for operand in [node.left] + node.comparators
+            ]
+            operators = []
+            for operator in node.ops:
+                if type(operator) not in self._COMPARE_OPERATORS:
+                    raise ValueError(f"Unsupported comparison: {type(operator)}")
+                operators.append(self._COMPARE_OPERATORS[type(operator)])
+
+            def compare(columns, count):
+                result = np.ones(count, dtype=bool)
+                for position, operator in enumerate(operators):
+                    result &= np.broadcast_to(
+                        operator(
+                            operands[position](columns),
+                            operands[position + 1](columns),
+                        ),
+                        (count,),
+                    )
+                return result
+
+            return compare
+
+        raise ValueError(f"Unsupported condition: {type(node).__name__}")
+
+    def _translate_value(self, node: ast.AST, usage: Dict[str, Any]):
+        """Translate an operand into a column accessor or constant."""
+        if isinstance(node, ast.Name):
+            if node.id not in BusinessRulesEngine.NUMERIC_ALIASES:
+                raise ValueError(f"Non-numeric name: {node.id}")
+            self._use(usage, "numeric", "value")
+            return lambda columns: columns["value"]
+
+        if (
+            isinstance(node, ast.Subscript)
+            and isinstance(node.value, ast.Name)
+            and node.value.id in BusinessRulesEngine.LIST_ALIASES
+            and isinstance(node.slice, ast.Constant)
+            and type(node.slice.value) is int
+            and node.slice.value >= 0
+        ):
+            index = node.slice.value
+            self._use(usage, "list", index)
+            return lambda columns: columns[index]
+
+        if isinstance(node, ast.Call) and self._call_name(node) == "_len":
+            name = self._string_argument(node, 1)
+            if name in BusinessRulesEngine.LIST_ALIASES:
+                self._use(usage, "list", "len")
+            elif name in BusinessRulesEngine.STRING_ALIASES:
+                self._use(usage, "string", "len")
+            else:
+                raise ValueError(f"Unsupported len() argument: {name}")
+            return lambda columns: columns["len"]
+
+        constant = self._constant_value(node)
+        return lambda columns: constant
+
+    def _use(self, usage: Dict[str, Any], kind: str, column: Any):
+        """Record the field kind and column an expression needs."""
+        usage["kinds"].add(kind)
+        usage["columns"].add(column)
+
+    def _call_name(self, node: ast.Call) -> Optional[str]:
+        """Name of a rule function call."""
+        return node.func.id if isinstance(node.func, ast.Name) else None
+
+    def _string_argument(self, node: ast.Call, position: int) -> str:
+        """Constant string argument of a rule function call."""
+        if len(node.args) > position:
+            argument = node.args[position]
+            if isinstance(argument, ast.Constant) and isinstance(argument.value, str):
+                return argument.value
+        raise ValueError("Unsupported function argument")
+
+    def _matches_pattern(
+        self, node: ast.Call, usage: Dict[str, Any]
+    ) -> Optional[re.Pattern]:
+        """Pre-compiled pattern of a MATCHES() call on a string alias."""
+        if self._string_argument(node, 1) not in BusinessRulesEngine.STRING_ALIASES:
+            raise ValueError("MATCHES() argument is not a string field")
+
+        pattern_node = node.args[2] if len(node.args) > 2 else None
+        if not (
+            isinstance(pattern_node, ast.Subscript)
+            and isinstance(pattern_node.slice, ast.Constant)
+            and isinstance(pattern_node.slice.value, int)
+            and pattern_node.slice.value < len(usage["patterns"])
+        ):
+            raise ValueError("Unsupported MATCHES() pattern")
+
+        return usage["patterns"][pattern_node.slice.value]
+
+    def _constant_value(self, node: ast.AST) -> float:
+        """Extract a numeric constant, including unary +/-."""
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+            value = self._constant_value(node.operand)
+            return -value if isinstance(node.op, ast.USub) else value
+
+        if (
+            isinstance(node, ast.Constant)
+            and type(node.value) in (int, float)
+            and self._is_exact_number(node.value)
+        ):
+            return node.value
+
+        raise ValueError(f"Unsupported operand: {ast.dump(node)}")
+
+
 class QualityScorer:
     """
     Calculates quality scores from validation results.
@@ -1028,16 +1863,20 @@ class DataQualityValidatorAgent:
     Coordinates schema validation, business rules, scoring, and cleaning.
     """
 
-    def __init__(self, config_path: str):
+    def __init__(self, config_path: str, config: Optional[DataQualityConfig] = None):
         """
         Initialize Data Quality Validator Agent.
 
         Args:
             config_path: Path to data_quality_config.yaml
+            config: Already loaded configuration (used by worker processes)
         """
-        self.config = DataQualityConfig(config_path)
+        self.config = config or DataQualityConfig(config_path)
         self.schema_validator = SchemaValidator(self.config)
         self.rules_engine = BusinessRulesEngine(self.config)
+        self.vectorized_evaluator = (
+            VectorizedRuleEvaluator(self.rules_engine) if NUMPY_AVAILABLE else None
+        )
         self.quality_scorer = QualityScorer(self.config)
         self.data_cleaner = DataCleaner(self.config)
 
@@ -1073,16 +1912,43 @@ class DataQualityValidatorAgent:
         logger.info(f"Validating entity {entity_id} (type: {entity_type})")
 
         # Apply data cleaning if enabled
-        original_entity = entity
+        entity = self._prepare_entity(entity, auto_clean)
+
+        # Business rules validation
+        rule_results = self.rules_engine.evaluate_rules(entity, entity_type)
+
+        return self._build_report(entity, entity_id, entity_type, rule_results)
+
+    def _prepare_entity(
+        self, entity: Dict[str, Any], auto_clean: bool = True
+    ) -> Dict[str, Any]:
+        """Apply data cleaning if enabled."""
         if auto_clean and self.integration_config.get("auto_fix", True):
-            entity = self.data_cleaner.clean(entity)
+            return self.data_cleaner.clean(entity)
+        return entity
+
+    def _build_report(
+        self,
+        entity: Dict[str, Any],
+        entity_id: str,
+        entity_type: str,
+        rule_results: List[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """
+        Run schema validation and scoring, then compile, save and log the report.
+
+        Args:
+            entity: Cleaned entity
+            entity_id: Entity ID
+            entity_type: Entity type used for rule filtering
+            rule_results: Business rule results for the entity
 
+        Returns:
+            Validation report
+        """
         # Schema validation
         schema_valid, schema_errors = self.schema_validator.validate(entity)
 
-        # Business rules validation
-        rule_results = self.rules_engine.evaluate_rules(entity, entity_type)
-
         # Calculate quality score
         quality_score, status = self.quality_scorer.calculate_score(
             schema_valid, rule_results
@@ -1117,7 +1983,10 @@ class DataQualityValidatorAgent:
         return report
 
     def validate_batch(
-        self, entities: List[Dict[str, Any]], parallel: bool = True
+        self,
+        entities: List[Dict[str, Any]],
+        parallel: bool = True,
+        vectorized: Optional[bool] = None,
     ) -> List[Dict[str, Any]]:
         """
         Validate multiple entities in batch.
@@ -1125,17 +1994,50 @@ class DataQualityValidatorAgent:
         Args:
             entities: List of NGSI-LD entities to validate
             parallel: Whether to use parallel processing
+            vectorized: Evaluate numeric rules column-wise with NumPy
+                (defaults to performance.vectorized_validation)
 
         Returns:
             List of validation reports
         """
         logger.info(f"Validating batch of {len(entities)} entities")
 
-        if parallel and self.performance_config.get("parallel_validation", True):
+        if self.performance_config.get("http_prefetch", True):
+            self.rules_engine.prefetch_urls(entities)
+
+        if vectorized is None:
+            vectorized = self.performance_config.get("vectorized_validation", False)
+
+        if vectorized:
+            return self._validate_batch_vectorized(entities)
+        elif parallel and self.performance_config.get("parallel_validation", True):
             return self._validate_batch_parallel(entities)
         else:
             return self._validate_batch_sequential(entities)
 
+    def _validate_batch_vectorized(
+        self, entities: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Validate entities with numeric rules evaluated as NumPy columns."""
+        if not NUMPY_AVAILABLE:
+            logger.warning("NumPy not available, using sequential validation")
+            return self._validate_batch_sequential(entities)
+
+        entity_ids = [entity.get("id", "unknown") for entity in entities]
+        entity_types = [entity.get("type", "unknown") for entity in entities]
+        cleaned_entities = [self._prepare_entity(entity) for entity in entities]
+
+        rule_results = self.vectorized_evaluator.evaluate(
+            cleaned_entities, entity_types
+        )
+
+        return [
+            self._build_report(entity, entity_id, entity_type, results)
+            for entity, entity_id, entity_type, results in zip(
+                cleaned_entities, entity_ids, entity_types, rule_results
+            )
+        ]
+
     def _validate_batch_sequential(
         self, entities: List[Dict[str, Any]]
     ) -> List[Dict[str, Any]]:
@@ -1149,36 +2051,57 @@ class DataQualityValidatorAgent:
     def _validate_batch_parallel(
         self, entities: List[Dict[str, Any]]
     ) -> List[Dict[str, Any]]:
-        """Validate entities in parallel using thread pool."""
-        max_workers = self.performance_config.get("max_workers", 4)
-        reports = []
+        """Validate entities in parallel using a process pool."""
+        min_batch_size = self.performance_config.get("parallel_min_batch_size", 100)
+        if len(entities) < min_batch_size or (os.cpu_count() or 1) < 2:
+            return self._validate_batch_sequential(entities)
 
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = {
-                executor.submit(self.validate_entity, entity): entity
-                for entity in entities
-            }
+        return list(self.iter_validate_batch(entities))
 
-            for future in as_completed(futures):
-                try:
-                    report = future.result()
-                    reports.append(report)
-                except Exception as e:
-                    entity = futures[future]
-                    entity_id = entity.get("id", "unknown")
-                    logger.error(f"Error validating entity {entity_id}: {e}")
-
-                    # Create error report
-                    reports.append(
-                        {
-                            "entity_id": entity_id,
-                            "status": "ERROR",
-                            "quality_score": 0.0,
-                            "errors": [str(e)],
-                        }
-                    )
+    def iter_validate_batch(
+        self, entities: List[Dict[str, Any]]
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Validate entities in a process pool, yielding reports in input order.
 
-        return reports
+        Entities are submitted in chunks of ``parallel_chunk_size`` (default:
+        about four chunks per worker). Each worker loads the configuration,
+        compiles the rules for the batch's entity types and receives the
+        current http_head() cache once, in its initializer.
+
+        Args:
+            entities: List of NGSI-LD entities to validate
+
+        Yields:
+            Validation reports, in the same order as ``entities``
+        """
+        max_workers = self.performance_config.get("max_workers", 4)
+        chunk_size = self.performance_config.get("parallel_chunk_size") or max(
+            1, math.ceil(len(entities) / (max_workers * 4))
+        )
+        chunks = [
+            entities[i : i + chunk_size] for i in range(0, len(entities), chunk_size)
+        ]
+        entity_types = sorted({entity.get("type", "unknown") for entity in entities})
+
+        try:
+            executor = ProcessPoolExecutor(
+                max_workers=max_workers,
+                initializer=_init_validation_worker,
+                initargs=(
+                    self.config,
+                    entity_types,
+                    dict(self.rules_engine.http_cache),
+                ),
+            )
+        except (OSError, NotImplementedError) as e:
+            logger.warning(f"Process pool unavailable ({e}), validating sequentially")
+            yield from self._validate_batch_sequential(entities)
+            return
+
+        with executor:
+            for chunk_reports in executor.map(_validate_chunk, chunks):
+                yield from chunk_reports
 
     def _format_rule_results(
         self, rule_results: List[Dict[str, Any]]
@@ -1306,6 +2229,7 @@ class DataQualityValidatorAgent:
         passed = sum(1 for r in reports if r["status"] == "PASS")
         warnings = sum(1 for r in reports if r["status"] == "WARNING")
         rejected = sum(1 for r in reports if r["status"] == "REJECT")
+        failed = sum(1 for r in reports if r["status"] == "ERROR")
 
         avg_score = (
             sum(r["quality_score"] for r in reports) / total if total > 0 else 0.0
@@ -1316,11 +2240,54 @@ class DataQualityValidatorAgent:
             "passed": passed,
             "warnings": warnings,
             "rejected": rejected,
+            "errors": failed,
             "average_quality_score": round(avg_score, 3),
             "pass_rate": round(passed / total * 100, 2) if total > 0 else 0.0,
         }
 
 
+# ==============================================================================
+# Process Pool Workers
+# ==============================================================================
+
+_worker_agent: Optional[DataQualityValidatorAgent] = None
+
+
+def _init_validation_worker(
+    config: DataQualityConfig,
+    entity_types: List[str],
+    http_cache: Dict[str, Tuple[float, int]],
+):
+    """Build the worker's agent and compile its rules once per process."""
+    global _worker_agent
+    _worker_agent = DataQualityValidatorAgent(config.config_path, config=config)
+    _worker_agent.rules_engine.http_cache.update(http_cache)
+    for entity_type in entity_types:
+        _worker_agent.rules_engine.get_compiled_rules(entity_type)
+
+
+def _validate_chunk(entities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Validate one chunk of entities inside a worker process."""
+    reports = []
+    for entity in entities:
+        try:
+            reports.append(_worker_agent.validate_entity(entity))
+        except Exception as e:
+            entity_id = entity.get("id", "unknown")
+            logger.error(f"Error validating entity {entity_id}: {e}")
+
+            # Create error report
+            reports.append(
+                {
+                    "entity_id": entity_id,
+                    "status": "ERROR",
+                    "quality_score": 0.0,
+                    "errors": [str(e)],
+                }
+            )
+    return reports
+
+
 # ==============================================================================
 # CLI Interface
 # ==============================================================================
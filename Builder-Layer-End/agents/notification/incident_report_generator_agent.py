@@ -41,6 +41,8 @@ import yaml
 from flask import Flask, jsonify, request, send_file
 from jinja2 import Template, Environment, FileSystemLoader
 
+from shared.accident_history import AccidentHistoryStore
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -244,6 +246,17 @@ class ReportDataCollector:
             "base_url", "http://localhost:8080"
         )
 
+        # Partitioned accident history written by AccidentDetectionAgent;
+        # answers related-incident lookups when Neo4j is unavailable
+        history_config = self.data_sources.get("accident_history", {})
+        self.history = None
+        if history_config.get("enabled", False):
+            self.history = AccidentHistoryStore(
+                history_config.get("directory", "data/accident_history")
+            )
+        self.related_window_hours = history_config.get("related_window_hours", 24)
+        self.related_limit = history_config.get("related_limit", 10)
+
     def collect_incident_data(
         self, accident_id: str, entity_data: Dict[str, Any]
     ) -> Dict[str, Any]:
@@ -323,6 +336,13 @@ class ReportDataCollector:
                 )
                 data["related_incidents"] = related_data
 
+        if not data["related_incidents"] and self.history is not None:
+            camera_ref = camera_id or entity_data.get("refCamera", {}).get("object", "")
+            if camera_ref:
+                data["related_incidents"] = self._related_from_history(
+                    accident_id, camera_ref, detection_time
+                )
+
         # Get historical patterns
         if location and isinstance(location, dict):
             coordinates = location.get("coordinates", [])
@@ -361,6 +381,42 @@ class ReportDataCollector:
 
         return data
 
+    def _related_from_history(
+        self, accident_id: str, camera_ref: str, detection_time: str
+    ) -> List[Dict[str, Any]]:
+        """
+        Earlier detections at the same camera from the accident history.
+
+        Args:
+            accident_id: Incident entity ID (excluded from results)
+            camera_ref: Camera entity reference
+            detection_time: Incident detection time (ISO 8601)
+
+        Returns:
+            Records shaped like the Neo4j related_incidents query rows,
+            newest first
+        """
+        start_time = datetime.fromisoformat(
+            detection_time.replace("Z", "")
+        ) - timedelta(hours=self.related_window_hours)
+        records = self.history.query(
+            camera=camera_ref, start=start_time, end=datetime.utcnow()
+        )
+        related = [
+            {
+                "a2": {
+                    "id": record.get("entity_id"),
+                    "cameraId": record.get("camera"),
+                    "detectionTime": record.get("timestamp"),
+                    "severity": record.get("severity"),
+                    "confidence": record.get("confidence"),
+                }
+            }
+            for record in reversed(records)
+            if record.get("entity_id") != accident_id
+        ]
+        return related[: self.related_limit]
+
 
 class VisualizationGenerator:
     """
@@ -778,7 +834,8 @@ class ReportGenerator:
             related_incidents.append(
                 {
                     "id": incident_data.get("id", "Unknown"),
-                    "location": incident_data.get("roadName", "Unknown"),
+                    "location": incident_data.get("roadName")
+                    or incident_data.get("cameraId", "Unknown"),
                     "time": incident_data.get("detectionTime", ""),
                     "severity": incident_data.get("severity", "moderate"),
                 }
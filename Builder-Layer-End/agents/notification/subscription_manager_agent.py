@@ -28,6 +28,8 @@ from urllib.parse import urljoin
 import requests
 import yaml
 
+from shared.stellio_client import get_stellio_client
+
 
 # Configure logging
 logging.basicConfig(
@@ -147,9 +149,8 @@ class SubscriptionManager:
         self.renew_before_days = auto_renew.get("renew_before_days", 7)
         self.default_extension_days = auto_renew.get("default_extension_days", 365)
 
-        # HTTP session for connection pooling
-        self.session = requests.Session()
-        self.session.headers.update(self.headers)
+        # Shared HTTP client for connection pooling
+        self.session = get_stellio_client(self.base_url)
 
         # Statistics
         self.stats = {
@@ -258,7 +259,7 @@ class SubscriptionManager:
             for attempt in range(self.max_retries):
                 try:
                     response = self.session.post(
-                        url, json=payload, timeout=self.timeout
+                        url, json=payload, headers=self.headers, timeout=self.timeout
                     )
 
                     if response.status_code == 201:
@@ -328,7 +329,9 @@ class SubscriptionManager:
                 self.base_url, self.get_endpoint.format(subscription_id=subscription_id)
             )
 
-            response = self.session.get(url, timeout=self.timeout)
+            response = self.session.get(
+                url, headers=self.headers, timeout=self.timeout
+            )
 
             if response.status_code == 200:
                 return response.json()
@@ -357,7 +360,9 @@ class SubscriptionManager:
         try:
             url = urljoin(self.base_url, self.list_endpoint)
 
-            response = self.session.get(url, timeout=self.timeout)
+            response = self.session.get(
+                url, headers=self.headers, timeout=self.timeout
+            )
 
             if response.status_code == 200:
                 return response.json()
@@ -393,7 +398,9 @@ class SubscriptionManager:
 
             logger.info(f"Updating subscription: {subscription_id}")
 
-            response = self.session.patch(url, json=updates, timeout=self.timeout)
+            response = self.session.patch(
+                url, json=updates, headers=self.headers, timeout=self.timeout
+            )
 
             if response.status_code == 204:
                 self.stats["subscriptions_updated"] += 1
@@ -428,7 +435,9 @@ class SubscriptionManager:
 
             logger.info(f"Deleting subscription: {subscription_id}")
 
-            response = self.session.delete(url, timeout=self.timeout)
+            response = self.session.delete(
+                url, headers=self.headers, timeout=self.timeout
+            )
 
             if response.status_code == 204:
                 self.stats["subscriptions_deleted"] += 1
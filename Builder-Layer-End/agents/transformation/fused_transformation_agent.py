@@ -0,0 +1,460 @@
+"""
+Fused Transformation Agent - Single-Pass Transform, Enhance and Validate
+
+This agent replaces the Phase 2/3 chain of ngsi_ld_transformer_agent,
+sosa_ssn_mapper_agent and smart_data_models_validation_agent with one stage.
+Every raw camera is read once and its entities are carried through NGSI-LD
+mapping, SOSA/SSN enhancement and validation in memory before the result is
+streamed to the output file.
+
+Architecture:
+- NGSILDTransformerAgent.process_batch() maps each camera to its NGSI-LD
+  entities (Camera + WeatherObserved + AirQualityObserved)
+- SOSASSNMapperAgent.process_batch() enhances them via enhance_entity()
+- EntityStructureValidator checks the NGSI-LD structure of the final entity
+- JSONArrayWriter streams valid entities to the output file
+- Intermediate NGSI-LD / SOSA files are optional debug taps
+
+Author: Builder Layer LOD System
+Version: 1.0.0
+"""
+
+import json
+import logging
+import os
+import sys
+import textwrap
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from agents.transformation.ngsi_ld_transformer_agent import NGSILDTransformerAgent
+from agents.transformation.sosa_ssn_mapper_agent import SOSASSNMapperAgent
+
+logger = logging.getLogger("FusedTransformation")
+
+
+class JSONArrayWriter:
+    """
+    Streams entities into a JSON array file.
+
+    The file is written to a temporary path and moved into place on close, so
+    readers never see a partial array. With ``indent=2`` the bytes match
+    ``json.dump(entities, f, indent=2, ensure_ascii=False)``.
+    """
+
+    def __init__(self, path: str, indent: Optional[int] = 2):
+        """
+        Initialize writer.
+
+        Args:
+            path: Output file path
+            indent: JSON indent (None for compact output)
+        """
+        self.path = Path(path)
+        self.indent = indent
+        self.count = 0
+        self._tmp_path = self.path.with_name(self.path.name + ".tmp")
+        self._file = None
+
+    def __enter__(self) -> "JSONArrayWriter":
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close(commit=exc_type is None)
+
+    def open(self) -> None:
+        """Open the temporary file and start the array."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self._tmp_path, "w", encoding="utf-8")
+        self._file.write("[")
+
+    def write(self, entity: Dict[str, Any]) -> None:
+        """
+        Append one entity to the array.
+
+        Args:
+            entity: JSON-serialisable entity
+        """
+        separator = "," if self.count else ""
+        if self.indent is None:
+            text = json.dumps(entity, ensure_ascii=False)
+            self._file.write(f"{separator}{' ' if self.count else ''}{text}")
+        else:
+            text = json.dumps(entity, ensure_ascii=False, indent=self.indent)
+            text = textwrap.indent(text, " " * self.indent)
+            self._file.write(f"{separator}\n{text}")
+        self.count += 1
+
+    def close(self, commit: bool = True) -> None:
+        """
+        Finish the array and move the file into place.
+
+        Args:
+            commit: Replace the target file (False discards the output)
+        """
+        if self._file is None:
+            return
+
+        if self.count and self.indent is not None:
+            self._file.write("\n")
+        self._file.write("]")
+        self._file.close()
+        self._file = None
+
+        if commit:
+            os.replace(self._tmp_path, self.path)
+        else:
+            self._tmp_path.unlink(missing_ok=True)
+
+
+class EntityStructureValidator:
+    """
+    Validates the NGSI-LD structure of a final entity.
+
+    Applied to every entity leaving the fused stage, mirroring the checks of
+    the standalone Smart Data Models validation step.
+    """
+
+    ATTRIBUTE_TYPES = {"Property", "GeoProperty", "Relationship", "LanguageProperty"}
+    CORE_FIELDS = {"id", "type", "@context"}
+
+    def __init__(self, validation_config: Dict[str, Any]):
+        """
+        Initialize validator.
+
+        Args:
+            validation_config: ``validation`` section of the NGSI-LD mappings
+        """
+        self.required_fields = validation_config.get(
+            "required_fields", ["id", "type", "@context"]
+        )
+        self.errors: List[str] = []
+
+    def validate_entity(self, entity: Dict[str, Any]) -> bool:
+        """
+        Validate entity structure.
+
+        Args:
+            entity: NGSI-LD entity
+
+        Returns:
+            True if valid, False otherwise
+        """
+        self.errors = []
+
+        for field_name in self.required_fields:
+            if field_name not in entity:
+                self.errors.append(f"Missing required field: {field_name}")
+
+        entity_id = entity.get("id", "")
+        if "id" in entity and not (
+            isinstance(entity_id, str)
+            and entity_id.startswith(("urn:", "http://", "https://"))
+        ):
+            self.errors.append(f"Entity id is not a URI: {entity_id}")
+
+        for name, attribute in entity.items():
+            if name in self.CORE_FIELDS:
+                continue
+            instances = attribute if isinstance(attribute, list) else [attribute]
+            for instance in instances:
+                self._validate_attribute(name, instance)
+
+        return len(self.errors) == 0
+
+    def _validate_attribute(self, name: str, attribute: Any) -> None:
+        """Validate one attribute instance."""
+        if not isinstance(attribute, dict):
+            self.errors.append(f"{name} is not an NGSI-LD attribute")
+            return
+
+        attr_type = attribute.get("type")
+        if attr_type not in self.ATTRIBUTE_TYPES:
+            self.errors.append(f"{name} has invalid attribute type: {attr_type}")
+        elif attr_type == "Relationship" and "object" not in attribute:
+            self.errors.append(f"{name} missing 'object' field")
+        elif attr_type == "LanguageProperty" and "languageMap" not in attribute:
+            self.errors.append(f"{name} missing 'languageMap' field")
+        elif attr_type in ("Property", "GeoProperty") and "value" not in attribute:
+            self.errors.append(f"{name} missing 'value' field")
+
+    def get_errors(self) -> List[str]:
+        """Get validation errors from last validation."""
+        return self.errors.copy()
+
+
+class FusedTransformationAgent:
+    """
+    Fused Transformation Agent - streams cameras through transform, enhance
+    and validate in a single pass.
+
+    Only the validated entity stream is written by default; the NGSI-LD and
+    SOSA intermediate files are written only when their debug taps are set.
+    """
+
+    def __init__(
+        self,
+        ngsi_ld_config_path: str = "config/ngsi_ld_mappings.yaml",
+        sosa_config_path: str = "config/sosa_mappings.yaml",
+    ):
+        """
+        Initialize Fused Transformation Agent.
+
+        Args:
+            ngsi_ld_config_path: Path to NGSI-LD mappings configuration
+            sosa_config_path: Path to SOSA mappings configuration
+        """
+        self.transformer = NGSILDTransformerAgent(config_path=ngsi_ld_config_path)
+        self.mapper = SOSASSNMapperAgent(config_path=sosa_config_path)
+        self.validator = EntityStructureValidator(
+            self.transformer.config.get("validation", {})
+        )
+
+        self.stats = {
+            "total_cameras": 0,
+            "ngsi_ld_entities": 0,
+            "valid_entities": 0,
+            "invalid_entities": 0,
+            "processing_time": 0.0,
+        }
+        self.validation_errors: List[Dict[str, Any]] = []
+
+    def iter_cameras(self, source_file: str) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate raw cameras from the source file.
+
+        Args:
+            source_file: Path to enriched cameras JSON array
+
+        Yields:
+            Raw camera records
+        """
+        cameras = self.transformer.load_source_data(source_file)
+        self.stats["total_cameras"] = len(cameras)
+        self.transformer.stats["total_entities"] = len(cameras)
+        yield from cameras
+
+    def process_camera(
+        self, camera: Dict[str, Any]
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Transform and enhance one camera.
+
+        Args:
+            camera: Raw camera record
+
+        Returns:
+            Tuple of (NGSI-LD entities, SOSA-enhanced entities)
+        """
+        ngsi_entities = self.transformer.process_batch([camera])
+        self.mapper.stats["total_entities"] += len(ngsi_entities)
+        return ngsi_entities, self.mapper.process_batch(ngsi_entities)
+
+    def validate_entity(self, entity: Dict[str, Any]) -> bool:
+        """
+        Validate one final entity and record its errors.
+
+        Args:
+            entity: SOSA-enhanced NGSI-LD entity
+
+        Returns:
+            True if valid, False otherwise
+        """
+        if self.validator.validate_entity(entity):
+            self.stats["valid_entities"] += 1
+            return True
+
+        errors = self.validator.get_errors()
+        self.stats["invalid_entities"] += 1
+        self.validation_errors.append(
+            {"entity_id": entity.get("id", "unknown"), "errors": errors}
+        )
+        logger.warning(f"Validation failed for {entity.get('id')}: {errors}")
+        return False
+
+    def run(
+        self,
+        source_file: str,
+        output_file: str,
+        ngsi_ld_file: Optional[str] = None,
+        sosa_file: Optional[str] = None,
+        invalid_file: Optional[str] = None,
+        report_file: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Run the fused stage.
+
+        Args:
+            source_file: Enriched cameras JSON file
+            output_file: Validated entities output file
+            ngsi_ld_file: Optional debug tap for NGSI-LD entities
+            sosa_file: Optional debug tap for SOSA-enhanced entities
+            invalid_file: Optional file for entities that failed validation
+            report_file: Optional validation report file
+
+        Returns:
+            Processing statistics
+        """
+        start_time = time.time()
+        processing = self.transformer.config.get("processing", {})
+        indent = 2 if processing.get("pretty_print", True) else None
+
+        writers = {"output": JSONArrayWriter(output_file, indent)}
+        for name, path in (
+            ("ngsi_ld", ngsi_ld_file),
+            ("sosa", sosa_file),
+            ("invalid", invalid_file),
+        ):
+            if path:
+                writers[name] = JSONArrayWriter(path, indent)
+
+        committed = False
+        for writer in writers.values():
+            writer.open()
+        try:
+            if self.mapper.config["output"].get("include_generated_entities", True):
+                for entity in self.mapper.generate_support_entities():
+                    self._emit(entity, writers)
+
+            for camera in self.iter_cameras(source_file):
+                ngsi_entities, enhanced_entities = self.process_camera(camera)
+                self.stats["ngsi_ld_entities"] += len(ngsi_entities)
+                if "ngsi_ld" in writers:
+                    for entity in ngsi_entities:
+                        writers["ngsi_ld"].write(entity)
+                for entity in enhanced_entities:
+                    self._emit(entity, writers)
+            committed = True
+        finally:
+            for writer in writers.values():
+                writer.close(commit=committed)
+
+        self.stats["processing_time"] = time.time() - start_time
+        if report_file:
+            self.save_report(report_file)
+        self.log_statistics()
+
+        return dict(self.stats)
+
+    def _emit(self, entity: Dict[str, Any], writers: Dict[str, JSONArrayWriter]):
+        """Validate an enhanced entity and route it to the open writers."""
+        if "sosa" in writers:
+            writers["sosa"].write(entity)
+        if self.validate_entity(entity):
+            writers["output"].write(entity)
+        elif "invalid" in writers:
+            writers["invalid"].write(entity)
+
+    def save_report(self, report_file: str) -> None:
+        """
+        Save validation report.
+
+        Args:
+            report_file: Report output path
+        """
+        total = self.stats["valid_entities"] + self.stats["invalid_entities"]
+        report = {
+            "summary": {
+                "total_entities": total,
+                "valid": self.stats["valid_entities"],
+                "invalid": self.stats["invalid_entities"],
+                "validation_rate": (
+                    round(self.stats["valid_entities"] / total * 100, 2)
+                    if total
+                    else 0.0
+                ),
+            },
+            "errors": self.validation_errors,
+            "timestamp": datetime.now().isoformat(),
+        }
+
+        report_path = Path(report_file)
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    def log_statistics(self) -> None:
+        """Log processing statistics."""
+        logger.info("=" * 60)
+        logger.info("FUSED TRANSFORMATION STATISTICS")
+        logger.info("=" * 60)
+        logger.info(f"Cameras processed: {self.stats['total_cameras']}")
+        logger.info(f"NGSI-LD entities: {self.stats['ngsi_ld_entities']}")
+        logger.info(f"Valid entities: {self.stats['valid_entities']}")
+        logger.info(f"Invalid entities: {self.stats['invalid_entities']}")
+        logger.info(f"Processing time: {self.stats['processing_time']:.2f}s")
+        logger.info("=" * 60)
+
+
+def main(config: Dict = None):
+    """Main entry point for the agent."""
+    import argparse
+
+    # If called from orchestrator with config dict
+    if config:
+        try:
+            output_file = config.get("output_file", "data/validated_entities.json")
+            debug_taps = config.get("debug_taps") or {}
+
+            agent = FusedTransformationAgent(
+                ngsi_ld_config_path=config.get(
+                    "ngsi_ld_config_path", "config/ngsi_ld_mappings.yaml"
+                ),
+                sosa_config_path=config.get(
+                    "sosa_config_path", "config/sosa_mappings.yaml"
+                ),
+            )
+            stats = agent.run(
+                source_file=config.get("input_file", "data/cameras_enriched.json"),
+                output_file=output_file,
+                ngsi_ld_file=debug_taps.get("ngsi_ld_file"),
+                sosa_file=debug_taps.get("sosa_file"),
+                invalid_file=config.get("invalid_output_file"),
+                report_file=config.get("report_file"),
+            )
+
+            return {"status": "success", "output_file": output_file, "stats": stats}
+        except Exception as e:
+            print(f"Agent execution failed: {e}", file=sys.stderr)
+            return {"status": "failed", "error": str(e)}
+
+    # Command line execution
+    parser = argparse.ArgumentParser(
+        description="Fused Transformation Agent - transform, enhance and validate"
+    )
+    parser.add_argument("--source", default="data/cameras_enriched.json")
+    parser.add_argument("--output", default="data/validated_entities.json")
+    parser.add_argument("--ngsi-ld-config", default="config/ngsi_ld_mappings.yaml")
+    parser.add_argument("--sosa-config", default="config/sosa_mappings.yaml")
+    parser.add_argument("--ngsi-ld-tap", help="Also write NGSI-LD entities here")
+    parser.add_argument("--sosa-tap", help="Also write SOSA-enhanced entities here")
+    parser.add_argument("--invalid-output", help="Write invalid entities here")
+    parser.add_argument("--report", help="Write validation report here")
+
+    args = parser.parse_args()
+
+    try:
+        agent = FusedTransformationAgent(
+            ngsi_ld_config_path=args.ngsi_ld_config,
+            sosa_config_path=args.sosa_config,
+        )
+        agent.run(
+            source_file=args.source,
+            output_file=args.output,
+            ngsi_ld_file=args.ngsi_ld_tap,
+            sosa_file=args.sosa_tap,
+            invalid_file=args.invalid_output,
+            report_file=args.report,
+        )
+    except KeyboardInterrupt:
+        print("\nTransformation cancelled by user")
+    except Exception as e:
+        print(f"Fatal error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
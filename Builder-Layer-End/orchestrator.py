@@ -185,6 +185,10 @@ class WorkflowConfig:
     def get_reporting_config(self) -> Dict:
         """Get reporting configuration"""
         return self.config.get('reporting', {})
+    
+    def get_streaming_config(self) -> Dict:
+        """Get streaming execution configuration"""
+        return self.config.get('streaming', {})
 
 
 class RetryPolicy:
@@ -557,6 +561,9 @@ class WorkflowOrchestrator:
         self.stop_on_required_failure = exec_settings.get('stop_on_required_failure', True)
         self.workflow_timeout = exec_settings.get('timeout', 300)
         
+        # Streaming mode replaces the file-based phases (batch is the default)
+        self.streaming_config = self.config_loader.get_streaming_config()
+        
         logger.info("Workflow Orchestrator initialized successfully")
     
     def run(self) -> WorkflowReport:
@@ -581,8 +588,12 @@ class WorkflowOrchestrator:
             endpoint_results = self.health_checker.check_all()
             # check_all now returns dict or raises exception if required check fails
             
-            # Execute phases
-            phases = self.config_loader.get_phases()
+            # Execute phases (or the streaming stages that replace them)
+            if self.streaming_config.get('enabled', False):
+                phase_results.append(self._run_streaming())
+                phases = []
+            else:
+                phases = self.config_loader.get_phases()
             seed_config = self.config.get('seed_data', {})
             
             for phase_index, phase_config in enumerate(phases):
@@ -638,6 +649,45 @@ class WorkflowOrchestrator:
         
         return report
     
+    def _run_streaming(self) -> PhaseResult:
+        """
+        Run the pipeline as streaming stages instead of phases
+        
+        Returns:
+            PhaseResult with one agent result per stage
+        """
+        from stream_orchestrator import StreamOrchestrator
+        
+        start_time = time.time()
+        stage_stats = StreamOrchestrator(self.streaming_config).run()
+        
+        agent_results = []
+        for name, stats in stage_stats.items():
+            error_message = stats.error_message
+            if not error_message and stats.failed:
+                error_message = f"{stats.failed} of {stats.consumed} records failed"
+            agent_results.append(AgentResult(
+                name=name,
+                status=AgentStatus.FAILED if error_message else AgentStatus.SUCCESS,
+                duration_seconds=stats.duration_seconds,
+                error_message=error_message
+            ))
+        
+        failed_count = sum(1 for r in agent_results if r.status == AgentStatus.FAILED)
+        if failed_count == 0:
+            status = PhaseStatus.SUCCESS
+        elif failed_count < len(agent_results):
+            status = PhaseStatus.PARTIAL
+        else:
+            status = PhaseStatus.FAILED
+        
+        return PhaseResult(
+            name="Streaming",
+            status=status,
+            duration_seconds=time.time() - start_time,
+            agents=agent_results
+        )
+    
     def _collect_endpoints(self) -> Dict[str, str]:
         """Collect endpoint URLs"""
         health_config = self.config_loader.get_health_checks()
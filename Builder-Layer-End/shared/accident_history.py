@@ -0,0 +1,249 @@
+"""
+Append-only, time-partitioned accident detection history.
+
+Detections are appended as NDJSON lines to one file per UTC day
+(``<prefix>-YYYY-MM-DD.ndjson``):
+
+- Writing a run's detections appends to the day's partition; nothing is
+  rewritten
+- Retention deletes whole partitions older than the cutoff
+- Queries ("detections for camera X between T1 and T2") only read the
+  partitions overlapping the requested window
+
+Used by AccidentDetectionAgent to record detections and by
+IncidentReportGenerator to look up related incidents without Neo4j.
+"""
+
+import json
+import logging
+import re
+import threading
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+Timestamp = Union[str, datetime]
+
+
+def parse_timestamp(value: Timestamp) -> Optional[datetime]:
+    """
+    Parse an ISO 8601 timestamp as an aware UTC datetime.
+
+    Args:
+        value: ISO string (with or without 'Z'/offset) or datetime;
+            naive values are taken as UTC
+
+    Returns:
+        Aware datetime, or None if the value cannot be parsed
+    """
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        try:
+            parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+class AccidentHistoryStore:
+    """
+    Daily NDJSON partitions of accident detection records.
+
+    Records are dicts with at least a ``timestamp`` (ISO 8601) and a
+    ``camera`` key; other keys are stored as-is.
+    """
+
+    def __init__(self, directory: str, prefix: str = "accidents"):
+        """
+        Initialize store.
+
+        Args:
+            directory: Directory holding the partition files
+            prefix: Partition file name prefix
+        """
+        self.directory = Path(directory)
+        self.prefix = prefix
+        self._pattern = re.compile(
+            rf"^{re.escape(prefix)}-(\d{{4}}-\d{{2}}-\d{{2}})\.ndjson$"
+        )
+        self._lock = threading.Lock()
+
+    def partition_path(self, day: date) -> Path:
+        """Path of the partition holding records of a UTC day"""
+        return self.directory / f"{self.prefix}-{day.isoformat()}.ndjson"
+
+    def partitions(self) -> List[Tuple[date, Path]]:
+        """
+        Existing partitions.
+
+        Returns:
+            (day, path) pairs sorted by day
+        """
+        if not self.directory.is_dir():
+            return []
+        found = []
+        for path in self.directory.iterdir():
+            match = self._pattern.match(path.name)
+            if match:
+                found.append((date.fromisoformat(match.group(1)), path))
+        return sorted(found)
+
+    def append(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        Append records to their day partitions.
+
+        Args:
+            records: Detection records
+
+        Returns:
+            Number of records written (records without a valid timestamp
+            are skipped)
+        """
+        by_day: Dict[date, List[str]] = {}
+        for record in records:
+            ts = parse_timestamp(record.get("timestamp", ""))
+            if ts is None:
+                logger.warning(
+                    f"Skipping history record without valid timestamp: {record}"
+                )
+                continue
+            by_day.setdefault(ts.date(), []).append(
+                json.dumps(record, ensure_ascii=False)
+            )
+
+        if not by_day:
+            return 0
+
+        written = 0
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            for day, lines in by_day.items():
+                with open(self.partition_path(day), "a", encoding="utf-8") as f:
+                    f.write("\n".join(lines) + "\n")
+                written += len(lines)
+        return written
+
+    def query(
+        self,
+        camera: Optional[str] = None,
+        start: Optional[Timestamp] = None,
+        end: Optional[Timestamp] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Detections for a camera within a time window.
+
+        Args:
+            camera: Camera reference (None for all cameras)
+            start: Window start, inclusive (None for unbounded)
+            end: Window end, inclusive (None for unbounded)
+            limit: Maximum records returned, newest kept
+
+        Returns:
+            Matching records in chronological order
+        """
+        start_ts = parse_timestamp(start) if start is not None else None
+        end_ts = parse_timestamp(end) if end is not None else None
+
+        matches = []
+        for record, ts in self._scan(start_ts, end_ts):
+            if camera is not None and record.get("camera") != camera:
+                continue
+            if start_ts is not None and ts < start_ts:
+                continue
+            if end_ts is not None and ts > end_ts:
+                continue
+            matches.append((ts, record))
+
+        matches.sort(key=lambda item: item[0])
+        records = [record for _, record in matches]
+        if limit is not None:
+            records = records[-limit:] if limit > 0 else []
+        return records
+
+    def drop_before(self, cutoff: Timestamp) -> int:
+        """
+        Delete partitions whose whole day is before the cutoff.
+
+        Args:
+            cutoff: Oldest timestamp to keep
+
+        Returns:
+            Number of partitions deleted
+        """
+        cutoff_ts = parse_timestamp(cutoff)
+        if cutoff_ts is None:
+            raise ValueError(f"Invalid cutoff timestamp: {cutoff}")
+
+        dropped = 0
+        with self._lock:
+            for day, path in self.partitions():
+                if day >= cutoff_ts.date():
+                    break
+                try:
+                    path.unlink()
+                    dropped += 1
+                except OSError as e:
+                    logger.error(f"Failed to delete history partition {path}: {e}")
+        if dropped:
+            logger.info(
+                f"Dropped {dropped} history partition(s) before {cutoff_ts.date()}"
+            )
+        return dropped
+
+    def apply_retention(self, retention_days: int) -> int:
+        """Delete partitions older than the retention period"""
+        return self.drop_before(
+            datetime.now(timezone.utc) - timedelta(days=retention_days)
+        )
+
+    def import_json(self, path: str) -> int:
+        """
+        Import a legacy JSON-array history file.
+
+        Args:
+            path: File holding a JSON list of detection records
+
+        Returns:
+            Number of records imported
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                records = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to import history file {path}: {e}")
+            return 0
+        if not isinstance(records, list):
+            return 0
+        return self.append(r for r in records if isinstance(r, dict))
+
+    def _scan(
+        self, start: Optional[datetime], end: Optional[datetime]
+    ) -> Iterator[Tuple[Dict[str, Any], datetime]]:
+        """Records of the partitions overlapping [start, end]"""
+        for day, path in self.partitions():
+            if start is not None and day < start.date():
+                continue
+            if end is not None and day > end.date():
+                break
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            # Torn last line of an interrupted append
+                            logger.warning(f"Skipping malformed line in {path}")
+                            continue
+                        ts = parse_timestamp(record.get("timestamp", ""))
+                        if ts is not None:
+                            yield record, ts
+            except OSError as e:
+                logger.error(f"Failed to read history partition {path}: {e}")
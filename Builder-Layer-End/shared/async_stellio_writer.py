@@ -0,0 +1,401 @@
+"""
+Asynchronous Stellio writer for analytics write fan-out.
+
+Replaces per-agent thread pools of blocking requests with aiohttp on a single
+event loop:
+
+- One background event loop thread per process, shared by all writers
+- One writer (connection pool + semaphore) per Stellio base URL
+- Batched NGSI-LD upserts (entityOperations/upsert), falling back to
+  per-entity POST when the broker does not support the batch endpoint
+- Concurrent attribute PATCHes bounded by the broker semaphore
+- Retry with backoff for transient failures (stellio.client.retry settings)
+
+Agents call the synchronous facade (patch_entities / upsert_entities) so their
+existing main() entry points stay synchronous.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import aiohttp
+
+from shared.stellio_client import DEFAULT_SETTINGS, load_client_settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEADERS = {"Content-Type": "application/ld+json"}
+UNSUPPORTED_BATCH_STATUS = (404, 405, 501)
+
+
+@dataclass
+class WriteResult:
+    """
+    Outcome of one entity write.
+
+    Attributes:
+        entity_id: NGSI-LD entity ID
+        success: Whether Stellio accepted the write
+        status_code: HTTP status code (None on connection errors)
+        error: Error message if failed
+    """
+
+    entity_id: str
+    success: bool
+    status_code: Optional[int] = None
+    error: Optional[str] = None
+
+
+class _EventLoopThread:
+    """Process-wide event loop running in a daemon thread."""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(
+            target=self.loop.run_forever, name="stellio-writer-loop", daemon=True
+        )
+        self.thread.start()
+
+    def run(self, coro):
+        """Run a coroutine on the loop and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+
+_loop_thread: Optional[_EventLoopThread] = None
+_loop_lock = threading.Lock()
+
+
+def _get_loop_thread() -> _EventLoopThread:
+    global _loop_thread
+    with _loop_lock:
+        if _loop_thread is None:
+            _loop_thread = _EventLoopThread()
+        return _loop_thread
+
+
+class AsyncStellioWriter:
+    """
+    aiohttp writer for one Stellio instance.
+
+    All requests go through one connection pool and are bounded by one
+    semaphore, however many agents write to the broker at once.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        max_concurrency: int = 64,
+        upsert_endpoint: str = "/ngsi-ld/v1/entityOperations/upsert",
+        batch_size: int = 100,
+        retry: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Initialize writer.
+
+        Args:
+            base_url: Stellio base URL
+            max_concurrency: Maximum requests in flight to this broker
+            upsert_endpoint: NGSI-LD batch upsert endpoint
+            batch_size: Entities per batch upsert request
+            retry: Retry settings (see stellio_client.DEFAULT_SETTINGS)
+        """
+        self.base_url = base_url.rstrip("/")
+        self.max_concurrency = max_concurrency
+        self.upsert_endpoint = upsert_endpoint
+        self.batch_size = batch_size
+        self.retry = {**DEFAULT_SETTINGS["retry"], **(retry or {})}
+        self.batch_supported = True
+
+        # Created on the writer loop on first use
+        self._http: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    # ------------------------------------------------------------------
+    # Synchronous facade
+    # ------------------------------------------------------------------
+
+    def patch_entities(
+        self,
+        updates: List[Tuple[str, str, Dict[str, Any]]],
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = 10,
+    ) -> List[WriteResult]:
+        """
+        PATCH entity attributes concurrently.
+
+        Args:
+            updates: (entity ID, URL, payload) triples
+            headers: Request headers
+            timeout: Per-request timeout in seconds
+
+        Returns:
+            One WriteResult per update, in input order
+        """
+        if not updates:
+            return []
+        return _get_loop_thread().run(
+            self.patch_entities_async(updates, headers or DEFAULT_HEADERS, timeout)
+        )
+
+    def upsert_entities(
+        self,
+        entities: List[Dict[str, Any]],
+        create_url: str,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = 10,
+        batch_size: Optional[int] = None,
+    ) -> List[WriteResult]:
+        """
+        Upsert entities in batches, concurrently.
+
+        Args:
+            entities: NGSI-LD entities
+            create_url: Per-entity POST URL, used if batch upsert is unsupported
+            headers: Request headers
+            timeout: Per-request timeout in seconds
+            batch_size: Entities per upsert request (default: writer batch_size)
+
+        Returns:
+            One WriteResult per entity, in input order
+        """
+        if not entities:
+            return []
+        return _get_loop_thread().run(
+            self.upsert_entities_async(
+                entities,
+                create_url,
+                headers or DEFAULT_HEADERS,
+                timeout,
+                batch_size or self.batch_size,
+            )
+        )
+
+    def close(self) -> None:
+        """Close the writer's connection pool."""
+        if self._http is not None:
+            _get_loop_thread().run(self._http.close())
+            self._http = None
+
+    # ------------------------------------------------------------------
+    # Coroutines
+    # ------------------------------------------------------------------
+
+    async def patch_entities_async(
+        self,
+        updates: List[Tuple[str, str, Dict[str, Any]]],
+        headers: Dict[str, str],
+        timeout: float,
+    ) -> List[WriteResult]:
+        """Coroutine behind patch_entities()."""
+        return list(
+            await asyncio.gather(
+                *(
+                    self._write_one("PATCH", entity_id, url, payload, headers, timeout)
+                    for entity_id, url, payload in updates
+                )
+            )
+        )
+
+    async def upsert_entities_async(
+        self,
+        entities: List[Dict[str, Any]],
+        create_url: str,
+        headers: Dict[str, str],
+        timeout: float,
+        batch_size: int,
+    ) -> List[WriteResult]:
+        """Coroutine behind upsert_entities()."""
+        batches = [
+            entities[i : i + batch_size] for i in range(0, len(entities), batch_size)
+        ]
+        batch_results = await asyncio.gather(
+            *(
+                self._upsert_batch(batch, create_url, headers, timeout)
+                for batch in batches
+            )
+        )
+        return [result for results in batch_results for result in results]
+
+    async def _upsert_batch(
+        self,
+        batch: List[Dict[str, Any]],
+        create_url: str,
+        headers: Dict[str, str],
+        timeout: float,
+    ) -> List[WriteResult]:
+        if self.batch_supported:
+            url = f"{self.base_url}{self.upsert_endpoint}"
+            status, body, error = await self._request(
+                "POST", url, batch, headers, timeout
+            )
+
+            if status in UNSUPPORTED_BATCH_STATUS:
+                logger.warning(
+                    f"Batch upsert not supported ({status}), using per-entity POST"
+                )
+                self.batch_supported = False
+            else:
+                return self._batch_results(batch, status, body, error)
+
+        return list(
+            await asyncio.gather(
+                *(
+                    self._write_one(
+                        "POST", entity["id"], create_url, entity, headers, timeout
+                    )
+                    for entity in batch
+                )
+            )
+        )
+
+    @staticmethod
+    def _batch_results(
+        batch: List[Dict[str, Any]],
+        status: Optional[int],
+        body: Any,
+        error: Optional[str],
+    ) -> List[WriteResult]:
+        """Map a batch upsert response to per-entity results."""
+        if status in (200, 201, 204):
+            return [WriteResult(entity["id"], True, status) for entity in batch]
+
+        if status == 207 and isinstance(body, dict):
+            errors = {
+                e.get("entityId"): str(e.get("error"))
+                for e in body.get("errors", [])
+                if isinstance(e, dict)
+            }
+            return [
+                WriteResult(
+                    entity["id"],
+                    entity["id"] not in errors,
+                    status,
+                    errors.get(entity["id"]),
+                )
+                for entity in batch
+            ]
+
+        return [WriteResult(entity["id"], False, status, error) for entity in batch]
+
+    async def _write_one(
+        self,
+        method: str,
+        entity_id: str,
+        url: str,
+        payload: Any,
+        headers: Dict[str, str],
+        timeout: float,
+    ) -> WriteResult:
+        status, _, error = await self._request(method, url, payload, headers, timeout)
+        success = status is not None and 200 <= status < 300
+        return WriteResult(entity_id, success, status, None if success else error)
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        payload: Any,
+        headers: Dict[str, str],
+        timeout: float,
+    ) -> Tuple[Optional[int], Any, Optional[str]]:
+        """
+        Send one request under the broker semaphore, retrying transient failures.
+
+        Batch upserts are idempotent, so POST to the upsert endpoint is
+        retried like PATCH; per-entity creation POSTs are not.
+
+        Returns:
+            Tuple of (status code or None, parsed JSON body or None, error text)
+        """
+        http, semaphore = self._ensure_session()
+        retryable = method != "POST" or url.endswith(self.upsert_endpoint)
+        max_attempts = self.retry["max_attempts"] if retryable else 1
+        attempt = 0
+
+        while True:
+            attempt += 1
+            try:
+                async with semaphore:
+                    async with http.request(
+                        method,
+                        url,
+                        json=payload,
+                        headers=headers,
+                        timeout=aiohttp.ClientTimeout(total=timeout),
+                    ) as response:
+                        status = response.status
+                        text = await response.text()
+                        is_json = response.content_type.endswith("json")
+                body = None
+                if text and is_json:
+                    try:
+                        body = json.loads(text)
+                    except ValueError:
+                        body = None
+                error = None if status < 400 else text or f"HTTP {status}"
+                if (
+                    status not in self.retry["retry_status_codes"]
+                    or attempt >= max_attempts
+                ):
+                    return status, body, error
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt >= max_attempts:
+                    return None, None, str(e) or type(e).__name__
+
+            delay = min(
+                self.retry["initial_delay"]
+                * self.retry["backoff_factor"] ** (attempt - 1),
+                self.retry["max_delay"],
+            )
+            logger.warning(
+                f"{method} {url} failed (attempt {attempt}), retrying in {delay:.1f}s"
+            )
+            await asyncio.sleep(delay)
+
+    def _ensure_session(self) -> Tuple[aiohttp.ClientSession, asyncio.Semaphore]:
+        if self._http is None or self._http.closed:
+            self._http = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency)
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._http, self._semaphore
+
+
+_writers: Dict[str, AsyncStellioWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_async_writer(base_url: str, max_concurrency: int = 64) -> AsyncStellioWriter:
+    """
+    Get the process-wide async writer for a Stellio instance.
+
+    Args:
+        base_url: Stellio base URL
+        max_concurrency: In-flight request limit, used when the writer is created
+
+    Returns:
+        Shared AsyncStellioWriter
+    """
+    key = base_url.rstrip("/")
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            writer = AsyncStellioWriter(
+                key,
+                max_concurrency=max_concurrency,
+                retry=load_client_settings().get("retry"),
+            )
+            _writers[key] = writer
+        return writer
+
+
+def close_async_writers() -> None:
+    """Close all shared writers (e.g. at process exit)."""
+    with _writers_lock:
+        for writer in _writers.values():
+            writer.close()
+        _writers.clear()
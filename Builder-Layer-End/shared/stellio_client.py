@@ -0,0 +1,405 @@
+"""
+Shared Stellio HTTP client.
+
+One pooled client per Stellio base URL per process, used by every agent that
+talks to the context broker. Provides:
+
+- A single tuned connection pool (grown to the largest size any agent asks for)
+- Optional HTTP/2 through httpx (falls back to HTTP/1.1 keep-alive)
+- Unified retry with exponential backoff for transient failures
+- Per-endpoint latency metrics
+
+The client is a ``requests.Session``, so agents keep calling
+``session.get/post/patch/delete`` and handle ``requests`` exceptions and
+responses as before.
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+import yaml
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import select_proxy
+
+try:
+    import httpx
+
+    HTTPX_AVAILABLE = True
+except ImportError:
+    httpx = None
+    HTTPX_AVAILABLE = False
+
+
+logger = logging.getLogger(__name__)
+
+# Client settings are read from this file's ``stellio.client`` section
+CLIENT_CONFIG_PATH = os.environ.get("STELLIO_CLIENT_CONFIG", "config/stellio.yaml")
+
+DEFAULT_SETTINGS: Dict[str, Any] = {
+    "pool_size": 10,
+    "http2": False,
+    "retry": {
+        "max_attempts": 3,
+        "initial_delay": 0.5,
+        "backoff_factor": 2,
+        "max_delay": 10,
+        # Transient gateway/throttling statuses; other errors are returned as-is
+        "retry_status_codes": [429, 502, 503, 504],
+        # POST is not idempotent; agents that can safely resend a POST retry it themselves
+        "retry_methods": ["GET", "HEAD", "OPTIONS", "PUT", "PATCH", "DELETE"],
+    },
+}
+
+_ID_SEGMENT = re.compile(r"^(urn:|https?%3A)", re.IGNORECASE)
+
+
+def endpoint_key(method: str, url: str) -> str:
+    """
+    Metrics key of a request: method and path with entity IDs templated.
+
+    Args:
+        method: HTTP method
+        url: Request URL
+
+    Returns:
+        Key such as 'PATCH /ngsi-ld/v1/entities/{id}/attrs'
+
+    Example:
+        >>> endpoint_key('get', 'http://stellio:8080/ngsi-ld/v1/entities/urn:ngsi-ld:Camera:1')
+        'GET /ngsi-ld/v1/entities/{id}'
+    """
+    segments = [
+        "{id}" if _ID_SEGMENT.match(segment) else segment
+        for segment in urlparse(url).path.split("/")
+    ]
+    return f"{method.upper()} {'/'.join(segments)}"
+
+
+class HTTPXAdapter(BaseAdapter):
+    """
+    requests transport adapter that sends through an HTTP/2 httpx client.
+
+    All requests to a host share one multiplexed HTTP/2 connection. httpx
+    only takes TLS and proxy settings per client, so one client is kept per
+    distinct ``verify``/``cert``/proxy combination passed to send(). httpx
+    errors are raised as the equivalent ``requests`` exceptions.
+    """
+
+    def __init__(self, pool_size: int):
+        """
+        Initialize adapter.
+
+        Args:
+            pool_size: Maximum connections kept alive
+
+        Raises:
+            ImportError: If httpx or its HTTP/2 support (h2) is missing
+        """
+        super().__init__()
+        if not HTTPX_AVAILABLE:
+            raise ImportError("httpx is required for HTTP/2")
+        self.pool_size = pool_size
+        self._clients: Dict[Tuple[Any, Any, Optional[str]], Any] = {}
+        self._clients_lock = threading.Lock()
+        self.client = self._client(True, None, None)
+
+    def _client(self, verify: Any, cert: Any, proxy: Optional[str]) -> Any:
+        """
+        Get (or create) the httpx client for a TLS/proxy combination.
+
+        Args:
+            verify: CA bundle path or whether to verify certificates
+            cert: Client certificate path or (cert, key) pair
+            proxy: Proxy URL, or None for a direct connection
+
+        Returns:
+            httpx.Client
+        """
+        key = (verify, tuple(cert) if isinstance(cert, list) else cert, proxy)
+        with self._clients_lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = httpx.Client(
+                    http2=True,
+                    verify=verify,
+                    cert=cert,
+                    proxy=proxy,
+                    limits=httpx.Limits(
+                        max_connections=self.pool_size,
+                        max_keepalive_connections=self.pool_size,
+                    ),
+                )
+                self._clients[key] = client
+            return client
+
+    def send(
+        self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None
+    ):
+        if isinstance(timeout, tuple):
+            timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+        client = self._client(verify, cert, select_proxy(request.url, proxies or {}))
+        try:
+            reply = client.request(
+                request.method,
+                request.url,
+                headers=dict(request.headers),
+                content=request.body,
+                timeout=timeout,
+            )
+        except httpx.ConnectTimeout as e:
+            raise requests.exceptions.ConnectTimeout(e, request=request)
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.ReadTimeout(e, request=request)
+        except httpx.HTTPError as e:
+            raise requests.exceptions.ConnectionError(e, request=request)
+
+        response = requests.Response()
+        response.status_code = reply.status_code
+        response.headers = CaseInsensitiveDict(reply.headers)
+        response._content = reply.content
+        response.encoding = reply.encoding
+        response.reason = reply.reason_phrase
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+    def close(self):
+        with self._clients_lock:
+            for client in self._clients.values():
+                client.close()
+
+
+class StellioClient(requests.Session):
+    """
+    Pooled, retrying, instrumented session for one Stellio instance.
+
+    Obtain instances through get_stellio_client(); agents share them and must
+    not close them. close() is therefore a no-op; shutdown() releases the
+    connections.
+    """
+
+    def __init__(self, base_url: str, settings: Optional[Dict[str, Any]] = None):
+        """
+        Initialize client.
+
+        Args:
+            base_url: Stellio base URL (e.g. 'http://stellio:8080')
+            settings: Client settings (see DEFAULT_SETTINGS)
+        """
+        super().__init__()
+        settings = settings or {}
+        self.base_url = base_url.rstrip("/")
+        self.pool_size = 0
+        self.http2 = False
+        self.retry = {**DEFAULT_SETTINGS["retry"], **settings.get("retry", {})}
+        self.retry_methods = {m.upper() for m in self.retry["retry_methods"]}
+        self.metrics: Dict[str, Dict[str, float]] = {}
+        self._metrics_lock = threading.Lock()
+        self._retired_adapters: List[BaseAdapter] = []
+
+        self._http2_requested = settings.get("http2", DEFAULT_SETTINGS["http2"])
+        self.ensure_pool_size(settings.get("pool_size", DEFAULT_SETTINGS["pool_size"]))
+
+    def ensure_pool_size(self, pool_size: int) -> None:
+        """
+        Grow the connection pool to at least ``pool_size`` connections.
+
+        The larger adapter is mounted in place of the old one. Other threads
+        may still be sending through the old adapter, so it is only closed
+        by shutdown().
+
+        Args:
+            pool_size: Connections the calling agent may use at once
+        """
+        if pool_size <= self.pool_size:
+            return
+        self.pool_size = pool_size
+
+        adapter: BaseAdapter
+        if self._http2_requested:
+            try:
+                adapter = HTTPXAdapter(pool_size)
+                self.http2 = True
+            except ImportError as e:
+                logger.warning(f"HTTP/2 unavailable ({e}), using HTTP/1.1 keep-alive")
+                self._http2_requested = False
+        if not self._http2_requested:
+            adapter = HTTPAdapter(
+                pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0
+            )
+
+        for prefix in ("http://", "https://"):
+            old = self.adapters.get(prefix)
+            self.mount(prefix, adapter)
+            if old is not None and old not in (adapter, *self._retired_adapters):
+                self._retired_adapters.append(old)
+
+    def request(self, method, url, *args, retry: bool = True, **kwargs):
+        """
+        Send a request, retrying transient failures with backoff.
+
+        Connection errors and retry_status_codes are retried for
+        retry_methods; the last response (or exception) is returned.
+        Callers with their own retry policy pass ``retry=False``.
+        """
+        method = method.upper()
+        key = endpoint_key(method, url)
+        retryable = retry and method in self.retry_methods
+        max_attempts = self.retry["max_attempts"] if retryable else 1
+        attempt = 0
+
+        while True:
+            attempt += 1
+            start_time = time.perf_counter()
+            try:
+                response = super().request(method, url, *args, **kwargs)
+            except requests.exceptions.RequestException:
+                self._record(
+                    key,
+                    time.perf_counter() - start_time,
+                    error=True,
+                    retried=attempt > 1,
+                )
+                if attempt >= max_attempts:
+                    raise
+            else:
+                status_retry = response.status_code in self.retry["retry_status_codes"]
+                self._record(
+                    key,
+                    time.perf_counter() - start_time,
+                    error=response.status_code >= 400,
+                    retried=attempt > 1,
+                )
+                if not status_retry or attempt >= max_attempts:
+                    return response
+
+            delay = min(
+                self.retry["initial_delay"]
+                * self.retry["backoff_factor"] ** (attempt - 1),
+                self.retry["max_delay"],
+            )
+            logger.warning(
+                f"{key} failed (attempt {attempt}), retrying in {delay:.1f}s"
+            )
+            time.sleep(delay)
+
+    def _record(self, key: str, seconds: float, error: bool, retried: bool) -> None:
+        with self._metrics_lock:
+            stats = self.metrics.setdefault(
+                key,
+                {
+                    "requests": 0,
+                    "errors": 0,
+                    "retries": 0,
+                    "total_seconds": 0.0,
+                    "max_seconds": 0.0,
+                },
+            )
+            stats["requests"] += 1
+            stats["errors"] += int(error)
+            stats["retries"] += int(retried)
+            stats["total_seconds"] += seconds
+            stats["max_seconds"] = max(stats["max_seconds"], seconds)
+
+    def get_metrics(self) -> Dict[str, Dict[str, float]]:
+        """
+        Latency metrics per endpoint.
+
+        Returns:
+            Endpoint key → requests, errors, retries, avg_ms and max_ms
+        """
+        with self._metrics_lock:
+            return {
+                key: {
+                    "requests": stats["requests"],
+                    "errors": stats["errors"],
+                    "retries": stats["retries"],
+                    "avg_ms": round(
+                        stats["total_seconds"] / stats["requests"] * 1000, 2
+                    ),
+                    "max_ms": round(stats["max_seconds"] * 1000, 2),
+                }
+                for key, stats in self.metrics.items()
+            }
+
+    def close(self) -> None:
+        """Shared client: kept open for the other agents of this process."""
+
+    def shutdown(self) -> None:
+        """Close all pooled connections."""
+        super().close()
+        for adapter in self._retired_adapters:
+            adapter.close()
+        self._retired_adapters.clear()
+
+
+_clients: Dict[str, StellioClient] = {}
+_clients_lock = threading.Lock()
+_settings: Optional[Dict[str, Any]] = None
+
+
+def load_client_settings(config_path: str = CLIENT_CONFIG_PATH) -> Dict[str, Any]:
+    """
+    Read the ``stellio.client`` section of the Stellio configuration.
+
+    Args:
+        config_path: Stellio configuration file
+
+    Returns:
+        Client settings (empty if the file or section is missing)
+    """
+    try:
+        with open(config_path, "r", encoding="utf-8") as f:
+            config = yaml.safe_load(f) or {}
+    except (OSError, yaml.YAMLError):
+        return {}
+    return (config.get("stellio") or {}).get("client") or {}
+
+
+def get_stellio_client(base_url: str, pool_size: Optional[int] = None) -> StellioClient:
+    """
+    Get the process-wide client for a Stellio instance.
+
+    Args:
+        base_url: Stellio base URL
+        pool_size: Connections the caller may use at once; the shared pool
+            grows to the largest size requested
+
+    Returns:
+        Shared StellioClient
+    """
+    global _settings
+    key = base_url.rstrip("/")
+
+    with _clients_lock:
+        if _settings is None:
+            _settings = load_client_settings()
+        client = _clients.get(key)
+        if client is None:
+            client = StellioClient(key, _settings)
+            _clients[key] = client
+            logger.info(
+                f"Created shared Stellio client for {key} "
+                f"(pool {client.pool_size}, {'HTTP/2' if client.http2 else 'HTTP/1.1'})"
+            )
+        if pool_size:
+            client.ensure_pool_size(pool_size)
+        return client
+
+
+def close_stellio_clients() -> None:
+    """Shut down all shared clients (e.g. at process exit)."""
+    global _settings
+    with _clients_lock:
+        for client in _clients.values():
+            client.shutdown()
+        _clients.clear()
+        _settings = None
@@ -2,15 +2,26 @@
 Kafka Entity Publisher Agent
 Publishes NGSI-LD entities directly to Kafka for Stellio consumption.
 Bypasses API Gateway by publishing to the same Kafka topic that search-service consumes.
+
+Entities are published in pipelined mode by default: sends are not awaited one
+by one, delivery callbacks record the outcome, the number of unacknowledged
+messages is bounded, and a single flush() at the end settles the batch.
 """
 
-from kafka import KafkaProducer
 import json
 import logging
+import threading
 import time
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime
 
+try:
+    from kafka import KafkaProducer
+    KAFKA_AVAILABLE = True
+except ImportError:
+    KafkaProducer = None
+    KAFKA_AVAILABLE = False
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -18,7 +29,7 @@ logger = logging.getLogger(__name__)
 class KafkaEntityPublisherAgent:
     """Agent that publishes NGSI-LD entities to Kafka for Stellio"""
     
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], producer: Optional[Any] = None):
         """
         Initialize Kafka Entity Publisher Agent
         
@@ -26,14 +37,33 @@ class KafkaEntityPublisherAgent:
             config: Configuration dictionary containing:
                 - kafka_bootstrap_servers: Kafka broker address (e.g., 'localhost:9092')
                 - kafka_topic: Kafka topic for entity events (default: 'cim.entity._CatchAll')
+                - mode: 'pipelined' (default) or 'sync' (wait for each acknowledgment)
+                - linger_ms: Time the producer waits to fill a batch (default: 20)
+                - batch_size: Producer batch size in bytes (default: 65536)
+                - compression_type: Batch compression (default: 'gzip')
+                - max_in_flight: Maximum unacknowledged messages (default: 1000)
+                - send_timeout: Seconds to wait for an ack or an in-flight slot (default: 10)
+                - flush_timeout: Seconds to wait for the final flush (default: 30)
+            producer: Pre-built producer (e.g. a mock in tests); created on connect() if None
         """
         self.config = config
         self.kafka_servers = config.get('kafka_bootstrap_servers', 'localhost:9092')
         self.kafka_topic = config.get('kafka_topic', 'cim.entity._CatchAll')
-        self.producer = None
+        self.mode = config.get('mode', 'pipelined')
+        self.linger_ms = config.get('linger_ms', 20)
+        self.batch_size = config.get('batch_size', 65536)
+        self.compression_type = config.get('compression_type', 'gzip')
+        self.max_in_flight = max(1, config.get('max_in_flight', 1000))
+        self.send_timeout = config.get('send_timeout', 10)
+        self.flush_timeout = config.get('flush_timeout', 30)
+        self.producer = producer
         
     def connect(self):
         """Establish connection to Kafka broker"""
+        if not KAFKA_AVAILABLE:
+            logger.error("✗ kafka-python not available - cannot connect to Kafka")
+            return False
+        
         try:
             logger.info(f"Connecting to Kafka at {self.kafka_servers}...")
             self.producer = KafkaProducer(
@@ -42,7 +72,10 @@ class KafkaEntityPublisherAgent:
                 key_serializer=lambda k: k.encode('utf-8') if k else None,
                 acks='all',  # Wait for all replicas
                 retries=3,
-                max_in_flight_requests_per_connection=1  # Ensure ordering
+                max_in_flight_requests_per_connection=1,  # Ensure ordering
+                linger_ms=self.linger_ms,  # Fill batches instead of one request per message
+                batch_size=self.batch_size,
+                compression_type=self.compression_type
             )
             logger.info("✓ Connected to Kafka successfully")
             return True
@@ -96,7 +129,7 @@ class KafkaEntityPublisherAgent:
             key = entity_id
             
             # Send to Kafka
-            logger.info(f"Publishing entity {entity_id} to topic {self.kafka_topic}...")
+            logger.debug(f"Publishing entity {entity_id} to topic {self.kafka_topic}...")
             future = self.producer.send(
                 topic=self.kafka_topic,
                 key=key,
@@ -104,9 +137,9 @@ class KafkaEntityPublisherAgent:
             )
             
             # Wait for acknowledgment (with timeout)
-            record_metadata = future.get(timeout=10)
+            record_metadata = future.get(timeout=self.send_timeout)
             
-            logger.info(
+            logger.debug(
                 f"✓ Published {entity_id} to partition {record_metadata.partition} "
                 f"at offset {record_metadata.offset}"
             )
@@ -120,6 +153,9 @@ class KafkaEntityPublisherAgent:
         """
         Publish multiple entities to Kafka
         
+        In pipelined mode (default) sends are not awaited individually; see
+        _publish_pipelined(). In 'sync' mode each send waits for its ack.
+        
         Args:
             entities: List of NGSI-LD entity dicts
             
@@ -141,29 +177,26 @@ class KafkaEntityPublisherAgent:
                 }
         
         total = len(entities)
-        published = 0
-        failed = 0
-        failed_entities = []
         
-        logger.info(f"Publishing {total} entities to Kafka topic {self.kafka_topic}...")
+        logger.info(f"Publishing {total} entities to Kafka topic {self.kafka_topic} ({self.mode} mode)...")
         
-        for i, entity in enumerate(entities, 1):
-            entity_id = entity.get("id", f"unknown-{i}")
-            logger.info(f"[{i}/{total}] Processing {entity_id}...")
+        if self.mode == 'sync':
+            failed_entities = []
+            for i, entity in enumerate(entities, 1):
+                if not self.publish_entity(entity):
+                    failed_entities.append({
+                        "id": entity.get("id", f"unknown-{i}"),
+                        "type": entity.get("type", "unknown")
+                    })
             
-            if self.publish_entity(entity):
-                published += 1
-            else:
-                failed += 1
-                failed_entities.append({
-                    "id": entity_id,
-                    "type": entity.get("type", "unknown")
-                })
-        
-        # Flush to ensure all messages are sent
-        logger.info("Flushing Kafka producer...")
-        self.producer.flush(timeout=30)
+            # Flush to ensure all messages are sent
+            logger.info("Flushing Kafka producer...")
+            self.producer.flush(timeout=self.flush_timeout)
+        else:
+            failed_entities = self._publish_pipelined(entities)
         
+        failed = len(failed_entities)
+        published = total - failed
         success_rate = (published / total * 100) if total > 0 else 0.0
         
         results = {
@@ -178,6 +211,85 @@ class KafkaEntityPublisherAgent:
         
         return results
     
+    def _publish_pipelined(self, entities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Send all entities without waiting for each acknowledgment
+        
+        Delivery callbacks release an in-flight slot and record failures, so
+        at most max_in_flight messages are unacknowledged at any time. A
+        single flush() settles the batch; messages still unacknowledged after
+        it are counted as failed.
+        
+        Args:
+            entities: List of NGSI-LD entity dicts
+            
+        Returns:
+            Failed entities as {"id", "type", "error"} dicts, in input order
+        """
+        slots = threading.BoundedSemaphore(self.max_in_flight)
+        lock = threading.Lock()
+        pending = {}
+        failures = {}
+        
+        def on_success(index, record_metadata):
+            with lock:
+                pending.pop(index, None)
+            slots.release()
+        
+        def on_error(index, exc):
+            with lock:
+                if pending.pop(index, None) is not None:
+                    failures[index] = str(exc)
+            slots.release()
+        
+        for i, entity in enumerate(entities):
+            if not slots.acquire(timeout=self.send_timeout):
+                failures[i] = "Timed out waiting for an in-flight slot"
+                continue
+            
+            with lock:
+                pending[i] = True
+            
+            try:
+                future = self.producer.send(
+                    topic=self.kafka_topic,
+                    key=entity.get("id", "unknown"),
+                    value=self._create_entity_event(entity, operation="ENTITY_CREATE")
+                )
+            except Exception as e:
+                with lock:
+                    pending.pop(i, None)
+                    failures[i] = str(e)
+                slots.release()
+                continue
+            
+            future.add_callback(on_success, i)
+            future.add_errback(on_error, i)
+        
+        # One flush for the whole batch
+        logger.info("Flushing Kafka producer...")
+        try:
+            self.producer.flush(timeout=self.flush_timeout)
+        except Exception as e:
+            logger.error(f"✗ Kafka flush failed: {e}")
+        
+        with lock:
+            for index in pending:
+                failures[index] = "Delivery not confirmed before flush timeout"
+            pending.clear()
+        
+        failed_entities = []
+        for index in sorted(failures):
+            entity = entities[index]
+            failed_entities.append({
+                "id": entity.get("id", f"unknown-{index + 1}"),
+                "type": entity.get("type", "unknown"),
+                "error": failures[index]
+            })
+            logger.error(f"✗ Failed to publish entity {failed_entities[-1]['id']}: {failures[index]}")
+        
+        return failed_entities
+    
     def close(self):
         """Close Kafka producer connection"""
         if self.producer:
@@ -0,0 +1,1013 @@
+"""
+Streaming Workflow Orchestrator
+
+Runs the pipeline as a chain of topic consumers/producers instead of phases
+that hand off through files polled by the batch orchestrator:
+
+    collection ──► cameras.raw ──► transformation ──► entities.ngsi ──┐
+                        │                                              ├──► publishing
+                        └──────► analytics ──────► observations ───────┘
+                                                         │
+                                                         └──► congestion ──► congestion
+
+- Every record is keyed by camera id, so all records of one camera land on
+  the same partition and are processed in order
+- Each stage is a consumer group; a stage scales horizontally by adding
+  workers (threads here, or more processes/hosts with the Kafka transport)
+- Two stages reading the same topic (transformation and analytics both read
+  cameras.raw) use different groups and each sees every record
+- InMemoryBroker is an in-process broker with partitions, consumer groups
+  and committed offsets, used for tests and single-host runs
+- KafkaTransport uses the same topics on a real Kafka cluster
+
+The batch WorkflowOrchestrator stays the default; this mode is used when the
+``streaming`` section of workflow.yaml is enabled.
+
+Author: LOD Pipeline Team
+Date: 2025-11-01
+"""
+
+import asyncio
+import importlib
+import json
+import logging
+import threading
+import time
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from kafka import KafkaConsumer, KafkaProducer
+
+    KAFKA_AVAILABLE = True
+except ImportError:
+    KafkaConsumer = None
+    KafkaProducer = None
+    KAFKA_AVAILABLE = False
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StreamRecord:
+    """Record read from a topic partition"""
+
+    topic: str
+    partition: int
+    offset: int
+    key: Optional[str]
+    value: Any
+
+
+# ============================================================================
+# TRANSPORTS
+# ============================================================================
+
+
+class InMemoryBroker:
+    """
+    In-process broker with keyed partitions and consumer groups
+
+    Topics are created on first use. A record's partition is derived from its
+    key, so records with the same key keep their relative order. Partitions of
+    a group's topics are spread round-robin over the group's live members and
+    re-spread whenever a member joins or leaves; a partition with uncommitted
+    reads stays with its reader until it commits, so a rebalance never hands
+    out records twice. Offsets are committed per group, so every group reads
+    every record once.
+    """
+
+    def __init__(self, num_partitions: int = 4):
+        """
+        Initialize broker
+
+        Args:
+            num_partitions: Partitions per topic
+        """
+        self.num_partitions = max(1, num_partitions)
+        self._logs: Dict[str, List[List[StreamRecord]]] = {}
+        self._committed: Dict[Tuple[str, str, int], int] = defaultdict(int)
+        self._readers: Dict[Tuple[str, str, int], str] = {}
+        self._members: Dict[str, List[str]] = defaultdict(list)
+        self._next_member = 0
+        self._cond = threading.Condition()
+
+    def _topic(self, topic: str) -> List[List[StreamRecord]]:
+        """Get (or create) a topic's partition logs; caller holds the lock"""
+        if topic not in self._logs:
+            self._logs[topic] = [[] for _ in range(self.num_partitions)]
+        return self._logs[topic]
+
+    def partition_for(self, key: Optional[str]) -> int:
+        """Stable partition for a record key"""
+        if key is None:
+            return 0
+        return zlib.crc32(str(key).encode("utf-8")) % self.num_partitions
+
+    def send(self, topic: str, key: Optional[str], value: Any) -> StreamRecord:
+        """
+        Append a record to a topic
+
+        Args:
+            topic: Topic name
+            key: Record key (camera id)
+            value: JSON-serialisable value
+
+        Returns:
+            The appended record
+        """
+        with self._cond:
+            partition = self.partition_for(key)
+            log = self._topic(topic)[partition]
+            record = StreamRecord(topic, partition, len(log), key, value)
+            log.append(record)
+            self._cond.notify_all()
+            return record
+
+    def flush(self) -> None:
+        """Records are appended synchronously; nothing to flush"""
+
+    def subscribe(self, topics: List[str], group_id: str) -> "InMemoryConsumer":
+        """
+        Join a consumer group
+
+        Args:
+            topics: Topics to consume
+            group_id: Consumer group
+
+        Returns:
+            Consumer bound to this broker
+        """
+        with self._cond:
+            for topic in topics:
+                self._topic(topic)
+            member_id = f"{group_id}-{self._next_member}"
+            self._next_member += 1
+            self._members[group_id].append(member_id)
+            self._cond.notify_all()
+        return InMemoryConsumer(self, list(topics), group_id, member_id)
+
+    def _leave(self, group_id: str, member_id: str) -> None:
+        with self._cond:
+            if member_id in self._members[group_id]:
+                self._members[group_id].remove(member_id)
+            for claim, reader in list(self._readers.items()):
+                if reader == member_id:
+                    del self._readers[claim]
+            self._cond.notify_all()
+
+    def _assignment(
+        self, topics: List[str], group_id: str, member_id: str
+    ) -> List[Tuple[str, int]]:
+        """Partitions owned by a member; caller holds the lock"""
+        members = self._members[group_id]
+        if member_id not in members:
+            return []
+        index = members.index(member_id)
+        pairs = [
+            (topic, p) for topic in sorted(topics) for p in range(self.num_partitions)
+        ]
+        return pairs[index :: len(members)]
+
+    def _poll(
+        self, consumer: "InMemoryConsumer", max_records: int, timeout: float
+    ) -> List[StreamRecord]:
+        deadline = time.time() + timeout
+        with self._cond:
+            while True:
+                records = []
+                for topic, partition in self._assignment(
+                    consumer.topics, consumer.group_id, consumer.member_id
+                ):
+                    claim = (consumer.group_id, topic, partition)
+                    if (
+                        self._readers.get(claim, consumer.member_id)
+                        != consumer.member_id
+                    ):
+                        continue
+                    start = self._committed[claim]
+                    log = self._logs[topic][partition]
+                    batch = log[start : start + max_records - len(records)]
+                    if batch:
+                        records.extend(batch)
+                        self._readers[claim] = consumer.member_id
+                        consumer._pending[(topic, partition)] = batch[-1].offset + 1
+                    if len(records) >= max_records:
+                        break
+
+                remaining = deadline - time.time()
+                if records or remaining <= 0:
+                    return records
+                self._cond.wait(remaining)
+
+    def _commit(self, consumer: "InMemoryConsumer") -> None:
+        with self._cond:
+            for (topic, partition), offset in consumer._pending.items():
+                self._committed[(consumer.group_id, topic, partition)] = offset
+                self._readers.pop((consumer.group_id, topic, partition), None)
+            consumer._pending.clear()
+            self._cond.notify_all()
+
+    def _rewind(self, consumer: "InMemoryConsumer") -> None:
+        with self._cond:
+            for topic, partition in consumer._pending:
+                self._readers.pop((consumer.group_id, topic, partition), None)
+            consumer._pending.clear()
+            self._cond.notify_all()
+
+    def lag(self, topics: List[str], group_id: str) -> int:
+        """
+        Records not yet committed by a group
+
+        Args:
+            topics: Topics to check
+            group_id: Consumer group
+
+        Returns:
+            Uncommitted record count across all partitions
+        """
+        with self._cond:
+            return sum(
+                len(log) - self._committed[(group_id, topic, partition)]
+                for topic in topics
+                for partition, log in enumerate(self._topic(topic))
+            )
+
+    def records(self, topic: str) -> List[StreamRecord]:
+        """All records of a topic, partition by partition (for inspection)"""
+        with self._cond:
+            return [record for log in self._topic(topic) for record in log]
+
+    def close(self) -> None:
+        """Nothing to release"""
+
+
+class InMemoryConsumer:
+    """Consumer group member of an InMemoryBroker"""
+
+    def __init__(
+        self, broker: InMemoryBroker, topics: List[str], group_id: str, member_id: str
+    ):
+        self.broker = broker
+        self.topics = topics
+        self.group_id = group_id
+        self.member_id = member_id
+        self._pending: Dict[Tuple[str, int], int] = {}
+
+    def poll(self, max_records: int = 100, timeout: float = 0.5) -> List[StreamRecord]:
+        """
+        Read uncommitted records from the member's partitions
+
+        Records are returned again until commit() is called.
+        """
+        return self.broker._poll(self, max_records, timeout)
+
+    def commit(self) -> None:
+        """Commit the offsets of the last poll"""
+        self.broker._commit(self)
+
+    def rewind(self) -> None:
+        """Drop the last poll so its records are read again (by any member)"""
+        self.broker._rewind(self)
+
+    def lag(self) -> int:
+        """Records the whole group has not committed yet"""
+        return self.broker.lag(self.topics, self.group_id)
+
+    def close(self) -> None:
+        """Leave the consumer group"""
+        self.broker._leave(self.group_id, self.member_id)
+
+
+class KafkaTransport:
+    """
+    Kafka-backed transport
+
+    Records are JSON-encoded and keyed by camera id; Kafka's default key
+    partitioner keeps each camera on one partition. Each stage worker is a
+    KafkaConsumer in the stage's consumer group, so more workers (in this or
+    other processes) share the partitions.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        """
+        Initialize transport
+
+        Args:
+            config: Kafka settings:
+                - bootstrap_servers: Broker address (default: 'localhost:9092')
+                - linger_ms: Producer batching delay (default: 20)
+                - compression_type: Batch compression (default: 'gzip')
+        """
+        if not KAFKA_AVAILABLE:
+            raise ImportError("kafka-python is required for the Kafka transport")
+
+        self.bootstrap_servers = config.get("bootstrap_servers", "localhost:9092")
+        self.producer = KafkaProducer(
+            bootstrap_servers=self.bootstrap_servers,
+            value_serializer=lambda v: json.dumps(v, ensure_ascii=False).encode(
+                "utf-8"
+            ),
+            key_serializer=lambda k: k.encode("utf-8") if k else None,
+            acks="all",
+            linger_ms=config.get("linger_ms", 20),
+            compression_type=config.get("compression_type", "gzip"),
+        )
+
+    def send(self, topic: str, key: Optional[str], value: Any) -> None:
+        """Queue a record for the topic"""
+        self.producer.send(topic, key=key, value=value)
+
+    def flush(self) -> None:
+        """Wait until all queued records are acknowledged"""
+        self.producer.flush()
+
+    def subscribe(self, topics: List[str], group_id: str) -> "KafkaStreamConsumer":
+        """Join a consumer group"""
+        consumer = KafkaConsumer(
+            *topics,
+            bootstrap_servers=self.bootstrap_servers,
+            group_id=group_id,
+            enable_auto_commit=False,
+            auto_offset_reset="earliest",
+            key_deserializer=lambda k: k.decode("utf-8") if k else None,
+            value_deserializer=lambda v: json.loads(v.decode("utf-8")),
+        )
+        return KafkaStreamConsumer(consumer)
+
+    def close(self) -> None:
+        """Flush and close the producer"""
+        self.producer.flush()
+        self.producer.close()
+
+
+class KafkaStreamConsumer:
+    """Adapter exposing a KafkaConsumer through the transport interface"""
+
+    def __init__(self, consumer: Any):
+        self.consumer = consumer
+        self._first_offsets: Dict[Any, int] = {}
+
+    def poll(self, max_records: int = 100, timeout: float = 0.5) -> List[StreamRecord]:
+        """Read the next records from the assigned partitions"""
+        batches = self.consumer.poll(
+            timeout_ms=int(timeout * 1000), max_records=max_records
+        )
+        for tp, messages in batches.items():
+            if messages:
+                self._first_offsets.setdefault(tp, messages[0].offset)
+        return [
+            StreamRecord(msg.topic, msg.partition, msg.offset, msg.key, msg.value)
+            for messages in batches.values()
+            for msg in messages
+        ]
+
+    def commit(self) -> None:
+        """Commit the offsets of the last poll"""
+        self.consumer.commit()
+        self._first_offsets.clear()
+
+    def rewind(self) -> None:
+        """Seek back to the first uncommitted record of every polled partition"""
+        for tp, offset in self._first_offsets.items():
+            self.consumer.seek(tp, offset)
+        self._first_offsets.clear()
+
+    def lag(self) -> int:
+        """Records behind the end of the currently assigned partitions"""
+        partitions = self.consumer.assignment()
+        if not partitions:
+            return 0
+        end_offsets = self.consumer.end_offsets(list(partitions))
+        return sum(end_offsets[tp] - self.consumer.position(tp) for tp in partitions)
+
+    def close(self) -> None:
+        """Leave the consumer group"""
+        self.consumer.close()
+
+
+# ============================================================================
+# STAGE HANDLERS
+# ============================================================================
+
+
+class StreamSource:
+    """Base class for stages that produce records without consuming a topic"""
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+
+    def records(self) -> Iterable[Tuple[str, Any]]:
+        """Yield (key, value) records"""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release resources"""
+
+
+class StreamBatchError(Exception):
+    """Raised by a handler when some records of a batch failed"""
+
+    def __init__(self, message: str, records: List[StreamRecord]):
+        super().__init__(message)
+        self.records = records
+
+
+class StreamHandler:
+    """Base class for stages that consume a topic"""
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+
+    def process(self, records: List[StreamRecord]) -> List[Tuple[str, Any]]:
+        """
+        Handle one polled batch
+
+        Args:
+            records: Records from the stage's input topics
+
+        Returns:
+            (key, value) records for the stage's output topic
+
+        Raises:
+            StreamBatchError: If some records failed (the batch is retried
+                and, once retries are exhausted, those records are
+                dead-lettered); any other exception fails the whole batch
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release resources"""
+
+
+class CameraFileSource(StreamSource):
+    """
+    Emits collected cameras to cameras.raw, keyed by camera id
+
+    Reads the collection output (config ``input_file``, default
+    data/cameras_enriched.json).
+    """
+
+    def records(self) -> Iterable[Tuple[str, Any]]:
+        input_file = self.config.get("input_file", "data/cameras_enriched.json")
+        with open(input_file, "r", encoding="utf-8") as f:
+            cameras = json.load(f)
+        for camera in cameras:
+            yield str(camera.get("id")), camera
+
+
+class FusedTransformHandler(StreamHandler):
+    """
+    Maps raw cameras to validated, SOSA-enhanced NGSI-LD entities
+
+    Runs the fused transformation stage per camera. The SOSA support entities
+    (platform, observable properties) are emitted once per worker; publishing
+    them is an idempotent upsert.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        super().__init__(config)
+        from agents.transformation.fused_transformation_agent import (
+            FusedTransformationAgent,
+        )
+
+        self.agent = FusedTransformationAgent(
+            ngsi_ld_config_path=config.get(
+                "ngsi_ld_config_path", "config/ngsi_ld_mappings.yaml"
+            ),
+            sosa_config_path=config.get(
+                "sosa_config_path", "config/sosa_mappings.yaml"
+            ),
+        )
+        self._support_pending = self.agent.mapper.config["output"].get(
+            "include_generated_entities", True
+        )
+
+    def process(self, records: List[StreamRecord]) -> List[Tuple[str, Any]]:
+        outputs = []
+        if self._support_pending:
+            for entity in self.agent.mapper.generate_support_entities():
+                if self.agent.validate_entity(entity):
+                    outputs.append((entity["id"], entity))
+
+        for record in records:
+            _, enhanced_entities = self.agent.process_camera(record.value)
+            for entity in enhanced_entities:
+                if self.agent.validate_entity(entity):
+                    outputs.append((record.key, entity))
+
+        # Cleared only after the batch succeeded, so a retry emits them again
+        self._support_pending = False
+        return outputs
+
+
+class CVObservationHandler(StreamHandler):
+    """Runs CV analysis on raw cameras and emits ItemFlowObserved entities"""
+
+    def __init__(self, config: Dict[str, Any]):
+        super().__init__(config)
+        from agents.analytics.cv_analysis_agent import CVAnalysisAgent
+
+        self.agent = CVAnalysisAgent(config.get("config_path", "config/cv_config.yaml"))
+
+    def process(self, records: List[StreamRecord]) -> List[Tuple[str, Any]]:
+        keys = {str(record.value.get("id")): record.key for record in records}
+        entities = asyncio.run(
+            self.agent.process_cameras([record.value for record in records])
+        )
+        outputs = []
+        for entity in entities:
+            camera_id = entity.get("refDevice", {}).get("object", "").rsplit(":", 1)[-1]
+            outputs.append((keys.get(camera_id, camera_id), entity))
+        return outputs
+
+
+class CongestionHandler(StreamHandler):
+    """
+    Evaluates congestion per observation and PATCHes state flips
+
+    Observations are evaluated one at a time in topic order against the
+    in-memory state of a CongestionDetectionAgent, so min_duration behaves
+    exactly as in batch mode and a flip reaches Stellio within one poll.
+    State is checkpointed every checkpoint_interval seconds and on close.
+    Successful flips are emitted keyed by camera. Run a single worker: the
+    state file belongs to one process.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        super().__init__(config)
+        from agents.analytics.congestion_detection_agent import CongestionDetectionAgent
+
+        self.agent = CongestionDetectionAgent(
+            config.get("config_path", "config/congestion_config.yaml")
+        )
+        self.checkpoint_interval = float(
+            config.get(
+                "checkpoint_interval",
+                self.agent.config.get_streaming().get("checkpoint_interval", 10),
+            )
+        )
+        self._last_checkpoint = time.monotonic()
+
+    def process(self, records: List[StreamRecord]) -> List[Tuple[str, Any]]:
+        outputs = []
+        for record in records:
+            for result in self.agent.process_entities([record.value]):
+                if result.get("updated") and result.get("success"):
+                    outputs.append((record.key, result))
+
+        if time.monotonic() - self._last_checkpoint >= self.checkpoint_interval:
+            self.agent.state_store.save()
+            self._last_checkpoint = time.monotonic()
+        return outputs
+
+    def close(self) -> None:
+        self.agent.state_store.save()
+
+
+class StellioPublishHandler(StreamHandler):
+    """
+    Upserts consumed entities to Stellio, one batch per poll
+
+    A batch with failed upserts raises StreamBatchError, so it is retried
+    (upserts are idempotent) and its failed entities are dead-lettered once
+    retries run out. Observation links to cameras are queued by the publisher and written once
+    when the worker stops.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        super().__init__(config)
+        from agents.context_management.entity_publisher_agent import (
+            EntityPublisherAgent,
+        )
+
+        self.agent = EntityPublisherAgent(
+            config.get("config_path", "config/stellio.yaml")
+        )
+
+    def process(self, records: List[StreamRecord]) -> List[Tuple[str, Any]]:
+        results = self.agent.publisher.publish_batch(
+            [record.value for record in records]
+        )
+        failed = {r.entity_id for r in results if not r.success}
+        if failed:
+            raise StreamBatchError(
+                f"Failed to publish {len(failed)} entities: {sorted(failed)[:5]}",
+                [
+                    record
+                    for record in records
+                    if record.value.get("id", "unknown") in failed
+                ],
+            )
+        return []
+
+    def close(self) -> None:
+        self.agent.publisher.flush_observation_links()
+
+
+# ============================================================================
+# PIPELINE
+# ============================================================================
+
+
+def load_class(path: str) -> type:
+    """
+    Import a class from 'package.module:ClassName' or 'package.module.ClassName'
+
+    Args:
+        path: Dotted class path
+
+    Returns:
+        The class
+    """
+    module_path, _, name = path.rpartition(":") if ":" in path else path.rpartition(".")
+    return getattr(importlib.import_module(module_path), name)
+
+
+@dataclass
+class StreamStage:
+    """Stage of the streaming pipeline"""
+
+    name: str
+    factory: Callable[[Dict[str, Any]], Any]
+    input_topics: List[str] = field(default_factory=list)
+    output_topic: Optional[str] = None
+    group_id: Optional[str] = None
+    workers: int = 1
+    config: Dict[str, Any] = field(default_factory=dict)
+    dead_letter_topic: Optional[str] = None
+
+    @property
+    def is_source(self) -> bool:
+        return not self.input_topics
+
+    @classmethod
+    def from_config(cls, stage_config: Dict[str, Any]) -> "StreamStage":
+        """
+        Build a stage from its workflow.yaml entry
+
+        Args:
+            stage_config: Stage configuration with name, source or handler
+                class path, input_topic(s), output_topic, group_id, workers,
+                dead_letter_topic, config
+
+        Returns:
+            StreamStage
+        """
+        name = stage_config["name"]
+        input_topics = stage_config.get("input_topics") or (
+            [stage_config["input_topic"]] if stage_config.get("input_topic") else []
+        )
+        factory_path = (
+            stage_config.get("source")
+            if not input_topics
+            else stage_config.get("handler")
+        )
+        if not factory_path:
+            raise ValueError(
+                f"Stream stage '{name}' needs a {'source' if not input_topics else 'handler'}"
+            )
+
+        return cls(
+            name=name,
+            factory=load_class(factory_path),
+            input_topics=input_topics,
+            output_topic=stage_config.get("output_topic"),
+            group_id=stage_config.get("group_id", name),
+            workers=max(1, stage_config.get("workers", 1)),
+            config=stage_config.get("config", {}),
+            dead_letter_topic=stage_config.get("dead_letter_topic"),
+        )
+
+
+@dataclass
+class StageStats:
+    """Counters of one stage, shared by its workers"""
+
+    consumed: int = 0
+    produced: int = 0
+    failed: int = 0
+    duration_seconds: float = 0.0
+    error_message: Optional[str] = None
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add(self, consumed: int = 0, produced: int = 0, failed: int = 0) -> None:
+        with self.lock:
+            self.consumed += consumed
+            self.produced += produced
+            self.failed += failed
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "consumed": self.consumed,
+            "produced": self.produced,
+            "failed": self.failed,
+            "duration_seconds": round(self.duration_seconds, 2),
+            "error_message": self.error_message,
+        }
+
+
+class StreamPipeline:
+    """
+    Runs stages concurrently over a transport
+
+    Every worker of a consuming stage is one member of the stage's consumer
+    group. In drain mode a stage stops once all stages feeding its input
+    topics have stopped and its group has committed every record; stages run
+    elsewhere (external_stages) never count as stopped, so their consumers
+    here keep polling. Without drain, workers run until stop() is called.
+
+    A batch whose handler raises is not committed: it is read again after an
+    exponential backoff, and after max_retries failed retries its records are
+    sent to the stage's dead-letter topic (default ``<stage>.dead_letter``)
+    before the offsets are committed.
+    """
+
+    def __init__(
+        self,
+        transport: Any,
+        stages: List[StreamStage],
+        poll_max_records: int = 100,
+        poll_timeout: float = 0.5,
+        drain: bool = True,
+        external_stages: Optional[List[StreamStage]] = None,
+        max_retries: int = 3,
+        retry_backoff: float = 1.0,
+    ):
+        """
+        Initialize pipeline
+
+        Args:
+            transport: InMemoryBroker or KafkaTransport
+            stages: Stages to run
+            poll_max_records: Records handed to a handler per poll
+            poll_timeout: Seconds a poll waits for records
+            drain: Stop when all input is consumed (False runs until stop())
+            external_stages: Configured stages run by other processes
+            max_retries: Retries of a failed batch before it is dead-lettered
+            retry_backoff: Seconds before the first retry, doubled per retry
+        """
+        self.transport = transport
+        self.stages = stages
+        self.poll_max_records = poll_max_records
+        self.poll_timeout = poll_timeout
+        self.drain = drain
+        self.external_stages = external_stages or []
+        self.max_retries = max(0, max_retries)
+        self.retry_backoff = retry_backoff
+        self.stats = {stage.name: StageStats() for stage in stages}
+        self._finished = {stage.name: threading.Event() for stage in stages}
+        self._stop = threading.Event()
+
+    def _upstream_done(self, stage: StreamStage) -> bool:
+        """True when every stage feeding this stage's topics has stopped"""
+        if any(
+            other.output_topic in stage.input_topics for other in self.external_stages
+        ):
+            return False
+        return all(
+            self._finished[other.name].is_set()
+            for other in self.stages
+            if other.output_topic in stage.input_topics
+        )
+
+    def _run_source(self, stage: StreamStage) -> None:
+        stats = self.stats[stage.name]
+        source = stage.factory(stage.config)
+        try:
+            for key, value in source.records():
+                if self._stop.is_set():
+                    break
+                self.transport.send(stage.output_topic, key, value)
+                stats.add(produced=1)
+            self.transport.flush()
+        finally:
+            source.close()
+
+    def _run_worker(self, stage: StreamStage) -> None:
+        stats = self.stats[stage.name]
+        handler = stage.factory(stage.config)
+        consumer = self.transport.subscribe(stage.input_topics, stage.group_id)
+        dead_letter_topic = stage.dead_letter_topic or f"{stage.name}.dead_letter"
+        attempts = 0
+        try:
+            while not self._stop.is_set():
+                records = consumer.poll(self.poll_max_records, self.poll_timeout)
+                if not records:
+                    if (
+                        self.drain
+                        and self._upstream_done(stage)
+                        and consumer.lag() == 0
+                    ):
+                        break
+                    continue
+
+                try:
+                    outputs = handler.process(records)
+                except Exception as e:
+                    attempts += 1
+                    if attempts <= self.max_retries:
+                        delay = self.retry_backoff * 2 ** (attempts - 1)
+                        logger.warning(
+                            f"Stage {stage.name} failed on {len(records)} records "
+                            f"(attempt {attempts}), retrying in {delay:.1f}s: {e}"
+                        )
+                        consumer.rewind()
+                        self._stop.wait(delay)
+                        continue
+
+                    failed = getattr(e, "records", None) or records
+                    logger.error(
+                        f"Stage {stage.name} failed on {len(failed)} of {len(records)} "
+                        f"records after {attempts} attempts, sending them to "
+                        f"{dead_letter_topic}: {e}"
+                    )
+                    for record in failed:
+                        self.transport.send(
+                            dead_letter_topic,
+                            record.key,
+                            {
+                                "stage": stage.name,
+                                "topic": record.topic,
+                                "partition": record.partition,
+                                "offset": record.offset,
+                                "error": str(e),
+                                "value": record.value,
+                            },
+                        )
+                    self.transport.flush()
+                    stats.add(consumed=len(records), failed=len(failed))
+                    consumer.commit()
+                    attempts = 0
+                    continue
+
+                attempts = 0
+                stats.add(consumed=len(records))
+
+                if stage.output_topic:
+                    for key, value in outputs:
+                        self.transport.send(stage.output_topic, key, value)
+                    self.transport.flush()
+                    stats.add(produced=len(outputs))
+
+                # Offsets are committed only after outputs are durable
+                consumer.commit()
+        finally:
+            consumer.close()
+            handler.close()
+
+    def _run_stage(self, stage: StreamStage) -> None:
+        stats = self.stats[stage.name]
+        start_time = time.time()
+        try:
+            if stage.is_source:
+                self._run_source(stage)
+            else:
+                threads = [
+                    threading.Thread(
+                        target=self._guard, args=(stage,), name=f"{stage.name}-{i}"
+                    )
+                    for i in range(stage.workers)
+                ]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+        except Exception as e:
+            logger.error(f"Stage {stage.name} stopped: {e}", exc_info=True)
+            stats.error_message = str(e)
+        finally:
+            stats.duration_seconds = time.time() - start_time
+            self._finished[stage.name].set()
+
+    def _guard(self, stage: StreamStage) -> None:
+        """Run one worker, recording a crash on the stage"""
+        try:
+            self._run_worker(stage)
+        except Exception as e:
+            logger.error(f"Worker of stage {stage.name} stopped: {e}", exc_info=True)
+            self.stats[stage.name].error_message = str(e)
+
+    def run(self) -> Dict[str, StageStats]:
+        """
+        Run all stages until drained (or stopped)
+
+        Returns:
+            Stats by stage name
+        """
+        threads = [
+            threading.Thread(target=self._run_stage, args=(stage,), name=stage.name)
+            for stage in self.stages
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for name, stats in self.stats.items():
+            logger.info(
+                f"Stage {name}: consumed={stats.consumed} produced={stats.produced} "
+                f"failed={stats.failed} ({stats.duration_seconds:.2f}s)"
+            )
+        return self.stats
+
+    def stop(self) -> None:
+        """Ask all stages to stop after their current batch"""
+        self._stop.set()
+
+
+class StreamOrchestrator:
+    """Builds and runs a StreamPipeline from the ``streaming`` config section"""
+
+    def __init__(self, streaming_config: Dict[str, Any], transport: Any = None):
+        """
+        Initialize streaming orchestrator
+
+        Args:
+            streaming_config: ``streaming`` section of workflow.yaml:
+                - transport: 'memory' (default) or 'kafka'
+                - kafka: KafkaTransport settings
+                - partitions: Partitions per topic for the memory transport
+                - poll_max_records, poll_timeout, drain, max_retries,
+                  retry_backoff: StreamPipeline settings
+                - stages: Stage definitions
+            transport: Pre-built transport (e.g. a shared InMemoryBroker)
+        """
+        self.config = streaming_config
+        self.transport = transport or self._create_transport()
+        self.stages = [
+            StreamStage.from_config(s) for s in streaming_config.get("stages", [])
+        ]
+
+    def _create_transport(self) -> Any:
+        kind = self.config.get("transport", "memory")
+        if kind == "kafka":
+            return KafkaTransport(self.config.get("kafka", {}))
+        if kind == "memory":
+            return InMemoryBroker(self.config.get("partitions", 4))
+        raise ValueError(f"Unknown streaming transport: {kind}")
+
+    def run(self, only: Optional[List[str]] = None) -> Dict[str, StageStats]:
+        """
+        Run the pipeline
+
+        Args:
+            only: Run just these stages (e.g. to add transformation workers on
+                another host); stages outside the list run elsewhere and never
+                count as finished, so with drain the selected consumers keep
+                polling until stopped
+
+        Returns:
+            Stats by stage name
+        """
+        stages = [s for s in self.stages if not only or s.name in only]
+        external_stages = [s for s in self.stages if s not in stages]
+        logger.info(
+            f"Starting streaming pipeline ({self.config.get('transport', 'memory')} transport): "
+            f"{', '.join(f'{s.name}x{s.workers}' for s in stages)}"
+        )
+        pipeline = StreamPipeline(
+            self.transport,
+            stages,
+            poll_max_records=self.config.get("poll_max_records", 100),
+            poll_timeout=self.config.get("poll_timeout", 0.5),
+            drain=self.config.get("drain", True),
+            external_stages=external_stages,
+            max_retries=self.config.get("max_retries", 3),
+            retry_backoff=self.config.get("retry_backoff", 1.0),
+        )
+        try:
+            return pipeline.run()
+        finally:
+            self.transport.close()
+
+
+def main():
+    """Run streaming stages from workflow.yaml"""
+    import argparse
+    import yaml
+
+    parser = argparse.ArgumentParser(description="Streaming workflow orchestrator")
+    parser.add_argument("--config", default="config/workflow.yaml")
+    parser.add_argument(
+        "--stage", action="append", help="Run only this stage (repeatable)"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+
+    with open(args.config, "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+
+    stats = StreamOrchestrator(config.get("streaming", {})).run(only=args.stage)
+    print(json.dumps({name: s.to_dict() for name, s in stats.items()}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
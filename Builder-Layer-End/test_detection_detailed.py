@@ -41,9 +41,9 @@ print(f"   Observations: {len(test_obs)}")
 
 # Add to buffer
 for obs in test_obs:
-    agent.observations_buffer[test_camera].append(obs)
+    agent.observations_buffer.append(test_camera, obs)
 
-recent = list(agent.observations_buffer[test_camera])
+recent = agent.observations_buffer.observations(test_camera)
 print(f"   Buffer size: {len(recent)}")
 
 # Run each detector
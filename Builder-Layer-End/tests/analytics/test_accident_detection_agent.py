@@ -13,9 +13,12 @@ Comprehensive tests covering:
 - Alert generation
 """
 
+import itertools
 import json
 import os
 import sys
+import threading
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any, Dict
 
@@ -28,6 +31,8 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from agents.analytics.accident_detection_agent import (
     AccidentConfig,
     AccidentDetectionAgent,
+    ObservationBatch,
+    ObservationBuffer,
     OccupancySpikeDetector,
     PatternAnomalyDetector,
     SpeedVarianceDetector,
@@ -48,6 +53,17 @@ def now_iso_fixed():
     return "2025-11-01T10:00:00Z"
 
 
+_observation_clock = itertools.count()
+
+
+def next_observed_at() -> str:
+    """Return a timestamp one second later than the previous one"""
+    observed = datetime(2025, 11, 1, 10, tzinfo=timezone.utc) + timedelta(
+        seconds=next(_observation_clock)
+    )
+    return observed.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
 def make_observation(
     camera_ref: str,
     occ: float = 0.5,
@@ -57,7 +73,7 @@ def make_observation(
 ) -> Dict[str, Any]:
     """Create test observation entity"""
     if observed_at is None:
-        observed_at = now_iso_fixed()
+        observed_at = next_observed_at()
     return {
         "id": f"urn:ngsi-ld:ItemFlowObserved:{camera_ref}-obs",
         "type": "ItemFlowObserved",
@@ -371,6 +387,167 @@ def test_severity_classification(tmp_path):
     assert agent._classify_severity(0.95) == "severe"
 
 
+# ==================== Observation Buffer Tests ====================
+
+
+def test_observation_buffer_wraps_and_keeps_order(tmp_path):
+    """Test ring buffer keeps the newest observations in order"""
+    buffer = ObservationBuffer(str(tmp_path / "buffers.db"), capacity=4)
+    for speed in range(6):
+        obs = make_observation("cam", speed=speed)
+        buffer.append("cam", obs)
+
+    window = buffer.window("cam")
+    assert window.shape == (4, 4)
+    assert list(window[1]) == [2, 3, 4, 5]
+
+    observations = buffer.observations("cam")
+    assert [o["averageSpeed"]["value"] for o in observations] == [2, 3, 4, 5]
+    assert (
+        observations[-1]["averageSpeed"]["observedAt"]
+        == obs["averageSpeed"]["observedAt"]
+    )
+
+
+def test_observation_buffer_skips_already_buffered_observations():
+    """Test re-appended or older observations are not buffered twice"""
+    buffer = ObservationBuffer(capacity=10)
+    first = [make_observation("cam", speed=speed) for speed in range(3)]
+    for obs in first:
+        assert buffer.append("cam", obs)
+
+    # Re-run over an overlapping file: the old rows are skipped
+    assert not buffer.append("cam", first[1])
+    assert not buffer.append("cam", first[2])
+    assert buffer.append("cam", make_observation("cam", speed=3))
+
+    assert list(buffer.window("cam")[1]) == [0, 1, 2, 3]
+
+
+def test_observation_buffer_persists_and_resizes(tmp_path):
+    """Test buffers survive a reload, including a capacity change"""
+    path = str(tmp_path / "buffers.db")
+    buffer = ObservationBuffer(path, capacity=5)
+    for speed in range(7):
+        buffer.append("cam", make_observation("cam", speed=speed))
+    obs = make_observation("other", speed=40)
+    del obs["occupancy"]
+    buffer.append("other", obs)
+    buffer.save()
+
+    reloaded = ObservationBuffer(path, capacity=5)
+    assert list(reloaded.window("cam")[1]) == [2, 3, 4, 5, 6]
+    assert "occupancy" not in reloaded.observations("other")[0]
+
+    smaller = ObservationBuffer(path, capacity=3)
+    assert list(smaller.window("cam")[1]) == [4, 5, 6]
+    smaller.append("cam", make_observation("cam", speed=7))
+    assert list(smaller.window("cam")[1]) == [5, 6, 7]
+
+
+def test_batch_detection_matches_per_camera_detection(tmp_path):
+    """Test detect_batch gives each camera the same result as detect"""
+    buffer = ObservationBuffer(capacity=30)
+    speed_series = [
+        [],
+        [60, 58],
+        [60, 1, 58, 2, 55, 3, 60, 1, 57, 2, 59, 1],
+        [30, 31, 29, 30, 32, 30, 31, 29, 30, 31, 30, 2],
+    ]
+    for cam_id, speeds in enumerate(speed_series * 5):
+        camera_ref = f"urn:ngsi-ld:Camera:Cam{cam_id}"
+        for i, speed in enumerate(speeds):
+            buffer.append(
+                camera_ref,
+                make_observation(
+                    camera_ref,
+                    speed=speed,
+                    occ=0.9 if i == len(speeds) - 1 else 0.2 + 0.01 * cam_id,
+                    intensity=50 if i == len(speeds) - 1 else 10 + i % 3,
+                    observed_at=f"2025-11-01T10:00:{i * 2:02d}Z",
+                ),
+            )
+    cameras = [f"urn:ngsi-ld:Camera:Cam{cam_id}" for cam_id in range(20)] + ["unseen"]
+
+    batch = buffer.batch(cameras)
+    assert batch.speed.shape == (21, 12)
+    assert list(batch.counts[:4]) == [0, 2, 12, 12]
+
+    detectors = [
+        SpeedVarianceDetector({"threshold": 0.5, "window_size": 10}),
+        OccupancySpikeDetector({"spike_factor": 2.0, "baseline_window": 5}),
+        SuddenStopDetector({"speed_drop_threshold": 0.8, "time_window": 30}),
+        PatternAnomalyDetector({"intensity_threshold": 2.0}),
+    ]
+    for detector in detectors:
+        results = detector.detect_batch(batch)
+        assert len(results) == len(cameras)
+        assert any(detected for detected, _, _ in results)
+        for camera_ref, result in zip(cameras, results):
+            assert result == detector.detect(
+                buffer.observations(camera_ref), camera_ref
+            )
+
+
+def test_observation_batch_from_observations_aligns_rows():
+    """Test shorter camera windows are right-aligned with NaN padding"""
+    batch = ObservationBatch.from_observations(
+        {
+            "a": [make_observation("a", speed=s) for s in (10, 20, 30)],
+            "b": [make_observation("b", speed=40)],
+        }
+    )
+
+    assert batch.cameras == ["a", "b"]
+    assert list(batch.speed[0]) == [10, 20, 30]
+    assert batch.speed[1, -1] == 40
+    assert all(v != v for v in batch.speed[1, :2])
+
+
+def test_detection_uses_observations_from_previous_runs(tmp_path, monkeypatch):
+    """Test a new agent run has the full detection window"""
+    cfg = {
+        "accident_detection": {
+            "methods": [
+                {
+                    "name": "speed_variance",
+                    "enabled": True,
+                    "threshold": 0.5,
+                    "window_size": 10,
+                }
+            ],
+            "severity_thresholds": {"minor": 0.3, "moderate": 0.6, "severe": 0.9},
+            "filtering": {"min_confidence": 0.3, "cooldown_period": 0},
+            "stellio": {
+                "base_url": "http://test",
+                "create_endpoint": "/entities",
+                "batch_create": False,
+            },
+            "alert": {"enabled": False},
+            "state": {"file": str(tmp_path / "state.json")},
+        }
+    }
+    cfg_path = tmp_path / "config.yaml"
+    write_yaml(cfg_path, cfg)
+    camera_ref = "urn:ngsi-ld:Camera:Test"
+
+    def run(speeds):
+        agent = AccidentDetectionAgent(str(cfg_path))
+        monkeypatch.setattr(agent.session, "post", lambda *a, **k: MockResponse(201))
+        obs_file = tmp_path / "obs.json"
+        obs_file.write_text(
+            json.dumps([make_observation(camera_ref, speed=s) for s in speeds])
+        )
+        return agent.process_observations_file(str(obs_file))
+
+    first = run([60, 1, 58, 2, 55])
+    second = run([3, 60, 1, 57, 2])
+
+    assert first[0]["detected"] is False
+    assert second[0]["detected"] is True
+    assert (tmp_path / "state_buffers.db").exists()
+
+
 # ==================== Integration Tests ====================
 
 
@@ -853,6 +1030,83 @@ def test_alert_generation(tmp_path, monkeypatch):
         assert alerts[0]["camera"] == camera_ref
 
 
+def test_creation_results_and_background_alerts(tmp_path, monkeypatch):
+    """Test creation results land on their camera and alerts are written in the background"""
+    alert_file = tmp_path / "alerts.json"
+    cfg = {
+        "accident_detection": {
+            "methods": [
+                {
+                    "name": "speed_variance",
+                    "enabled": True,
+                    "threshold": 0.5,
+                    "window_size": 5,
+                }
+            ],
+            "severity_thresholds": {"minor": 0.3, "moderate": 0.6, "severe": 0.9},
+            "filtering": {"min_confidence": 0.3, "cooldown_period": 0},
+            "stellio": {
+                "base_url": "http://test",
+                "create_endpoint": "/entities",
+                "batch_create": True,
+                "max_workers": 8,
+            },
+            "alert": {
+                "enabled": True,
+                "notify_on_severity": ["minor", "moderate", "severe"],
+                "alert_file": str(alert_file),
+            },
+            "state": {"file": str(tmp_path / "state.json")},
+        }
+    }
+    cfg_path = tmp_path / "config.yaml"
+    write_yaml(cfg_path, cfg)
+
+    agent = AccidentDetectionAgent(str(cfg_path))
+
+    # Odd cameras fail creation
+    def fake_post(url, json=None, headers=None, timeout=None):
+        cam_id = int(json["refCamera"]["object"].rsplit("Cam", 1)[1])
+        return MockResponse(500 if cam_id % 2 else 201, "boom")
+
+    monkeypatch.setattr(agent.session, "post", fake_post)
+
+    writer_threads = []
+    original_write = agent.alert_dispatcher._write
+
+    def recording_write(alerts):
+        writer_threads.append(threading.current_thread().name)
+        original_write(alerts)
+
+    monkeypatch.setattr(agent.alert_dispatcher, "_write", recording_write)
+
+    observations = []
+    for cam_id in range(40):
+        camera_ref = f"urn:ngsi-ld:Camera:Cam{cam_id}"
+        observations.extend(
+            make_observation(camera_ref, speed=speed)
+            for speed in (60, 1, 58, 2, 55, 3, 60, 1, 57, 2)
+        )
+
+    obs_file = tmp_path / "obs.json"
+    obs_file.write_text(json.dumps(observations))
+
+    results = agent.process_observations_file(str(obs_file))
+
+    assert len(results) == 40
+    for res in results:
+        cam_id = int(res["camera"].rsplit("Cam", 1)[1])
+        assert res["created"] is True
+        assert res["entity_id"].startswith(f"urn:ngsi-ld:RoadAccident:Cam{cam_id}-")
+        assert res["success"] is (cam_id % 2 == 0)
+
+    alerts = json.loads(alert_file.read_text())
+    assert sorted(a["camera"] for a in alerts) == sorted(
+        r["camera"] for r in results if r["success"]
+    )
+    assert writer_threads and set(writer_threads) == {"accident-alerts"}
+
+
 def test_state_persistence(tmp_path, monkeypatch):
     """Test state and history persistence across runs"""
     state_file = tmp_path / "state.json"
@@ -913,9 +1167,9 @@ def test_state_persistence(tmp_path, monkeypatch):
 
     results1 = agent1.process_observations_file(str(obs_file))
 
-    # State files should exist
+    # State file and history partition should exist
     assert state_file.exists()
-    assert history_file.exists()
+    assert list((tmp_path / "history").glob("accidents-*.ndjson"))
 
     # Second run (new agent instance)
     agent2 = AccidentDetectionAgent(str(cfg_path))
@@ -925,6 +1179,12 @@ def test_state_persistence(tmp_path, monkeypatch):
     camera_state = agent2.state_store.get_camera_state(camera_ref)
     assert camera_state["last_alert_ts"] is not None
 
+    # History should be queryable by camera
+    history = agent2.state_store.history.query(camera=camera_ref)
+    assert [h["entity_id"] for h in history] == [
+        r["entity_id"] for r in results1 if r.get("entity_id")
+    ]
+
 
 def test_missing_observation_fields(tmp_path, monkeypatch):
     """Test graceful handling of missing observation fields"""
@@ -1051,5 +1311,68 @@ def test_batch_entity_creation(tmp_path, monkeypatch):
     assert post_count["count"] >= 1
 
 
+def test_async_batched_entity_creation(tmp_path, monkeypatch):
+    """Test async writes upsert all accident entities in one writer call"""
+    from shared.async_stellio_writer import WriteResult
+
+    cfg = {
+        "accident_detection": {
+            "methods": [
+                {
+                    "name": "speed_variance",
+                    "enabled": True,
+                    "threshold": 0.5,
+                    "window_size": 5,
+                }
+            ],
+            "severity_thresholds": {"minor": 0.3, "moderate": 0.6, "severe": 0.9},
+            "filtering": {"min_confidence": 0.3, "cooldown_period": 0},
+            "stellio": {
+                "base_url": "http://test",
+                "create_endpoint": "/entities",
+                "async_writes": True,
+                "batch_size": 2,
+            },
+            "alert": {"enabled": False},
+            "state": {"file": str(tmp_path / "state.json")},
+        }
+    }
+    cfg_path = tmp_path / "config.yaml"
+    write_yaml(cfg_path, cfg)
+
+    agent = AccidentDetectionAgent(str(cfg_path))
+
+    calls = []
+
+    def fake_upsert(entities, create_url, headers=None, timeout=None, batch_size=None):
+        calls.append((entities, create_url, batch_size))
+        return [WriteResult(e["id"], True, 204) for e in entities]
+
+    monkeypatch.setattr(agent.writer, "upsert_entities", fake_upsert)
+    monkeypatch.setattr(
+        agent.session, "post", lambda *a, **k: pytest.fail("blocking POST used")
+    )
+
+    observations = []
+    for cam_id in range(3):
+        camera_ref = f"urn:ngsi-ld:Camera:Cam{cam_id}"
+        observations.extend(
+            make_observation(camera_ref, speed=speed)
+            for speed in (60, 1, 58, 2, 55, 3, 60, 1, 57, 2)
+        )
+
+    obs_file = tmp_path / "obs.json"
+    obs_file.write_text(json.dumps(observations))
+
+    results = agent.process_observations_file(str(obs_file))
+
+    assert len(calls) == 1
+    entities, create_url, batch_size = calls[0]
+    assert create_url == "http://test/entities"
+    assert batch_size == 2
+    detected = [r for r in results if r.get("detected")]
+    assert len(entities) == len(detected) == 3
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -7,6 +7,7 @@ from agents.analytics.congestion_detection_agent import (
     CongestionConfig,
     StateStore,
     now_iso,
+    tail_ndjson,
 )
 
 
@@ -269,3 +270,208 @@ def test_alert_on_new_congestion(tmp_path, monkeypatch):
     assert any(a["camera"] == "urn:ngsi-ld:Camera:CamAlert" for a in alerts)
     # Clean up
     alerts_file.unlink()
+
+
+def test_async_writes_use_writer(tmp_path, monkeypatch):
+    from shared.async_stellio_writer import WriteResult
+
+    cfg = {
+        "congestion_detection": {
+            "thresholds": {"occupancy": 0.5, "average_speed": 15, "intensity": 10},
+            "rules": {"logic": "AND", "min_duration": 0},
+            "stellio": {
+                "base_url": "http://localhost:1234",
+                "update_endpoint": "/entities/{id}/attrs",
+                "async_writes": True,
+            },
+            "alert": {"enabled": False},
+            "state": {"file": str(tmp_path / "state6.json")},
+        }
+    }
+    cfg_path = tmp_path / "cong6.yaml"
+    write_yaml(cfg_path, cfg)
+
+    agent = CongestionDetectionAgent(str(cfg_path))
+    sent = []
+
+    def fake_patch_entities(updates, headers=None, timeout=None):
+        sent.extend(updates)
+        return [
+            WriteResult(cam, cam.endswith("A"), 204 if cam.endswith("A") else 503)
+            for cam, _, _ in updates
+        ]
+
+    monkeypatch.setattr(agent.writer, "patch_entities", fake_patch_entities)
+
+    ents = [
+        make_entity(f"urn:ngsi-ld:Camera:Cam{s}", occ=0.9, speed=5, intensity=20)
+        for s in "AB"
+    ]
+    obs_file = tmp_path / "obs6.json"
+    obs_file.write_text(json.dumps(ents))
+
+    results = agent.process_observations_file(str(obs_file))
+
+    assert [url for _, url, _ in sent] == [
+        "http://localhost:1234/entities/urn:ngsi-ld:Camera:CamA/attrs",
+        "http://localhost:1234/entities/urn:ngsi-ld:Camera:CamB/attrs",
+    ]
+    updates = {r["camera"]: r for r in results if r.get("updated")}
+    assert updates["urn:ngsi-ld:Camera:CamA"]["success"] is True
+    assert updates["urn:ngsi-ld:Camera:CamB"]["status_code"] == 503
+    assert agent.state_store.get("urn:ngsi-ld:Camera:CamA")["congested"] is True
+    assert agent.state_store.get("urn:ngsi-ld:Camera:CamB").get("congested") is not True
+
+
+def test_state_store_splits_hot_state_from_bounded_history(tmp_path):
+    state_file = tmp_path / "state.json"
+    store = StateStore(str(state_file), history_size=3, summary_hours=2)
+
+    # Six samples over three hours: three fall out of the ring
+    for minute in range(0, 180, 30):
+        ts = f"2025-11-01T{10 + minute // 60:02d}:{minute % 60:02d}:00Z"
+        store.update("cam", minute >= 60, None, ts)
+    store.save()
+
+    hot = json.loads(state_file.read_text())
+    assert hot == {
+        "cam": {
+            "congested": True,
+            "first_breach_ts": None,
+            "last_update_ts": "2025-11-01T12:30:00Z",
+        }
+    }
+    assert [h["ts"] for h in store.history.get("cam")] == [
+        "2025-11-01T11:30:00Z",
+        "2025-11-01T12:00:00Z",
+        "2025-11-01T12:30:00Z",
+    ]
+    assert store.history.hourly("cam") == [
+        {"hour": "2025-11-01T10:00:00Z", "samples": 2, "congested": 0},
+        {"hour": "2025-11-01T11:00:00Z", "samples": 1, "congested": 1},
+    ]
+
+    reloaded = StateStore(str(state_file), history_size=3, summary_hours=2)
+    assert reloaded.history.get("cam") == store.history.get("cam")
+    assert reloaded.history.hourly("cam") == store.history.hourly("cam")
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_state_store_migrates_inline_history(tmp_path):
+    state_file = tmp_path / "state.json"
+    state_file.write_text(
+        json.dumps(
+            {
+                "cam": {
+                    "congested": False,
+                    "first_breach_ts": None,
+                    "last_update_ts": "2025-11-01T09:34:03Z",
+                    "history": [
+                        {"ts": "2025-11-01T09:20:26Z", "congested": False},
+                        {"ts": "2025-11-01T09:34:03Z", "congested": True},
+                    ],
+                }
+            }
+        )
+    )
+
+    store = StateStore(str(state_file))
+    store.save()
+
+    assert "history" not in json.loads(state_file.read_text())["cam"]
+    assert [h["congested"] for h in StateStore(str(state_file)).history.get("cam")] == [
+        False,
+        True,
+    ]
+
+
+def test_stream_patches_flip_on_the_triggering_event(tmp_path, monkeypatch):
+    cfg = {
+        "congestion_detection": {
+            "thresholds": {"occupancy": 0.5, "average_speed": 15, "intensity": 10},
+            "rules": {"logic": "AND", "min_duration": 60},
+            "stellio": {
+                "base_url": "http://localhost:1234",
+                "update_endpoint": "/entities/{id}/attrs",
+                "batch_updates": False,
+            },
+            "alert": {"enabled": False},
+            "state": {"file": str(tmp_path / "state7.json")},
+        }
+    }
+    cfg_path = tmp_path / "cong7.yaml"
+    write_yaml(cfg_path, cfg)
+    agent = CongestionDetectionAgent(str(cfg_path))
+
+    cam = "urn:ngsi-ld:Camera:CamS"
+    feed = [
+        make_entity(
+            cam, occ=0.9, speed=5, intensity=20, observed_at="2025-11-01T10:00:00Z"
+        ),
+        make_entity(
+            cam, occ=0.9, speed=5, intensity=20, observed_at="2025-11-01T10:00:30Z"
+        ),
+        make_entity(
+            cam, occ=0.9, speed=5, intensity=20, observed_at="2025-11-01T10:01:00Z"
+        ),
+        make_entity(
+            cam, occ=0.9, speed=5, intensity=20, observed_at="2025-11-01T10:01:30Z"
+        ),
+        make_entity(
+            cam, occ=0.1, speed=40, intensity=1, observed_at="2025-11-01T10:02:00Z"
+        ),
+    ]
+    consumed = []
+    patches = []
+
+    def events():
+        for entity in feed:
+            consumed.append(entity)
+            yield entity
+
+    def fake_patch(url, json=None, headers=None, timeout=None):
+        patches.append((len(consumed), json["congested"]["value"]))
+        return MockResponse(204)
+
+    monkeypatch.setattr(agent.session, "patch", fake_patch)
+
+    stats = agent.run_stream(events(), checkpoint_interval=3600)
+
+    # Flip to congested once min_duration has elapsed, then clear
+    assert patches == [(3, True), (5, False)]
+    assert stats == {"events": 5, "updates": 2, "failed": 0}
+    saved = json.loads((tmp_path / "state7.json").read_text())
+    assert saved[cam]["congested"] is False
+
+
+def test_tail_ndjson_yields_complete_lines(tmp_path):
+    feed = tmp_path / "obs.ndjson"
+    feed.write_text('{"id": "a"}\n\nnot json\n{"id": "b"}\n{"id": ')
+
+    assert [e["id"] for e in tail_ndjson(str(feed), follow=False)] == ["a", "b"]
+
+    feed.write_text('{"id": "a"}\n{"id": "c"}')
+    assert [e["id"] for e in tail_ndjson(str(feed), follow=False)] == ["a", "c"]
+    assert list(tail_ndjson(str(tmp_path / "missing.ndjson"), follow=False)) == []
+
+
+def test_tail_ndjson_resumes_from_saved_offset(tmp_path):
+    feed = tmp_path / "obs.ndjson"
+    feed.write_text('{"id": "a"}\n{"id": "b"}\n{"id": ')
+    store = StateStore(str(tmp_path / "state.json"))
+
+    def read(offsets):
+        return [e["id"] for e in tail_ndjson(str(feed), follow=False, offsets=offsets)]
+
+    assert read(store.feed_offsets) == ["a", "b"]
+    store.save()
+
+    # A restart reads only what was appended after the checkpoint
+    with open(feed, "a", encoding="utf-8") as f:
+        f.write('"c"}\n{"id": "d"}\n')
+    offsets = StateStore(str(tmp_path / "state.json")).feed_offsets
+    assert read(offsets) == ["c", "d"]
+
+    # A replaced, shorter feed is read from the start
+    feed.write_text('{"id": "e"}\n')
+    assert read(offsets) == ["e"]
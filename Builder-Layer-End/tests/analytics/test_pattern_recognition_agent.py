@@ -5,6 +5,7 @@ Tests cover:
 - Unit Tests: Time windows, pattern detection, forecasting algorithms
 - Integration Tests: Neo4j mock, full pipeline, entity creation
 - Statistical Tests: Rush hour accuracy, anomaly detection, weekly patterns
+- Performance: Vectorised statistics benchmark (1,000 cameras x 7 days)
 
 Target: 100% pass rate, >=80% coverage
 """
@@ -12,10 +13,13 @@ Target: 100% pass rate, >=80% coverage
 import pytest
 import json
 import yaml
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from unittest.mock import Mock, MagicMock, patch
+import random
 import statistics
+import time
+from concurrent.futures.process import BrokenProcessPool
 
 # Import agent components
 import sys
@@ -23,15 +27,17 @@ import sys
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from agents.analytics.pattern_recognition_agent import (
+    PANDAS_AVAILABLE,
     PatternConfig,
     Neo4jConnector,
     TimeSeriesAnalyzer,
     PatternDetector,
     ForecastEngine,
     PatternRecognitionAgent,
+    RollingAggregates,
+    _init_pattern_worker,
 )
 
-
 # ============================================================================
 # Test Fixtures
 # ============================================================================
@@ -281,6 +287,151 @@ def test_zscore_empty_data():
     assert z_scores == []
 
 
+def python_fallback(analyzer):
+    """Force an analyzer onto the pure-Python statistics path."""
+    analyzer.df = None
+    return analyzer
+
+
+def assert_same_statistics(vectorised, fallback, metric):
+    """Assert both analyzers return the same aggregates and z-scores."""
+    for method in (
+        "get_hourly_aggregates",
+        "get_daily_aggregates",
+        "get_weekday_aggregates",
+    ):
+        expected = getattr(fallback, method)(metric)
+        actual = getattr(vectorised, method)(metric)
+        assert actual.keys() == expected.keys()
+        for key, stats in expected.items():
+            assert actual[key]["count"] == stats["count"]
+            for field in ("mean", "std", "min", "max"):
+                assert actual[key][field] == pytest.approx(stats[field])
+
+    expected = fallback.calculate_zscore(metric)
+    actual = vectorised.calculate_zscore(metric)
+    assert [(ts, value) for ts, value, _ in actual] == [
+        (ts, value) for ts, value, _ in expected
+    ]
+    assert [z for _, _, z in actual] == pytest.approx([z for _, _, z in expected])
+
+
+@pytest.mark.skipif(not PANDAS_AVAILABLE, reason="pandas not installed")
+def test_vectorised_statistics_match_python_fallback(sample_temporal_data):
+    """Test that the pandas path matches the pure-Python path."""
+    data = [dict(obs) for obs in sample_temporal_data]
+    for obs in data[::7]:
+        obs["intensity"] = None
+    for obs in data[::11]:
+        del obs["occupancy"]
+
+    metrics = ["intensity", "occupancy", "missing"]
+    vectorised = TimeSeriesAnalyzer(data, metrics)
+    fallback = python_fallback(TimeSeriesAnalyzer(data, metrics))
+
+    assert vectorised.df is not None
+    for metric in metrics:
+        assert_same_statistics(vectorised, fallback, metric)
+
+
+@pytest.mark.skipif(not PANDAS_AVAILABLE, reason="pandas not installed")
+def test_vectorised_statistics_fall_back_on_mixed_offsets():
+    """Test that timestamps pandas cannot convert in one pass use the loops."""
+    data = [
+        {"timestamp": "2025-11-01T08:00:00+07:00", "intensity": 0.5},
+        {"timestamp": "2025-11-01T09:00:00Z", "intensity": 0.7},
+    ]
+
+    analyzer = TimeSeriesAnalyzer(data, ["intensity"])
+
+    assert analyzer.df is None
+    assert set(analyzer.get_hourly_aggregates("intensity")) == {8, 9}
+
+
+def test_rolling_aggregates_match_full_recompute(tmp_path, sample_temporal_data):
+    """Test incremental aggregates across runs against a full recompute."""
+    path = tmp_path / "aggregates.json"
+    camera = "urn:ngsi-ld:Camera:Test"
+    metrics = ["intensity", "occupancy"]
+
+    first_run = RollingAggregates(str(path))
+    assert first_run.update(camera, sample_temporal_data[:100], metrics) == 100
+    first_run.save()
+
+    second_run = RollingAggregates(str(path))
+    assert second_run.update(camera, sample_temporal_data, metrics) == 68
+    assert second_run.update(camera, sample_temporal_data, metrics) == 0
+
+    full = TimeSeriesAnalyzer(sample_temporal_data, metrics)
+    rolling = TimeSeriesAnalyzer(sample_temporal_data, metrics, second_run, camera)
+    for method in (
+        "get_hourly_aggregates",
+        "get_daily_aggregates",
+        "get_weekday_aggregates",
+    ):
+        expected = getattr(full, method)("intensity")
+        actual = getattr(rolling, method)("intensity")
+        assert actual.keys() == expected.keys()
+        for key, stats in expected.items():
+            assert actual[key]["count"] == stats["count"]
+            for field in ("mean", "std", "min", "max"):
+                assert actual[key][field] == pytest.approx(stats[field])
+
+
+def test_rolling_aggregates_expire_hours_outside_window(sample_temporal_data):
+    """Test that hour buckets before the window start are dropped."""
+    camera = "urn:ngsi-ld:Camera:Test"
+    aggregates = RollingAggregates()
+    aggregates.update(camera, sample_temporal_data, ["intensity"])
+
+    dropped = aggregates.expire(camera, datetime(2025, 11, 7, 0, 30))
+
+    assert dropped == 144
+    daily = aggregates.summarize(camera, "intensity", "date")
+    assert list(daily) == ["2025-11-07"]
+    assert daily["2025-11-07"]["count"] == 24
+
+
+def test_rolling_aggregates_rebuild_for_wider_window(sample_temporal_data):
+    """Test a 7-day run after a 1-hour run sees the whole week again."""
+    camera = "urn:ngsi-ld:Camera:Test"
+    week_start = datetime(2025, 11, 1, 0, 0)
+    hour_start = datetime(2025, 11, 7, 23, 0)
+    aggregates = RollingAggregates()
+
+    aggregates.update(camera, sample_temporal_data, ["intensity"], week_start)
+    aggregates.expire(camera, week_start)
+    last_hour = sample_temporal_data[-1:]
+    aggregates.update(camera, last_hour, ["intensity"], hour_start)
+    aggregates.expire(camera, hour_start)
+    assert len(aggregates.summarize(camera, "intensity", "hour")) == 1
+
+    aggregates.update(camera, sample_temporal_data, ["intensity"], week_start)
+    aggregates.expire(camera, week_start)
+
+    daily = aggregates.summarize(camera, "intensity", "date")
+    assert len(daily) == 7
+    assert sum(stats["count"] for stats in daily.values()) == 168
+
+
+def test_rolling_aggregates_expire_in_utc():
+    """Test the window start is compared with observations in UTC."""
+    camera = "urn:ngsi-ld:Camera:Test"
+    data = [
+        {"timestamp": f"2025-11-07T{hour:02d}:30:00Z", "intensity": 0.5}
+        for hour in range(8, 12)
+    ]
+    aggregates = RollingAggregates()
+    aggregates.update(camera, data, ["intensity"])
+
+    # 17:00 in Hanoi is 10:00 UTC
+    hanoi = timezone(timedelta(hours=7))
+    dropped = aggregates.expire(camera, datetime(2025, 11, 7, 17, 0, tzinfo=hanoi))
+
+    assert dropped == 2
+    assert set(aggregates.summarize(camera, "intensity", "hour")) == {10, 11}
+
+
 # ============================================================================
 # Unit Tests - Pattern Detector
 # ============================================================================
@@ -450,6 +601,49 @@ def test_forecast_invalid_method(temp_config, sample_temporal_data):
         forecast_engine.forecast_next_hour("intensity")
 
 
+def test_arima_forecast_warm_starts_from_cached_params(
+    temp_config, sample_temporal_data, monkeypatch
+):
+    """Test that fitted ARIMA parameters are reused as start parameters."""
+    fits = []
+
+    class FakeARIMA:
+        param_names = ["ar.L1", "ma.L1", "sigma2"]
+
+        def __init__(self, values, order):
+            self.values = values
+
+        def fit(self, start_params=None):
+            fits.append(start_params)
+            return Mock(
+                params=[0.5, -0.2, 0.01], forecast=lambda steps: [self.values[-1]]
+            )
+
+    monkeypatch.setattr(
+        "agents.analytics.pattern_recognition_agent.STATSMODELS_AVAILABLE", True
+    )
+    monkeypatch.setattr(
+        "agents.analytics.pattern_recognition_agent.ARIMA", FakeARIMA, raising=False
+    )
+
+    config = PatternConfig(temp_config)
+    forecasting_config = config.get_forecasting_config()
+    forecasting_config["method"] = "arima"
+    analyzer = TimeSeriesAnalyzer(sample_temporal_data, ["intensity"])
+
+    cold = ForecastEngine(forecasting_config, analyzer)
+    assert cold.forecast_next_hour("intensity")["method"] == "arima"
+
+    warm = ForecastEngine(forecasting_config, analyzer, cold.fitted_params)
+    warm.forecast_next_hour("intensity")
+
+    mismatched = ForecastEngine(forecasting_config, analyzer, {"intensity": [0.1]})
+    mismatched.forecast_next_hour("intensity")
+
+    assert fits == [None, [0.5, -0.2, 0.01], None]
+    assert warm.fitted_params == {"intensity": [0.5, -0.2, 0.01]}
+
+
 # ============================================================================
 # Integration Tests - Mock Neo4j
 # ============================================================================
@@ -555,6 +749,210 @@ def test_neo4j_query_temporal_data(mock_neo4j_connector, sample_temporal_data):
     connector.close()
 
 
+class RecordingNeo4jDriver:
+    """Mock Neo4j driver answering UNWIND bulk queries and counting them."""
+
+    def __init__(self, observations_by_camera):
+        self.observations_by_camera = observations_by_camera
+        self.queries = []
+        self.statements = []
+        self.fetch_sizes = []
+
+    def session(self, database=None, fetch_size=None):
+        self.fetch_sizes.append(fetch_size)
+        return RecordingNeo4jSession(self)
+
+    def close(self):
+        pass
+
+
+class RecordingNeo4jSession(MockNeo4jSession):
+    """Mock session returning one row per observation of the requested cameras."""
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    def run(self, query, **params):
+        self.driver.queries.append(params)
+        self.driver.statements.append(query)
+        rows = [
+            {"camera_id": camera_id, **obs}
+            for camera_id in params["camera_ids"]
+            for obs in self.driver.observations_by_camera.get(camera_id, [])
+        ]
+        return MockNeo4jResult(rows)
+
+
+def test_process_all_cameras_fetches_observations_in_bulk(
+    temp_config, sample_temporal_data, monkeypatch
+):
+    """Test that observations are fetched with one query per camera chunk."""
+    monkeypatch.setattr(
+        "agents.analytics.pattern_recognition_agent.NEO4J_AVAILABLE", True
+    )
+
+    def mock_neo4j_init(self, config):
+        self.config = config
+        self.database = "neo4j"
+        self.fetch_size = 250
+        self.driver = None
+
+    monkeypatch.setattr(
+        "agents.analytics.pattern_recognition_agent.Neo4jConnector.__init__",
+        mock_neo4j_init,
+    )
+
+    agent = PatternRecognitionAgent(temp_config)
+    agent.config.get_neo4j_config()["bulk_chunk_size"] = 2
+
+    cameras = [f"urn:ngsi-ld:Camera:{i}" for i in range(3)]
+    driver = RecordingNeo4jDriver(
+        {cameras[0]: sample_temporal_data, cameras[2]: sample_temporal_data}
+    )
+    agent.neo4j.driver = driver
+    monkeypatch.setattr(
+        agent.neo4j, "is_ready_for_pattern_analysis", lambda: (True, "ready")
+    )
+    monkeypatch.setattr(agent.neo4j, "get_all_cameras", lambda: cameras)
+    monkeypatch.setattr(
+        agent.neo4j,
+        "query_temporal_data",
+        lambda *args, **kwargs: pytest.fail("per-camera query used"),
+    )
+    monkeypatch.setattr(agent, "post_entities", lambda entities: len(entities))
+    monkeypatch.setattr(agent, "_save_results", lambda results, path: None)
+
+    results = agent.process_all_cameras("7_days")
+
+    assert [q["camera_ids"] for q in driver.queries] == [cameras[:2], cameras[2:]]
+    assert "ORDER BY camera_id, o.observedAt" in driver.statements[0]
+    assert driver.fetch_sizes == [250, 250]
+    assert results["cameras_processed"] == 2
+    assert results["failures"] == []
+
+    agent.close()
+
+
+def test_process_all_cameras_in_process_pool(
+    temp_config, sample_temporal_data, monkeypatch
+):
+    """Test that pooled analysis of pre-fetched series matches in-process analysis."""
+    monkeypatch.setattr(
+        "agents.analytics.pattern_recognition_agent.NEO4J_AVAILABLE", True
+    )
+
+    def mock_neo4j_init(self, config):
+        self.config = config
+        self.database = "neo4j"
+        self.fetch_size = 1000
+        self.driver = None
+
+    monkeypatch.setattr(
+        "agents.analytics.pattern_recognition_agent.Neo4jConnector.__init__",
+        mock_neo4j_init,
+    )
+    monkeypatch.setattr(
+        "agents.analytics.pattern_recognition_agent.os.cpu_count", lambda: 2
+    )
+
+    cameras = [f"urn:ngsi-ld:Camera:{i}" for i in range(6)]
+    observations = {camera_id: sample_temporal_data for camera_id in cameras[:-1]}
+
+    def run(parallel):
+        agent = PatternRecognitionAgent(temp_config)
+        agent.config.get_neo4j_config()["bulk_chunk_size"] = 4
+        agent.config.config["pattern_recognition"]["performance"] = {
+            "parallel_processing": parallel,
+            "max_workers": 2,
+            "chunk_size": 2,
+            "parallel_min_cameras": 0,
+        }
+        agent.neo4j.driver = RecordingNeo4jDriver(observations)
+        monkeypatch.setattr(
+            agent.neo4j, "is_ready_for_pattern_analysis", lambda: (True, "ready")
+        )
+        monkeypatch.setattr(agent.neo4j, "get_all_cameras", lambda: cameras)
+        monkeypatch.setattr(agent, "_save_results", lambda results, path: None)
+        posted = []
+        monkeypatch.setattr(
+            agent, "post_entities", lambda entities: posted.extend(entities) or 0
+        )
+        if parallel:
+            pool = agent._create_pool(len(cameras))
+            assert pool is not None
+            pool.shutdown()
+
+        results = agent.process_all_cameras("7_days")
+        agent.close()
+        return results, [
+            (e["refCamera"]["object"], e["rushHours"], e["forecast"]) for e in posted
+        ]
+
+    sequential_results, sequential_entities = run(parallel=False)
+    parallel_results, parallel_entities = run(parallel=True)
+
+    assert parallel_results["cameras_processed"] == 5
+    assert parallel_results == sequential_results
+    assert parallel_entities == sequential_entities
+
+
+class BreakingPool:
+    """Process pool whose worker dies after the first camera."""
+
+    def __init__(self):
+        self.shut_down = False
+
+    def map(self, fn, tasks, chunksize=1):
+        yield fn(tasks[0])
+        raise BrokenProcessPool("worker died")
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.shut_down = True
+
+
+def test_process_all_cameras_falls_back_when_pool_breaks(
+    temp_config, sample_temporal_data, monkeypatch
+):
+    """Test that cameras left by a broken pool are analyzed in-process."""
+    monkeypatch.setattr(
+        "agents.analytics.pattern_recognition_agent.NEO4J_AVAILABLE", True
+    )
+
+    def mock_neo4j_init(self, config):
+        self.config = config
+        self.database = "neo4j"
+        self.fetch_size = 1000
+        self.driver = None
+
+    monkeypatch.setattr(
+        "agents.analytics.pattern_recognition_agent.Neo4jConnector.__init__",
+        mock_neo4j_init,
+    )
+
+    cameras = [f"urn:ngsi-ld:Camera:{i}" for i in range(5)]
+    agent = PatternRecognitionAgent(temp_config)
+    agent.config.get_neo4j_config()["bulk_chunk_size"] = 3
+    agent.neo4j.driver = RecordingNeo4jDriver(
+        {camera_id: sample_temporal_data for camera_id in cameras}
+    )
+    monkeypatch.setattr(
+        agent.neo4j, "is_ready_for_pattern_analysis", lambda: (True, "ready")
+    )
+    monkeypatch.setattr(agent.neo4j, "get_all_cameras", lambda: cameras)
+    monkeypatch.setattr(agent, "_save_results", lambda results, path: None)
+    monkeypatch.setattr(agent, "post_entities", lambda entities: len(entities))
+    pool = BreakingPool()
+    monkeypatch.setattr(agent, "_create_pool", lambda camera_count: pool)
+    _init_pattern_worker(agent.config)
+
+    results = agent.process_all_cameras("7_days")
+    agent.close()
+
+    assert pool.shut_down
+    assert results["cameras_processed"] == 5
+    assert results["failures"] == []
+
+
 # ============================================================================
 # Integration Tests - Pattern Recognition Agent
 # ============================================================================
@@ -890,5 +1288,49 @@ def test_missing_metric_in_data(temp_config):
     assert len(hourly_stats) > 0
 
 
+# ============================================================================
+# Performance Tests
+# ============================================================================
+
+
+@pytest.mark.benchmark
+@pytest.mark.skipif(not PANDAS_AVAILABLE, reason="pandas not installed")
+def test_vectorised_statistics_benchmark():
+    """Benchmark statistics on a synthetic 1,000-camera x 7-day dataset."""
+    rng = random.Random(42)
+    base_time = datetime(2025, 11, 1, 0, 0, 0)
+    timestamps = [(base_time + timedelta(hours=i)).isoformat() for i in range(168)]
+    cameras = [
+        [
+            {"timestamp": ts, "intensity": rng.random(), "occupancy": rng.random()}
+            for ts in timestamps
+        ]
+        for _ in range(1000)
+    ]
+
+    def run(make_analyzer):
+        start = time.perf_counter()
+        for data in cameras:
+            analyzer = make_analyzer(data)
+            analyzer.get_hourly_aggregates("intensity")
+            analyzer.get_weekday_aggregates("intensity")
+            analyzer.calculate_zscore("intensity")
+        return time.perf_counter() - start
+
+    metrics = ["intensity", "occupancy"]
+    fallback_time = run(lambda data: python_fallback(TimeSeriesAnalyzer(data, metrics)))
+    vectorised_time = run(lambda data: TimeSeriesAnalyzer(data, metrics))
+
+    print(
+        f"\nPerformance: 1,000 cameras x 168 hours - "
+        f"python {fallback_time:.2f}s, vectorised {vectorised_time:.2f}s"
+    )
+    assert_same_statistics(
+        TimeSeriesAnalyzer(cameras[0], metrics),
+        python_fallback(TimeSeriesAnalyzer(cameras[0], metrics)),
+        "intensity",
+    )
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -17,7 +17,9 @@ Version: 1.0.0
 
 import json
 import os
+import re
 import tempfile
+import threading
 import time
 from pathlib import Path
 from typing import Dict, List, Any
@@ -33,10 +35,12 @@ import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 
 from agents.context_management.entity_publisher_agent import (
+    AdaptiveConcurrencyLimiter,
     ConfigLoader,
     BatchPublisher,
     PublishReportGenerator,
     EntityPublisherAgent,
+    PublishCache,
     PublishResult,
     PublishStatistics,
 )
@@ -563,6 +567,173 @@ class TestBatchPublisher:
         assert len(results) == 3
         assert all(r.success for r in results)
 
+    @responses.activate
+    def test_publish_batch_republishes_only_failed_ids(
+        self, sample_stellio_config, sample_ngsi_ld_entity
+    ):
+        """Test itemised batch errors resubmit only the failed entities."""
+        entities = [sample_ngsi_ld_entity.copy() for _ in range(4)]
+        for i, entity in enumerate(entities):
+            entity["id"] = f"urn:ngsi-ld:Camera:TEST{i:03d}"
+
+        responses.add(
+            responses.POST,
+            "http://localhost:8080/ngsi-ld/v1/entityOperations/upsert",
+            status=207,
+            json={
+                "success": [entities[0]["id"], entities[1]["id"], entities[3]["id"]],
+                "errors": [
+                    {
+                        "entityId": entities[2]["id"],
+                        "error": {"title": "BadRequestData", "detail": "Bad value"},
+                    }
+                ],
+            },
+        )
+        responses.add(
+            responses.POST,
+            "http://localhost:8080/ngsi-ld/v1/entities",
+            status=400,
+            json={"detail": "Bad value"},
+        )
+
+        publisher = BatchPublisher(sample_stellio_config)
+        results = publisher.publish_batch(entities)
+
+        assert [r.entity_id for r in results] == [e["id"] for e in entities]
+        assert [r.success for r in results] == [True, True, False, True]
+        assert len(responses.calls) == 2
+        assert json.loads(responses.calls[1].request.body)["id"] == entities[2]["id"]
+
+    @responses.activate
+    def test_publish_batch_bisects_unitemised_errors(
+        self, sample_stellio_config, sample_ngsi_ld_entity
+    ):
+        """Test a batch without per-entity errors is bisected."""
+        entities = [sample_ngsi_ld_entity.copy() for _ in range(16)]
+        for i, entity in enumerate(entities):
+            entity["id"] = f"urn:ngsi-ld:Camera:TEST{i:03d}"
+        bad_id = entities[11]["id"]
+
+        def upsert(request):
+            ids = [entity["id"] for entity in json.loads(request.body)]
+            if bad_id in ids:
+                return (400, {}, json.dumps({"title": "Invalid request"}))
+            return (204, {}, "")
+
+        responses.add_callback(
+            responses.POST,
+            "http://localhost:8080/ngsi-ld/v1/entityOperations/upsert",
+            callback=upsert,
+        )
+        responses.add(
+            responses.POST,
+            "http://localhost:8080/ngsi-ld/v1/entities",
+            status=400,
+            json={"detail": "Invalid request"},
+        )
+
+        publisher = BatchPublisher(sample_stellio_config)
+        results = publisher.publish_batch(entities)
+
+        assert [r.entity_id for r in results] == [e["id"] for e in entities]
+        assert [r.entity_id for r in results if not r.success] == [bad_id]
+        # 1 + 2 per level for log2(16) levels, plus one individual POST
+        assert len(responses.calls) == 1 + 2 * 4 + 1
+
+    @responses.activate
+    def test_publish_batch_fails_fast_on_auth_errors(
+        self, sample_stellio_config, sample_ngsi_ld_entity
+    ):
+        """Test a 401 batch fails every entity without bisecting."""
+        entities = [sample_ngsi_ld_entity.copy() for _ in range(16)]
+        for i, entity in enumerate(entities):
+            entity["id"] = f"urn:ngsi-ld:Camera:TEST{i:03d}"
+
+        responses.add(
+            responses.POST,
+            "http://localhost:8080/ngsi-ld/v1/entityOperations/upsert",
+            status=401,
+        )
+
+        publisher = BatchPublisher(sample_stellio_config)
+        results = publisher.publish_batch(entities)
+
+        assert [r.entity_id for r in results] == [e["id"] for e in entities]
+        assert not any(r.success for r in results)
+        assert all(r.status_code == 401 for r in results)
+        assert len(responses.calls) == 1
+
+    @responses.activate
+    def test_publish_batch_does_not_bisect_server_errors(
+        self, sample_stellio_config, sample_ngsi_ld_entity
+    ):
+        """Test a 500 batch falls back to individual POSTs once."""
+        entities = [sample_ngsi_ld_entity.copy() for _ in range(16)]
+        for i, entity in enumerate(entities):
+            entity["id"] = f"urn:ngsi-ld:Camera:TEST{i:03d}"
+
+        upsert_url = "http://localhost:8080/ngsi-ld/v1/entityOperations/upsert"
+        responses.add(responses.POST, upsert_url, status=500)
+        responses.add(
+            responses.POST, "http://localhost:8080/ngsi-ld/v1/entities", status=201
+        )
+
+        publisher = BatchPublisher(sample_stellio_config)
+        results = publisher.publish_batch(entities)
+
+        assert all(r.success for r in results)
+        upserts = [c for c in responses.calls if c.request.url == upsert_url]
+        assert len(upserts) == 1
+        assert len(responses.calls) == 1 + 16
+
+    @responses.activate
+    def test_publish_batch_backs_off_when_throttled(
+        self, sample_stellio_config, sample_ngsi_ld_entity
+    ):
+        """Test a throttled batch is retried whole and shrinks the window."""
+        entities = [sample_ngsi_ld_entity.copy() for _ in range(4)]
+        for i, entity in enumerate(entities):
+            entity["id"] = f"urn:ngsi-ld:Camera:TEST{i:03d}"
+
+        url = "http://localhost:8080/ngsi-ld/v1/entityOperations/upsert"
+        responses.add(responses.POST, url, status=429, headers={"Retry-After": "0"})
+        responses.add(responses.POST, url, status=204)
+
+        publisher = BatchPublisher(sample_stellio_config)
+        publisher.limiter = AdaptiveConcurrencyLimiter(max_limit=4)
+        results = publisher.publish_batch(entities)
+
+        assert all(r.success for r in results)
+        assert len(responses.calls) == 2
+        assert publisher.limiter.throttled == 1
+        assert publisher.limiter.limit == 2
+
+    @responses.activate
+    def test_publish_batch_fails_whole_batch_when_throttle_persists(
+        self, sample_stellio_config, sample_ngsi_ld_entity
+    ):
+        """Test a batch still throttled after retries is failed, not bisected."""
+        entities = [sample_ngsi_ld_entity.copy() for _ in range(16)]
+        for i, entity in enumerate(entities):
+            entity["id"] = f"urn:ngsi-ld:Camera:TEST{i:03d}"
+
+        responses.add(
+            responses.POST,
+            "http://localhost:8080/ngsi-ld/v1/entityOperations/upsert",
+            status=503,
+            headers={"Retry-After": "0"},
+        )
+
+        publisher = BatchPublisher(sample_stellio_config)
+        publisher.limiter = AdaptiveConcurrencyLimiter(max_limit=4)
+        results = publisher.publish_batch(entities)
+
+        assert not any(r.success for r in results)
+        assert all(r.status_code == 503 for r in results)
+        assert len(responses.calls) == publisher.retry_config["max_attempts"]
+        assert publisher.limiter.throttled == publisher.retry_config["max_attempts"]
+
     def test_publish_batch_empty_list(self, sample_stellio_config):
         """Test publishing empty batch."""
         publisher = BatchPublisher(sample_stellio_config)
@@ -580,11 +751,111 @@ class TestBatchPublisher:
         # Session should be closed (no exception means success)
 
 
+class TestAdaptiveConcurrencyLimiter:
+    """Unit tests for AdaptiveConcurrencyLimiter class."""
+
+    def test_window_adapts(self):
+        """Test additive increase, latency decrease and throttle halving."""
+        limiter = AdaptiveConcurrencyLimiter(
+            max_limit=8, min_limit=2, latency_target=1.0
+        )
+        assert limiter.limit == 8
+
+        limiter.on_throttle()
+        assert limiter.limit == 4
+        limiter.on_throttle()
+        limiter.on_throttle()
+        assert limiter.limit == 2
+
+        limiter.on_success(0.1)
+        assert limiter.limit == 3
+        limiter.on_success(2.0)
+        assert limiter.limit == 2
+
+    def test_acquire_blocks_at_limit(self):
+        """Test acquire waits until an in-flight batch is released."""
+        limiter = AdaptiveConcurrencyLimiter(max_limit=1)
+        limiter.acquire()
+
+        acquired = threading.Event()
+        waiter = threading.Thread(
+            target=lambda: (limiter.acquire(), acquired.set()), daemon=True
+        )
+        waiter.start()
+
+        assert not acquired.wait(0.05)
+        limiter.release()
+        assert acquired.wait(1)
+
+
 # ============================================================================
 # UNIT TESTS - PublishReportGenerator
 # ============================================================================
 
 
+class TestPublishCache:
+    """Test PublishCache class."""
+
+    def test_diff_unchanged_changed_and_uncached(self, sample_ngsi_ld_entity, tmp_path):
+        """Test diff reports changed attributes against the cached version."""
+        cache = PublishCache(str(tmp_path / "cache.json"))
+        assert cache.diff(sample_ngsi_ld_entity) is None
+
+        cache.record(sample_ngsi_ld_entity)
+        assert cache.diff(sample_ngsi_ld_entity) == []
+
+        changed = dict(sample_ngsi_ld_entity)
+        changed["name"] = {"type": "Property", "value": "Renamed"}
+        assert cache.diff(changed) == ["name"]
+
+    def test_diff_requires_upsert_for_removed_attributes(
+        self, sample_ngsi_ld_entity, tmp_path
+    ):
+        """Test removed attributes or a new type force a full upsert."""
+        cache = PublishCache(str(tmp_path / "cache.json"))
+        cache.record(sample_ngsi_ld_entity)
+
+        removed = {k: v for k, v in sample_ngsi_ld_entity.items() if k != "name"}
+        retyped = dict(sample_ngsi_ld_entity, type="Device")
+
+        assert cache.diff(removed) is None
+        assert cache.diff(retyped) is None
+
+    def test_persisted_and_expired(self, sample_ngsi_ld_entity, tmp_path):
+        """Test the cache survives a reload and expires old entries."""
+        path = str(tmp_path / "cache" / "publish_cache.json")
+        cache = PublishCache(path)
+        cache.record(sample_ngsi_ld_entity)
+        cache.save()
+
+        assert PublishCache(path).diff(sample_ngsi_ld_entity) == []
+        assert (
+            PublishCache(path, max_age_seconds=-1).diff(sample_ngsi_ld_entity) is None
+        )
+
+    def test_save_drops_expired_and_surplus_entries(self, tmp_path):
+        """Test saving prunes expired entries and caps the entry count."""
+        path = str(tmp_path / "cache.json")
+        cache = PublishCache(path, max_age_seconds=3600, max_entries=2)
+        for i in range(4):
+            cache.record({"id": f"urn:ngsi-ld:ItemFlowObserved:{i}", "type": "T"})
+            cache.entries[f"urn:ngsi-ld:ItemFlowObserved:{i}"]["published_at"] -= 4 - i
+        cache.entries["urn:ngsi-ld:ItemFlowObserved:3"]["published_at"] -= 7200
+        cache.save()
+
+        assert sorted(PublishCache(path).entries) == [
+            "urn:ngsi-ld:ItemFlowObserved:1",
+            "urn:ngsi-ld:ItemFlowObserved:2",
+        ]
+
+    def test_corrupt_file_starts_empty(self, tmp_path):
+        """Test an unreadable cache file is ignored."""
+        path = tmp_path / "cache.json"
+        path.write_text("{not json")
+
+        assert PublishCache(str(path)).entries == {}
+
+
 class TestPublishReportGenerator:
     """Unit tests for PublishReportGenerator class."""
 
@@ -890,6 +1161,407 @@ class TestEntityPublisherAgentIntegration:
 
         agent.close()
 
+    @responses.activate
+    def test_publish_concurrent_batches(
+        self, sample_config_file, sample_entities_file, tmp_path
+    ):
+        """Test concurrent publishing bounds in-flight batches and keeps order."""
+        lock = threading.Lock()
+        state = {"in_flight": 0, "peak": 0}
+
+        def upsert(request):
+            with lock:
+                state["in_flight"] += 1
+                state["peak"] = max(state["peak"], state["in_flight"])
+            time.sleep(0.05)
+            with lock:
+                state["in_flight"] -= 1
+            ids = [entity["id"] for entity in json.loads(request.body)]
+            if "urn:ngsi-ld:Camera:TEST007" in ids:
+                body = {
+                    "success": [i for i in ids if not i.endswith("TEST007")],
+                    "errors": [
+                        {
+                            "entityId": "urn:ngsi-ld:Camera:TEST007",
+                            "error": {"detail": "Bad value"},
+                        }
+                    ],
+                }
+                return (207, {}, json.dumps(body))
+            return (204, {}, "")
+
+        responses.add_callback(
+            responses.POST,
+            "http://localhost:8080/ngsi-ld/v1/entityOperations/upsert",
+            callback=upsert,
+        )
+        responses.add(
+            responses.POST, "http://localhost:8080/ngsi-ld/v1/entities", status=400
+        )
+
+        with open(sample_config_file, "r") as f:
+            config = yaml.safe_load(f)
+        config["stellio"]["output"]["report_dir"] = str(tmp_path)
+        config["stellio"]["batch_size"] = 1
+        config["stellio"]["performance"]["parallel_batches"] = True
+        config["stellio"]["performance"]["max_concurrent_batches"] = 3
+        config["stellio"]["performance"]["connection_pool_size"] = 2
+        with open(sample_config_file, "w") as f:
+            yaml.dump(config, f)
+
+        agent = EntityPublisherAgent(config_path=sample_config_file)
+        assert agent.publisher.session.get_adapter("http://")._pool_maxsize >= 3
+        report = agent.publish(
+            input_file=sample_entities_file, output_report=str(tmp_path / "report.json")
+        )
+
+        assert 1 < state["peak"] <= 3
+        assert report["total_entities"] == 10
+        assert report["successful"] == 9
+        assert report["failed"] == 1
+        assert report["errors"][0]["entity_id"] == "urn:ngsi-ld:Camera:TEST007"
+        assert agent.publisher.limiter is None
+
+        agent.close()
+
+    def test_concurrent_publish_grows_window_only_for_successful_batches(
+        self, sample_config_file
+    ):
+        """Test failed and throttled batches are not reported as successes."""
+        agent = EntityPublisherAgent(config_path=sample_config_file)
+        outcomes = {
+            "ok": [PublishResult(entity_id="ok", status_code=201, success=True)],
+            "failed": [
+                PublishResult(entity_id="ok2", status_code=201, success=True),
+                PublishResult(entity_id="failed", status_code=400, success=False),
+            ],
+            "throttled": [
+                PublishResult(entity_id="throttled", status_code=201, success=True)
+            ],
+        }
+
+        def publish_batch(batch):
+            entity_id = batch[0]["id"]
+            if entity_id == "throttled":
+                agent.publisher.limiter.on_throttle()
+            return outcomes[entity_id]
+
+        batches = [[{"id": entity_id}] for entity_id in outcomes]
+        with patch.object(AdaptiveConcurrencyLimiter, "on_success") as on_success:
+            with patch.object(
+                agent.publisher, "publish_batch", side_effect=publish_batch
+            ):
+                results = agent._publish_batches_concurrently(batches)
+
+        assert results == list(outcomes.values())
+        assert on_success.call_count == 1
+
+        agent.close()
+
+    @pytest.mark.parametrize("batch_status", [204, 500])
+    @responses.activate
+    def test_observation_links_coalesced_per_camera(
+        self, sample_config_file, tmp_path, batch_status
+    ):
+        """Test camera sosa:madeObservation links are written once per camera."""
+        observations = []
+        for i in range(6):
+            camera_id = f"urn:ngsi-ld:Camera:CAM{i % 2}"
+            observations.append(
+                {
+                    "id": f"urn:ngsi-ld:ItemFlowObserved:CAM{i % 2}-{i}",
+                    "type": "ItemFlowObserved",
+                    "refDevice": {"type": "Relationship", "object": camera_id},
+                    "intensity": {
+                        "type": "Property",
+                        "value": i,
+                        "observedAt": f"2025-11-01T10:0{i}:00Z",
+                    },
+                }
+            )
+        input_file = tmp_path / "observations.json"
+        input_file.write_text(json.dumps(observations))
+
+        responses.add(
+            responses.POST,
+            "http://localhost:8080/ngsi-ld/v1/entityOperations/upsert",
+            status=batch_status,
+        )
+        responses.add(
+            responses.POST, "http://localhost:8080/ngsi-ld/v1/entities", status=201
+        )
+        for camera in ("CAM0", "CAM1"):
+            responses.add(
+                responses.PATCH,
+                f"http://localhost:8080/ngsi-ld/v1/entities/urn:ngsi-ld:Camera:{camera}/attrs",
+                status=204,
+            )
+
+        with open(sample_config_file, "r") as f:
+            config = yaml.safe_load(f)
+        config["stellio"]["output"]["report_dir"] = str(tmp_path)
+        with open(sample_config_file, "w") as f:
+            yaml.dump(config, f)
+
+        agent = EntityPublisherAgent(config_path=sample_config_file)
+        report = agent.publish(input_file=str(input_file))
+
+        patches = [c for c in responses.calls if c.request.method == "PATCH"]
+        assert len(patches) == 2
+        cam0 = json.loads(patches[0].request.body)["sosa:madeObservation"]
+        assert [(r["object"], r["datasetId"]) for r in cam0] == [
+            (f"urn:ngsi-ld:ItemFlowObserved:CAM0-{i}",) * 2 for i in (0, 2, 4)
+        ]
+        assert all(r["type"] == "Relationship" for r in cam0)
+        assert cam0[2]["observedAt"] == "2025-11-01T10:04:00Z"
+        assert report["successful"] == 6
+        assert report["camera_updates"] == {"cameras": 2, "failed": 0}
+
+        agent.close()
+
+    @responses.activate
+    def test_publish_cache_skips_unchanged_and_updates_changed(
+        self, sample_config_file, sample_entities_file, tmp_path
+    ):
+        """Test the publish cache skips, attribute-updates and re-upserts."""
+        upsert_url = "http://localhost:8080/ngsi-ld/v1/entityOperations/upsert"
+        update_url = "http://localhost:8080/ngsi-ld/v1/entityOperations/update"
+        responses.add(responses.POST, upsert_url, status=201)
+
+        with open(sample_config_file, "r") as f:
+            config = yaml.safe_load(f)
+        config["stellio"]["output"]["report_dir"] = str(tmp_path)
+        config["stellio"]["publish_cache"] = {
+            "enabled": True,
+            "path": str(tmp_path / "cache" / "publish_cache.json"),
+        }
+        with open(sample_config_file, "w") as f:
+            yaml.dump(config, f)
+
+        # First run: everything is new
+        agent = EntityPublisherAgent(config_path=sample_config_file)
+        report = agent.publish(input_file=sample_entities_file)
+        agent.close()
+        assert report["publish_cache"] == {
+            "unchanged_skipped": 0,
+            "attribute_updates": 0,
+            "upserted": 10,
+        }
+
+        # Second run (new process): nothing changed, nothing is sent
+        responses.calls.reset()
+        agent = EntityPublisherAgent(config_path=sample_config_file)
+        report = agent.publish(input_file=sample_entities_file)
+        agent.close()
+        assert len(responses.calls) == 0
+        assert report["successful"] == 10
+        assert report["publish_cache"]["unchanged_skipped"] == 10
+
+        # Third run: two cameras renamed, one of them deleted from Stellio
+        with open(sample_entities_file, "r") as f:
+            entities = json.load(f)
+        for entity in entities[:2]:
+            entity["name"] = {"type": "Property", "value": "Renamed"}
+        with open(sample_entities_file, "w") as f:
+            json.dump(entities, f)
+        responses.add(
+            responses.POST,
+            update_url,
+            status=207,
+            json={
+                "success": ["urn:ngsi-ld:Camera:TEST000"],
+                "errors": [
+                    {
+                        "entityId": "urn:ngsi-ld:Camera:TEST001",
+                        "error": {"status": 404, "title": "Entity not found"},
+                    }
+                ],
+            },
+        )
+
+        responses.calls.reset()
+        agent = EntityPublisherAgent(config_path=sample_config_file)
+        report = agent.publish(input_file=sample_entities_file)
+        agent.close()
+
+        update_body = json.loads(responses.calls[0].request.body)
+        assert [sorted(e) for e in update_body] == [
+            ["@context", "id", "name", "type"],
+            ["@context", "id", "name", "type"],
+        ]
+        upsert_body = json.loads(responses.calls[1].request.body)
+        assert [e["id"] for e in upsert_body] == ["urn:ngsi-ld:Camera:TEST001"]
+        assert "location" in upsert_body[0]
+        assert report["successful"] == 10
+        assert report["publish_cache"] == {
+            "unchanged_skipped": 8,
+            "attribute_updates": 1,
+            "upserted": 1,
+        }
+
+    @responses.activate
+    def test_publish_cache_updates_link_observations(
+        self, sample_config_file, tmp_path
+    ):
+        """Test observations sent as attribute updates are linked to cameras."""
+        camera_id = "urn:ngsi-ld:Camera:CAM0"
+        observations = [
+            {
+                "id": f"urn:ngsi-ld:ItemFlowObserved:CAM0-{i}",
+                "type": "ItemFlowObserved",
+                "refDevice": {"type": "Relationship", "object": camera_id},
+                "intensity": {
+                    "type": "Property",
+                    "value": i,
+                    "observedAt": f"2025-11-01T10:0{i}:00Z",
+                },
+            }
+            for i in range(2)
+        ]
+        input_file = tmp_path / "observations.json"
+        input_file.write_text(json.dumps(observations))
+        responses.add(
+            responses.POST,
+            "http://localhost:8080/ngsi-ld/v1/entityOperations/upsert",
+            status=201,
+        )
+        responses.add(
+            responses.POST,
+            "http://localhost:8080/ngsi-ld/v1/entityOperations/update",
+            status=204,
+        )
+        responses.add(
+            responses.PATCH,
+            f"http://localhost:8080/ngsi-ld/v1/entities/{camera_id}/attrs",
+            status=204,
+        )
+
+        with open(sample_config_file, "r") as f:
+            config = yaml.safe_load(f)
+        config["stellio"]["output"]["report_dir"] = str(tmp_path)
+        config["stellio"]["publish_cache"] = {
+            "enabled": True,
+            "path": str(tmp_path / "cache" / "publish_cache.json"),
+        }
+        with open(sample_config_file, "w") as f:
+            yaml.dump(config, f)
+
+        agent = EntityPublisherAgent(config_path=sample_config_file)
+        agent.publish(input_file=str(input_file))
+        agent.close()
+
+        observations[1]["intensity"]["value"] = 7
+        input_file.write_text(json.dumps(observations))
+        responses.calls.reset()
+        agent = EntityPublisherAgent(config_path=sample_config_file)
+        report = agent.publish(input_file=str(input_file))
+        agent.close()
+
+        assert report["publish_cache"]["attribute_updates"] == 1
+        patches = [c for c in responses.calls if c.request.method == "PATCH"]
+        assert len(patches) == 1
+        link = json.loads(patches[0].request.body)["sosa:madeObservation"]
+        assert link["object"] == "urn:ngsi-ld:ItemFlowObserved:CAM0-1"
+        assert report["camera_updates"] == {"cameras": 1, "failed": 0}
+
+    @responses.activate
+    def test_publish_cache_dropped_when_stellio_was_reset(
+        self, sample_config_file, sample_entities_file, tmp_path
+    ):
+        """Test a missing probed entity forces a full upsert of everything."""
+        upsert_url = "http://localhost:8080/ngsi-ld/v1/entityOperations/upsert"
+        entities_url = "http://localhost:8080/ngsi-ld/v1/entities/"
+        responses.add(responses.POST, upsert_url, status=201)
+
+        with open(sample_config_file, "r") as f:
+            config = yaml.safe_load(f)
+        config["stellio"]["output"]["report_dir"] = str(tmp_path)
+        config["stellio"]["publish_cache"] = {
+            "enabled": True,
+            "path": str(tmp_path / "cache" / "publish_cache.json"),
+            "existence_probes": 2,
+        }
+        with open(sample_config_file, "w") as f:
+            yaml.dump(config, f)
+
+        agent = EntityPublisherAgent(config_path=sample_config_file)
+        agent.publish(input_file=sample_entities_file)
+        agent.close()
+
+        # Stellio still holds the entities: probes only, nothing is sent
+        responses.calls.reset()
+        probe = responses.add(
+            responses.GET, re.compile(re.escape(entities_url) + ".*"), status=200
+        )
+        agent = EntityPublisherAgent(config_path=sample_config_file)
+        report = agent.publish(input_file=sample_entities_file)
+        agent.close()
+        assert [c.request.method for c in responses.calls] == ["GET", "GET"]
+        assert report["publish_cache"]["unchanged_skipped"] == 10
+
+        # Stellio was reset: the first probe misses and everything is upserted
+        responses.remove(probe)
+        responses.add(
+            responses.GET, re.compile(re.escape(entities_url) + ".*"), status=404
+        )
+        responses.calls.reset()
+        agent = EntityPublisherAgent(config_path=sample_config_file)
+        report = agent.publish(input_file=sample_entities_file)
+        agent.close()
+        assert [c.request.method for c in responses.calls] == ["GET", "POST"]
+        assert len(json.loads(responses.calls[1].request.body)) == 10
+        assert report["publish_cache"] == {
+            "unchanged_skipped": 0,
+            "attribute_updates": 0,
+            "upserted": 10,
+        }
+
+    @responses.activate
+    def test_publish_cache_kept_when_probe_fails(
+        self, sample_config_file, sample_entities_file, tmp_path
+    ):
+        """Test a failed probe upserts everything once but keeps the cache."""
+        upsert_url = "http://localhost:8080/ngsi-ld/v1/entityOperations/upsert"
+        entities_url = "http://localhost:8080/ngsi-ld/v1/entities/"
+        responses.add(responses.POST, upsert_url, status=201)
+
+        with open(sample_config_file, "r") as f:
+            config = yaml.safe_load(f)
+        config["stellio"]["output"]["report_dir"] = str(tmp_path)
+        config["stellio"]["publish_cache"] = {
+            "enabled": True,
+            "path": str(tmp_path / "cache" / "publish_cache.json"),
+            "existence_probes": 1,
+        }
+        with open(sample_config_file, "w") as f:
+            yaml.dump(config, f)
+
+        agent = EntityPublisherAgent(config_path=sample_config_file)
+        agent.publish(input_file=sample_entities_file)
+        agent.close()
+
+        probe = responses.add(
+            responses.GET, re.compile(re.escape(entities_url) + ".*"), status=500
+        )
+        responses.calls.reset()
+        agent = EntityPublisherAgent(config_path=sample_config_file)
+        report = agent.publish(input_file=sample_entities_file)
+        agent.close()
+        probe_request = responses.calls[0].request
+        assert probe_request.headers["User-Agent"] == "EntityPublisherAgent/1.0"
+        assert report["publish_cache"]["upserted"] == 10
+
+        # The cache survived: a successful probe skips everything again
+        responses.remove(probe)
+        responses.add(
+            responses.GET, re.compile(re.escape(entities_url) + ".*"), status=200
+        )
+        agent = EntityPublisherAgent(config_path=sample_config_file)
+        assert len(agent.cache.entries) == 10
+        report = agent.publish(input_file=sample_entities_file)
+        agent.close()
+        assert report["publish_cache"]["unchanged_skipped"] == 10
+
     def test_publish_empty_input(self, sample_config_file, tmp_path):
         """Test publishing with empty input file."""
         empty_file = tmp_path / "empty.json"
@@ -0,0 +1,157 @@
+"""
+Test Suite for Kafka Entity Publisher Agent
+
+Tests pipelined publishing against a local mock producer:
+- Single flush and no per-message waits
+- Bounded in-flight messages
+- Failed-entity accounting from delivery callbacks and flush timeouts
+
+Author: LOD Pipeline Team
+Version: 1.0.0
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src/agents"))
+)
+
+from kafka_entity_publisher_agent import KafkaEntityPublisherAgent
+
+
+class MockFuture:
+    """Minimal kafka-python FutureRecordMetadata."""
+
+    def __init__(self):
+        self.callbacks = []
+        self.errbacks = []
+        self.waited = False
+        self.outcome = None
+
+    def add_callback(self, fn, *args):
+        self.callbacks.append((fn, args))
+        if self.outcome is not None and self.outcome[0] is None:
+            fn(*args, self.outcome[1])
+
+    def add_errback(self, fn, *args):
+        self.errbacks.append((fn, args))
+        if self.outcome is not None and self.outcome[0] is not None:
+            fn(*args, self.outcome[0])
+
+    def get(self, timeout=None):
+        self.waited = True
+        return type("RecordMetadata", (), {"partition": 0, "offset": 0})()
+
+    def resolve(self, error=None):
+        metadata = type("RecordMetadata", (), {"partition": 0, "offset": 0})()
+        self.outcome = (error, metadata)
+        if error is None:
+            for fn, args in self.callbacks:
+                fn(*args, metadata)
+        else:
+            for fn, args in self.errbacks:
+                fn(*args, error)
+
+
+class MockProducer:
+    """Producer that acknowledges messages in batches or on flush."""
+
+    def __init__(self, batch=None, fail_ids=(), lose_ids=()):
+        self.batch = batch
+        self.fail_ids = set(fail_ids)
+        self.lose_ids = set(lose_ids)
+        self.pending = []
+        self.futures = []
+        self.sent = []
+        self.flushes = 0
+        self.peak_pending = 0
+
+    def send(self, topic, key=None, value=None):
+        if key == "urn:ngsi-ld:Camera:REJECT":
+            raise BufferError("Local queue full")
+
+        future = MockFuture()
+        self.sent.append(key)
+        self.futures.append(future)
+        self.pending.append((key, future))
+        self.peak_pending = max(self.peak_pending, len(self.pending))
+        if self.batch and len(self.pending) >= self.batch:
+            self._deliver()
+        return future
+
+    def flush(self, timeout=None):
+        self.flushes += 1
+        self._deliver()
+
+    def _deliver(self):
+        pending, self.pending = self.pending, []
+        for key, future in pending:
+            if key in self.lose_ids:
+                continue
+            future.resolve(Exception("Broker error") if key in self.fail_ids else None)
+
+
+def make_entities(count):
+    """Create Camera entities."""
+    return [{"id": f"urn:ngsi-ld:Camera:C{i}", "type": "Camera"} for i in range(count)]
+
+
+def test_pipelined_publish_flushes_once():
+    """Test entities are sent without waiting for each acknowledgment."""
+    producer = MockProducer()
+    agent = KafkaEntityPublisherAgent({"max_in_flight": 100}, producer=producer)
+
+    results = agent.publish_entities(make_entities(50))
+
+    assert results["published"] == 50
+    assert results["failed"] == 0
+    assert producer.flushes == 1
+    assert producer.sent == [f"urn:ngsi-ld:Camera:C{i}" for i in range(50)]
+    assert not any(future.waited for future in producer.futures)
+
+
+def test_pipelined_publish_bounds_in_flight():
+    """Test unacknowledged messages never exceed max_in_flight."""
+    producer = MockProducer(batch=5)
+    agent = KafkaEntityPublisherAgent({"max_in_flight": 5}, producer=producer)
+
+    results = agent.publish_entities(make_entities(23))
+
+    assert results["published"] == 23
+    assert producer.peak_pending == 5
+
+
+def test_pipelined_publish_counts_failures():
+    """Test broker errors, send errors and unconfirmed deliveries are failures."""
+    entities = make_entities(6)
+    entities.insert(2, {"id": "urn:ngsi-ld:Camera:REJECT", "type": "Camera"})
+    producer = MockProducer(
+        fail_ids={"urn:ngsi-ld:Camera:C1"}, lose_ids={"urn:ngsi-ld:Camera:C4"}
+    )
+    agent = KafkaEntityPublisherAgent({}, producer=producer)
+
+    results = agent.publish_entities(entities)
+
+    assert results["total"] == 7
+    assert results["published"] == 4
+    assert [(e["id"], e["error"]) for e in results["failed_entities"]] == [
+        ("urn:ngsi-ld:Camera:C1", "Broker error"),
+        ("urn:ngsi-ld:Camera:REJECT", "Local queue full"),
+        ("urn:ngsi-ld:Camera:C4", "Delivery not confirmed before flush timeout"),
+    ]
+
+
+@pytest.mark.parametrize("mode", ["sync", "pipelined"])
+def test_modes_publish_same_events(mode):
+    """Test sync mode keeps per-message acknowledgment."""
+    producer = MockProducer(batch=1)
+    agent = KafkaEntityPublisherAgent({"mode": mode}, producer=producer)
+
+    results = agent.publish_entities(make_entities(3))
+
+    assert results["published"] == 3
+    assert producer.sent == [f"urn:ngsi-ld:Camera:C{i}" for i in range(3)]
+    assert all(future.waited for future in producer.futures) == (mode == "sync")
@@ -0,0 +1,201 @@
+"""
+Test Suite for Stellio State Query Agent
+
+Tests for paginated entity queries:
+- Concurrent page fetch when the result count is known
+- Link rel="next" pagination when it is not
+- Attribute projection and streaming save
+
+Author: LOD Pipeline Team
+Version: 1.0.0
+"""
+
+import json
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import responses
+import yaml
+
+from agents.context_management.stellio_state_query_agent import (
+    StellioStateQueryAgent,
+    main,
+)
+
+BASE_URL = "http://stellio.test"
+QUERY_URL = f"{BASE_URL}/ngsi-ld/v1/entities"
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    """Create Stellio configuration with small pages."""
+    config = {
+        "stellio": {
+            "base_url": BASE_URL,
+            "timeout": 5,
+            "query": {"page_size": 10, "max_concurrent_pages": 3},
+        }
+    }
+    path = tmp_path / "stellio.yaml"
+    path.write_text(yaml.safe_dump(config), encoding="utf-8")
+    return str(path)
+
+
+def make_cameras(count):
+    """Create Camera entities."""
+    return [
+        {
+            "id": f"urn:ngsi-ld:Camera:C{i:03d}",
+            "type": "Camera",
+            "congested": {"type": "Property", "value": True},
+        }
+        for i in range(count)
+    ]
+
+
+def paged_callback(entities, with_count=True, delay=0.0):
+    """Serve entities by limit/offset, recording peak concurrent requests."""
+    state = {"active": 0, "peak": 0, "requests": []}
+    lock = threading.Lock()
+
+    def callback(request):
+        params = parse_qs(urlparse(request.url).query)
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+            state["requests"].append(params)
+
+        time.sleep(delay)
+        limit = int(params["limit"][0])
+        offset = int(params["offset"][0])
+        headers = {}
+        if with_count and params.get("count") == ["true"]:
+            headers["NGSILD-Results-Count"] = str(len(entities))
+
+        with lock:
+            state["active"] -= 1
+        return 200, headers, json.dumps(entities[offset : offset + limit])
+
+    return callback, state
+
+
+@responses.activate
+def test_iter_entities_fetches_all_pages_concurrently(config_file):
+    """Test every page is fetched, in order, with bounded concurrency."""
+    cameras = make_cameras(95)
+    callback, state = paged_callback(cameras, delay=0.05)
+    responses.add_callback(responses.GET, QUERY_URL, callback=callback)
+
+    agent = StellioStateQueryAgent(config_file)
+    entities = list(agent.iter_entities("Camera", "congested==true"))
+
+    assert entities == cameras
+    assert len(state["requests"]) == 10
+    assert state["requests"][0]["count"] == ["true"]
+    assert all("count" not in params for params in state["requests"][1:])
+    assert 1 < state["peak"] <= 3
+
+
+@responses.activate
+def test_iter_entities_follows_next_link(config_file):
+    """Test Link rel="next" is followed when no count is returned."""
+    cameras = make_cameras(25)
+    pages = [cameras[0:10], cameras[10:20], cameras[20:25]]
+
+    responses.add(
+        responses.GET,
+        QUERY_URL,
+        json=pages[0],
+        headers={"Link": '</ngsi-ld/v1/entities?page=2>; rel="next"'},
+        match=[
+            responses.matchers.query_param_matcher(
+                {"limit": "10", "offset": "0", "count": "true", "type": "Camera"}
+            )
+        ],
+    )
+    responses.add(
+        responses.GET,
+        f"{QUERY_URL}?page=2",
+        json=pages[1],
+        headers={"Link": '</ngsi-ld/v1/entities?page=3>; rel="next"'},
+        match=[responses.matchers.query_param_matcher({"page": "2"})],
+    )
+    responses.add(
+        responses.GET,
+        f"{QUERY_URL}?page=3",
+        json=pages[2],
+        match=[responses.matchers.query_param_matcher({"page": "3"})],
+    )
+
+    agent = StellioStateQueryAgent(config_file)
+
+    assert list(agent.iter_entities("Camera")) == cameras
+    assert len(responses.calls) == 3
+
+
+@responses.activate
+def test_iter_entities_pages_by_offset_without_count(config_file):
+    """Test offset paging stops at the first short page."""
+    cameras = make_cameras(20)
+    callback, state = paged_callback(cameras, with_count=False)
+    responses.add_callback(responses.GET, QUERY_URL, callback=callback)
+
+    agent = StellioStateQueryAgent(config_file)
+
+    assert list(agent.iter_entities("Camera")) == cameras
+    assert [params["offset"] for params in state["requests"]] == [
+        ["0"],
+        ["10"],
+        ["20"],
+    ]
+
+
+@responses.activate
+def test_main_streams_projected_entities(config_file, tmp_path):
+    """Test orchestrator entry point saves every entity with projection."""
+    cameras = make_cameras(23)
+    callback, state = paged_callback(cameras)
+    responses.add_callback(responses.GET, QUERY_URL, callback=callback)
+    output_file = tmp_path / "updated_cameras.json"
+
+    result = main(
+        {
+            "config_path": config_file,
+            "query_filter": "congested==true",
+            "attrs": ["congested", "location"],
+            "output_file": str(output_file),
+        }
+    )
+
+    assert result["status"] == "success"
+    assert result["entities_found"] == 23
+    assert output_file.read_text(encoding="utf-8") == json.dumps(
+        cameras, indent=2, ensure_ascii=False
+    )
+    assert all(
+        params["attrs"] == ["congested,location"] for params in state["requests"]
+    )
+
+
+@responses.activate
+def test_failed_page_keeps_previous_output(config_file, tmp_path):
+    """Test a failing page does not leave a truncated output file."""
+    cameras = make_cameras(30)
+    callback, _ = paged_callback(cameras)
+
+    def flaky(request):
+        if "offset=20" in request.url:
+            return 500, {}, "error"
+        return callback(request)
+
+    responses.add_callback(responses.GET, QUERY_URL, callback=flaky)
+    output_file = tmp_path / "updated_cameras.json"
+    output_file.write_text("[]", encoding="utf-8")
+
+    result = main({"config_path": config_file, "output_file": str(output_file)})
+
+    assert result["status"] == "failed"
+    assert output_file.read_text(encoding="utf-8") == "[]"
+    assert not (tmp_path / "updated_cameras.json.tmp").exists()
@@ -563,6 +563,130 @@ def test_post_temporal_instances_failure(mock_post, temp_config):
     assert success is False
 
 
+def _instances(count, attr="intensity"):
+    """Build temporal instances for bulk tests."""
+    return {
+        attr: [
+            {"type": "Property", "value": i, "observedAt": "2025-11-01T10:00:00Z"}
+            for i in range(count)
+        ]
+    }
+
+
+@patch("time.sleep")
+@patch("requests.Session.post")
+def test_post_temporal_bulk_splits_and_retries_failed(
+    mock_post, mock_sleep, temp_config
+):
+    """Test bulk writer chunks instances and retries only failed entities."""
+    config = TemporalConfig(temp_config)
+    store = TemporalDataStore(config)
+    store.max_instances_per_request = 2
+
+    failures = {"urn:ngsi-ld:Camera:B": 1}
+
+    def respond(url, json=None, headers=None, timeout=None):
+        response = Mock()
+        response.text = "error"
+        entity_id = url.split("/entities/")[1].split("/")[0]
+        if failures.get(entity_id):
+            failures[entity_id] -= 1
+            response.status_code = 503
+        else:
+            response.status_code = 204
+        return response
+
+    mock_post.side_effect = respond
+
+    results = store.post_temporal_bulk(
+        {"urn:ngsi-ld:Camera:A": _instances(3), "urn:ngsi-ld:Camera:B": _instances(1)}
+    )
+
+    assert results == {"urn:ngsi-ld:Camera:A": True, "urn:ngsi-ld:Camera:B": True}
+    # A: 2 chunks, B: 1 failed + 1 retry
+    assert mock_post.call_count == 4
+    assert mock_sleep.call_count == 1
+    sizes = sorted(len(c.kwargs["json"]["intensity"]) for c in mock_post.call_args_list)
+    assert sizes == [1, 1, 1, 2]
+
+
+@patch("time.sleep")
+@patch("requests.Session.post")
+def test_post_temporal_bulk_reports_persistent_failure(
+    mock_post, mock_sleep, temp_config
+):
+    """Test entities still failing after retries are reported as failed."""
+    config = TemporalConfig(temp_config)
+    store = TemporalDataStore(config)
+
+    def respond(url, json=None, headers=None, timeout=None):
+        response = Mock()
+        response.text = "error"
+        response.status_code = 500 if "Camera:B" in url else 201
+        return response
+
+    mock_post.side_effect = respond
+
+    results = store.post_temporal_bulk(
+        {"urn:ngsi-ld:Camera:A": _instances(1), "urn:ngsi-ld:Camera:B": _instances(1)}
+    )
+
+    assert results == {"urn:ngsi-ld:Camera:A": True, "urn:ngsi-ld:Camera:B": False}
+    assert mock_post.call_count == 1 + 1 + store.max_retries
+
+
+@patch("requests.Session.post")
+def test_post_temporal_bulk_batch_endpoint(mock_post, temp_config):
+    """Test batch endpoint partial errors resubmit only the failed entity."""
+    config = TemporalConfig(temp_config)
+    store = TemporalDataStore(config)
+    store.batch_endpoint = "/ngsi-ld/v1/temporal/entityOperations/upsert"
+    store.batch_endpoint_supported = True
+    store.retry_backoff = 0
+
+    partial = Mock(status_code=207)
+    partial.json.return_value = {
+        "success": ["urn:ngsi-ld:Camera:A"],
+        "errors": [{"entityId": "urn:ngsi-ld:Camera:B", "error": {}}],
+    }
+    mock_post.side_effect = [partial, Mock(status_code=204)]
+
+    results = store.post_temporal_bulk(
+        {"urn:ngsi-ld:Camera:A": _instances(1), "urn:ngsi-ld:Camera:B": _instances(1)}
+    )
+
+    assert all(results.values())
+    first, retry = mock_post.call_args_list
+    assert [item["id"] for item in first.kwargs["json"]] == [
+        "urn:ngsi-ld:Camera:A",
+        "urn:ngsi-ld:Camera:B",
+    ]
+    assert [item["id"] for item in retry.kwargs["json"]] == ["urn:ngsi-ld:Camera:B"]
+
+
+@patch("requests.Session.post")
+def test_post_temporal_bulk_batch_endpoint_fallback(mock_post, temp_config):
+    """Test unsupported batch endpoint falls back to per-entity requests."""
+    config = TemporalConfig(temp_config)
+    store = TemporalDataStore(config)
+    store.batch_endpoint = "/ngsi-ld/v1/temporal/entityOperations/upsert"
+    store.batch_endpoint_supported = True
+
+    mock_post.side_effect = [
+        Mock(status_code=404),
+        Mock(status_code=204),
+        Mock(status_code=204),
+    ]
+
+    results = store.post_temporal_bulk(
+        {"urn:ngsi-ld:Camera:A": _instances(1), "urn:ngsi-ld:Camera:B": _instances(1)}
+    )
+
+    assert all(results.values())
+    assert store.batch_endpoint_supported is False
+    assert mock_post.call_count == 3
+
+
 # ============================================================================
 # Integration Tests
 # ============================================================================
@@ -613,6 +737,29 @@ def test_agent_statistics(temp_config):
     assert "observations_archived" in stats
 
 
+@patch("requests.Session.post")
+def test_agent_store_observations_bulk(mock_post, temp_config, sample_observations):
+    """Test storing observations for several entities in one call."""
+    mock_post.return_value = Mock(status_code=204)
+
+    agent = TemporalDataManagerAgent(temp_config)
+    results = agent.store_temporal_observations_bulk(
+        {
+            "urn:ngsi-ld:Camera:A": sample_observations,
+            "urn:ngsi-ld:Camera:B": sample_observations,
+            "urn:ngsi-ld:Camera:C": [],
+        }
+    )
+
+    assert results == {
+        "urn:ngsi-ld:Camera:A": True,
+        "urn:ngsi-ld:Camera:B": True,
+        "urn:ngsi-ld:Camera:C": True,
+    }
+    assert mock_post.call_count == 2
+    assert agent.stats["observations_stored"] == 2 * len(sample_observations)
+
+
 # ============================================================================
 # Data Integrity Tests
 # ============================================================================
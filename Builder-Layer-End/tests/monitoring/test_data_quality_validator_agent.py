@@ -15,6 +15,7 @@ Date: 2025-11-02
 """
 
 import pytest
+import asyncio
 import json
 import yaml
 import os
@@ -35,6 +36,9 @@ from agents.monitoring.data_quality_validator_agent import (
     QualityScorer,
     DataCleaner,
     DataQualityValidatorAgent,
+    ExpressionCompiler,
+    URLReachabilityChecker,
+    VectorizedRuleEvaluator,
 )
 
 
@@ -482,6 +486,193 @@ class TestBusinessRulesEngine:
         )
         assert result is False
 
+    def test_rules_compiled_once_per_entity_type(self, business_rules_engine):
+        """Test rules are compiled on first use and then reused."""
+        rules_first = business_rules_engine.get_compiled_rules("Camera")
+        rules_second = business_rules_engine.get_compiled_rules("Camera")
+
+        assert rules_first is rules_second
+        assert all(
+            expression.code is not None or expression.error
+            for rule in rules_first
+            for expression, _ in rule.expressions
+        )
+
+    def test_compiler_caches_expressions(self):
+        """Test identical expressions share one compiled object."""
+        compiler = ExpressionCompiler()
+
+        first = compiler.compile("speed >= 0.0 AND speed <= 120.0")
+        second = compiler.compile("speed >= 0.0 AND speed <= 120.0")
+
+        assert first is second
+        assert first.code is not None
+
+    def test_compiler_rejects_unsafe_expressions(self, business_rules_engine):
+        """Test expressions outside the rule language never execute."""
+        compiler = ExpressionCompiler()
+
+        for expression in [
+            "__import__('os').system('echo unsafe')",
+            "speed.__class__",
+            "open('/etc/passwd')",
+        ]:
+            compiled = compiler.compile(expression)
+            assert compiled.code is None
+            assert (
+                business_rules_engine._evaluate_expression(expression, 1, {}) is False
+            )
+
+    def test_compiled_matches_interpreted(
+        self, data_quality_config, valid_camera_entity, invalid_camera_entity
+    ):
+        """Test compiled evaluation gives the same results as string evaluation."""
+        compiled_engine = BusinessRulesEngine(data_quality_config)
+        interpreted_engine = BusinessRulesEngine(data_quality_config)
+        interpreted_engine.compile_expressions = False
+
+        entities = [
+            valid_camera_entity,
+            invalid_camera_entity,
+            {
+                "id": "urn:ngsi-ld:TrafficFlowObserved:TF001",
+                "type": "TrafficFlowObserved",
+                "intensity": {"type": "Property", "value": -3},
+                "occupancy": {"type": "Property", "value": 0.4},
+                "dateObserved": {"type": "Property", "value": "2025-11-01"},
+                "refDevice": {"type": "Relationship", "object": "urn:ngsi-ld:X:1"},
+                "category": {"type": "Property", "value": []},
+            },
+        ]
+
+        with patch.object(BusinessRulesEngine, "_http_head_check", return_value=200):
+            for entity in entities:
+                assert compiled_engine.evaluate_rules(
+                    entity, entity["type"]
+                ) == interpreted_engine.evaluate_rules(entity, entity["type"])
+
+
+# ==============================================================================
+# URL Reachability Checker Tests
+# ==============================================================================
+
+
+class TestURLReachabilityChecker:
+    """Test batched, cached http_head() checks."""
+
+    @pytest.fixture
+    def url_checker(self, data_quality_config):
+        """Create URL checker from performance configuration."""
+        return URLReachabilityChecker(data_quality_config.get_performance_config())
+
+    def test_normalize_url_ignores_cache_busting_params(self, url_checker):
+        """Test URLs differing only by cache-busting params share a key."""
+        first = url_checker.normalize_url(
+            "HTTPS://Example.com/render/ImageHandler.ashx?id=abc&t=1763409530160"
+        )
+        second = url_checker.normalize_url(
+            "https://example.com/render/ImageHandler.ashx?t=1763409539999&id=abc"
+        )
+
+        assert first == second
+        assert first == "https://example.com/render/ImageHandler.ashx?id=abc"
+
+    def test_prefetch_deduplicates_urls(self, url_checker):
+        """Test each normalised URL is requested only once per batch."""
+        calls = []
+
+        async def fake_fetch(session, url):
+            calls.append(url)
+            return 200
+
+        urls = [
+            f"https://example.com/snapshot.jpg?id=cam{i % 5}&t={i}" for i in range(50)
+        ]
+
+        with patch.object(url_checker, "_fetch_status", side_effect=fake_fetch):
+            results = url_checker.prefetch(urls)
+            url_checker.prefetch(urls)
+
+        assert len(calls) == 5
+        assert len(results) == 5
+        assert url_checker.get_cached(urls[0]) == 200
+
+    def test_prefetch_requests_original_url(self, url_checker):
+        """Test HEAD requests go to the URL as referenced, not its cache key."""
+        calls = []
+
+        async def fake_fetch(session, url):
+            calls.append(url)
+            return 200
+
+        url = "https://example.com/render/?id=abc&t=1763409530160"
+
+        with patch.object(url_checker, "_fetch_status", side_effect=fake_fetch):
+            results = url_checker.prefetch([url])
+
+        assert calls == [url]
+        assert results == {"https://example.com/render?id=abc": 200}
+        assert url_checker.get_cached(url) == 200
+
+    def test_negative_cache_expires_sooner(self, url_checker):
+        """Test unreachable URLs are cached for the negative TTL only."""
+        url_checker.cache_ttl = 300
+        url_checker.negative_cache_ttl = 60
+
+        url_checker.store("https://up.example.com/a.jpg", 200)
+        url_checker.store("https://down.example.com/a.jpg", 0)
+
+        with patch("time.time", return_value=time.time() + 120):
+            assert url_checker.get_cached("https://up.example.com/a.jpg") == 200
+            assert url_checker.get_cached("https://down.example.com/a.jpg") is None
+
+    def test_prefetch_limits_concurrency_per_host(self, url_checker):
+        """Test no more than the configured requests run against one host."""
+        url_checker.max_concurrent_per_host = 2
+        in_flight = {"current": 0, "peak": 0}
+
+        async def fake_fetch(session, url):
+            in_flight["current"] += 1
+            in_flight["peak"] = max(in_flight["peak"], in_flight["current"])
+            await asyncio.sleep(0.01)
+            in_flight["current"] -= 1
+            return 200
+
+        urls = [f"https://example.com/cam{i}.jpg" for i in range(10)]
+
+        with patch.object(url_checker, "_fetch_status", side_effect=fake_fetch):
+            url_checker.prefetch(urls)
+
+        assert in_flight["peak"] == 2
+
+    def test_validate_batch_prefetches_urls(self, validator_agent, valid_camera_entity):
+        """Test batch validation resolves http_head() URLs before rule evaluation."""
+        entities = []
+        for i in range(20):
+            entity = json.loads(json.dumps(valid_camera_entity))
+            entity["id"] = f"urn:ngsi-ld:Camera:CAM{i:03d}"
+            entity["imageSnapshot"][
+                "value"
+            ] = f"https://example.com/camera/snapshot.jpg?t={i}"
+            entities.append(entity)
+
+        checker = validator_agent.rules_engine.url_checker
+
+        async def fake_fetch(session, url):
+            return 200
+
+        with (
+            patch.object(
+                checker, "_fetch_status", side_effect=fake_fetch
+            ) as mock_fetch,
+            patch("requests.head") as mock_head,
+        ):
+            reports = validator_agent.validate_batch(entities, parallel=False)
+
+        assert len(reports) == 20
+        assert mock_fetch.call_count == 1
+        assert mock_head.call_count == 0
+
 
 # ==============================================================================
 # Quality Scorer Tests
@@ -753,6 +944,95 @@ class TestDataQualityValidatorAgent:
         assert len(reports) == 10
         assert all("quality_score" in r for r in reports)
 
+    def test_numeric_rules_are_vectorizable(self, validator_agent):
+        """Test numeric range rules are planned as column operations."""
+        evaluator = VectorizedRuleEvaluator(validator_agent.rules_engine)
+        rules = {
+            rule.name: rule
+            for rule in validator_agent.rules_engine.get_compiled_rules(
+                "TrafficFlowObserved"
+            )
+        }
+
+        for name in [
+            "realistic_speed",
+            "traffic_flow_consistency",
+            "occupancy_percentage",
+            "valid_coordinates",
+        ]:
+            assert evaluator.is_vectorizable(rules[name]), name
+
+        assert not evaluator.is_vectorizable(rules["timestamp_order"])
+
+    def test_vectorized_batch_matches_sequential(
+        self, validator_agent, valid_camera_entity, invalid_camera_entity
+    ):
+        """Test vectorized batch mode produces the same per-entity reports."""
+        entities = [valid_camera_entity, invalid_camera_entity]
+        for i in range(30):
+            entities.append(
+                {
+                    "id": f"urn:ngsi-ld:TrafficFlowObserved:TF{i:03d}",
+                    "type": "TrafficFlowObserved",
+                    "@context": "https://uri.etsi.org/ngsi-ld/v1/ngsi-ld-core-context.jsonld",
+                    "location": {
+                        "type": "GeoProperty",
+                        "value": {"coordinates": [106.5 + i * 0.01, 10.5]},
+                    },
+                    "intensity": {"type": "Property", "value": [150, -1, 20000][i % 3]},
+                    "occupancy": {
+                        "type": "Property",
+                        "value": [0.4, 1.5, "n/a"][i % 3],
+                    },
+                    "averageSpeed": {"type": "Property", "value": float(i * 5)},
+                }
+            )
+
+        with patch.object(BusinessRulesEngine, "_http_head_check", return_value=200):
+            sequential = validator_agent.validate_batch(entities, parallel=False)
+            vectorized = validator_agent.validate_batch(entities, vectorized=True)
+
+        for report in sequential + vectorized:
+            report.pop("validation_timestamp")
+
+        assert vectorized == sequential
+
+    def test_parallel_reports_in_input_order(
+        self, validator_agent, valid_camera_entity, monkeypatch
+    ):
+        """Test process pool validation streams reports in input order."""
+        performance = validator_agent.performance_config
+        monkeypatch.setitem(performance, "parallel_chunk_size", 7)
+        monkeypatch.setitem(performance, "max_workers", 2)
+
+        entities = []
+        for i in range(40):
+            entity = json.loads(json.dumps(valid_camera_entity))
+            entity["id"] = f"urn:ngsi-ld:Camera:CAM{i:03d}"
+            entity["averageSpeed"]["value"] = [45.5, -10.0][i % 2]
+            entities.append(entity)
+
+        with patch.object(BusinessRulesEngine, "_http_head_check", return_value=200):
+            sequential = validator_agent.validate_batch(entities, parallel=False)
+            parallel = list(validator_agent.iter_validate_batch(entities))
+
+        assert [r["entity_id"] for r in parallel] == [e["id"] for e in entities]
+        for report in sequential + parallel:
+            report.pop("validation_timestamp")
+        assert parallel == sequential
+
+    def test_summary_counts_error_reports(self, validator_agent):
+        """Test reports of entities that failed to validate are summarised."""
+        reports = [
+            {"status": "PASS", "quality_score": 0.9},
+            {"status": "ERROR", "quality_score": 0.0, "errors": ["boom"]},
+        ]
+
+        summary = validator_agent.get_validation_summary(reports)
+
+        assert summary["total_entities"] == 2
+        assert summary["errors"] == 1
+
     def test_get_validation_summary(self, validator_agent):
         """Test validation summary generation."""
         reports = [
@@ -952,6 +1232,42 @@ class TestPerformance:
         # Allow some tolerance due to overhead
         assert time_par <= time_seq * 1.5
 
+    @pytest.mark.benchmark
+    def test_compiled_rules_faster_than_interpreted(
+        self, data_quality_config, valid_camera_entity
+    ):
+        """Benchmark compiled rule evaluation against string evaluation."""
+        entities = []
+        for i in range(500):
+            entity = json.loads(json.dumps(valid_camera_entity))
+            entity["id"] = f"urn:ngsi-ld:Camera:CAM{i:04d}"
+            entity["averageSpeed"]["value"] = float(i % 150)
+            entities.append(entity)
+
+        compiled_engine = BusinessRulesEngine(data_quality_config)
+        interpreted_engine = BusinessRulesEngine(data_quality_config)
+        interpreted_engine.compile_expressions = False
+
+        timings = {}
+        with patch.object(BusinessRulesEngine, "_http_head_check", return_value=200):
+            for name, engine in [
+                ("interpreted", interpreted_engine),
+                ("compiled", compiled_engine),
+            ]:
+                start = time.perf_counter()
+                results = [engine.evaluate_rules(e, "Camera") for e in entities]
+                timings[name] = time.perf_counter() - start
+                timings[f"{name}_results"] = results
+
+        assert timings["compiled_results"] == timings["interpreted_results"]
+
+        print(
+            f"\nInterpreted: {timings['interpreted']:.3f}s, "
+            f"Compiled: {timings['compiled']:.3f}s "
+            f"({timings['interpreted'] / timings['compiled']:.1f}x)"
+        )
+        assert timings["compiled"] < timings["interpreted"]
+
     def test_caching_improves_performance(self, business_rules_engine):
         """Test HTTP caching improves performance for repeated checks."""
         url = "https://example.com/test.jpg"
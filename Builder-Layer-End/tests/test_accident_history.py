@@ -0,0 +1,91 @@
+"""
+Test suite for the partitioned accident history store.
+
+Tests cover:
+- Append-only daily partitions
+- Camera/time-window queries
+- Retention by dropping whole partitions
+- Legacy JSON history import
+"""
+
+import json
+from datetime import datetime, timedelta, timezone
+
+from shared.accident_history import AccidentHistoryStore
+
+
+def record(camera, timestamp, entity_id=None):
+    return {
+        "timestamp": timestamp,
+        "camera": camera,
+        "entity_id": entity_id or f"urn:ngsi-ld:RoadAccident:{camera}-{timestamp}",
+        "severity": "moderate",
+    }
+
+
+def test_appends_to_daily_partitions(tmp_path):
+    store = AccidentHistoryStore(str(tmp_path / "history"))
+
+    store.append(
+        [record("cam1", "2025-11-01T10:00:00Z"), record("cam2", "2025-11-02T00:00:01Z")]
+    )
+    store.append([record("cam1", "2025-11-01T23:59:59Z"), {"camera": "cam1"}])
+
+    partitions = store.partitions()
+    assert [p.name for _, p in partitions] == [
+        "accidents-2025-11-01.ndjson",
+        "accidents-2025-11-02.ndjson",
+    ]
+    assert len(partitions[0][1].read_text().splitlines()) == 2
+
+
+def test_query_by_camera_and_window(tmp_path):
+    store = AccidentHistoryStore(str(tmp_path))
+    store.append(
+        [
+            record("cam1", "2025-11-01T09:00:00Z"),
+            record("cam2", "2025-11-01T10:00:00Z"),
+            record("cam1", "2025-11-02T08:00:00Z"),
+            record("cam1", "2025-11-01T11:00:00Z"),
+            record("cam1", "2025-11-03T08:00:00Z"),
+        ]
+    )
+
+    results = store.query(
+        camera="cam1",
+        start="2025-11-01T10:00:00Z",
+        end=datetime(2025, 11, 2, 12, 0),
+    )
+
+    assert [r["timestamp"] for r in results] == [
+        "2025-11-01T11:00:00Z",
+        "2025-11-02T08:00:00Z",
+    ]
+    assert len(store.query()) == 5
+    assert [r["timestamp"] for r in store.query(camera="cam1", limit=1)] == [
+        "2025-11-03T08:00:00Z"
+    ]
+
+
+def test_retention_drops_whole_partitions(tmp_path):
+    store = AccidentHistoryStore(str(tmp_path))
+    now = datetime.now(timezone.utc)
+    old = (now - timedelta(days=10)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    recent = now.strftime("%Y-%m-%dT%H:%M:%SZ")
+    store.append([record("cam1", old), record("cam1", recent)])
+
+    assert store.apply_retention(7) == 1
+    assert [r["timestamp"] for r in store.query()] == [recent]
+    assert store.apply_retention(7) == 0
+
+
+def test_skips_torn_lines_and_imports_legacy_json(tmp_path):
+    store = AccidentHistoryStore(str(tmp_path / "history"))
+    legacy = tmp_path / "history.json"
+    legacy.write_text(json.dumps([record("cam1", "2025-11-01T10:00:00Z"), "junk"]))
+
+    assert store.import_json(str(legacy)) == 1
+    with open(store.partitions()[0][1], "a", encoding="utf-8") as f:
+        f.write('{"timestamp": "2025-11-01T1')
+
+    assert [r["camera"] for r in store.query()] == ["cam1"]
@@ -0,0 +1,200 @@
+"""
+Test suite for the asynchronous Stellio writer.
+
+Tests cover:
+- Concurrent attribute PATCHes bounded by the broker semaphore
+- Batched upserts, multi-status results and per-entity fallback
+- Retry of transient failures
+- Synchronous facade from worker threads
+"""
+
+import asyncio
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from aiohttp import web
+
+from shared.async_stellio_writer import AsyncStellioWriter, get_async_writer
+
+
+class FakeStellio:
+    """Minimal NGSI-LD broker on a local port, recording requests."""
+
+    def __init__(self):
+        self.requests = []
+        self.in_flight = 0
+        self.peak = 0
+        self.upsert_status = 204
+        self.upsert_errors = []
+        self.patch_failures = 0
+
+        app = web.Application()
+        app.router.add_patch("/ngsi-ld/v1/entities/{id}/attrs", self.patch)
+        app.router.add_post("/ngsi-ld/v1/entityOperations/upsert", self.upsert)
+        app.router.add_post("/ngsi-ld/v1/entities", self.create)
+
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            self.port = s.getsockname()[1]
+        self.url = f"http://127.0.0.1:{self.port}"
+
+        self.loop = asyncio.new_event_loop()
+        self.runner = web.AppRunner(app)
+        self.loop.run_until_complete(self.runner.setup())
+        self.loop.run_until_complete(
+            web.TCPSite(self.runner, "127.0.0.1", self.port).start()
+        )
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    async def patch(self, request):
+        self.requests.append(("PATCH", request.match_info["id"]))
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.02)
+        self.in_flight -= 1
+        if self.patch_failures:
+            self.patch_failures -= 1
+            return web.Response(status=503)
+        return web.Response(status=204)
+
+    async def upsert(self, request):
+        batch = await request.json()
+        self.requests.append(("UPSERT", [e["id"] for e in batch]))
+        if self.upsert_status == 207:
+            return web.json_response(
+                {
+                    "success": [
+                        e["id"] for e in batch if e["id"] not in self.upsert_errors
+                    ],
+                    "errors": [
+                        {"entityId": i, "error": {"title": "bad"}}
+                        for i in self.upsert_errors
+                    ],
+                },
+                status=207,
+            )
+        return web.Response(status=self.upsert_status)
+
+    async def create(self, request):
+        entity = await request.json()
+        self.requests.append(("POST", entity["id"]))
+        return web.Response(status=201)
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self.runner.cleanup(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+
+@pytest.fixture
+def stellio():
+    server = FakeStellio()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def writer(stellio):
+    writer = AsyncStellioWriter(
+        stellio.url,
+        max_concurrency=4,
+        batch_size=2,
+        retry={"initial_delay": 0.01},
+    )
+    yield writer
+    writer.close()
+
+
+def entities(count):
+    return [
+        {"id": f"urn:ngsi-ld:Accident:{i}", "type": "RoadAccident"}
+        for i in range(count)
+    ]
+
+
+def test_patches_run_concurrently_within_semaphore(stellio, writer):
+    updates = [
+        (
+            f"cam-{i}",
+            f"{stellio.url}/ngsi-ld/v1/entities/cam-{i}/attrs",
+            {"congested": {}},
+        )
+        for i in range(12)
+    ]
+
+    results = writer.patch_entities(updates)
+
+    assert [r.entity_id for r in results] == [f"cam-{i}" for i in range(12)]
+    assert all(r.success and r.status_code == 204 for r in results)
+    assert 1 < stellio.peak <= 4
+
+
+def test_patch_retries_transient_failures(stellio, writer):
+    stellio.patch_failures = 1
+
+    [result] = writer.patch_entities(
+        [("cam-1", f"{stellio.url}/ngsi-ld/v1/entities/cam-1/attrs", {})]
+    )
+
+    assert result.success
+    assert len(stellio.requests) == 2
+
+
+def test_upserts_are_batched(stellio, writer):
+    results = writer.upsert_entities(entities(5), f"{stellio.url}/ngsi-ld/v1/entities")
+
+    batches = [ids for method, ids in stellio.requests if method == "UPSERT"]
+    assert sorted(len(b) for b in batches) == [1, 2, 2]
+    assert all(r.success for r in results)
+
+
+def test_multi_status_marks_failed_entities(stellio, writer):
+    stellio.upsert_status = 207
+    stellio.upsert_errors = ["urn:ngsi-ld:Accident:1"]
+
+    results = writer.upsert_entities(entities(2), f"{stellio.url}/ngsi-ld/v1/entities")
+
+    assert [r.success for r in results] == [True, False]
+    assert "bad" in results[1].error
+
+
+def test_falls_back_to_per_entity_post(stellio, writer):
+    stellio.upsert_status = 404
+
+    results = writer.upsert_entities(entities(3), f"{stellio.url}/ngsi-ld/v1/entities")
+
+    assert all(r.success and r.status_code == 201 for r in results)
+    assert writer.batch_supported is False
+    assert sorted(i for m, i in stellio.requests if m == "POST") == [
+        e["id"] for e in entities(3)
+    ]
+
+
+def test_sync_facade_from_many_threads(stellio, writer):
+    def write(i):
+        url = f"{stellio.url}/ngsi-ld/v1/entities/cam-{i}/attrs"
+        return writer.patch_entities([(f"cam-{i}", url, {})])[0].success
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        assert all(pool.map(write, range(16)))
+    assert stellio.peak <= 4
+
+
+def test_connection_errors_are_reported(writer):
+    writer.base_url = "http://127.0.0.1:9"
+    writer.retry["max_attempts"] = 1
+
+    [result] = writer.patch_entities([("cam-1", "http://127.0.0.1:9/x", {})])
+
+    assert result.success is False
+    assert result.status_code is None
+    assert result.error
+
+
+def test_registry_returns_one_writer_per_broker():
+    assert get_async_writer("http://stellio.test:8080/") is get_async_writer(
+        "http://stellio.test:8080"
+    )
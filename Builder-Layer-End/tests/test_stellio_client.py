@@ -0,0 +1,181 @@
+"""
+Test suite for the shared Stellio client.
+
+Tests cover:
+- Process-wide client registry and pool sizing
+- Retry with backoff for transient failures
+- Per-endpoint latency metrics
+"""
+
+import pytest
+import requests
+import responses
+
+from shared import stellio_client
+from shared.stellio_client import (
+    StellioClient,
+    close_stellio_clients,
+    endpoint_key,
+    get_stellio_client,
+)
+
+BASE_URL = "http://stellio.test:8080"
+ENTITY_URL = f"{BASE_URL}/ngsi-ld/v1/entities/urn:ngsi-ld:Camera:1/attrs"
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(stellio_client.time, "sleep", lambda seconds: None)
+
+
+@pytest.fixture
+def client():
+    return StellioClient(BASE_URL, {"pool_size": 2})
+
+
+def test_registry_shares_one_client_per_base_url():
+    first = get_stellio_client(BASE_URL + "/", pool_size=2)
+    second = get_stellio_client(BASE_URL, pool_size=7)
+
+    assert first is second
+    assert first.get_adapter("http://")._pool_maxsize >= 7
+
+    close_stellio_clients()
+    assert get_stellio_client(BASE_URL) is not first
+
+
+def test_pool_never_shrinks(client):
+    client.ensure_pool_size(8)
+    client.ensure_pool_size(3)
+
+    assert client.pool_size == 8
+    assert client.get_adapter("https://")._pool_maxsize == 8
+
+
+def test_growing_pool_keeps_old_adapter_open_until_shutdown(client):
+    old = client.get_adapter("http://")
+    closed = []
+    old.close = lambda: closed.append(old)
+
+    client.ensure_pool_size(8)
+
+    assert client.get_adapter("http://") is not old
+    assert closed == []
+
+    client.shutdown()
+    assert closed == [old]
+
+
+class FakeHTTPXClient:
+    """Records the settings an httpx client was built with."""
+
+    instances = []
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        FakeHTTPXClient.instances.append(self)
+
+    def request(self, method, url, **kwargs):
+        return type(
+            "Reply",
+            (),
+            {
+                "status_code": 204,
+                "headers": {},
+                "content": b"",
+                "encoding": None,
+                "reason_phrase": "No Content",
+            },
+        )()
+
+    def close(self):
+        pass
+
+
+def test_http2_adapter_passes_tls_and_proxy_settings(monkeypatch):
+    monkeypatch.setattr(stellio_client.httpx, "Client", FakeHTTPXClient)
+    FakeHTTPXClient.instances = []
+    adapter = stellio_client.HTTPXAdapter(4)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.trust_env = False
+
+    session.get(ENTITY_URL)
+    session.get(
+        ENTITY_URL,
+        verify="/etc/ssl/stellio-ca.pem",
+        proxies={"http": "http://proxy.test:3128"},
+    )
+    session.get(ENTITY_URL)
+
+    assert len(FakeHTTPXClient.instances) == 2
+    default, custom = FakeHTTPXClient.instances
+    assert (default.kwargs["verify"], default.kwargs["proxy"]) == (True, None)
+    assert custom.kwargs["verify"] == "/etc/ssl/stellio-ca.pem"
+    assert custom.kwargs["proxy"] == "http://proxy.test:3128"
+
+
+def test_http2_falls_back_without_h2(monkeypatch):
+    monkeypatch.setattr(stellio_client, "HTTPX_AVAILABLE", False)
+
+    client = StellioClient(BASE_URL, {"http2": True})
+
+    assert client.http2 is False
+    assert client.get_adapter("http://")._pool_maxsize == 10
+
+
+@responses.activate
+def test_retries_transient_status_for_idempotent_methods(client):
+    responses.add(responses.PATCH, ENTITY_URL, status=503)
+    responses.add(responses.PATCH, ENTITY_URL, status=204)
+
+    response = client.patch(ENTITY_URL, json={"congested": {"value": True}})
+
+    assert response.status_code == 204
+    assert len(responses.calls) == 2
+
+
+@responses.activate
+def test_does_not_retry_post_or_opted_out_requests(client):
+    url = f"{BASE_URL}/ngsi-ld/v1/entities"
+    responses.add(responses.POST, url, status=503)
+    responses.add(responses.PATCH, ENTITY_URL, status=503)
+
+    assert client.post(url, json={}).status_code == 503
+    assert client.patch(ENTITY_URL, json={}, retry=False).status_code == 503
+    assert len(responses.calls) == 2
+
+
+@responses.activate
+def test_connection_errors_raise_after_last_attempt(client):
+    responses.add(
+        responses.GET, ENTITY_URL, body=requests.exceptions.ConnectionError("down")
+    )
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        client.get(ENTITY_URL)
+
+    assert len(responses.calls) == 3
+    assert client.get_metrics()[endpoint_key("GET", ENTITY_URL)]["errors"] == 3
+
+
+@responses.activate
+def test_metrics_group_requests_by_endpoint_template(client):
+    for camera in range(3):
+        url = f"{BASE_URL}/ngsi-ld/v1/entities/urn:ngsi-ld:Camera:{camera}/attrs"
+        responses.add(responses.PATCH, url, status=204)
+        client.patch(url, json={})
+
+    metrics = client.get_metrics()
+
+    assert list(metrics) == ["PATCH /ngsi-ld/v1/entities/{id}/attrs"]
+    assert metrics["PATCH /ngsi-ld/v1/entities/{id}/attrs"]["requests"] == 3
+    assert metrics["PATCH /ngsi-ld/v1/entities/{id}/attrs"]["errors"] == 0
+
+
+def test_close_keeps_shared_client_usable(client):
+    adapter = client.get_adapter("http://")
+
+    client.close()
+
+    assert client.get_adapter("http://") is adapter
@@ -0,0 +1,557 @@
+"""
+Test suite for the streaming workflow orchestrator.
+
+Tests cover:
+- InMemoryBroker keyed partitioning, consumer groups and committed offsets
+- StreamPipeline stage chaining, per-camera ordering and drain
+- Fused transformation stage over the in-process broker
+- WorkflowOrchestrator streaming mode dispatch
+"""
+
+import json
+import threading
+
+import pytest
+import yaml
+
+from orchestrator import AgentStatus, PhaseStatus, WorkflowOrchestrator
+from stream_orchestrator import (
+    CameraFileSource,
+    CongestionHandler,
+    FusedTransformHandler,
+    InMemoryBroker,
+    StellioPublishHandler,
+    StreamBatchError,
+    StreamHandler,
+    StreamOrchestrator,
+    StreamPipeline,
+    StreamSource,
+    StreamRecord,
+    StreamStage,
+)
+
+# ============================================================================
+# TEST HANDLERS
+# ============================================================================
+
+
+class SequenceSource(StreamSource):
+    """Emits `count` readings for each of `cameras` cameras, interleaved."""
+
+    def records(self):
+        for seq in range(self.config.get("count", 5)):
+            for camera in range(self.config.get("cameras", 3)):
+                yield f"cam-{camera}", {"camera": f"cam-{camera}", "seq": seq}
+
+
+class TagHandler(StreamHandler):
+    """Tags each record with the worker that handled it."""
+
+    def process(self, records):
+        worker = threading.current_thread().name
+        return [(r.key, dict(r.value, worker=worker)) for r in records]
+
+
+class CollectHandler(StreamHandler):
+    """Sink collecting every consumed value."""
+
+    collected = []
+
+    def process(self, records):
+        CollectHandler.collected.extend(r.value for r in records)
+        return []
+
+
+class FailingHandler(StreamHandler):
+    """Fails on every batch."""
+
+    def process(self, records):
+        raise ValueError("bad batch")
+
+
+@pytest.fixture(autouse=True)
+def reset_collected():
+    CollectHandler.collected = []
+
+
+# ============================================================================
+# IN-MEMORY BROKER
+# ============================================================================
+
+
+def test_same_key_maps_to_same_partition():
+    broker = InMemoryBroker(num_partitions=8)
+
+    records = [broker.send("cameras.raw", "cam-1", {"seq": i}) for i in range(10)]
+
+    assert len({r.partition for r in records}) == 1
+    assert [r.offset for r in records] == list(range(10))
+
+
+def test_group_members_split_partitions():
+    broker = InMemoryBroker(num_partitions=4)
+    for i in range(40):
+        broker.send("cameras.raw", f"cam-{i}", i)
+
+    first = broker.subscribe(["cameras.raw"], "transformation")
+    second = broker.subscribe(["cameras.raw"], "transformation")
+    a = first.poll(max_records=100, timeout=0)
+    b = second.poll(max_records=100, timeout=0)
+
+    assert len(a) + len(b) == 40
+    assert not {(r.partition) for r in a} & {(r.partition) for r in b}
+
+
+def test_groups_consume_independently():
+    broker = InMemoryBroker(num_partitions=2)
+    for i in range(6):
+        broker.send("cameras.raw", f"cam-{i}", i)
+
+    for group in ("transformation", "analytics"):
+        consumer = broker.subscribe(["cameras.raw"], group)
+        assert len(consumer.poll(max_records=100, timeout=0)) == 6
+        consumer.commit()
+        assert consumer.lag() == 0
+
+
+def test_uncommitted_records_are_redelivered():
+    broker = InMemoryBroker(num_partitions=1)
+    broker.send("entities.ngsi", "cam-0", {"id": 1})
+
+    consumer = broker.subscribe(["entities.ngsi"], "publishing")
+    assert len(consumer.poll(timeout=0)) == 1
+    consumer.close()
+
+    replacement = broker.subscribe(["entities.ngsi"], "publishing")
+    assert len(replacement.poll(timeout=0)) == 1
+    replacement.commit()
+    assert replacement.poll(timeout=0) == []
+
+
+def test_rewind_releases_partitions_to_new_owner():
+    broker = InMemoryBroker(num_partitions=2)
+    for i in range(8):
+        broker.send("cameras.raw", f"cam-{i}", i)
+
+    first = broker.subscribe(["cameras.raw"], "transformation")
+    assert len(first.poll(timeout=0)) == 8
+    second = broker.subscribe(["cameras.raw"], "transformation")
+    assert second.poll(timeout=0) == []
+
+    first.rewind()
+    moved = second.poll(timeout=0)
+
+    assert moved
+    assert len(first.poll(timeout=0)) + len(moved) == 8
+
+
+# ============================================================================
+# PIPELINE
+# ============================================================================
+
+
+def build_stages(workers=3, handler=TagHandler):
+    return [
+        StreamStage(
+            "collection",
+            SequenceSource,
+            output_topic="cameras.raw",
+            config={"count": 20, "cameras": 6},
+        ),
+        StreamStage(
+            "transformation",
+            handler,
+            input_topics=["cameras.raw"],
+            output_topic="entities.ngsi",
+            group_id="transformation",
+            workers=workers,
+        ),
+        StreamStage(
+            "publishing",
+            CollectHandler,
+            input_topics=["entities.ngsi"],
+            group_id="publishing",
+        ),
+    ]
+
+
+def test_pipeline_preserves_per_camera_order():
+    broker = InMemoryBroker(num_partitions=4)
+    pipeline = StreamPipeline(
+        broker, build_stages(), poll_max_records=7, poll_timeout=0.05
+    )
+
+    stats = pipeline.run()
+
+    assert stats["collection"].produced == 120
+    assert stats["transformation"].consumed == 120
+    assert stats["publishing"].consumed == 120
+    for camera in range(6):
+        values = [v for v in CollectHandler.collected if v["camera"] == f"cam-{camera}"]
+        assert [v["seq"] for v in values] == list(range(20))
+        assert len({v["worker"] for v in values}) == 1
+
+
+def test_pipeline_dead_letters_failed_batches_and_drains():
+    broker = InMemoryBroker(num_partitions=2)
+    pipeline = StreamPipeline(
+        broker,
+        build_stages(workers=2, handler=FailingHandler),
+        poll_timeout=0.05,
+        max_retries=2,
+        retry_backoff=0,
+    )
+
+    stats = pipeline.run()
+
+    assert stats["transformation"].failed == 120
+    assert stats["publishing"].consumed == 0
+    assert broker.lag(["cameras.raw"], "transformation") == 0
+    dead = broker.records("transformation.dead_letter")
+    assert len(dead) == 120
+    assert dead[0].value["error"] == "bad batch"
+    assert {r.value["value"]["seq"] for r in dead} == set(range(20))
+
+
+class FlakyHandler(StreamHandler):
+    """Fails the first two batches, then collects."""
+
+    calls = 0
+
+    def process(self, records):
+        FlakyHandler.calls += 1
+        if FlakyHandler.calls <= 2:
+            raise ValueError("stellio unavailable")
+        CollectHandler.collected.extend(r.value for r in records)
+        return []
+
+
+def test_pipeline_retries_failed_batch_without_committing():
+    FlakyHandler.calls = 0
+    broker = InMemoryBroker(num_partitions=1)
+    for seq in range(5):
+        broker.send("entities.ngsi", "cam-0", {"seq": seq})
+    stages = [
+        StreamStage(
+            "publishing",
+            FlakyHandler,
+            input_topics=["entities.ngsi"],
+            group_id="publishing",
+        )
+    ]
+    pipeline = StreamPipeline(broker, stages, poll_timeout=0.05, retry_backoff=0)
+
+    stats = pipeline.run()
+
+    assert [v["seq"] for v in CollectHandler.collected] == list(range(5))
+    assert stats["publishing"].consumed == 5
+    assert stats["publishing"].failed == 0
+    assert broker.records("publishing.dead_letter") == []
+
+
+def test_pipeline_keeps_polling_while_external_upstream_runs():
+    broker = InMemoryBroker(num_partitions=2)
+    stages = build_stages()
+    pipeline = StreamPipeline(
+        broker, stages[1:2], poll_timeout=0.05, external_stages=[stages[0], stages[2]]
+    )
+    thread = threading.Thread(target=pipeline.run)
+    thread.start()
+
+    thread.join(0.3)
+    assert thread.is_alive()
+
+    broker.send("cameras.raw", "cam-0", {"camera": "cam-0", "seq": 0})
+    thread.join(0.3)
+    assert thread.is_alive()
+    pipeline.stop()
+    thread.join(5)
+
+    assert not thread.is_alive()
+    assert pipeline.stats["transformation"].consumed == 1
+
+
+class PartialFailureHandler(StreamHandler):
+    """Fails the records of odd sequence numbers."""
+
+    def process(self, records):
+        failed = [r for r in records if r.value["seq"] % 2]
+        if failed:
+            raise StreamBatchError(f"{len(failed)} records failed", failed)
+        return []
+
+
+def test_pipeline_dead_letters_only_failed_records_of_a_batch():
+    broker = InMemoryBroker(num_partitions=1)
+    for seq in range(6):
+        broker.send("entities.ngsi", "cam-0", {"seq": seq})
+    stages = [
+        StreamStage(
+            "publishing",
+            PartialFailureHandler,
+            input_topics=["entities.ngsi"],
+            group_id="publishing",
+        )
+    ]
+    pipeline = StreamPipeline(
+        broker, stages, poll_timeout=0.05, max_retries=1, retry_backoff=0
+    )
+
+    stats = pipeline.run()
+
+    assert stats["publishing"].consumed == 6
+    assert stats["publishing"].failed == 3
+    dead = broker.records("publishing.dead_letter")
+    assert [r.value["value"]["seq"] for r in dead] == [1, 3, 5]
+
+
+def test_publish_handler_raises_for_failed_upserts(monkeypatch):
+    from agents.context_management.entity_publisher_agent import PublishResult
+
+    handler = StellioPublishHandler({})
+    monkeypatch.setattr(
+        handler.agent.publisher,
+        "publish_batch",
+        lambda entities: [
+            PublishResult(
+                entity_id=e["id"], status_code=201 if i else 500, success=bool(i)
+            )
+            for i, e in enumerate(entities)
+        ],
+    )
+    records = [
+        StreamRecord("entities.ngsi", 0, i, "cam", {"id": f"urn:{i}"}) for i in range(3)
+    ]
+
+    with pytest.raises(StreamBatchError) as excinfo:
+        handler.process(records)
+
+    assert excinfo.value.records == records[:1]
+
+
+def test_fused_transformation_stage(tmp_path):
+    cameras = [
+        {
+            "id": str(i),
+            "name": f"Camera {i}",
+            "code": f"TTH {100 + i}",
+            "latitude": 10.79 + i * 0.01,
+            "longitude": 106.69 + i * 0.01,
+            "cam_type": "tth",
+            "image_url_x4": f"https://example.com/image?id={i}",
+            "status": "success",
+            "updated_at": "2025-10-31T23:13:05.002234",
+        }
+        for i in range(4)
+    ]
+    input_file = tmp_path / "cameras_enriched.json"
+    input_file.write_text(json.dumps(cameras), encoding="utf-8")
+
+    broker = InMemoryBroker(num_partitions=2)
+    stages = [
+        StreamStage(
+            "collection",
+            CameraFileSource,
+            output_topic="cameras.raw",
+            config={"input_file": str(input_file)},
+        ),
+        StreamStage(
+            "transformation",
+            FusedTransformHandler,
+            input_topics=["cameras.raw"],
+            output_topic="entities.ngsi",
+            workers=2,
+        ),
+    ]
+
+    stats = StreamPipeline(broker, stages, poll_timeout=0.05).run()
+
+    assert stats["transformation"].consumed == 4
+    camera_records = [
+        r for r in broker.records("entities.ngsi") if "Camera" in r.value["type"]
+    ]
+    assert sorted(r.key for r in camera_records) == ["0", "1", "2", "3"]
+    for record in camera_records:
+        assert record.partition == broker.partition_for(record.key)
+
+
+def test_fused_transformation_reemits_support_entities_after_failure(monkeypatch):
+    def fail(camera):
+        raise ValueError("bad camera")
+
+    handler = FusedTransformHandler({})
+    record = StreamRecord("cameras.raw", 0, 0, "0", {"id": "0"})
+    monkeypatch.setattr(handler.agent, "process_camera", fail)
+    with pytest.raises(ValueError):
+        handler.process([record])
+
+    monkeypatch.setattr(handler.agent, "process_camera", lambda camera: (None, []))
+    support = handler.process([record])
+
+    assert support
+    assert handler.process([record]) == []
+
+
+class ObservationSource(StreamSource):
+    """Emits breaching observations of one camera, 30 seconds apart."""
+
+    def records(self):
+        for i in range(4):
+            yield "cam-1", {
+                "id": f"urn:ngsi-ld:ItemFlowObserved:cam-1-{i}",
+                "refDevice": {"object": "urn:ngsi-ld:Camera:cam-1"},
+                **{
+                    prop: {
+                        "type": "Property",
+                        "value": value,
+                        "observedAt": f"2025-11-01T10:0{i // 2}:{i % 2 * 3}0Z",
+                    }
+                    for prop, value in (
+                        ("occupancy", 0.9),
+                        ("averageSpeed", 5),
+                        ("intensity", 20),
+                    )
+                },
+            }
+
+
+def test_congestion_stage_emits_state_flips(tmp_path, monkeypatch):
+    from shared.stellio_client import get_stellio_client
+
+    config_path = tmp_path / "congestion.yaml"
+    config_path.write_text(
+        yaml.safe_dump(
+            {
+                "congestion_detection": {
+                    "thresholds": {
+                        "occupancy": 0.5,
+                        "average_speed": 15,
+                        "intensity": 10,
+                    },
+                    "rules": {"logic": "AND", "min_duration": 60},
+                    "stellio": {
+                        "base_url": "http://stream.test",
+                        "update_endpoint": "/entities/{id}/attrs",
+                        "batch_updates": False,
+                    },
+                    "alert": {"enabled": False},
+                    "state": {"file": str(tmp_path / "state.json")},
+                }
+            }
+        ),
+        encoding="utf-8",
+    )
+
+    patched = []
+
+    class Response:
+        status_code = 204
+
+        def raise_for_status(self):
+            pass
+
+    monkeypatch.setattr(
+        get_stellio_client("http://stream.test"),
+        "patch",
+        lambda url, **kwargs: patched.append(url) or Response(),
+    )
+
+    broker = InMemoryBroker(num_partitions=2)
+    stages = [
+        StreamStage("analytics", ObservationSource, output_topic="observations"),
+        StreamStage(
+            "congestion",
+            CongestionHandler,
+            input_topics=["observations"],
+            output_topic="congestion",
+            config={"config_path": str(config_path)},
+        ),
+    ]
+
+    StreamPipeline(broker, stages, poll_max_records=1, poll_timeout=0.05).run()
+
+    assert patched == ["http://stream.test/entities/urn:ngsi-ld:Camera:cam-1/attrs"]
+    [flip] = broker.records("congestion")
+    assert flip.key == "cam-1"
+    assert flip.value["congested"] is True
+    state = json.loads((tmp_path / "state.json").read_text())
+    assert state["urn:ngsi-ld:Camera:cam-1"]["congested"] is True
+
+
+# ============================================================================
+# ORCHESTRATOR
+# ============================================================================
+
+
+def streaming_config():
+    return {
+        "enabled": True,
+        "transport": "memory",
+        "partitions": 2,
+        "poll_timeout": 0.05,
+        "stages": [
+            {
+                "name": "collection",
+                "source": "tests.test_stream_orchestrator:SequenceSource",
+                "output_topic": "cameras.raw",
+                "config": {"count": 2},
+            },
+            {
+                "name": "transformation",
+                "handler": "tests.test_stream_orchestrator:TagHandler",
+                "input_topic": "cameras.raw",
+                "output_topic": "entities.ngsi",
+                "workers": 2,
+            },
+            {
+                "name": "publishing",
+                "handler": "tests.test_stream_orchestrator:CollectHandler",
+                "input_topics": ["entities.ngsi"],
+            },
+        ],
+    }
+
+
+def test_stream_orchestrator_runs_configured_stages():
+    stats = StreamOrchestrator(streaming_config()).run()
+
+    assert stats["publishing"].consumed == 6
+    assert len(CollectHandler.collected) == 6
+
+
+def test_stream_stage_requires_handler():
+    with pytest.raises(ValueError):
+        StreamStage.from_config(
+            {"name": "transformation", "input_topic": "cameras.raw"}
+        )
+
+
+def test_workflow_orchestrator_streaming_mode(tmp_path):
+    config = {
+        "workflow": {
+            "name": "Streaming Test",
+            "phases": [
+                {
+                    "name": "Data Collection",
+                    "agents": [{"name": "never_run", "module": "agents.missing"}],
+                }
+            ],
+        },
+        "health_checks": {"enabled": False},
+        "reporting": {"output_directory": str(tmp_path / "reports")},
+        "streaming": streaming_config(),
+    }
+    config_path = tmp_path / "workflow.yaml"
+    config_path.write_text(yaml.safe_dump(config), encoding="utf-8")
+
+    report = WorkflowOrchestrator(str(config_path)).run()
+
+    assert report.status == "success"
+    assert [p.name for p in report.phases] == ["Streaming"]
+    assert report.phases[0].status == PhaseStatus.SUCCESS
+    assert [a.name for a in report.phases[0].agents] == [
+        "collection",
+        "transformation",
+        "publishing",
+    ]
+    assert all(a.status == AgentStatus.SUCCESS for a in report.phases[0].agents)
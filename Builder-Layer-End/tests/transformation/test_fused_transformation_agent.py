@@ -0,0 +1,241 @@
+"""
+Test Suite for Fused Transformation Agent
+
+Tests for the single-pass transform, enhance and validate stage:
+- Streaming JSON array writer
+- NGSI-LD structure validation
+- Equivalence with the chained transformer and SOSA mapper agents
+
+Author: Builder Layer LOD System
+Version: 1.0.0
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from agents.transformation.fused_transformation_agent import (
+    EntityStructureValidator,
+    FusedTransformationAgent,
+    JSONArrayWriter,
+    main,
+)
+from agents.transformation.sosa_ssn_mapper_agent import SOSASSNMapperAgent
+
+NGSI_LD_CONFIG = "config/ngsi_ld_mappings.yaml"
+SOSA_CONFIG = "config/sosa_mappings.yaml"
+
+
+@pytest.fixture
+def raw_cameras_file(tmp_path):
+    """Create a small enriched cameras file."""
+    cameras = []
+    for i in range(3):
+        cameras.append(
+            {
+                "id": str(i),
+                "name": f"Camera {i}",
+                "code": f"TTH {100 + i}",
+                "latitude": 10.79 + i * 0.01,
+                "longitude": 106.69 + i * 0.01,
+                "ptz": "True",
+                "cam_type": "tth",
+                "image_url_x4": f"https://example.com/image?id={i}",
+                "status": "success",
+                "updated_at": "2025-10-31T23:13:05.002234",
+                "enrichment_timestamp": "2025-11-17T19:58:55.036099Z",
+                "weather": {
+                    "temperature": 26.68,
+                    "humidity": 93,
+                    "pressure": 1008,
+                    "description": "mist",
+                    "wind_speed": 2.06,
+                    "clouds": 98,
+                },
+                "air_quality": {
+                    "pm25": {"value": 8, "unit": "µg/m³"},
+                    "aqi_category": "Good",
+                    "aqi_index": 1,
+                },
+            }
+        )
+
+    source_file = tmp_path / "cameras_enriched.json"
+    source_file.write_text(json.dumps(cameras), encoding="utf-8")
+    return source_file
+
+
+@pytest.fixture
+def fused_agent():
+    """Create fused agent with the repository mapping configs."""
+    return FusedTransformationAgent(NGSI_LD_CONFIG, SOSA_CONFIG)
+
+
+class TestJSONArrayWriter:
+    """Test streaming JSON array writer."""
+
+    @pytest.mark.parametrize("indent", [2, None])
+    def test_matches_json_dump(self, tmp_path, indent):
+        """Test streamed output is byte-identical to json.dump."""
+        entities = [{"id": "urn:a", "name": "Trần"}, {"id": "urn:b", "v": [1, 2]}]
+        path = tmp_path / "out.json"
+
+        with JSONArrayWriter(str(path), indent) as writer:
+            for entity in entities:
+                writer.write(entity)
+
+        expected = json.dumps(entities, ensure_ascii=False, indent=indent)
+        assert path.read_text(encoding="utf-8") == expected
+
+    def test_empty_array(self, tmp_path):
+        """Test writer with no entities produces an empty array."""
+        path = tmp_path / "out.json"
+
+        with JSONArrayWriter(str(path)):
+            pass
+
+        assert json.loads(path.read_text()) == []
+
+    def test_failure_keeps_previous_file(self, tmp_path):
+        """Test a failed run does not replace the existing output."""
+        path = tmp_path / "out.json"
+        path.write_text("[1]")
+
+        with pytest.raises(RuntimeError):
+            with JSONArrayWriter(str(path)) as writer:
+                writer.write({"id": "urn:a"})
+                raise RuntimeError("boom")
+
+        assert path.read_text() == "[1]"
+        assert not (tmp_path / "out.json.tmp").exists()
+
+
+class TestEntityStructureValidator:
+    """Test NGSI-LD structure validation."""
+
+    def test_valid_entity(self):
+        """Test well-formed entity passes."""
+        validator = EntityStructureValidator({})
+        entity = {
+            "id": "urn:ngsi-ld:Camera:C1",
+            "type": "Camera",
+            "@context": ["https://uri.etsi.org/ngsi-ld/v1/ngsi-ld-core-context.jsonld"],
+            "name": {"type": "Property", "value": "C1"},
+            "refDevice": {"type": "Relationship", "object": "urn:ngsi-ld:Device:D1"},
+        }
+
+        assert validator.validate_entity(entity)
+        assert validator.get_errors() == []
+
+    def test_invalid_entity(self):
+        """Test structural errors are reported."""
+        validator = EntityStructureValidator({})
+        entity = {
+            "id": "C1",
+            "type": "Camera",
+            "name": "C1",
+            "refDevice": {"type": "Relationship"},
+        }
+
+        assert not validator.validate_entity(entity)
+        errors = validator.get_errors()
+        assert "Missing required field: @context" in errors
+        assert "Entity id is not a URI: C1" in errors
+        assert "name is not an NGSI-LD attribute" in errors
+        assert "refDevice missing 'object' field" in errors
+
+
+class TestFusedTransformationAgent:
+    """Test fused transform, enhance and validate stage."""
+
+    def test_run_writes_only_validated_stream(
+        self, fused_agent, raw_cameras_file, tmp_path
+    ):
+        """Test intermediate files are not written without debug taps."""
+        output_file = tmp_path / "validated_entities.json"
+
+        stats = fused_agent.run(str(raw_cameras_file), str(output_file))
+
+        entities = json.loads(output_file.read_text(encoding="utf-8"))
+        assert stats["total_cameras"] == 3
+        assert stats["ngsi_ld_entities"] == 9
+        assert stats["valid_entities"] == len(entities) == 11
+        assert sorted(p.name for p in tmp_path.iterdir()) == [
+            "cameras_enriched.json",
+            "validated_entities.json",
+        ]
+
+    def test_matches_chained_agents(self, fused_agent, raw_cameras_file, tmp_path):
+        """Test fused output equals SOSA mapping of the NGSI-LD debug tap."""
+        output_file = tmp_path / "validated_entities.json"
+        ngsi_ld_file = tmp_path / "ngsi_ld_entities.json"
+        sosa_file = tmp_path / "sosa_enhanced_entities.json"
+
+        fused_agent.run(
+            str(raw_cameras_file),
+            str(output_file),
+            ngsi_ld_file=str(ngsi_ld_file),
+            sosa_file=str(sosa_file),
+        )
+
+        mapper = SOSASSNMapperAgent(config_path=SOSA_CONFIG)
+        ngsi_entities = json.loads(ngsi_ld_file.read_text(encoding="utf-8"))
+        chained = mapper.generate_support_entities() + mapper.enhance_all(ngsi_entities)
+
+        assert json.loads(sosa_file.read_text(encoding="utf-8")) == chained
+        assert json.loads(output_file.read_text(encoding="utf-8")) == chained
+
+    def test_invalid_entities_are_filtered(
+        self, fused_agent, raw_cameras_file, tmp_path
+    ):
+        """Test invalid entities go to the invalid file and the report."""
+        output_file = tmp_path / "validated_entities.json"
+        invalid_file = tmp_path / "invalid_entities.json"
+        report_file = tmp_path / "validation_report.json"
+
+        original = fused_agent.mapper.enhance_entity
+
+        def break_weather(entity):
+            enhanced = original(entity)
+            if "WeatherObserved" in enhanced.get("type", []):
+                enhanced["temperature"] = 26.68
+            return enhanced
+
+        fused_agent.mapper.enhance_entity = break_weather
+        fused_agent.run(
+            str(raw_cameras_file),
+            str(output_file),
+            invalid_file=str(invalid_file),
+            report_file=str(report_file),
+        )
+
+        valid = json.loads(output_file.read_text(encoding="utf-8"))
+        invalid = json.loads(invalid_file.read_text(encoding="utf-8"))
+        report = json.loads(report_file.read_text(encoding="utf-8"))
+
+        assert len(valid) == 8
+        assert len(invalid) == 3
+        assert all("WeatherObserved" in entity["type"] for entity in invalid)
+        assert report["summary"]["invalid"] == 3
+        assert report["errors"][0]["errors"] == [
+            "temperature is not an NGSI-LD attribute"
+        ]
+
+    def test_main_with_orchestrator_config(self, raw_cameras_file, tmp_path):
+        """Test orchestrator entry point with debug taps."""
+        output_file = tmp_path / "validated_entities.json"
+        sosa_file = tmp_path / "sosa.json"
+
+        result = main(
+            {
+                "input_file": str(raw_cameras_file),
+                "output_file": str(output_file),
+                "debug_taps": {"ngsi_ld_file": None, "sosa_file": str(sosa_file)},
+            }
+        )
+
+        assert result["status"] == "success"
+        assert result["output_file"] == str(output_file)
+        assert Path(sosa_file).exists()
+        assert result["stats"]["valid_entities"] == 11